@@ -1,7 +1,43 @@
 #!/usr/bin/env python3
 """
 Package IA.
+
+Les classes sont importées au premier accès (numpy et les index ne sont
+chargés que par les modules qui s'en servent) : importer un sous-module
+comme app.ai.prompt_builder ne charge pas tout le package.
 """
-from .smart_classifier import SmartClassifier, EmailAnalysis
+import importlib
+
+# Nom exporté -> sous-module qui le définit
+_EXPORTS = {
+    'SmartClassifier': 'smart_classifier', 'EmailAnalysis': 'smart_classifier',
+    'EmbeddingClassifier': 'embedding_classifier',
+    'SemanticSearch': 'semantic_search', 'VectorIndex': 'semantic_search',
+    'ClassificationCascade': 'classification_cascade', 'ConfidenceCalibrator': 'classification_cascade',
+    'PromptBuilder': 'prompt_builder', 'PromptSection': 'prompt_builder', 'estimate_tokens': 'prompt_builder',
+    'ResponseCache': 'response_cache',
+    'KeywordMatcher': 'keyword_matcher', 'shared_matcher': 'keyword_matcher',
+    'LanguageIdentifier': 'language_identifier', 'shared_identifier': 'language_identifier',
+    'OnlineClassifier': 'online_classifier',
+    'ClassifierStore': 'classifier_store', 'get_store': 'classifier_store',
+    'KeywordIndex': 'keyword_index', 'get_keyword_index': 'keyword_index',
+    'SenderIndex': 'sender_index', 'SenderStats': 'sender_index', 'get_sender_index': 'sender_index',
+    'SpamFilter': 'spam_filter', 'get_spam_filter': 'spam_filter',
+    'NearDuplicateIndex': 'near_duplicates', 'shared_near_duplicates': 'near_duplicates',
+    'ThreadIndex': 'thread_index', 'get_thread_index': 'thread_index',
+    'AnalysisStore': 'analysis_store', 'get_analysis_store': 'analysis_store',
+    'SpeculativePrecomputer': 'speculative_precompute'
+}
+
+__all__ = list(_EXPORTS)
+
+def __getattr__(name: str):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
 
-__all__ = ['SmartClassifier', 'EmailAnalysis']
\ No newline at end of file
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Stockage SQLite des analyses de messages (par identifiant, empreinte du contenu et version).
+"""
+import json
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.ai.smart_classifier import email_hash
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS analyses (
+        email_id TEXT PRIMARY KEY,
+        content_hash TEXT NOT NULL,
+        version TEXT NOT NULL,
+        analysis TEXT NOT NULL,
+        updated DATETIME
+    ) WITHOUT ROWID;
+'''
+
+_UPSERT_ANALYSIS = '''
+    INSERT OR REPLACE INTO analyses (email_id, content_hash, version, analysis, updated)
+    VALUES (?, ?, ?, ?, ?)
+'''
+_SELECT_ANALYSIS = "SELECT content_hash, version, analysis FROM analyses WHERE email_id = ?"
+
+class AnalysisStore:
+    """
+    Analyses enregistrées par message.
+
+    Une analyse n'est rendue que si l'empreinte du contenu et la version
+    (modèle et prompt) correspondent encore : un message modifié ou un
+    changement de version la rendent caduque sans purge, et elle est
+    remplacée à la prochaine analyse du message.
+    """
+
+    def __init__(self, db_path: str = "app/data/analyses.db"):
+        """
+        Ouvre le stockage.
+
+        Args:
+            db_path: Fichier SQLite
+        """
+        self.db_path = db_path
+
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connexion du thread courant (ouverte au premier appel)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    @staticmethod
+    def content_hash(email) -> str:
+        """Empreinte du contenu (l'aperçu est présent dans les listes comme dans les messages complets)."""
+        return email_hash(email.subject, email.snippet or email.body)
+
+    def get(self, email, version: str) -> Optional[Dict[str, Any]]:
+        """
+        Analyse enregistrée d'un message.
+
+        Args:
+            email: Email
+            version: Version attendue (modèle et prompt)
+
+        Returns:
+            L'analyse, None si absente ou caduque
+        """
+        try:
+            row = self._connection().execute(_SELECT_ANALYSIS, (email.id,)).fetchone()
+        except Exception as e:
+            logger.error(f"Erreur lecture analyses: {e}")
+            return None
+
+        if not row or row[0] != self.content_hash(email) or row[1] != version:
+            return None
+        return json.loads(row[2])
+
+    def load(self, emails: list, version: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyses encore valides d'un lot de messages (une requête par tranche de 500).
+
+        Args:
+            emails: Liste d'emails
+            version: Version attendue (modèle et prompt)
+
+        Returns:
+            Identifiant -> analyse, pour les messages dont l'analyse est à jour
+        """
+        hashes = {email.id: self.content_hash(email) for email in emails if email.id}
+        ids = list(hashes)
+        found = {}
+        try:
+            conn = self._connection()
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                rows = conn.execute(
+                    f"SELECT email_id, content_hash, version, analysis FROM analyses "
+                    f"WHERE email_id IN ({','.join('?' * len(chunk))})", chunk
+                )
+                for email_id, content_hash, row_version, analysis in rows:
+                    if content_hash == hashes[email_id] and row_version == version:
+                        found[email_id] = json.loads(analysis)
+        except Exception as e:
+            logger.error(f"Erreur lecture analyses: {e}")
+
+        return found
+
+    def put(self, email, analysis: Dict[str, Any], version: str):
+        """
+        Enregistre l'analyse d'un message (remplace la précédente).
+
+        Args:
+            email: Email analysé
+            analysis: Résultat de l'analyse
+            version: Version de l'analyse (modèle et prompt)
+        """
+        try:
+            conn = self._connection()
+            with conn:
+                conn.execute(_UPSERT_ANALYSIS, (
+                    email.id, self.content_hash(email), version,
+                    json.dumps(analysis, ensure_ascii=False, default=str), datetime.now().isoformat(sep=' ')
+                ))
+        except Exception as e:
+            logger.error(f"Erreur écriture analyse {email.id}: {e}")
+
+    def close(self):
+        """Ferme les connexions."""
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+
+
+_stores: Dict[str, AnalysisStore] = {}
+_stores_lock = threading.Lock()
+
+def get_analysis_store(db_path: str = "app/data/analyses.db") -> AnalysisStore:
+    """Stockage partagé d'un fichier (ouvert au premier appel)."""
+    key = str(Path(db_path).resolve())
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = AnalysisStore(db_path)
+        return _stores[key]
+
+def close_analysis_stores():
+    """Ferme tous les stockages partagés (à appeler à la fermeture de l'application)."""
+    with _stores_lock:
+        stores = list(_stores.values())
+        _stores.clear()
+    for store in stores:
+        store.close()
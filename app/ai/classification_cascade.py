@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Cascade de classification : règles, puis embeddings, puis génération.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from app.ai.smart_classifier import SmartClassifier, to_ai_category
+
+logger = logging.getLogger(__name__)
+
+class ConfidenceCalibrator:
+    """
+    Calibre le seuil d'acceptation des règles.
+
+    Chaque verdict des règles vérifié par un niveau supérieur est enregistré
+    par tranche de confiance. Le seuil retenu est la plus basse tranche à
+    partir de laquelle la précision observée atteint la précision cible,
+    sans descendre sous un plancher. Les tranches sont conservées dans le
+    stockage des corrections d'une session à l'autre.
+    """
+
+    def __init__(self, target_precision: float = 0.9, default_threshold: float = 0.7,
+                 min_samples: int = 30, bins: int = 10, min_threshold: Optional[float] = None,
+                 store=None, name: str = "rules", autosave_every: int = 20):
+        """
+        Initialise le calibrage.
+
+        Args:
+            target_precision: Précision visée pour les verdicts acceptés
+            default_threshold: Seuil tant que les verdicts vérifiés sont trop peu nombreux
+            min_samples: Verdicts vérifiés nécessaires pour calibrer
+            bins: Tranches de confiance
+            min_threshold: Seuil minimal (default_threshold par défaut)
+            store: ClassifierStore où conserver les tranches (optionnel)
+            name: Nom du calibrage dans le stockage
+            autosave_every: Sauvegarde tous les N verdicts enregistrés
+        """
+        self.target_precision = target_precision
+        self.default_threshold = default_threshold
+        self.min_samples = min_samples
+        self.bins = bins
+        self.min_threshold = default_threshold if min_threshold is None else min_threshold
+        self.store = store
+        self.name = name
+        self.autosave_every = autosave_every
+        self.agreed = [0] * bins
+        self.total = [0] * bins
+        self._unsaved = 0
+
+        self.load()
+        self._threshold = self._compute_threshold()
+
+    def record(self, confidence: float, agreed: bool):
+        """Enregistre un verdict vérifié."""
+        index = min(int(confidence * self.bins), self.bins - 1)
+        self.total[index] += 1
+        if agreed:
+            self.agreed[index] += 1
+        self._threshold = self._compute_threshold()
+
+        self._unsaved += 1
+        if self._unsaved >= self.autosave_every:
+            self.save()
+
+    def threshold(self) -> float:
+        """Seuil de confiance actuel."""
+        return self._threshold
+
+    def _compute_threshold(self) -> float:
+        """Plus basse tranche dont la précision cumulée atteint la cible."""
+        agreed = total = 0
+        threshold = None
+
+        for index in range(self.bins - 1, -1, -1):
+            agreed += self.agreed[index]
+            total += self.total[index]
+            if total >= self.min_samples and self.total[index]:
+                if agreed / total >= self.target_precision:
+                    threshold = index / self.bins
+                else:
+                    break
+
+        if threshold is None:
+            return self.default_threshold
+        return max(threshold, self.min_threshold)
+
+    def save(self):
+        """Enregistre les tranches dans le stockage."""
+        if self.store and self.store.save_calibration(self.name, self.agreed, self.total):
+            self._unsaved = 0
+
+    def load(self):
+        """Reprend les tranches enregistrées (ignorées si le nombre de tranches a changé)."""
+        if not self.store:
+            return
+        saved = self.store.load_calibration(self.name)
+        if saved and len(saved[0]) == self.bins:
+            self.agreed, self.total = saved
+
+
+class ClassificationCascade:
+    """Classe chaque email au niveau le moins coûteux suffisamment confiant."""
+
+    TIER_RULES = "rules"
+    TIER_EMBEDDING = "embedding"
+    TIER_LLM = "llm"
+    TIER_FALLBACK = "fallback"
+    TIERS = (TIER_RULES, TIER_EMBEDDING, TIER_LLM, TIER_FALLBACK)
+
+    # Catégories de l'analyse par génération apprises par le modèle local
+    LEARNABLE_CATEGORIES = ('cv', 'meeting', 'invoice', 'newsletter', 'support', 'spam', 'important', 'personal', 'work')
+
+    def __init__(self, ai_processor, smart_classifier: Optional[SmartClassifier] = None,
+                 calibrator: Optional[ConfidenceCalibrator] = None, audit_every: int = 20,
+                 sender_index=None):
+        """
+        Initialise la cascade.
+
+        Args:
+            ai_processor: AIProcessor (niveaux embeddings et génération)
+            smart_classifier: Classificateur par règles
+            calibrator: Calibrage du seuil des règles
+            audit_every: Un verdict accepté des règles sur N est vérifié par les
+                niveaux supérieurs pour garder le calibrage à jour
+            sender_index: Statistiques par expéditeur recevant la catégorie de
+                chaque email (celles d'AIProcessor par défaut)
+        """
+        self.ai_processor = ai_processor
+        self.smart_classifier = smart_classifier or SmartClassifier()
+        self.calibrator = calibrator or ConfidenceCalibrator(store=getattr(self.smart_classifier, 'store', None))
+        self.audit_every = audit_every
+        self.sender_index = sender_index or getattr(ai_processor, 'sender_index', None)
+
+        self._accepted_rules = 0
+        self._hits = {tier: 0 for tier in self.TIERS}
+        self._latency = {tier: 0.0 for tier in self.TIERS}
+        self._lock = threading.Lock()
+
+    def classify(self, email) -> Dict[str, Any]:
+        """
+        Classe un email.
+
+        Args:
+            email: Email à classer
+
+        Returns:
+            Dictionnaire d'analyse (category, sentiment, summary, source...)
+        """
+        start = time.perf_counter()
+
+        rule_analysis, rule_category, rule_confidence = self._classify_by_rules(email)
+        if rule_analysis:
+            with self._lock:
+                self._accepted_rules += 1
+                audit = self._accepted_rules % self.audit_every == 0
+
+            if not audit:
+                return self._finish(self.TIER_RULES, rule_analysis, start, email)
+
+        analysis, vector = self.ai_processor.classify_by_embedding(email)
+        tier = self.TIER_EMBEDDING
+
+        if analysis is None:
+            analysis = self.ai_processor.analyze_with_llm(email, vector=vector)
+            # Modèle indisponible ou réponse illisible : analyse de repli, pas un verdict du modèle
+            tier = self.TIER_LLM if analysis.get('source') == 'llm' else self.TIER_FALLBACK
+
+        # Seul un verdict du modèle permet de calibrer les règles
+        if rule_category and analysis.get('source') in ('embedding', 'llm'):
+            with self._lock:
+                self.calibrator.record(rule_confidence, rule_category == analysis.get('category'))
+
+        # Les verdicts de la génération alimentent le modèle appris des règles
+        if self._is_confident_verdict(analysis):
+            self.smart_classifier.learn_from_verdict(self._email_data(email), analysis['category'], key=email.id)
+
+        return self._finish(tier, analysis, start, email)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Statistiques par niveau.
+
+        Returns:
+            Taux de réponse et latence moyenne par niveau, latence moyenne par email
+        """
+        with self._lock:
+            total = sum(self._hits.values())
+            stats = {
+                'total': total,
+                'rule_threshold': self.calibrator.threshold(),
+                'learned_examples': len(self.smart_classifier.online_model),
+                'avg_latency_ms': (sum(self._latency.values()) / total * 1000) if total else 0.0,
+                'tiers': {}
+            }
+
+            for tier in self.TIERS:
+                hits = self._hits[tier]
+                stats['tiers'][tier] = {
+                    'hits': hits,
+                    'rate': hits / total if total else 0.0,
+                    'avg_latency_ms': (self._latency[tier] / hits * 1000) if hits else 0.0
+                }
+
+        return stats
+
+    def log_stats(self):
+        """Journalise les statistiques de la cascade."""
+        stats = self.get_stats()
+        if not stats['total']:
+            return
+
+        tiers = ", ".join(
+            f"{tier}: {data['rate']:.0%} ({data['avg_latency_ms']:.0f} ms)"
+            for tier, data in stats['tiers'].items()
+        )
+        logger.info(
+            f"📊 Cascade sur {stats['total']} emails - {tiers} - "
+            f"moyenne {stats['avg_latency_ms']:.0f} ms/email (seuil règles {stats['rule_threshold']:.2f}, "
+            f"{stats['learned_examples']} exemples appris)"
+        )
+
+    def reset_stats(self):
+        """Réinitialise les compteurs (le calibrage est conservé)."""
+        with self._lock:
+            self._hits = {tier: 0 for tier in self.TIERS}
+            self._latency = {tier: 0.0 for tier in self.TIERS}
+
+    def _classify_by_rules(self, email) -> Tuple[Optional[Dict[str, Any]], Optional[str], float]:
+        """
+        Verdict des règles.
+
+        Returns:
+            (analyse si la confiance dépasse le seuil calibré, catégorie, confiance)
+        """
+        try:
+            result = self.smart_classifier.analyze_email(self._email_data(email))
+        except Exception as e:
+            logger.error(f"Erreur classification par règles {email.id}: {e}")
+            return None, None, 0.0
+
+        if result.category == 'general':
+            return None, None, 0.0
+
+        category = to_ai_category(result.category)
+
+        if result.confidence < self.calibrator.threshold():
+            return None, category, result.confidence
+
+        return {
+            'category': category,
+            'sentiment': 'neutral',
+            'summary': email.subject or 'Email sans sujet',
+            'confidence': result.confidence,
+            'priority': result.priority,
+            'source': 'rules'
+        }, category, result.confidence
+
+    @staticmethod
+    def _email_data(email) -> Dict[str, str]:
+        """Données transmises à SmartClassifier."""
+        return {
+            'subject': email.subject or '',
+            'body': email.body or email.snippet or '',
+            'sender': email.sender or ''
+        }
+
+    def _is_confident_verdict(self, analysis: Dict[str, Any]) -> bool:
+        """Verdict de la génération suffisamment sûr pour être appris (sans confiance déclarée : non)."""
+        confidence = analysis.get('confidence')
+        if not isinstance(confidence, (int, float)):
+            return False
+        return (
+            analysis.get('source') == 'llm'
+            and analysis.get('category') in self.LEARNABLE_CATEGORIES
+            and confidence >= 0.7
+        )
+
+    def _finish(self, tier: str, analysis: Dict[str, Any], start: float, email) -> Dict[str, Any]:
+        """Enregistre le niveau ayant répondu et la catégorie dans l'historique de l'expéditeur."""
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._hits[tier] += 1
+            self._latency[tier] += elapsed
+
+        if self.sender_index and analysis.get('category'):
+            self.sender_index.record_label(email.id, email.sender, analysis['category'])
+
+        analysis['tier'] = tier
+        return analysis
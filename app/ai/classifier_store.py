@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Stockage SQLite des corrections de classification et du calibrage des règles.
+"""
+import logging
+import sqlite3
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS user_corrections (
+        id INTEGER PRIMARY KEY,
+        email_hash TEXT UNIQUE,
+        original_category TEXT,
+        corrected_category TEXT,
+        timestamp DATETIME,
+        confidence REAL
+    );
+    CREATE INDEX IF NOT EXISTS idx_user_corrections_timestamp ON user_corrections (timestamp);
+    CREATE TABLE IF NOT EXISTS calibration_bins (
+        name TEXT,
+        bin INTEGER,
+        agreed INTEGER NOT NULL,
+        total INTEGER NOT NULL,
+        PRIMARY KEY (name, bin)
+    ) WITHOUT ROWID;
+'''
+
+# Requêtes constantes : sqlite3 garde leur forme préparée dans le cache de chaque connexion
+_INSERT_CORRECTION = '''
+    INSERT OR REPLACE INTO user_corrections
+    (email_hash, original_category, corrected_category, timestamp, confidence)
+    VALUES (?, ?, ?, ?, ?)
+'''
+_SELECT_SINCE = '''
+    SELECT email_hash, original_category, corrected_category, timestamp, confidence
+    FROM user_corrections WHERE timestamp > ? ORDER BY timestamp
+'''
+_COUNT_LABELS = '''
+    SELECT corrected_category, COUNT(*) FROM user_corrections GROUP BY corrected_category
+'''
+_DELETE_CALIBRATION = "DELETE FROM calibration_bins WHERE name = ?"
+_INSERT_CALIBRATION = "INSERT INTO calibration_bins (name, bin, agreed, total) VALUES (?, ?, ?, ?)"
+_SELECT_CALIBRATION = "SELECT bin, agreed, total FROM calibration_bins WHERE name = ? ORDER BY bin"
+
+class ClassifierStore:
+    """
+    Base des corrections avec une connexion durable par thread.
+
+    La base est en mode WAL : les lectures ne bloquent pas les écritures.
+    Les écritures sont mises en file et enregistrées par lots, dans une
+    seule transaction, par un thread dédié (à intervalle régulier ou dès
+    que le lot est plein).
+    """
+
+    def __init__(self, db_path: str = "app/data/classifier.db", flush_interval: float = 2.0,
+                 batch_size: int = 100):
+        """
+        Initialise le stockage.
+
+        Args:
+            db_path: Fichier SQLite
+            flush_interval: Délai maximal (secondes) avant l'écriture d'une correction
+            batch_size: Taille de lot déclenchant une écriture immédiate
+        """
+        self.db_path = db_path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+
+        self._pending: List[Tuple] = []
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._connection().executescript(_SCHEMA)
+
+        self._thread = threading.Thread(target=self._run, name="classifier-store", daemon=True)
+        self._thread.start()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connexion du thread courant (ouverte au premier appel)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False, cached_statements=64)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def add_correction(self, key: str, original_category: str, corrected_category: str,
+                       confidence: float = 0.8):
+        """
+        Met une correction en file d'écriture.
+
+        Args:
+            key: Empreinte de l'email (voir smart_classifier.email_hash)
+            original_category: Catégorie proposée
+            corrected_category: Catégorie corrigée
+            confidence: Confiance associée à la correction
+        """
+        row = (key, original_category, corrected_category, datetime.now().isoformat(sep=' '), confidence)
+        with self._pending_lock:
+            self._pending.append(row)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wakeup.set()
+
+    def flush(self) -> int:
+        """
+        Écrit les corrections en attente.
+
+        Returns:
+            Nombre de corrections écrites
+        """
+        with self._write_lock:
+            with self._pending_lock:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+
+            try:
+                conn = self._connection()
+                with conn:
+                    conn.executemany(_INSERT_CORRECTION, rows)
+                return len(rows)
+            except Exception as e:
+                logger.error(f"Erreur écriture corrections: {e}")
+                with self._pending_lock:
+                    self._pending[:0] = rows
+                return 0
+
+    def corrections_since(self, since: Optional[datetime] = None) -> List[Dict]:
+        """
+        Corrections enregistrées après une date.
+
+        Args:
+            since: Date de début (toutes les corrections si None)
+
+        Returns:
+            Liste de {email_hash, original_category, corrected_category, timestamp, confidence}
+        """
+        self.flush()
+        try:
+            bound = since.isoformat(sep=' ') if since else ''
+            rows = self._connection().execute(_SELECT_SINCE, (bound,)).fetchall()
+        except Exception as e:
+            logger.error(f"Erreur lecture corrections: {e}")
+            return []
+
+        return [
+            {
+                'email_hash': key,
+                'original_category': original,
+                'corrected_category': corrected,
+                'timestamp': timestamp,
+                'confidence': confidence
+            }
+            for key, original, corrected, timestamp, confidence in rows
+        ]
+
+    def label_counts(self) -> Dict[str, int]:
+        """
+        Nombre de corrections par catégorie corrigée.
+
+        Returns:
+            Catégorie -> nombre de corrections
+        """
+        self.flush()
+        try:
+            return dict(self._connection().execute(_COUNT_LABELS).fetchall())
+        except Exception as e:
+            logger.error(f"Erreur lecture corrections: {e}")
+            return {}
+
+    def save_calibration(self, name: str, agreed: List[int], total: List[int]) -> bool:
+        """
+        Enregistre les tranches d'un calibrage (remplace les précédentes).
+
+        Args:
+            name: Nom du calibrage
+            agreed: Verdicts confirmés par tranche
+            total: Verdicts vérifiés par tranche
+
+        Returns:
+            True si l'écriture a réussi
+        """
+        rows = [(name, index, int(a), int(t)) for index, (a, t) in enumerate(zip(agreed, total))]
+        with self._write_lock:
+            try:
+                conn = self._connection()
+                with conn:
+                    conn.execute(_DELETE_CALIBRATION, (name,))
+                    conn.executemany(_INSERT_CALIBRATION, rows)
+                return True
+            except Exception as e:
+                logger.error(f"Erreur écriture calibrage {name}: {e}")
+                return False
+
+    def load_calibration(self, name: str) -> Optional[Tuple[List[int], List[int]]]:
+        """
+        Tranches enregistrées d'un calibrage.
+
+        Returns:
+            (confirmés, vérifiés) par tranche, None si aucun calibrage enregistré
+        """
+        try:
+            rows = self._connection().execute(_SELECT_CALIBRATION, (name,)).fetchall()
+        except Exception as e:
+            logger.error(f"Erreur lecture calibrage {name}: {e}")
+            return None
+
+        if not rows or [row[0] for row in rows] != list(range(len(rows))):
+            return None
+        return [row[1] for row in rows], [row[2] for row in rows]
+
+    def pending_count(self) -> int:
+        """Nombre de corrections en attente d'écriture."""
+        with self._pending_lock:
+            return len(self._pending)
+
+    def close(self):
+        """Écrit les corrections en attente et ferme les connexions."""
+        self._stop.set()
+        self._wakeup.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+
+    def _run(self):
+        """Écrit les corrections en attente à intervalle régulier."""
+        while not self._stop.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            written = self.flush()
+            if written:
+                logger.debug(f"💾 {written} corrections enregistrées")
+
+
+_stores: Dict[str, ClassifierStore] = {}
+_stores_lock = threading.Lock()
+
+def get_store(db_path: str = "app/data/classifier.db") -> ClassifierStore:
+    """Stockage partagé d'un fichier (créé au premier appel)."""
+    key = str(Path(db_path).resolve())
+    with _stores_lock:
+        if key not in _stores:
+            _stores[key] = ClassifierStore(db_path)
+        return _stores[key]
+
+def close_stores():
+    """Ferme tous les stockages partagés (à appeler à la fermeture de l'application)."""
+    with _stores_lock:
+        stores = list(_stores.values())
+        _stores.clear()
+    for store in stores:
+        store.close()
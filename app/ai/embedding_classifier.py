@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Classification par plus proches voisins sur les embeddings Ollama.
+"""
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.ai.classifier_store import get_store
+from app.ai.smart_classifier import email_hash, to_ai_category
+
+logger = logging.getLogger(__name__)
+
+class EmbeddingClassifier:
+    """Classificateur k-NN sur une base locale d'exemples étiquetés."""
+
+    def __init__(self, ollama_client, store_path: str = "app/data/embedding_store.npz",
+                 k: int = 7, confidence_threshold: float = 0.7, min_similarity: float = 0.55,
+                 max_examples: int = 5000, autosave_every: int = 25):
+        """
+        Initialise le classificateur.
+
+        Args:
+            ollama_client: Client Ollama (méthode embed)
+            store_path: Fichier .npz de la base d'exemples
+            k: Nombre de voisins consultés
+            confidence_threshold: Part de vote minimale pour accepter la prédiction
+            min_similarity: Similarité cosinus minimale du plus proche voisin
+            max_examples: Taille maximale de la base (les plus anciens sont remplacés)
+            autosave_every: Sauvegarde automatique tous les N ajouts
+        """
+        self.ollama_client = ollama_client
+        self.store_path = Path(store_path)
+        self.k = k
+        self.confidence_threshold = confidence_threshold
+        self.min_similarity = min_similarity
+        self.max_examples = max_examples
+        self.autosave_every = autosave_every
+
+        # Matrice float16 normalisée (une ligne par exemple)
+        self.vectors: Optional[np.ndarray] = None
+        self.labels = np.zeros(0, dtype=np.int16)
+        self.hashes: List[str] = []
+        self.categories: List[str] = []
+
+        self._hash_index: Dict[str, int] = {}
+        self._size = 0
+        self._cursor = 0
+        self._unsaved = 0
+        self._lock = threading.Lock()
+
+        self.load()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def embed_text(self, text: str) -> Optional[np.ndarray]:
+        """
+        Calcule l'embedding normalisé d'un texte.
+
+        Args:
+            text: Texte à encoder
+
+        Returns:
+            Vecteur float32 de norme 1, ou None en cas d'erreur
+        """
+        if not text or not text.strip():
+            return None
+
+        embedding = self.ollama_client.embed(text)
+        if not embedding:
+            return None
+
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        if norm == 0:
+            return None
+
+        return vector / norm
+
+    def predict(self, text: str = None, vector: Optional[np.ndarray] = None) -> Tuple[Optional[str], float]:
+        """
+        Prédit la catégorie par vote pondéré des k plus proches voisins.
+
+        Args:
+            text: Texte à classer (ignoré si vector est fourni)
+            vector: Embedding normalisé déjà calculé
+
+        Returns:
+            (catégorie, confiance) - (None, 0.0) si la base ne permet pas de conclure
+        """
+        if vector is None:
+            vector = self.embed_text(text)
+        if vector is None:
+            return None, 0.0
+
+        with self._lock:
+            if self._size < self.k or self.vectors.shape[1] != vector.shape[0]:
+                return None, 0.0
+
+            similarities = self.vectors[:self._size].astype(np.float32) @ vector
+            k = min(self.k, self._size)
+            top = np.argpartition(-similarities, k - 1)[:k]
+            top_sims = similarities[top]
+            top_labels = self.labels[top]
+
+        if top_sims.max() < self.min_similarity:
+            return None, 0.0
+
+        weights = np.clip(top_sims, 0.0, None)
+        votes = np.bincount(top_labels, weights=weights, minlength=len(self.categories))
+        total = votes.sum()
+        if total <= 0:
+            return None, 0.0
+
+        best = int(votes.argmax())
+        return self.categories[best], float(votes[best] / total)
+
+    def add_example(self, label: str, text: str = None, vector: Optional[np.ndarray] = None,
+                    key: Optional[str] = None) -> bool:
+        """
+        Ajoute (ou remplace) un exemple étiqueté.
+
+        Args:
+            label: Catégorie de l'exemple
+            text: Texte de l'exemple (ignoré si vector est fourni)
+            vector: Embedding normalisé déjà calculé
+            key: Empreinte de l'email (voir smart_classifier.email_hash)
+
+        Returns:
+            True si l'exemple a été ajouté
+        """
+        if vector is None:
+            vector = self.embed_text(text)
+        if vector is None:
+            return False
+
+        label_id = self._category_id(label)
+
+        with self._lock:
+            if self.vectors is None:
+                self.vectors = np.zeros((min(256, self.max_examples), vector.shape[0]), dtype=np.float16)
+            elif self.vectors.shape[1] != vector.shape[0]:
+                logger.warning("Dimension d'embedding modifiée, base réinitialisée")
+                self._reset(vector.shape[0])
+
+            if key is not None and key in self._hash_index:
+                row = self._hash_index[key]
+            elif self._size < self.max_examples:
+                row = self._size
+                self._ensure_capacity(row + 1)
+                self._size += 1
+                self.hashes.append('')
+            else:
+                # Base pleine: remplacer l'exemple le plus ancien
+                row = self._cursor
+                self._cursor = (self._cursor + 1) % self.max_examples
+                self._hash_index.pop(self.hashes[row], None)
+
+            self.vectors[row] = vector
+            self.labels[row] = label_id
+            self.hashes[row] = key or ''
+            if key:
+                self._hash_index[key] = row
+
+            self._unsaved += 1
+            should_save = self._unsaved >= self.autosave_every
+
+        if should_save:
+            self.save()
+
+        return True
+
+    def seed_from_corrections(self, db_path: str = "app/data/classifier.db") -> int:
+        """
+        Applique les corrections utilisateur de SmartClassifier à la base.
+
+        Les exemples sont appariés par empreinte d'email.
+
+        Args:
+            db_path: Base SQLite de SmartClassifier
+
+        Returns:
+            Nombre d'exemples réétiquetés
+        """
+        try:
+            corrections = get_store(db_path).corrections_since()
+        except Exception as e:
+            logger.error(f"Erreur lecture corrections: {e}")
+            return 0
+
+        updated = 0
+        with self._lock:
+            for correction in corrections:
+                category = correction['corrected_category']
+                row = self._hash_index.get(correction['email_hash'])
+                if row is not None:
+                    self.labels[row] = self._category_id(to_ai_category(category))
+                    updated += 1
+            self._unsaved += updated
+
+        if updated:
+            logger.info(f"✅ {updated} corrections appliquées à la base d'embeddings")
+            self.save()
+
+        return updated
+
+    @staticmethod
+    def email_key(email) -> str:
+        """Empreinte d'un email (même clé que les corrections SmartClassifier)."""
+        return email_hash(email.subject, email.body or email.snippet)
+
+    @staticmethod
+    def email_text(email) -> str:
+        """Texte encodé pour un email."""
+        return f"{email.subject or ''}\n{(email.body or email.snippet or '')[:1000]}"
+
+    def save(self):
+        """Sauvegarde la base sur disque."""
+        try:
+            with self._lock:
+                if self.vectors is None:
+                    return
+
+                self.store_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.store_path, 'wb') as f:
+                    np.savez(
+                        f,
+                        vectors=self.vectors[:self._size],
+                        labels=self.labels[:self._size],
+                        hashes=np.array(self.hashes, dtype=str),
+                        categories=np.array(self.categories, dtype=str),
+                        cursor=np.array(self._cursor)
+                    )
+                self._unsaved = 0
+
+            logger.info(f"💾 Base d'embeddings sauvegardée ({self._size} exemples)")
+        except Exception as e:
+            logger.error(f"Erreur sauvegarde base d'embeddings: {e}")
+
+    def load(self):
+        """Charge la base depuis le disque."""
+        if not self.store_path.exists():
+            return
+
+        try:
+            with np.load(self.store_path) as data:
+                vectors = data['vectors'].astype(np.float16)
+                labels = data['labels'].astype(np.int16)
+                hashes = [str(h) for h in data['hashes']]
+                categories = [str(c) for c in data['categories']]
+                cursor = int(data['cursor'])
+
+            with self._lock:
+                self._size = len(vectors)
+                self.vectors = vectors
+                self.labels = labels
+                self.hashes = hashes
+                self.categories = categories
+                self._cursor = cursor
+                self._hash_index = {h: i for i, h in enumerate(hashes) if h}
+
+            logger.info(f"✅ Base d'embeddings chargée ({self._size} exemples)")
+        except Exception as e:
+            logger.error(f"Erreur chargement base d'embeddings: {e}")
+
+    def _category_id(self, category: str) -> int:
+        """Indice d'une catégorie (ajoutée si inconnue)."""
+        if category not in self.categories:
+            self.categories.append(category)
+        return self.categories.index(category)
+
+    def _ensure_capacity(self, size: int):
+        """Agrandit la matrice par doublement si nécessaire."""
+        capacity = len(self.vectors)
+        if size <= capacity and size <= len(self.labels):
+            return
+
+        new_capacity = min(max(size, capacity * 2, 256), self.max_examples)
+        vectors = np.zeros((new_capacity, self.vectors.shape[1]), dtype=np.float16)
+        vectors[:self._size] = self.vectors[:self._size]
+        labels = np.zeros(new_capacity, dtype=np.int16)
+        labels[:self._size] = self.labels[:self._size]
+        self.vectors = vectors
+        self.labels = labels
+
+    def _reset(self, dimension: int):
+        """Vide la base."""
+        self.vectors = np.zeros((min(256, self.max_examples), dimension), dtype=np.float16)
+        self.labels = np.zeros(len(self.vectors), dtype=np.int16)
+        self.hashes = []
+        self._hash_index = {}
+        self._size = 0
+        self._cursor = 0
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Index TF-IDF incrémental des mots-clés de la boîte mail (SQLite).
+"""
+import logging
+import math
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from app.utils.ai_utils import keyword_tokens
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS terms (
+        id INTEGER PRIMARY KEY,
+        term TEXT UNIQUE NOT NULL,
+        df INTEGER NOT NULL DEFAULT 0
+    );
+    CREATE TABLE IF NOT EXISTS documents (
+        id INTEGER PRIMARY KEY,
+        email_id TEXT UNIQUE NOT NULL,
+        received DATETIME
+    );
+    CREATE TABLE IF NOT EXISTS postings (
+        term_id INTEGER NOT NULL,
+        doc_id INTEGER NOT NULL,
+        tf INTEGER NOT NULL,
+        PRIMARY KEY (term_id, doc_id)
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_postings_doc ON postings (doc_id);
+    CREATE INDEX IF NOT EXISTS idx_documents_received ON documents (received);
+'''
+
+_INSERT_DOCUMENT = "INSERT INTO documents (email_id, received) VALUES (?, ?)"
+_UPSERT_TERM = '''
+    INSERT INTO terms (term, df) VALUES (?, ?)
+    ON CONFLICT(term) DO UPDATE SET df = df + excluded.df
+'''
+_INSERT_POSTING = "INSERT INTO postings (term_id, doc_id, tf) VALUES (?, ?, ?)"
+_SELECT_DOC_POSTINGS = '''
+    SELECT p.term_id, p.tf FROM postings p JOIN documents d ON d.id = p.doc_id WHERE d.email_id = ?
+'''
+_SELECT_WINDOW_DF = '''
+    SELECT p.term_id, COUNT(*) FROM postings p JOIN documents d ON d.id = p.doc_id
+    WHERE d.received >= ? GROUP BY p.term_id
+'''
+_COUNT_WINDOW = "SELECT COUNT(*) FROM documents WHERE received >= ?"
+
+class KeywordIndex:
+    """
+    Fréquences documentaires des mots de tous les messages indexés.
+
+    Les comptes (terme -> nombre de messages) sont gardés en mémoire pour
+    pondérer les mots d'un message sans requête ; les listes terme ->
+    messages restent dans SQLite (tables sans rowid, entiers uniquement)
+    pour les sujets de la période et les messages liés.
+    """
+
+    def __init__(self, db_path: str = "app/data/keywords.db", text_chars: int = 3000,
+                 max_df_ratio: float = 0.5):
+        """
+        Ouvre l'index.
+
+        Args:
+            db_path: Fichier SQLite
+            text_chars: Caractères du corps indexés par message
+            max_df_ratio: Part de messages au-delà de laquelle un mot est trop commun
+                pour relier deux messages
+        """
+        self.db_path = db_path
+        self.text_chars = text_chars
+        self.max_df_ratio = max_df_ratio
+
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        conn.executescript(_SCHEMA)
+
+        self._term_ids: Dict[str, int] = {}
+        self._terms: Dict[int, str] = {}
+        self._df: Dict[int, int] = {}
+        for term_id, term, df in conn.execute("SELECT id, term, df FROM terms"):
+            self._term_ids[term] = term_id
+            self._terms[term_id] = term
+            self._df[term_id] = df
+        self._email_ids = {row[0] for row in conn.execute("SELECT email_id FROM documents")}
+
+        logger.info(f"🔑 Index de mots-clés: {len(self._email_ids)} messages, {len(self._terms)} mots")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connexion du thread courant (ouverte au premier appel)."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            with self._connections_lock:
+                self._connections.append(conn)
+        return conn
+
+    def __len__(self) -> int:
+        return len(self._email_ids)
+
+    def __contains__(self, email_id: str) -> bool:
+        return email_id in self._email_ids
+
+    @staticmethod
+    def email_text(email) -> str:
+        """Texte indexé pour un message."""
+        return f"{email.subject or ''}\n{email.body or email.snippet or ''}"
+
+    def _counts(self, text: str) -> Counter:
+        return Counter(keyword_tokens(text[:self.text_chars].lower()))
+
+    def _idf(self, df: int) -> float:
+        return math.log((len(self._email_ids) + 1) / (df + 1)) + 1.0
+
+    def add_emails(self, emails: list) -> int:
+        """
+        Indexe les messages qui ne le sont pas encore (appelé à chaque synchronisation).
+
+        Args:
+            emails: Liste d'emails
+
+        Returns:
+            Nombre de messages ajoutés
+        """
+        with self._write_lock:
+            documents, seen = [], set()
+            for email in emails:
+                if email.id in self._email_ids or email.id in seen:
+                    continue
+                seen.add(email.id)
+                received = email.received_date.isoformat(sep=' ') if email.received_date else None
+                documents.append((email.id, received, self._counts(self.email_text(email))))
+            if not documents:
+                return 0
+
+            new_df = Counter(term for _, _, counts in documents for term in counts)
+            try:
+                conn = self._connection()
+                with conn:
+                    conn.executemany(_UPSERT_TERM, new_df.items())
+                    # Identifiants des nouveaux mots (gardés en mémoire seulement si la transaction aboutit)
+                    term_ids = {term: self._term_ids[term] for term in new_df if term in self._term_ids}
+                    unknown = [term for term in new_df if term not in term_ids]
+                    for start in range(0, len(unknown), 500):
+                        chunk = unknown[start:start + 500]
+                        term_ids.update(conn.execute(
+                            f"SELECT term, id FROM terms WHERE term IN ({','.join('?' * len(chunk))})", chunk
+                        ))
+
+                    postings = []
+                    for email_id, received, counts in documents:
+                        doc_id = conn.execute(_INSERT_DOCUMENT, (email_id, received)).lastrowid
+                        postings.extend((term_ids[term], doc_id, tf) for term, tf in counts.items())
+                    conn.executemany(_INSERT_POSTING, postings)
+            except Exception as e:
+                logger.error(f"Erreur indexation mots-clés: {e}")
+                return 0
+
+            for term in unknown:
+                self._term_ids[term] = term_ids[term]
+                self._terms[term_ids[term]] = term
+            for term, df in new_df.items():
+                term_id = self._term_ids[term]
+                self._df[term_id] = self._df.get(term_id, 0) + df
+            self._email_ids.update(email_id for email_id, _, _ in documents)
+
+        logger.debug(f"🔑 {len(documents)} messages indexés ({len(self._email_ids)} au total)")
+        return len(documents)
+
+    def keywords(self, text: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Mots-clés d'un texte pondérés par TF-IDF sur le corpus indexé.
+
+        Args:
+            text: Texte à analyser
+            k: Nombre de mots-clés
+
+        Returns:
+            Liste de (mot, score), du plus au moins caractéristique
+        """
+        counts = self._counts(text)
+        scored = []
+        for term, tf in counts.items():
+            df = self._df.get(self._term_ids.get(term), 0)
+            scored.append((term, (1.0 + math.log(tf)) * self._idf(df)))
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:k]
+
+    def email_keywords(self, email_id: str, k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Mots-clés d'un message indexé.
+
+        Args:
+            email_id: Identifiant du message
+            k: Nombre de mots-clés
+
+        Returns:
+            Liste de (mot, score)
+        """
+        try:
+            rows = self._connection().execute(_SELECT_DOC_POSTINGS, (email_id,)).fetchall()
+        except Exception as e:
+            logger.error(f"Erreur lecture index mots-clés: {e}")
+            return []
+
+        scored = [(self._terms[term_id], (1.0 + math.log(tf)) * self._idf(self._df[term_id]))
+                  for term_id, tf in rows]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:k]
+
+    def top_topics(self, days: int = 7, k: int = 15, since: Optional[datetime] = None,
+                   min_messages: int = 2) -> List[Tuple[str, int, float]]:
+        """
+        Sujets dominants d'une période : mots fréquents dans la période et rares ailleurs.
+
+        Args:
+            days: Durée de la période (jusqu'à maintenant)
+            k: Nombre de sujets
+            since: Début de la période (remplace days)
+            min_messages: Nombre minimal de messages de la période contenant le mot
+
+        Returns:
+            Liste de (mot, nombre de messages de la période, score)
+        """
+        bound = (since or datetime.now() - timedelta(days=days)).isoformat(sep=' ')
+        try:
+            conn = self._connection()
+            window_size = conn.execute(_COUNT_WINDOW, (bound,)).fetchone()[0]
+            rows = conn.execute(_SELECT_WINDOW_DF, (bound,)).fetchall()
+        except Exception as e:
+            logger.error(f"Erreur lecture index mots-clés: {e}")
+            return []
+
+        if not window_size:
+            return []
+
+        # Part des messages de la période contenant le mot, pondérée par sa rareté
+        # globale et par sa sur-représentation dans la période (mots omniprésents -> 0)
+        total = len(self._email_ids)
+        topics = []
+        for term_id, window_df in rows:
+            if window_df < min_messages:
+                continue
+            df = self._df[term_id]
+            share = window_df / window_size
+            lift = share / ((df + 1) / (total + 1))
+            topics.append((self._terms[term_id], window_df, share * math.log((total + 1) / (df + 1)) * lift))
+        topics.sort(key=lambda item: item[2], reverse=True)
+        return topics[:k]
+
+    def related(self, email_id: str, k: int = 10, keywords: int = 10) -> List[Tuple[str, float]]:
+        """
+        Messages partageant les mots-clés d'un message.
+
+        Args:
+            email_id: Identifiant du message de départ
+            k: Nombre de messages
+            keywords: Nombre de mots-clés du message utilisés
+
+        Returns:
+            Liste de (id du message, score)
+        """
+        max_df = max(2, int(self.max_df_ratio * len(self._email_ids)))
+        try:
+            conn = self._connection()
+            rows = conn.execute(_SELECT_DOC_POSTINGS, (email_id,)).fetchall()
+            weights = sorted(
+                ((term_id, (1.0 + math.log(tf)) * self._idf(self._df[term_id]))
+                 for term_id, tf in rows if self._df[term_id] <= max_df),
+                key=lambda item: item[1], reverse=True
+            )[:keywords]
+            if not weights:
+                return []
+
+            weights = dict(weights)
+            placeholders = ','.join('?' * len(weights))
+            postings = conn.execute(
+                f'''SELECT d.email_id, p.term_id, p.tf FROM postings p JOIN documents d ON d.id = p.doc_id
+                    WHERE p.term_id IN ({placeholders}) AND d.email_id != ?''',
+                (*weights, email_id)
+            ).fetchall()
+        except Exception as e:
+            logger.error(f"Erreur lecture index mots-clés: {e}")
+            return []
+
+        scores = defaultdict(float)
+        for other_id, term_id, tf in postings:
+            scores[other_id] += weights[term_id] * (1.0 + math.log(tf)) * self._idf(self._df[term_id])
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+    def close(self):
+        """Ferme les connexions."""
+        with self._connections_lock:
+            for conn in self._connections:
+                try:
+                    conn.close()
+                except Exception:
+                    pass
+            self._connections.clear()
+        self._local = threading.local()
+
+
+_indexes: Dict[str, KeywordIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_keyword_index(db_path: str = "app/data/keywords.db") -> KeywordIndex:
+    """Index partagé d'un fichier (ouvert au premier appel)."""
+    key = str(Path(db_path).resolve())
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = KeywordIndex(db_path)
+        return _indexes[key]
+
+def close_keyword_indexes():
+    """Ferme tous les index partagés (à appeler à la fermeture de l'application)."""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+        _indexes.clear()
+    for index in indexes:
+        index.close()
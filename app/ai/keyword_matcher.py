@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Recherche simultanée de mots-clés (Aho-Corasick) pour les heuristiques IA.
+"""
+import unicodedata
+from collections import deque
+from typing import Dict, Iterable, List, Optional, Set
+
+# Mots-clés par catégorie SmartClassifier
+CATEGORY_KEYWORDS = {
+    'cv': [
+        'cv', 'candidature', 'curriculum vitae', 'postuler', 'candidat',
+        'lettre de motivation', 'portfolio', 'expérience professionnelle',
+        'compétences', 'diplôme', 'formation', 'poste'
+    ],
+    'rdv': [
+        'rendez-vous', 'réunion', 'rencontre', 'meeting', 'rdv',
+        'disponible', 'disponibilité', 'calendrier', 'créneau',
+        'conférence', 'call', 'entretien', 'zoom', 'teams'
+    ],
+    'facture': [
+        'facture', 'paiement', 'montant', 'invoice', 'devis',
+        'prix', 'tarif', '€', 'euro', 'virement', 'règlement',
+        'total', 'tva', 'commande'
+    ],
+    'support': [
+        'problème', 'bug', 'erreur', 'aide', 'support', 'assistance',
+        'dysfonctionnement', 'panne', 'question', 'comment',
+        'ne fonctionne pas', 'issue', 'ticket'
+    ],
+    'partenariat': [
+        'partenariat', 'collaboration', 'coopération', 'projet commun',
+        'ensemble', 'proposition', 'opportunité', 'synergie', 'partnership'
+    ],
+    'newsletter': [
+        'newsletter', 'abonnement', 'désabonner', 'unsubscribe',
+        'bulletin', 'actualités', 'notification'
+    ],
+    'spam': [
+        'gagner', 'gratuit', 'cliquez ici', 'urgent!!!', 'offre limitée',
+        'casino', 'crypto', 'investissement garanti', 'loterie',
+        'félicitations', 'héritage', 'nigerian prince'
+    ]
+}
+
+# Toutes les tables de mots-clés, regroupées dans un seul automate
+KEYWORD_TABLES = {
+    **{f"category.{name}": keywords for name, keywords in CATEGORY_KEYWORDS.items()},
+
+    # SmartClassifier._calculate_priority
+    'priority.urgent': ['urgent', 'emergency', 'critique', 'asap', 'immédiat', 'rapidement'],
+
+    # AIProcessor.detect_urgency
+    'urgency.urgent': ['urgent', 'asap', 'immédiat', 'critique', 'emergency'],
+    'urgency.important': ['important', 'prioritaire', 'rapidement', 'bientôt'],
+
+    # AIProcessor.detect_spam (sujet)
+    'spam.subject': ['viagra', 'casino', 'lottery', 'winner'],
+    'spam.promo': ['promo'],
+
+    # AIProcessor._default_analysis (sujet)
+    'default.cv': ['cv', 'candidature', 'postul'],
+    'default.meeting': ['réunion', 'meeting', 'rdv'],
+    'default.invoice': ['facture', 'invoice', 'paiement'],
+    'default.newsletter': ['newsletter'],
+    'default.support': ['support', 'aide', 'help'],
+
+    # CalendarManager et Assistant IA
+    'meeting': ['réunion', 'meeting', 'rdv', 'rendez-vous', 'entretien', 'call', 'visio', 'zoom', 'teams', 'skype'],
+    'assistant.urgent': ['urgent', 'asap', 'immédiat', 'critique', 'important', 'rapidement'],
+    'assistant.question': ['?', 'pouvez-vous', 'pourriez-vous', 'merci de', 'svp', 's il vous plait']
+}
+
+def normalize_text(text: str) -> str:
+    """Forme normalisée utilisée pour la recherche (NFC, minuscules)."""
+    if not text:
+        return ""
+    return unicodedata.normalize('NFC', text).lower()
+
+
+class KeywordHits:
+    """Occurrences trouvées par KeywordMatcher.scan."""
+
+    def __init__(self, matcher: "KeywordMatcher", counts: List[int]):
+        self._matcher = matcher
+        self._counts = counts
+
+    def count(self, group: str) -> int:
+        """Nombre total d'occurrences des mots-clés d'un groupe."""
+        return sum(self._counts[k] for k in self._matcher.group_keywords[group])
+
+    def has(self, group: str) -> bool:
+        """Au moins un mot-clé du groupe est présent."""
+        return any(self._counts[k] for k in self._matcher.group_keywords[group])
+
+    def keyword(self, keyword: str) -> int:
+        """Nombre d'occurrences d'un mot-clé."""
+        index = self._matcher.keyword_index.get(normalize_text(keyword))
+        return 0 if index is None else self._counts[index]
+
+    def groups(self, prefix: str = "") -> Dict[str, int]:
+        """Occurrences par groupe (éventuellement filtrés par préfixe)."""
+        return {
+            group: self.count(group)
+            for group in self._matcher.group_keywords if group.startswith(prefix)
+        }
+
+
+class KeywordMatcher:
+    """
+    Automate d'Aho-Corasick sur plusieurs tables de mots-clés.
+
+    Le texte est parcouru une seule fois quel que soit le nombre de
+    mots-clés ; les occurrences sont comptées comme des sous-chaînes
+    (chevauchements compris), comme le faisaient les recherches `in`.
+    """
+
+    def __init__(self, tables: Dict[str, Iterable[str]]):
+        """
+        Construit l'automate.
+
+        Args:
+            tables: Groupe -> mots-clés (un mot-clé peut appartenir à plusieurs groupes)
+        """
+        self.keywords: List[str] = []
+        self.keyword_index: Dict[str, int] = {}
+        self.group_keywords: Dict[str, List[int]] = {}
+
+        for group, keywords in tables.items():
+            ids = []
+            for keyword in keywords:
+                keyword = normalize_text(keyword)
+                if not keyword:
+                    continue
+                if keyword not in self.keyword_index:
+                    self.keyword_index[keyword] = len(self.keywords)
+                    self.keywords.append(keyword)
+                if self.keyword_index[keyword] not in ids:
+                    ids.append(self.keyword_index[keyword])
+            self.group_keywords[group] = ids
+
+        self._build()
+
+    def _build(self):
+        """Trie, liens d'échec, puis table de transitions complète."""
+        goto: List[Dict[str, int]] = [{}]
+        output: List[List[int]] = [[]]
+
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = goto[state].get(char)
+                if next_state is None:
+                    next_state = len(goto)
+                    goto[state][char] = next_state
+                    goto.append({})
+                    output.append([])
+                state = next_state
+            output[state].append(index)
+
+        fail = [0] * len(goto)
+        delta: List[Dict[str, int]] = [None] * len(goto)
+        delta[0] = dict(goto[0])
+
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            # Transitions héritées du lien d'échec (déjà calculé, plus court)
+            delta[state] = {**delta[fail[state]], **goto[state]}
+            for char, next_state in goto[state].items():
+                fail[next_state] = delta[fail[state]].get(char, 0)
+                output[next_state].extend(output[fail[next_state]])
+                queue.append(next_state)
+
+        self._delta = delta
+        self._output = [tuple(o) if o else None for o in output]
+
+    def scan(self, text: str, normalized: bool = False) -> KeywordHits:
+        """
+        Parcourt un texte et compte les occurrences de chaque mot-clé.
+
+        Args:
+            text: Texte à analyser
+            normalized: Le texte est déjà passé par normalize_text
+
+        Returns:
+            Les occurrences trouvées
+        """
+        if not normalized:
+            text = normalize_text(text)
+
+        counts = [0] * len(self.keywords)
+        delta = self._delta
+        output = self._output
+        state = 0
+
+        for char in text:
+            state = delta[state].get(char, 0)
+            found = output[state]
+            if found:
+                for index in found:
+                    counts[index] += 1
+
+        return KeywordHits(self, counts)
+
+    def groups_present(self, text: str, prefix: str = "") -> Set[str]:
+        """Groupes dont au moins un mot-clé apparaît dans le texte."""
+        hits = self.scan(text)
+        return {group for group in self.group_keywords if group.startswith(prefix) and hits.has(group)}
+
+
+_shared_matcher: Optional[KeywordMatcher] = None
+
+def shared_matcher() -> KeywordMatcher:
+    """Automate commun construit une seule fois sur KEYWORD_TABLES."""
+    global _shared_matcher
+    if _shared_matcher is None:
+        _shared_matcher = KeywordMatcher(KEYWORD_TABLES)
+    return _shared_matcher
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Identification de la langue par profils de n-grammes de caractères.
+"""
+import logging
+import math
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Textes de référence (registre email) à partir desquels les profils sont construits
+SAMPLES = {
+    'fr': (
+        "Bonjour, je vous remercie pour votre message et je reviens vers vous concernant la réunion "
+        "de la semaine prochaine. Pourriez-vous me confirmer vos disponibilités pour mardi ou jeudi "
+        "après-midi ? Nous devons valider le budget du projet avant la fin du mois, et il faudrait que "
+        "l'équipe puisse présenter les résultats au client. Je vous envoie ci-joint la facture ainsi que "
+        "le compte rendu de notre dernier échange. N'hésitez pas à me contacter si vous avez des "
+        "questions. Merci d'avance pour votre retour rapide, c'est assez urgent. Votre commande a bien "
+        "été expédiée et sera livrée dans les prochains jours. Nous sommes heureux de vous compter parmi "
+        "nos clients et vous souhaitons une excellente journée. Cordialement, le service client. "
+        "Il est possible que le rendez-vous soit déplacé à cause des congés ; je vous tiendrai au courant "
+        "dès que j'aurai plus d'informations. Les documents doivent être signés et renvoyés avant vendredi. "
+        "Pensez également à mettre à jour le tableau de suivi, qui n'est plus à jour depuis plusieurs semaines."
+    ),
+    'en': (
+        "Hello, thank you for your message and I am getting back to you about the meeting next week. "
+        "Could you please confirm your availability for Tuesday or Thursday afternoon? We need to approve "
+        "the project budget before the end of the month, and the team should be able to present the "
+        "results to the client. Please find attached the invoice as well as the minutes of our last call. "
+        "Feel free to reach out if you have any questions. Thanks in advance for your quick reply, it is "
+        "rather urgent. Your order has been shipped and will be delivered within the next few days. We are "
+        "happy to have you as a customer and wish you a great day. Best regards, the customer service team. "
+        "The appointment might be moved because of the holidays; I will keep you posted as soon as I have "
+        "more information. The documents must be signed and returned by Friday. Please also remember to "
+        "update the tracking sheet, which has not been updated for several weeks."
+    ),
+    'es': (
+        "Hola, muchas gracias por tu mensaje y te escribo sobre la reunión de la próxima semana. ¿Podrías "
+        "confirmarme tu disponibilidad para el martes o el jueves por la tarde? Tenemos que aprobar el "
+        "presupuesto del proyecto antes de fin de mes, y el equipo debería poder presentar los resultados "
+        "al cliente. Te envío adjunta la factura y el acta de nuestra última llamada. No dudes en "
+        "contactarme si tienes alguna pregunta. Gracias de antemano por tu respuesta rápida, es bastante "
+        "urgente. Su pedido ha sido enviado y será entregado en los próximos días. Estamos encantados de "
+        "tenerle como cliente y le deseamos un excelente día. Saludos cordiales, el servicio de atención "
+        "al cliente. Es posible que la cita se cambie por las vacaciones; te mantendré informado en cuanto "
+        "tenga más información. Los documentos deben firmarse y devolverse antes del viernes. Recuerda "
+        "también actualizar la hoja de seguimiento, que no se ha actualizado desde hace varias semanas."
+    ),
+    'de': (
+        "Hallo, vielen Dank für Ihre Nachricht, ich melde mich wegen des Treffens nächste Woche. Könnten "
+        "Sie mir bitte Ihre Verfügbarkeit für Dienstag oder Donnerstag Nachmittag bestätigen? Wir müssen "
+        "das Budget des Projekts vor Ende des Monats freigeben, und das Team sollte die Ergebnisse dem "
+        "Kunden vorstellen können. Anbei sende ich Ihnen die Rechnung sowie das Protokoll unseres letzten "
+        "Gesprächs. Zögern Sie nicht, mich bei Fragen zu kontaktieren. Vielen Dank im Voraus für Ihre "
+        "schnelle Antwort, es ist ziemlich dringend. Ihre Bestellung wurde versendet und wird in den "
+        "nächsten Tagen geliefert. Wir freuen uns, Sie als Kunden zu haben, und wünschen Ihnen einen "
+        "schönen Tag. Mit freundlichen Grüßen, Ihr Kundenservice. Der Termin wird wegen der Feiertage "
+        "möglicherweise verschoben; ich halte Sie auf dem Laufenden, sobald ich mehr weiß. Die Unterlagen "
+        "müssen bis Freitag unterschrieben und zurückgeschickt werden. Denken Sie bitte auch daran, die "
+        "Übersichtstabelle zu aktualisieren, die seit mehreren Wochen nicht mehr aktuell ist."
+    )
+}
+
+_WORD_RE = re.compile(r"[^\W\d_]+")
+
+def _ngrams(text: str, max_chars: int, orders: Sequence[int]) -> List[str]:
+    """N-grammes de caractères des mots (bornés par des espaces)."""
+    words = _WORD_RE.findall(text[:max_chars].lower())
+    if not words:
+        return []
+    padded = f" {' '.join(words)} "
+    return [padded[i:i + n] for n in orders for i in range(len(padded) - n + 1) if padded[i:i + n] != ' ']
+
+class LanguageIdentifier:
+    """
+    Bayes naïf sur les n-grammes de caractères (1 à 3 par défaut).
+
+    Les tables de log-probabilités (n-gramme -> langue) sont calculées une
+    fois ; l'identification d'un lot ne fait qu'une indexation et une somme
+    par segments sur la matrice.
+    """
+
+    def __init__(self, samples: Optional[Dict[str, str]] = None, orders: Sequence[int] = (1, 2, 3),
+                 alpha: float = 0.5, max_chars: int = 1000, max_evidence: float = 60.0):
+        """
+        Construit les profils.
+
+        Args:
+            samples: Langue -> texte de référence (SAMPLES par défaut)
+            orders: Longueurs de n-grammes utilisées
+            alpha: Lissage additif des comptes
+            max_chars: Caractères analysés par texte
+            max_evidence: Longueur (en caractères) au-delà de laquelle la confiance n'augmente plus
+        """
+        samples = samples or SAMPLES
+        self.orders = tuple(orders)
+        self.max_chars = max_chars
+        self.max_evidence = max_evidence
+        self.languages = list(samples)
+
+        counts = {lang: Counter(_ngrams(text, len(text), self.orders)) for lang, text in samples.items()}
+        vocabulary = sorted(set().union(*counts.values()))
+        self._index = {gram: i for i, gram in enumerate(vocabulary)}
+
+        # Ligne supplémentaire (dernière) : n-gramme absent de tous les profils
+        table = np.zeros((len(vocabulary) + 1, len(self.languages)), dtype=np.float32)
+        for column, lang in enumerate(self.languages):
+            total = sum(counts[lang].values()) + alpha * (len(vocabulary) + 1)
+            table[:, column] = math.log(alpha / total)
+            for gram, count in counts[lang].items():
+                table[self._index[gram], column] = math.log((count + alpha) / total)
+        self._table = table
+        self._unknown = len(vocabulary)
+
+        logger.debug(f"Profils de langue: {', '.join(self.languages)} ({len(vocabulary)} n-grammes)")
+
+    def _ids(self, text: str) -> List[int]:
+        unknown = self._unknown
+        index = self._index
+        return [index.get(gram, unknown) for gram in _ngrams(text, self.max_chars, self.orders)]
+
+    def _evidence(self, lengths: np.ndarray) -> np.ndarray:
+        """Longueur équivalente en caractères (un n-gramme de chaque ordre par caractère)."""
+        return np.minimum(lengths / len(self.orders), self.max_evidence)
+
+    def identify(self, text: str) -> Tuple[Optional[str], float]:
+        """
+        Langue d'un texte.
+
+        Args:
+            text: Texte à analyser
+
+        Returns:
+            (code de langue, confiance entre 0 et 1), (None, 0.0) sans texte exploitable
+        """
+        return self.identify_batch([text])[0]
+
+    def identify_batch(self, texts: Sequence[str]) -> List[Tuple[Optional[str], float]]:
+        """
+        Langue de chaque texte d'un lot.
+
+        Args:
+            texts: Textes à analyser
+
+        Returns:
+            (code de langue, confiance) pour chaque texte, dans l'ordre
+        """
+        ids = [self._ids(text or '') for text in texts]
+        lengths = np.fromiter((len(row) for row in ids), dtype=np.int64, count=len(ids))
+        results: List[Tuple[Optional[str], float]] = [(None, 0.0)] * len(ids)
+        present = np.flatnonzero(lengths)
+        if not len(present):
+            return results
+
+        flat = np.fromiter((i for row in ids for i in row), dtype=np.int64, count=int(lengths.sum()))
+        starts = np.concatenate(([0], np.cumsum(lengths[present])[:-1]))
+        scores = np.add.reduceat(self._table[flat], starts, axis=0)
+
+        # Confiance : softmax de la log-vraisemblance moyenne par n-gramme,
+        # multipliée par une longueur plafonnée (un texte court reste incertain)
+        logits = scores / lengths[present][:, None] * self._evidence(lengths[present])[:, None]
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+
+        best = probabilities.argmax(axis=1)
+        for row, position in enumerate(present):
+            results[position] = (self.languages[best[row]], float(probabilities[row, best[row]]))
+        return results
+
+    def probabilities(self, text: str) -> Dict[str, float]:
+        """Confiance pour chaque langue connue."""
+        ids = self._ids(text or '')
+        if not ids:
+            return {}
+        scores = self._table[ids].sum(axis=0) / len(ids) * self._evidence(np.array([len(ids)]))[0]
+        probabilities = np.exp(scores - scores.max())
+        probabilities /= probabilities.sum()
+        return {lang: float(p) for lang, p in zip(self.languages, probabilities)}
+
+
+_shared_identifier: Optional[LanguageIdentifier] = None
+_shared_lock = threading.Lock()
+
+def shared_identifier() -> LanguageIdentifier:
+    """Identificateur commun (profils construits une seule fois)."""
+    global _shared_identifier
+    with _shared_lock:
+        if _shared_identifier is None:
+            _shared_identifier = LanguageIdentifier()
+        return _shared_identifier
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Regroupement des messages quasi identiques (newsletters, notifications, envois en masse) par MinHash.
+"""
+import logging
+import re
+import threading
+import zlib
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_URL_RE = re.compile(r"https?://\S+|www\.\S+")
+_DIGITS_RE = re.compile(r"\d+")
+_WORD_RE = re.compile(r"\w+")
+
+# Premier supérieur à 2**32 : a * h + b (a, b, h < 2**32) tient dans un uint64
+_PRIME = 4294967311
+
+def normalize_body(text: str) -> List[str]:
+    """Mots d'un message sans balises, liens ni nombres (qui varient d'un envoi à l'autre)."""
+    text = _URL_RE.sub(' ', _TAG_RE.sub(' ', text.lower()))
+    return _WORD_RE.findall(_DIGITS_RE.sub('0', text))
+
+class NearDuplicateIndex:
+    """
+    Index LSH (MinHash découpé en bandes) des messages.
+
+    Les bandes de signature de chaque message pointent vers son groupe ; un
+    nouveau message n'est comparé qu'aux représentants des groupes partageant
+    au moins une de ses bandes, jamais à toute la boîte. Il rejoint le plus
+    proche si leur similarité de Jaccard estimée dépasse le seuil. Le premier
+    message d'un groupe en est le représentant : son analyse vaut pour tous
+    les membres.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, shingle_size: int = 2,
+                 threshold: float = 0.6, min_shingles: int = 8, text_chars: int = 2000,
+                 max_emails: int = 20000, seed: int = 1,
+                 shared_sources: Iterable[str] = ('rules', 'embedding', 'llm')):
+        """
+        Initialise l'index.
+
+        Args:
+            num_perm: Taille des signatures MinHash
+            bands: Nombre de bandes (num_perm doit en être un multiple)
+            shingle_size: Nombre de mots par fragment comparé
+            threshold: Similarité de Jaccard estimée minimale pour regrouper
+            min_shingles: Fragments nécessaires pour indexer un message (les
+                messages très courts se ressemblent tous)
+            text_chars: Caractères du corps pris en compte
+            max_emails: Messages conservés (les plus anciens sont oubliés)
+            seed: Graine des permutations
+            shared_sources: Sources d'analyse partagées avec le groupe (pas les
+                analyses de repli, moins bonnes que celles qui suivront)
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm doit être un multiple de bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+        self.min_shingles = min_shingles
+        self.text_chars = text_chars
+        self.max_emails = max_emails
+        self.shared_sources = frozenset(shared_sources)
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+
+        self._signatures: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._buckets: Dict[tuple, Counter] = defaultdict(Counter)
+        self._cluster_of: Dict[str, str] = {}
+        self._members: Dict[str, List[str]] = {}
+        self._representatives: Dict[str, np.ndarray] = {}
+        self._subjects: Dict[str, str] = {}
+        self._analyses: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def __contains__(self, email_id: str) -> bool:
+        return email_id in self._signatures
+
+    def signature(self, email) -> Optional[np.ndarray]:
+        """
+        Signature MinHash d'un message.
+
+        Returns:
+            Tableau de num_perm entiers, None si le message est trop court
+        """
+        text = f"{email.subject or ''} {(email.body or email.snippet or '')[:self.text_chars]}"
+        words = normalize_body(text)
+        size = self.shingle_size
+        shingles = {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+        if len(shingles) < self.min_shingles:
+            return None
+
+        hashes = np.fromiter((zlib.crc32(s.encode()) for s in shingles), dtype=np.uint64, count=len(shingles))
+        permuted = (hashes[:, None] * self._a + self._b) % _PRIME
+        return permuted.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> List[tuple]:
+        rows = self.rows
+        return [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(self.bands)]
+
+    def add(self, email) -> Optional[str]:
+        """
+        Indexe un message et le rattache au groupe du message le plus proche.
+
+        Args:
+            email: Email à indexer
+
+        Returns:
+            Identifiant du groupe (celui de son représentant), None si le message n'est pas indexable
+        """
+        with self._lock:
+            if email.id in self._cluster_of:
+                return self._cluster_of[email.id]
+
+        signature = self.signature(email)
+        if signature is None:
+            return None
+        keys = self._band_keys(signature)
+
+        with self._lock:
+            candidates = list({cluster for key in keys for cluster in self._buckets.get(key, ())})
+            cluster_id = email.id
+            if candidates:
+                similarities = (np.stack([self._representatives[c] for c in candidates]) == signature).mean(axis=1)
+                best = int(similarities.argmax())
+                if similarities[best] >= self.threshold:
+                    cluster_id = candidates[best]
+
+            if cluster_id == email.id:
+                self._representatives[cluster_id] = signature
+            self._signatures[email.id] = signature
+            for key in keys:
+                self._buckets[key][cluster_id] += 1
+            self._cluster_of[email.id] = cluster_id
+            self._members.setdefault(cluster_id, []).append(email.id)
+            self._subjects[email.id] = email.subject or ''
+
+            while len(self._signatures) > self.max_emails:
+                self._forget(next(iter(self._signatures)))
+
+        return cluster_id
+
+    def add_emails(self, emails: List) -> int:
+        """
+        Indexe un lot de messages (appelé à chaque synchronisation).
+
+        Returns:
+            Nombre de messages rattachés à un groupe existant
+        """
+        grouped = 0
+        for email in emails:
+            cluster_id = self.add(email)
+            if cluster_id and cluster_id != email.id:
+                grouped += 1
+        if grouped:
+            logger.debug(f"📚 {grouped} messages rattachés à un groupe de messages similaires")
+        return grouped
+
+    def _forget(self, email_id: str):
+        """Retire le plus ancien message (verrou tenu)."""
+        signature = self._signatures.pop(email_id)
+        cluster_id = self._cluster_of.pop(email_id)
+        for key in self._band_keys(signature):
+            bucket = self._buckets.get(key)
+            if bucket:
+                bucket[cluster_id] -= 1
+                if bucket[cluster_id] <= 0:
+                    del bucket[cluster_id]
+                if not bucket:
+                    del self._buckets[key]
+
+        self._subjects.pop(email_id, None)
+        members = self._members[cluster_id]
+        members.remove(email_id)
+        if not members:
+            del self._members[cluster_id]
+            self._representatives.pop(cluster_id, None)
+            self._analyses.pop(cluster_id, None)
+
+    def cluster_of(self, email_id: str) -> Optional[str]:
+        """Groupe d'un message indexé."""
+        with self._lock:
+            return self._cluster_of.get(email_id)
+
+    def members(self, email_id: str) -> List[str]:
+        """Messages du groupe d'un message (lui compris), du plus ancien au plus récent."""
+        with self._lock:
+            cluster_id = self._cluster_of.get(email_id)
+            return list(self._members.get(cluster_id, ())) if cluster_id else []
+
+    def clusters(self, min_size: int = 2) -> List[Dict[str, Any]]:
+        """
+        Groupes de messages similaires.
+
+        Args:
+            min_size: Taille minimale d'un groupe
+
+        Returns:
+            Liste de {'id', 'subject', 'size', 'members'}, des plus grands aux plus petits
+        """
+        with self._lock:
+            clusters = [
+                {'id': cluster_id, 'subject': self._subjects.get(members[0], ''), 'size': len(members),
+                 'members': list(members)}
+                for cluster_id, members in self._members.items() if len(members) >= min_size
+            ]
+        clusters.sort(key=lambda cluster: cluster['size'], reverse=True)
+        return clusters
+
+    def shared_analysis(self, email) -> Optional[Dict[str, Any]]:
+        """
+        Analyse déjà calculée pour un autre message du groupe.
+
+        Args:
+            email: Email à analyser (indexé au passage)
+
+        Returns:
+            Copie de l'analyse du groupe, ou None
+        """
+        cluster_id = self.add(email)
+        if not cluster_id:
+            return None
+        with self._lock:
+            analysis = self._analyses.get(cluster_id)
+            if analysis is None:
+                return None
+            size = len(self._members.get(cluster_id, ()))
+
+        shared = dict(analysis)
+        shared['shared_from'] = cluster_id
+        shared['cluster_size'] = size
+        return shared
+
+    def record_analysis(self, email, analysis: Dict[str, Any]):
+        """
+        Mémorise l'analyse d'un message pour les autres membres de son groupe.
+
+        Seules les analyses d'une source partagée sont retenues : après une
+        analyse de repli, le message suivant du groupe est analysé normalement.
+        """
+        if analysis.get('source') not in self.shared_sources:
+            return
+        with self._lock:
+            cluster_id = self._cluster_of.get(email.id)
+            if cluster_id and cluster_id not in self._analyses:
+                self._analyses[cluster_id] = dict(analysis)
+
+
+_shared_index: Optional[NearDuplicateIndex] = None
+_shared_lock = threading.Lock()
+
+def shared_near_duplicates() -> NearDuplicateIndex:
+    """Index commun des messages similaires (créé au premier appel)."""
+    global _shared_index
+    with _shared_lock:
+        if _shared_index is None:
+            _shared_index = NearDuplicateIndex()
+        return _shared_index
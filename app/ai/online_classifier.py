@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Classification bayésienne naïve apprise en continu (corrections et verdicts du modèle).
+"""
+import logging
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from app.ai.keyword_matcher import normalize_text
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w{2,}")
+
+class OnlineClassifier:
+    """
+    Bayes naïf multinomial sur des caractéristiques hachées.
+
+    Chaque exemple met à jour des compteurs (mot haché -> occurrences par
+    catégorie) : l'apprentissage est incrémental et la prédiction ne demande
+    que quelques opérations vectorielles sur les mots de l'email.
+    """
+
+    def __init__(self, store_path: str = "app/data/online_classifier.npz", n_features: int = 2 ** 18,
+                 alpha: float = 0.1, min_examples: int = 20, body_chars: int = 2000,
+                 autosave_every: int = 25, max_seen: int = 10000):
+        """
+        Initialise le classificateur.
+
+        Args:
+            store_path: Fichier .npz des compteurs
+            n_features: Nombre de cases de hachage (puissance de 2)
+            alpha: Lissage de Laplace
+            min_examples: Poids d'apprentissage minimal avant de prédire
+            body_chars: Caractères du corps pris en compte
+            autosave_every: Sauvegarde automatique tous les N apprentissages
+            max_seen: Nombre d'exemples mémorisés pour ignorer les verdicts en double
+                et annuler l'apprentissage précédent d'un email réétiqueté
+        """
+        self.store_path = Path(store_path)
+        self.n_features = n_features
+        self.alpha = alpha
+        self.min_examples = min_examples
+        self.body_chars = body_chars
+        self.autosave_every = autosave_every
+        self.max_seen = max_seen
+
+        self.categories = []
+        self.counts = np.zeros((0, n_features), dtype=np.float32)
+        self.totals = np.zeros(0, dtype=np.float64)
+        self.documents = np.zeros(0, dtype=np.float64)
+
+        # Clé -> (catégorie, cases, valeurs ajoutées) des derniers exemples appris
+        self._seen: "OrderedDict[str, Tuple[str, np.ndarray, np.ndarray, float]]" = OrderedDict()
+        self._unsaved = 0
+        self._lock = threading.Lock()
+
+        self.load()
+
+    def __len__(self) -> int:
+        return int(self.documents.sum())
+
+    def is_ready(self) -> bool:
+        """Assez d'exemples (et au moins deux catégories) pour prédire."""
+        return len(self.categories) >= 2 and self.documents.sum() >= self.min_examples
+
+    def features(self, subject: str, body: str, sender: str = "") -> Dict[int, float]:
+        """
+        Caractéristiques hachées d'un email.
+
+        Les mots du sujet et le domaine de l'expéditeur sont distingués des
+        mots du corps.
+
+        Returns:
+            Case de hachage -> nombre d'occurrences
+        """
+        tokens = [f"s:{t}" for t in _TOKEN_RE.findall(normalize_text(subject))]
+        tokens.extend(_TOKEN_RE.findall(normalize_text((body or "")[:self.body_chars])))
+
+        domain = (sender or "").lower().rpartition('@')[2].strip(' >')
+        if domain:
+            tokens.append(f"d:{domain}")
+
+        mask = self.n_features - 1
+        features: Dict[int, float] = {}
+        for token in tokens:
+            index = zlib.crc32(token.encode()) & mask
+            features[index] = features.get(index, 0.0) + 1.0
+        return features
+
+    def predict_proba(self, features: Dict[int, float]) -> Dict[str, float]:
+        """
+        Probabilités a posteriori par catégorie.
+
+        Returns:
+            Catégorie -> probabilité (vide si le modèle n'est pas prêt)
+        """
+        if not features:
+            return {}
+
+        indices = np.fromiter(features.keys(), dtype=np.int64, count=len(features))
+        weights = np.fromiter(features.values(), dtype=np.float64, count=len(features))
+
+        with self._lock:
+            if not self.is_ready():
+                return {}
+            counts = self.counts[:, indices].astype(np.float64)
+            totals = self.totals
+            documents = self.documents
+            categories = list(self.categories)
+
+        log_likelihood = np.log(counts + self.alpha) - np.log(totals + self.alpha * self.n_features)[:, None]
+        scores = np.log(documents / documents.sum()) + log_likelihood @ weights
+        scores = np.exp(scores - scores.max())
+        probabilities = scores / scores.sum()
+
+        return {category: float(p) for category, p in zip(categories, probabilities)}
+
+    def predict(self, features: Dict[int, float]) -> Tuple[Optional[str], float]:
+        """
+        Catégorie la plus probable.
+
+        Returns:
+            (catégorie, probabilité) - (None, 0.0) si le modèle n'est pas prêt
+        """
+        probabilities = self.predict_proba(features)
+        if not probabilities:
+            return None, 0.0
+        category = max(probabilities, key=probabilities.get)
+        return category, probabilities[category]
+
+    def learn(self, features: Dict[int, float], category: str, weight: float = 1.0,
+              key: Optional[str] = None) -> bool:
+        """
+        Met à jour les compteurs avec un exemple étiqueté.
+
+        Args:
+            features: Caractéristiques (voir features)
+            category: Catégorie de l'exemple
+            weight: Poids de l'exemple (une correction compte plus qu'un verdict)
+            key: Identifiant de l'email ; un même email n'est appris qu'une fois
+                par catégorie, et un changement de catégorie (correction d'un
+                verdict) annule l'apprentissage précédent
+
+        Returns:
+            True si l'exemple a été appris
+        """
+        if not features or not category:
+            return False
+
+        indices = np.fromiter(features.keys(), dtype=np.int64, count=len(features))
+        values = np.fromiter(features.values(), dtype=np.float32, count=len(features)) * weight
+
+        with self._lock:
+            if key is not None:
+                previous = self._seen.get(key)
+                if previous is not None and previous[0] == category:
+                    return False
+                if previous is not None:
+                    self._unlearn(*previous)
+                self._seen[key] = (category, indices, values, weight)
+                self._seen.move_to_end(key)
+                while len(self._seen) > self.max_seen:
+                    self._seen.popitem(last=False)
+
+            row = self._category_row(category)
+            self.counts[row, indices] += values
+            self.totals[row] += float(values.sum())
+            self.documents[row] += weight
+
+            self._unsaved += 1
+            should_save = self._unsaved >= self.autosave_every
+
+        if should_save:
+            self.save()
+
+        return True
+
+    def _unlearn(self, category: str, indices: np.ndarray, values: np.ndarray, weight: float):
+        """Retire un exemple appris (verrou déjà pris)."""
+        row = self._category_row(category)
+        self.counts[row, indices] = np.maximum(self.counts[row, indices] - values, 0.0)
+        self.totals[row] = max(self.totals[row] - float(values.sum()), 0.0)
+        self.documents[row] = max(self.documents[row] - weight, 0.0)
+
+    def save(self):
+        """Sauvegarde les compteurs non nuls sur disque."""
+        try:
+            with self._lock:
+                if not self.categories:
+                    return
+
+                rows, cols = np.nonzero(self.counts)
+                self.store_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.store_path, 'wb') as f:
+                    np.savez_compressed(
+                        f,
+                        categories=np.array(self.categories, dtype=str),
+                        rows=rows.astype(np.int16),
+                        cols=cols.astype(np.int32),
+                        values=self.counts[rows, cols],
+                        documents=self.documents,
+                        n_features=np.array(self.n_features)
+                    )
+                self._unsaved = 0
+
+            logger.info(f"💾 Modèle appris sauvegardé ({len(self)} exemples, {len(cols)} compteurs)")
+        except Exception as e:
+            logger.error(f"Erreur sauvegarde modèle appris: {e}")
+
+    def load(self):
+        """Charge les compteurs depuis le disque."""
+        if not self.store_path.exists():
+            return
+
+        try:
+            with np.load(self.store_path) as data:
+                if int(data['n_features']) != self.n_features:
+                    logger.warning("Taille de hachage modifiée, modèle appris réinitialisé")
+                    return
+
+                categories = [str(c) for c in data['categories']]
+                counts = np.zeros((len(categories), self.n_features), dtype=np.float32)
+                counts[data['rows'].astype(np.int64), data['cols'].astype(np.int64)] = data['values']
+                documents = data['documents'].astype(np.float64)
+
+            with self._lock:
+                self.categories = categories
+                self.counts = counts
+                self.totals = counts.sum(axis=1, dtype=np.float64)
+                self.documents = documents
+
+            logger.info(f"✅ Modèle appris chargé ({len(self)} exemples)")
+        except Exception as e:
+            logger.error(f"Erreur chargement modèle appris: {e}")
+
+    def _category_row(self, category: str) -> int:
+        """Ligne d'une catégorie (ajoutée si inconnue, verrou déjà pris)."""
+        if category not in self.categories:
+            self.categories.append(category)
+            self.counts = np.vstack([self.counts, np.zeros((1, self.n_features), dtype=np.float32)])
+            self.totals = np.append(self.totals, 0.0)
+            self.documents = np.append(self.documents, 0.0)
+        return self.categories.index(category)
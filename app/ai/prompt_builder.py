@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Construction de prompts sous budget de tokens avec contrôle de num_ctx.
+"""
+import logging
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Préfixe système identique pour toutes les requêtes : le serveur peut
+# réutiliser son cache de préfixe d'une requête à l'autre. La langue de la
+# réponse est précisée avec la consigne (traductions, réponses à un email
+# en anglais...).
+SYSTEM_PREFIX = (
+    "Tu es l'assistant email de Dynovate Mail. Tu réponds de façon concise "
+    "et exacte, dans la langue demandée, en suivant strictement le format demandé."
+)
+
+LANGUAGE_NAMES = {
+    'fr': 'français',
+    'en': 'anglais',
+    'es': 'espagnol',
+    'de': 'allemand'
+}
+
+_TOKEN_PATTERN = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+# Début de l'historique cité dans un message
+_QUOTE_PATTERN = re.compile(
+    r"^\s*>"
+    r"|^\s*Le .{0,120}a écrit\s*:"
+    r"|^\s*On .{0,120}wrote\s*:"
+    r"|^\s*-{2,}\s*(?:Original Message|Message d'origine|Forwarded message|Message transféré)"
+    r"|^\s*(?:De|From)\s*:.+@",
+    re.IGNORECASE | re.MULTILINE
+)
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estime le nombre de tokens d'un texte.
+
+    Approximation d'un tokenizer BPE : un token par ponctuation et environ
+    un token par tranche de 4 caractères de mot.
+
+    Args:
+        text: Texte à mesurer
+
+    Returns:
+        Nombre de tokens estimé
+    """
+    if not text:
+        return 0
+
+    count = 0
+    for match in _TOKEN_PATTERN.finditer(text):
+        count += 1 + (len(match.group()) - 1) // 4
+    return count
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Tronque un texte pour qu'il tienne dans un budget de tokens.
+
+    Args:
+        text: Texte à tronquer
+        max_tokens: Budget maximal
+
+    Returns:
+        Le texte tronqué sur une frontière de mot
+    """
+    if max_tokens <= 0:
+        return ""
+
+    count = 0
+    for match in _TOKEN_PATTERN.finditer(text):
+        count += 1 + (len(match.group()) - 1) // 4
+        if count > max_tokens:
+            return text[:match.start()].rstrip() + " [...]"
+    return text
+
+def split_quoted_history(body: str) -> Tuple[str, str]:
+    """
+    Sépare le dernier message de l'historique cité.
+
+    Args:
+        body: Corps de l'email
+
+    Returns:
+        (dernier message, historique cité)
+    """
+    if not body:
+        return "", ""
+
+    match = _QUOTE_PATTERN.search(body)
+    if not match:
+        return body.strip(), ""
+
+    return body[:match.start()].strip(), body[match.start():].strip()
+
+
+@dataclass
+class PromptSection:
+    """Section de prompt (priorité 0 = conservée en premier)."""
+    label: str
+    text: str
+    priority: int = 1
+    max_tokens: Optional[int] = None
+
+
+@dataclass
+class BuiltPrompt:
+    """Prompt construit."""
+    prompt: str
+    prompt_tokens: int
+    num_ctx: int
+    trimmed: List[str] = field(default_factory=list)
+
+
+class PromptBuilder:
+    """
+    Assemble préfixe système, sections et consigne dans un budget de tokens.
+
+    L'ordre est stable : préfixe système, sections dans l'ordre fourni, puis
+    langue de la réponse et consigne. Les différentes requêtes sur un même email partagent ainsi le
+    même préfixe. Les sections sont servies par priorité et tronquées si le
+    budget est dépassé. num_ctx est choisi parmi quelques tailles fixes :
+    chaque nouvelle valeur force Ollama à recharger le modèle.
+    """
+
+    CONTEXT_SIZES = (2048, 4096, 8192)
+
+    def __init__(self, system: str = SYSTEM_PREFIX, max_ctx: int = 8192, reserve_tokens: int = 32):
+        """
+        Initialise le constructeur.
+
+        Args:
+            system: Préfixe système commun
+            max_ctx: Contexte maximal autorisé
+            reserve_tokens: Marge pour l'imprécision de l'estimation
+        """
+        self.system = system
+        self.max_ctx = max_ctx
+        self.reserve_tokens = reserve_tokens
+        self._system_tokens = estimate_tokens(system)
+
+    def build(self, instruction: str, sections: List[PromptSection], max_tokens: int,
+              language: Optional[str] = None) -> BuiltPrompt:
+        """
+        Construit un prompt.
+
+        Args:
+            instruction: Consigne placée en fin de prompt
+            sections: Sections de contenu
+            max_tokens: Tokens réservés pour la réponse
+            language: Code ('fr', 'en'...) ou nom de la langue de la réponse
+
+        Returns:
+            Le prompt, sa taille estimée et le num_ctx à utiliser
+        """
+        if language:
+            instruction = f"Langue de la réponse : {LANGUAGE_NAMES.get(language, language)}.\n{instruction}"
+
+        fixed = self._system_tokens + estimate_tokens(instruction) + self.reserve_tokens
+        budget = max(0, self.max_ctx - max_tokens - fixed)
+
+        texts = {}
+        trimmed = []
+        for index in sorted(range(len(sections)), key=lambda i: sections[i].priority):
+            section = sections[index]
+            limit = budget if section.max_tokens is None else min(budget, section.max_tokens)
+            header_tokens = estimate_tokens(section.label) + 1
+
+            if not section.text or limit <= header_tokens:
+                if section.text:
+                    trimmed.append(section.label)
+                continue
+
+            text = section.text
+            tokens = estimate_tokens(text)
+            if tokens + header_tokens > limit:
+                text = truncate_to_tokens(text, limit - header_tokens)
+                tokens = estimate_tokens(text)
+                trimmed.append(section.label)
+
+            texts[index] = text
+            budget -= tokens + header_tokens
+
+        parts = [self.system]
+        body = "\n".join(f"{sections[i].label}: {texts[i]}" for i in range(len(sections)) if i in texts)
+        if body:
+            parts.append(body)
+        parts.append(instruction)
+
+        prompt = "\n\n".join(parts)
+        prompt_tokens = estimate_tokens(prompt)
+
+        if trimmed:
+            logger.debug(f"Sections tronquées: {', '.join(trimmed)}")
+
+        return BuiltPrompt(
+            prompt=prompt,
+            prompt_tokens=prompt_tokens,
+            num_ctx=self.context_size(prompt_tokens + max_tokens + self.reserve_tokens),
+            trimmed=trimmed
+        )
+
+    def context_size(self, tokens: int) -> int:
+        """Plus petite taille de contexte suffisante."""
+        for size in self.CONTEXT_SIZES:
+            if size >= tokens and size <= self.max_ctx:
+                return size
+        return self.max_ctx
+
+    def email_sections(self, email, include_sender: bool = True, body_tokens: Optional[int] = None,
+                       history_tokens: Optional[int] = None) -> List[PromptSection]:
+        """
+        Sections standard d'un email : sujet > dernier message > historique cité.
+
+        Args:
+            email: Email source
+            include_sender: Inclure l'expéditeur
+            body_tokens: Plafond pour le dernier message
+            history_tokens: Plafond pour l'historique cité (0 pour l'exclure)
+
+        Returns:
+            Liste de sections
+        """
+        latest, history = split_quoted_history(email.body or email.snippet or '')
+
+        sections = []
+        if include_sender:
+            sections.append(PromptSection("Expéditeur", email.sender or '', priority=0, max_tokens=40))
+        sections.append(PromptSection("Sujet", email.subject or '', priority=0, max_tokens=60))
+        sections.append(PromptSection("Message", latest, priority=1, max_tokens=body_tokens))
+
+        if history and history_tokens != 0:
+            sections.append(PromptSection("Historique", history, priority=2, max_tokens=history_tokens))
+
+        return sections
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Cache des réponses générées (résumés, suggestions de réponse).
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+from app.ai.smart_classifier import email_hash
+
+class ResponseCache:
+    """Cache LRU à durée de vie limitée, indexé par empreinte d'email."""
+
+    def __init__(self, max_entries: int = 500, ttl: float = 6 * 3600):
+        """
+        Initialise le cache.
+
+        Args:
+            max_entries: Nombre maximal d'entrées (les moins récemment utilisées sont évincées)
+            ttl: Durée de vie d'une entrée (secondes)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and time.monotonic() - entry[1] < self.ttl
+
+    @staticmethod
+    def key(kind: str, email, *args) -> tuple:
+        """
+        Clé d'une réponse pour un email.
+
+        La clé associe l'identifiant à une empreinte du sujet et de l'aperçu,
+        présents aussi bien dans les emails des listes (sans corps) que dans
+        les emails complets : une réponse précalculée depuis la liste sert à
+        l'ouverture, et un email modifié ne réutilise pas une réponse obsolète.
+
+        Args:
+            kind: Type de réponse (summary, suggestions...)
+            email: Email concerné
+            *args: Paramètres de génération
+
+        Returns:
+            La clé de cache
+        """
+        return (kind, email.id, email_hash(email.subject, email.snippet or email.body)) + args
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Valeur en cache, ou None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.monotonic() - entry[1] >= self.ttl:
+                self._entries.pop(key, None)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any):
+        """Ajoute une valeur."""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Vide le cache."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Taille et taux de réussite."""
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
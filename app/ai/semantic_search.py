@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+Recherche sémantique dans la boîte mail sur un index vectoriel mappé en mémoire.
+"""
+import json
+import logging
+import queue
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+class VectorIndex:
+    """
+    Index vectoriel persistant.
+
+    Les vecteurs normalisés sont stockés dans une matrice float16 mappée en
+    mémoire (fichier .f16) avec une table d'identifiants (.ids.json). Au-delà
+    de ivf_threshold vecteurs, un index grossier de type IVF (centroïdes
+    k-means) limite la recherche exacte aux listes les plus proches.
+    """
+
+    def __init__(self, path: str = "app/data/semantic_index", ivf_threshold: int = 100000,
+                 nprobe: int = 8, chunk_size: int = 65536):
+        """
+        Initialise l'index.
+
+        Args:
+            path: Préfixe des fichiers de l'index
+            ivf_threshold: Taille à partir de laquelle l'index IVF est utilisé
+            nprobe: Nombre de listes IVF explorées par requête
+            chunk_size: Taille des blocs pour la recherche exhaustive
+        """
+        self.path = Path(path)
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self.chunk_size = chunk_size
+
+        self.dim = 0
+        self.size = 0
+        self.capacity = 0
+        self.ids: List[str] = []
+        self._positions: Dict[str, int] = {}
+        self._matrix: Optional[np.memmap] = None
+
+        # Index IVF
+        self._centroids: Optional[np.ndarray] = None
+        self._assignments = np.zeros(0, dtype=np.int32)
+        self._trained_size = 0
+
+        self._lock = threading.RLock()
+        self._load()
+
+    @property
+    def _matrix_file(self) -> Path:
+        return self.path.with_suffix('.f16')
+
+    @property
+    def _ids_file(self) -> Path:
+        return self.path.with_suffix('.ids.json')
+
+    @property
+    def _ivf_file(self) -> Path:
+        return self.path.with_suffix('.ivf.npz')
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._positions
+
+    def add(self, ids: List[str], vectors: np.ndarray) -> int:
+        """
+        Ajoute des vecteurs à l'index (les identifiants déjà présents sont ignorés).
+
+        Args:
+            ids: Identifiants des messages
+            vectors: Matrice (n, dim) de vecteurs
+
+        Returns:
+            Nombre de vecteurs ajoutés
+        """
+        vectors = np.asarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(ids) != len(vectors):
+            return 0
+
+        with self._lock:
+            if self.dim == 0:
+                self.dim = vectors.shape[1]
+            elif vectors.shape[1] != self.dim:
+                logger.error(f"Dimension incompatible: {vectors.shape[1]} au lieu de {self.dim}")
+                return 0
+
+            keep = [i for i, item_id in enumerate(ids) if item_id not in self._positions]
+            if not keep:
+                return 0
+
+            vectors = _normalize(vectors[keep])
+            new_ids = [ids[i] for i in keep]
+
+            start = self.size
+            self._ensure_capacity(start + len(new_ids))
+            self._matrix[start:start + len(new_ids)] = vectors.astype(np.float16)
+
+            for offset, item_id in enumerate(new_ids):
+                self._positions[item_id] = start + offset
+            self.ids.extend(new_ids)
+            self.size += len(new_ids)
+
+            if self._centroids is not None:
+                assignments = self._assign(vectors)
+                self._assignments = np.concatenate([self._assignments, assignments])
+
+            if self.size >= self.ivf_threshold and self.size >= 2 * max(self._trained_size, self.ivf_threshold // 2):
+                self._train_ivf()
+
+            return len(new_ids)
+
+    def search(self, query: np.ndarray, k: int = 20) -> List[Tuple[str, float]]:
+        """
+        Recherche les vecteurs les plus proches (similarité cosinus).
+
+        Args:
+            query: Vecteur de requête
+            k: Nombre de résultats
+
+        Returns:
+            Liste de (identifiant, score) triée par score décroissant
+        """
+        query = _normalize(np.asarray(query, dtype=np.float32)[None, :])[0]
+
+        with self._lock:
+            if self.size == 0 or query.shape[0] != self.dim:
+                return []
+
+            if self._centroids is not None:
+                rows, scores = self._search_ivf(query)
+            else:
+                rows, scores = self._search_exhaustive(query)
+
+            if len(rows) == 0:
+                return []
+
+            k = min(k, len(rows))
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+
+            return [(self.ids[rows[i]], float(scores[i])) for i in top]
+
+    def flush(self):
+        """Écrit l'index sur disque."""
+        with self._lock:
+            if self._matrix is None:
+                return
+
+            try:
+                self._matrix.flush()
+
+                with open(self._ids_file, 'w', encoding='utf-8') as f:
+                    json.dump({'dim': self.dim, 'capacity': self.capacity, 'ids': self.ids}, f)
+
+                if self._centroids is not None:
+                    np.savez(
+                        self._ivf_file,
+                        centroids=self._centroids,
+                        assignments=self._assignments,
+                        trained_size=np.array(self._trained_size)
+                    )
+
+                logger.info(f"💾 Index sémantique sauvegardé ({self.size} messages)")
+            except Exception as e:
+                logger.error(f"Erreur sauvegarde index sémantique: {e}")
+
+    def _search_exhaustive(self, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Produit scalaire sur toute la matrice, par blocs."""
+        scores = np.empty(self.size, dtype=np.float32)
+        for start in range(0, self.size, self.chunk_size):
+            end = min(start + self.chunk_size, self.size)
+            scores[start:end] = self._matrix[start:end].astype(np.float32) @ query
+        return np.arange(self.size), scores
+
+    def _search_ivf(self, query: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Recherche exacte limitée aux nprobe listes les plus proches."""
+        nprobe = min(self.nprobe, len(self._centroids))
+        probe = np.argpartition(-(self._centroids @ query), nprobe - 1)[:nprobe]
+        rows = np.flatnonzero(np.isin(self._assignments, probe))
+        if len(rows) == 0:
+            return rows, np.zeros(0, dtype=np.float32)
+        return rows, self._matrix[rows].astype(np.float32) @ query
+
+    def _train_ivf(self, iterations: int = 10, sample_size: int = 20000):
+        """Entraîne les centroïdes (k-means sphérique) et réassigne les vecteurs."""
+        n_lists = int(min(4096, max(16, 4 * np.sqrt(self.size))))
+        logger.info(f"🧭 Construction de l'index IVF ({n_lists} listes, {self.size} messages)...")
+
+        rng = np.random.default_rng(42)
+        sample_rows = np.sort(rng.choice(self.size, size=min(sample_size, self.size), replace=False))
+        sample = self._matrix[sample_rows].astype(np.float32)
+
+        centroids = sample[rng.choice(len(sample), size=min(n_lists, len(sample)), replace=False)]
+        for _ in range(iterations):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            empty = np.linalg.norm(sums, axis=1) == 0
+            sums[empty] = centroids[empty]
+            centroids = _normalize(sums)
+
+        self._centroids = centroids
+        self._assignments = np.concatenate([
+            self._assign(self._matrix[start:min(start + self.chunk_size, self.size)].astype(np.float32))
+            for start in range(0, self.size, self.chunk_size)
+        ])
+        self._trained_size = self.size
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        """Liste IVF la plus proche pour chaque vecteur."""
+        return np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int32)
+
+    def _ensure_capacity(self, size: int):
+        """Agrandit le fichier mappé par doublement."""
+        if size <= self.capacity:
+            return
+
+        capacity = max(size, self.capacity * 2, 1024)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        if self._matrix is not None:
+            self._matrix.flush()
+            del self._matrix
+
+        mode = 'r+b' if self._matrix_file.exists() else 'w+b'
+        with open(self._matrix_file, mode) as f:
+            f.truncate(capacity * self.dim * 2)
+
+        self._matrix = np.memmap(self._matrix_file, dtype=np.float16, mode='r+', shape=(capacity, self.dim))
+        self.capacity = capacity
+
+    def _load(self):
+        """Ouvre un index existant."""
+        if not self._ids_file.exists() or not self._matrix_file.exists():
+            return
+
+        try:
+            with open(self._ids_file, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+
+            self.dim = meta['dim']
+            self.capacity = meta['capacity']
+            self.ids = meta['ids']
+            self.size = len(self.ids)
+            self._positions = {item_id: i for i, item_id in enumerate(self.ids)}
+            self._matrix = np.memmap(self._matrix_file, dtype=np.float16, mode='r+',
+                                     shape=(self.capacity, self.dim))
+
+            if self._ivf_file.exists():
+                with np.load(self._ivf_file) as data:
+                    assignments = data['assignments']
+                    # Les assignations doivent couvrir tous les vecteurs persistés
+                    if len(assignments) == self.size:
+                        self._centroids = data['centroids']
+                        self._assignments = assignments
+                        self._trained_size = int(data['trained_size'])
+
+            if self._centroids is None and self.size >= self.ivf_threshold:
+                self._train_ivf()
+
+            logger.info(f"✅ Index sémantique chargé ({self.size} messages)")
+        except Exception as e:
+            logger.error(f"Erreur chargement index sémantique: {e}")
+            self.dim = self.size = self.capacity = 0
+            self.ids = []
+            self._positions = {}
+            self._matrix = None
+
+
+class SemanticSearch:
+    """Recherche en langage naturel sur les embeddings des messages."""
+
+    def __init__(self, ollama_client, index: Optional[VectorIndex] = None, flush_every: int = 200):
+        """
+        Initialise la recherche sémantique.
+
+        Args:
+            ollama_client: Client Ollama (méthode embed)
+            index: Index vectoriel (créé dans app/data par défaut)
+            flush_every: Écriture sur disque tous les N messages indexés
+        """
+        self.ollama_client = ollama_client
+        self.index = index or VectorIndex()
+        self.flush_every = flush_every
+
+        self._queue: "queue.Queue" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._pending = 0
+
+    @staticmethod
+    def email_text(email) -> str:
+        """Texte encodé pour un message."""
+        return f"{email.subject or ''}\n{email.sender or ''}\n{(email.body or email.snippet or '')[:1000]}"
+
+    def index_emails(self, emails: list) -> int:
+        """
+        Indexe les messages qui ne le sont pas encore.
+
+        Args:
+            emails: Liste d'emails
+
+        Returns:
+            Nombre de messages ajoutés
+        """
+        ids, vectors = [], []
+        for email in emails:
+            if email.id in self.index or email.id in ids:
+                continue
+
+            embedding = self.ollama_client.embed(self.email_text(email))
+            if embedding:
+                ids.append(email.id)
+                vectors.append(embedding)
+
+        if not ids:
+            return 0
+
+        added = self.index.add(ids, np.asarray(vectors, dtype=np.float32))
+        self._pending += added
+        if self._pending >= self.flush_every:
+            self.index.flush()
+            self._pending = 0
+
+        logger.info(f"🧠 {added} messages indexés ({len(self.index)} au total)")
+        return added
+
+    def index_async(self, emails: list):
+        """
+        Indexe des messages en arrière-plan (appelé à chaque synchronisation).
+
+        Args:
+            emails: Liste d'emails
+        """
+        emails = [e for e in emails if e.id not in self.index]
+        if not emails:
+            return
+
+        self._queue.put(emails)
+
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run_worker, name="semantic-indexer", daemon=True)
+            self._worker.start()
+
+    def search(self, query: str, k: int = 20) -> List[Tuple[str, float]]:
+        """
+        Recherche les messages les plus proches d'une requête.
+
+        Args:
+            query: Requête en langage naturel
+            k: Nombre de résultats
+
+        Returns:
+            Liste de (id du message, score)
+        """
+        if not query.strip() or len(self.index) == 0:
+            return []
+
+        embedding = self.ollama_client.embed(query)
+        if not embedding:
+            return []
+
+        return self.index.search(np.asarray(embedding, dtype=np.float32), k=k)
+
+    def close(self):
+        """Écrit l'index sur disque."""
+        self.index.flush()
+        self._pending = 0
+
+    def _run_worker(self):
+        """Consomme la file d'indexation."""
+        while True:
+            emails = self._queue.get()
+            try:
+                self.index_emails(emails)
+            except Exception as e:
+                logger.error(f"Erreur indexation sémantique: {e}")
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """Normalise les lignes d'une matrice (norme 1)."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
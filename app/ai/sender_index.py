@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+Statistiques par expéditeur et par domaine, tenues à jour à chaque synchronisation.
+"""
+import json
+import logging
+import sqlite3
+import statistics
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from email.utils import getaddresses, parseaddr
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from app.utils.ai_utils import PERSONAL_DOMAINS
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS sender_stats (
+        key TEXT PRIMARY KEY,
+        received INTEGER NOT NULL DEFAULT 0,
+        sent INTEGER NOT NULL DEFAULT 0,
+        replied INTEGER NOT NULL DEFAULT 0,
+        latencies TEXT,
+        first_contact DATETIME,
+        last_contact DATETIME,
+        labels TEXT
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS sender_messages (
+        email_id TEXT PRIMARY KEY,
+        thread_id TEXT,
+        address TEXT,
+        outgoing INTEGER NOT NULL,
+        date DATETIME,
+        replied INTEGER NOT NULL DEFAULT 0,
+        label TEXT
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_sender_messages_thread ON sender_messages (thread_id);
+'''
+
+_UPSERT_STATS = '''
+    INSERT OR REPLACE INTO sender_stats
+    (key, received, sent, replied, latencies, first_contact, last_contact, labels)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+'''
+_INSERT_MESSAGE = '''
+    INSERT OR IGNORE INTO sender_messages (email_id, thread_id, address, outgoing, date)
+    VALUES (?, ?, ?, ?, ?)
+'''
+_SELECT_THREAD = '''
+    SELECT email_id, address, outgoing, date, replied FROM sender_messages
+    WHERE thread_id = ? ORDER BY date
+'''
+_MARK_REPLIED = "UPDATE sender_messages SET replied = 1 WHERE email_id = ?"
+_SET_LABEL = '''
+    UPDATE sender_messages SET label = ? WHERE email_id = ? AND label IS NULL AND outgoing = 0
+'''
+
+@dataclass
+class SenderStats:
+    """Historique des échanges avec une adresse (ou un domaine, clé « @domaine »)."""
+    key: str
+    received: int = 0
+    sent: int = 0
+    replied: int = 0
+    latencies: List[float] = field(default_factory=list)  # délais de réponse récents (secondes)
+    first_contact: Optional[datetime] = None
+    last_contact: Optional[datetime] = None
+    labels: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def reply_rate(self) -> float:
+        """Part des messages reçus auxquels nous avons répondu."""
+        return self.replied / self.received if self.received else 0.0
+
+    @property
+    def median_reply_latency(self) -> Optional[timedelta]:
+        """Délai médian de nos réponses."""
+        return timedelta(seconds=statistics.median(self.latencies)) if self.latencies else None
+
+    @property
+    def top_label(self) -> Optional[str]:
+        """Catégorie la plus fréquente des messages reçus."""
+        return max(self.labels.items(), key=lambda item: item[1])[0] if self.labels else None
+
+    def urgency_hint(self, min_messages: int = 3, fast_reply: timedelta = timedelta(days=1),
+                     outgoing_seen: bool = False) -> Optional[str]:
+        """
+        Indication d'urgence tirée de l'historique.
+
+        Args:
+            min_messages: Messages reçus nécessaires pour conclure
+            fast_reply: Délai médian en dessous duquel nous répondons vite
+            outgoing_seen: Des messages envoyés ont été synchronisés ; sans
+                eux, l'absence de réponse ne prouve rien
+
+        Returns:
+            'important' (nous répondons souvent et vite), 'low' (jamais de réponse
+            ni d'envoi), ou None si l'historique ne permet pas de conclure
+        """
+        if self.received < min_messages:
+            return None
+        latency = self.median_reply_latency
+        if self.reply_rate >= 0.5 and latency is not None and latency <= fast_reply:
+            return 'important'
+        if outgoing_seen and self.replied == 0 and self.sent == 0:
+            return 'low'
+        return None
+
+    def _row(self) -> Tuple:
+        return (
+            self.key, self.received, self.sent, self.replied, json.dumps(self.latencies),
+            _iso(self.first_contact), _iso(self.last_contact), json.dumps(self.labels)
+        )
+
+
+def _iso(date: Optional[datetime]) -> Optional[str]:
+    return date.isoformat(sep=' ') if date else None
+
+def _utc(date: Optional[datetime]) -> Optional[datetime]:
+    """Date en UTC sans fuseau (les dates naïves sont considérées locales)."""
+    return date.astimezone(timezone.utc).replace(tzinfo=None) if date else None
+
+def address_of(header: str) -> str:
+    """Adresse email d'un en-tête « Nom <adresse> », en minuscules."""
+    return parseaddr(header or '')[1].lower()
+
+def domain_key(address: str) -> Optional[str]:
+    """Clé de domaine d'une adresse (None pour les messageries personnelles)."""
+    domain = address.rpartition('@')[2]
+    if not domain or domain in PERSONAL_DOMAINS:
+        return None
+    return f"@{domain}"
+
+
+class SenderIndex:
+    """
+    Statistiques d'échange par adresse et par domaine.
+
+    Toutes les statistiques sont en mémoire (consultation en O(1)) et
+    recopiées dans SQLite ; les messages vus y sont aussi gardés, par fil
+    de conversation, pour relier nos réponses aux messages reçus même
+    lorsqu'elles sont synchronisées dans le désordre.
+    """
+
+    def __init__(self, db_path: str = "app/data/senders.db", own_addresses: Iterable[str] = (),
+                 max_latencies: int = 50):
+        """
+        Ouvre l'index.
+
+        Args:
+            db_path: Fichier SQLite
+            own_addresses: Nos adresses (en plus du label SENT) pour reconnaître les envois
+            max_latencies: Délais de réponse conservés par adresse pour la médiane
+        """
+        self.db_path = db_path
+        self.own_addresses = {address.lower() for address in own_addresses if address}
+        self.max_latencies = max_latencies
+
+        self._lock = threading.Lock()
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        self._stats: Dict[str, SenderStats] = {}
+        self._seen = set()
+        self.outgoing_seen = False
+        self._load()
+
+        logger.info(f"👥 Index des expéditeurs: {len(self._stats)} adresses et domaines")
+
+    def _load(self):
+        """Charge les statistiques et les messages vus depuis la base."""
+        self._stats = {}
+        for key, received, sent, replied, latencies, first, last, labels in self._conn.execute(
+                "SELECT key, received, sent, replied, latencies, first_contact, last_contact, labels FROM sender_stats"):
+            self._stats[key] = SenderStats(
+                key, received, sent, replied, json.loads(latencies or '[]'),
+                datetime.fromisoformat(first) if first else None,
+                datetime.fromisoformat(last) if last else None,
+                json.loads(labels or '{}')
+            )
+        # Les envois sont enregistrés une fois par destinataire (« id:adresse »)
+        self._seen = {row[0].partition(':')[0] for row in self._conn.execute("SELECT email_id FROM sender_messages")}
+        self.outgoing_seen = any(stats.sent for stats in self._stats.values())
+
+    def __len__(self) -> int:
+        return len(self._stats)
+
+    def get(self, sender: str) -> Optional[SenderStats]:
+        """Statistiques d'une adresse (en-tête From accepté)."""
+        return self._stats.get(address_of(sender))
+
+    def get_domain(self, sender: str) -> Optional[SenderStats]:
+        """Statistiques du domaine d'une adresse (None pour les messageries personnelles)."""
+        key = domain_key(address_of(sender))
+        return self._stats.get(key) if key else None
+
+    def lookup(self, sender: str, min_messages: int = 3) -> Optional[SenderStats]:
+        """Statistiques de l'adresse, ou de son domaine si l'adresse est trop peu connue."""
+        stats = self.get(sender)
+        if stats and stats.received >= min_messages:
+            return stats
+        return self.get_domain(sender) or stats
+
+    def urgency_hint(self, sender: str) -> Optional[str]:
+        """Indication d'urgence de l'historique (voir SenderStats.urgency_hint)."""
+        stats = self.lookup(sender)
+        return stats.urgency_hint(outgoing_seen=self.outgoing_seen) if stats else None
+
+    def add_own_addresses(self, addresses: Iterable[str]):
+        """Ajoute nos adresses (celle du compte Gmail) pour reconnaître les envois."""
+        self.own_addresses.update(address.lower() for address in addresses if address)
+
+    def is_outgoing(self, email) -> bool:
+        """Message envoyé par nous."""
+        return 'SENT' in (email.labels or []) or address_of(email.sender) in self.own_addresses
+
+    def add_emails(self, emails: list) -> int:
+        """
+        Intègre les messages pas encore vus (appelé à chaque synchronisation).
+
+        Args:
+            emails: Liste d'emails (reçus ou envoyés)
+
+        Returns:
+            Nombre de messages intégrés
+        """
+        with self._lock:
+            dirty = set()
+            added = 0
+            try:
+                with self._conn:
+                    for email in emails:
+                        if not email.id or email.id in self._seen:
+                            continue
+                        self._seen.add(email.id)
+                        added += 1
+                        if self.is_outgoing(email):
+                            self._add_outgoing(email, dirty)
+                        else:
+                            self._add_incoming(email, dirty)
+
+                    self._conn.executemany(_UPSERT_STATS, [self._stats[key]._row() for key in dirty])
+            except Exception as e:
+                logger.error(f"Erreur index des expéditeurs: {e}")
+                self._load()  # transaction annulée : revenir à l'état enregistré
+                return 0
+
+        if added:
+            logger.debug(f"👥 {added} messages intégrés, {len(dirty)} expéditeurs mis à jour")
+        return added
+
+    def record_label(self, email_id: str, sender: str, label: str):
+        """
+        Enregistre la catégorie d'un message reçu (une seule fois par message).
+
+        Args:
+            email_id: Identifiant du message
+            sender: En-tête From
+            label: Catégorie attribuée
+        """
+        if not email_id or not label:
+            return
+        with self._lock:
+            try:
+                with self._conn:
+                    updated = self._conn.execute(_SET_LABEL, (label, email_id)).rowcount
+                    if not updated:
+                        return
+                    keys = self._keys(address_of(sender))
+                    for key in keys:
+                        stats = self._stats.setdefault(key, SenderStats(key))
+                        stats.labels[label] = stats.labels.get(label, 0) + 1
+                    self._conn.executemany(_UPSERT_STATS, [self._stats[key]._row() for key in keys])
+            except Exception as e:
+                logger.error(f"Erreur index des expéditeurs: {e}")
+                self._load()
+
+    def close(self):
+        """Ferme la connexion."""
+        with self._lock:
+            self._conn.close()
+
+    def _keys(self, address: str) -> List[str]:
+        """Clés mises à jour pour une adresse : elle-même et son domaine."""
+        if not address:
+            return []
+        domain = domain_key(address)
+        return [address, domain] if domain else [address]
+
+    def _touch(self, key: str, date: Optional[datetime], dirty: set) -> SenderStats:
+        stats = self._stats.setdefault(key, SenderStats(key))
+        if date:
+            if stats.first_contact is None or date < stats.first_contact:
+                stats.first_contact = date
+            if stats.last_contact is None or date > stats.last_contact:
+                stats.last_contact = date
+        dirty.add(key)
+        return stats
+
+    def _add_incoming(self, email, dirty: set):
+        address = address_of(email.sender)
+        date = _utc(email.received_date)
+        self._conn.execute(_INSERT_MESSAGE, (email.id, email.thread_id, address, 0, _iso(date)))
+        for key in self._keys(address):
+            self._touch(key, date, dirty).received += 1
+
+        # Réponse déjà synchronisée (messages reçus dans le désordre)
+        if email.thread_id and date:
+            for _, other, outgoing, other_date, _ in self._conn.execute(_SELECT_THREAD, (email.thread_id,)).fetchall():
+                if outgoing and other == address and other_date and datetime.fromisoformat(other_date) > date:
+                    self._mark_replied(email.id, address, datetime.fromisoformat(other_date) - date, dirty)
+                    break
+
+    def _add_outgoing(self, email, dirty: set):
+        date = _utc(email.received_date)
+        recipients = [address.lower() for _, address in getaddresses([email.to or '']) if address]
+        for address in recipients:
+            self._conn.execute(_INSERT_MESSAGE, (f"{email.id}:{address}", email.thread_id, address, 1, _iso(date)))
+            for key in self._keys(address):
+                self._touch(key, date, dirty).sent += 1
+        if recipients:
+            self.outgoing_seen = True
+
+        if not (email.thread_id and date):
+            return
+
+        # Premier message sans réponse de chaque destinataire, antérieur à l'envoi
+        thread = self._conn.execute(_SELECT_THREAD, (email.thread_id,)).fetchall()
+        for address in recipients:
+            for email_id, other, outgoing, other_date, replied in thread:
+                if outgoing or replied or other != address or not other_date:
+                    continue
+                received = datetime.fromisoformat(other_date)
+                if received < date:
+                    self._mark_replied(email_id, address, date - received, dirty)
+                    break
+
+    def _mark_replied(self, email_id: str, address: str, latency: timedelta, dirty: set):
+        self._conn.execute(_MARK_REPLIED, (email_id,))
+        for key in self._keys(address):
+            stats = self._stats.setdefault(key, SenderStats(key))
+            stats.replied += 1
+            stats.latencies = (stats.latencies + [latency.total_seconds()])[-self.max_latencies:]
+            dirty.add(key)
+
+
+_indexes: Dict[str, SenderIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_sender_index(db_path: str = "app/data/senders.db", own_addresses: Iterable[str] = ()) -> SenderIndex:
+    """Index partagé d'un fichier (ouvert au premier appel, nos adresses ajoutées à chaque appel)."""
+    key = str(Path(db_path).resolve())
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = SenderIndex(db_path)
+        _indexes[key].add_own_addresses(own_addresses)
+        return _indexes[key]
+
+def close_sender_indexes():
+    """Ferme tous les index partagés (à appeler à la fermeture de l'application)."""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+        _indexes.clear()
+    for index in indexes:
+        index.close()
@@ -6,14 +6,38 @@ import logging
 import re
 import json
 from typing import Dict, List, Tuple, Optional
-from datetime import datetime, timedelta
 from dataclasses import dataclass
-import sqlite3
 import hashlib
 from pathlib import Path
 
+from app.ai.keyword_matcher import CATEGORY_KEYWORDS, KeywordHits, normalize_text, shared_matcher
+from app.ai.classifier_store import ClassifierStore, get_store
+from app.ai.sender_index import SenderIndex, get_sender_index
+
 logger = logging.getLogger(__name__)
 
+# Correspondance avec les catégories utilisées par AIProcessor
+AI_CATEGORY_MAP = {
+    'rdv': 'meeting',
+    'facture': 'invoice',
+    'partenariat': 'work',
+    'general': 'work'
+}
+
+# Catégories apprises (AIProcessor) ayant un équivalent direct dans SmartClassifier
+LEARNED_CATEGORY_MAP = {
+    'meeting': 'rdv',
+    'invoice': 'facture'
+}
+
+def to_ai_category(category: str) -> str:
+    """Convertit une catégorie SmartClassifier en catégorie AIProcessor."""
+    return AI_CATEGORY_MAP.get(category, category)
+
+def email_hash(subject: str, body: str) -> str:
+    """Empreinte d'un email utilisée comme clé des corrections."""
+    return hashlib.md5(f"{subject or ''} {body or ''}".encode()).hexdigest()
+
 @dataclass
 class EmailAnalysis:
     """Résultat d'analyse d'un email."""
@@ -28,9 +52,22 @@ class EmailAnalysis:
 class SmartClassifier:
     """Classificateur intelligent avec génération de réponses."""
     
-    def __init__(self, model_path: str = "app/data/classifier.db"):
+    def __init__(self, model_path: str = "app/data/classifier.db",
+                 online_model=None,
+                 learned_weight: float = 0.8, correction_weight: float = 5.0,
+                 store: Optional[ClassifierStore] = None, sender_index: Optional[SenderIndex] = None):
         self.model_path = model_path
-        self._init_database()
+        self.store = store or get_store(model_path)
+        
+        # Historique des échanges par expéditeur (priorité et réponses automatiques)
+        self.sender_index = sender_index or get_sender_index(str(Path(model_path).with_name("senders.db")))
+        
+        # Modèle appris des corrections et des verdicts du modèle, ajouté aux scores
+        # (importé ici : numpy n'est chargé qu'à la création du classificateur)
+        from app.ai.online_classifier import OnlineClassifier
+        self.online_model = online_model or OnlineClassifier(str(Path(model_path).with_name("online_classifier.npz")))
+        self.learned_weight = learned_weight
+        self.correction_weight = correction_weight
     
     # Templates de réponses améliorés
         self.response_templates = {
@@ -93,69 +130,10 @@ L'équipe Support""",
     }
     
     # CORRECTION: Patterns améliorés
-        self.category_keywords = {
-        'cv': [
-            'cv', 'candidature', 'curriculum vitae', 'postuler', 'candidat',
-            'lettre de motivation', 'portfolio', 'expérience professionnelle',
-            'compétences', 'diplôme', 'formation', 'poste'
-        ],
-        'rdv': [
-            'rendez-vous', 'réunion', 'rencontre', 'meeting', 'rdv',
-            'disponible', 'disponibilité', 'calendrier', 'créneau',
-            'conférence', 'call', 'entretien', 'zoom', 'teams'
-        ],
-        'facture': [
-            'facture', 'paiement', 'montant', 'invoice', 'devis',
-            'prix', 'tarif', '€', 'euro', 'virement', 'règlement',
-            'total', 'tva', 'commande'
-        ],
-        'support': [
-            'problème', 'bug', 'erreur', 'aide', 'support', 'assistance',
-            'dysfonctionnement', 'panne', 'question', 'comment',
-            'ne fonctionne pas', 'issue', 'ticket'
-        ],
-        'partenariat': [
-            'partenariat', 'collaboration', 'coopération', 'projet commun',
-            'ensemble', 'proposition', 'opportunité', 'synergie', 'partnership'
-        ],
-        'newsletter': [
-            'newsletter', 'abonnement', 'désabonner', 'unsubscribe',
-            'bulletin', 'actualités', 'notification'
-        ],
-        'spam': [
-            'gagner', 'gratuit', 'cliquez ici', 'urgent!!!', 'offre limitée',
-            'casino', 'crypto', 'investissement garanti', 'loterie',
-            'félicitations', 'héritage', 'nigerian prince'
-        ]
-    }
+        self.category_keywords = CATEGORY_KEYWORDS
     
         logger.info("SmartClassifier initialisé avec patterns corrigés")
     
-    def _init_database(self):
-        """Initialise la base de données."""
-        try:
-            Path(self.model_path).parent.mkdir(parents=True, exist_ok=True)
-            
-            conn = sqlite3.connect(self.model_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS user_corrections (
-                    id INTEGER PRIMARY KEY,
-                    email_hash TEXT UNIQUE,
-                    original_category TEXT,
-                    corrected_category TEXT,
-                    timestamp DATETIME,
-                    confidence REAL
-                )
-            ''')
-            
-            conn.commit()
-            conn.close()
-            logger.info("Base de données classificateur initialisée")
-        except Exception as e:
-            logger.error(f"Erreur init base de données: {e}")
-    
     def analyze_email(self, email_data: Dict) -> EmailAnalysis:
         """Analyse complète d'un email avec génération de réponse."""
         try:
@@ -163,14 +141,16 @@ L'équipe Support""",
             body = email_data.get('body', '').lower()
             sender = email_data.get('sender', '').lower()
             sender_name = email_data.get('sender_name', 'Monsieur/Madame')
-            full_text = f"{subject} {body}".strip()
+            full_text = normalize_text(f"{subject} {body}".strip())
+            hits = shared_matcher().scan(full_text, normalized=True)
+            learned = self.online_model.predict_proba(self.online_model.features(subject, body, sender))
             
             # Classification
-            category_scores = self._calculate_category_scores(full_text, sender)
+            category_scores = self._calculate_category_scores(full_text, sender, hits, learned)
             best_category = max(category_scores.items(), key=lambda x: x[1])
             
             # Priorité
-            priority = self._calculate_priority(full_text, best_category[0])
+            priority = self._calculate_priority(full_text, best_category[0], hits, sender)
             
             # Décision de réponse automatique
             should_respond = self._should_auto_respond(full_text, best_category[0], best_category[1])
@@ -202,31 +182,37 @@ L'équipe Support""",
             logger.error(f"Erreur analyse email: {e}")
             return self._fallback_analysis()
     
-    def _calculate_category_scores(self, text: str, sender: str) -> Dict[str, float]:
-        """Calcule les scores pour chaque catégorie."""
+    def _calculate_category_scores(self, text: str, sender: str, hits: Optional[KeywordHits] = None,
+                                   learned: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """Calcule les scores pour chaque catégorie (mots-clés et probabilités apprises)."""
         scores = {'general': 0.1}
         
-        for category, patterns in self.patterns.items():
-            score = 0.0
-            
+        # Un seul parcours du texte pour toutes les catégories
+        hits = hits or shared_matcher().scan(text)
+        
+        for category in self.category_keywords:
             # Score basé sur les patterns
-            for pattern in patterns:
-                matches = len(re.findall(pattern, text, re.IGNORECASE))
-                score += matches * 0.3
+            score = hits.count(f"category.{category}") * 0.3
             
             # Bonus pour certains expéditeurs
             if category == 'facture' and any(word in sender for word in ['billing', 'invoice', 'facture']):
                 score += 0.4
-            elif category == 'cv' and 'candidat' in text:
+            elif category == 'cv' and hits.keyword('candidat'):
                 score += 0.5
             elif category == 'support' and any(word in sender for word in ['support', 'help', 'assistance']):
                 score += 0.4
             
-            scores[category] = min(score, 1.0)
+            scores[category] = score
+        
+        # Probabilités du modèle appris (catégories AIProcessor)
+        for category, probability in (learned or {}).items():
+            category = LEARNED_CATEGORY_MAP.get(category, category)
+            scores[category] = scores.get(category, 0.0) + probability * self.learned_weight
         
-        return scores
+        return {category: min(score, 1.0) for category, score in scores.items()}
     
-    def _calculate_priority(self, text: str, category: str) -> int:
+    def _calculate_priority(self, text: str, category: str, hits: Optional[KeywordHits] = None,
+                            sender: str = '') -> int:
         """Calcule la priorité de l'email."""
         base_priorities = {
             'support': 2,
@@ -240,10 +226,17 @@ L'équipe Support""",
         priority = base_priorities.get(category, 3)
         
         # Mots-clés d'urgence
-        urgent_keywords = ['urgent', 'emergency', 'critique', 'asap', 'immédiat', 'rapidement']
-        if any(keyword in text for keyword in urgent_keywords):
+        hits = hits or shared_matcher().scan(text)
+        if hits.has('priority.urgent'):
             priority = max(1, priority - 2)
         
+        # Historique : expéditeur auquel nous répondons vite, ou jamais
+        hint = self.sender_index.urgency_hint(sender) if sender else None
+        if hint == 'important':
+            priority = max(1, priority - 1)
+        elif hint == 'low':
+            priority += 1
+        
         return min(priority, 5)
     
     def _should_auto_respond(self, text: str, category: str, confidence: float) -> bool:
@@ -426,24 +419,48 @@ L'équipe Support""",
             reasoning="Analyse par défaut (erreur)"
         )
     
-    def learn_from_correction(self, email_data: Dict, original_category: str, corrected_category: str):
-        """Apprend d'une correction utilisateur."""
+    def learn_from_correction(self, email_data: Dict, original_category: str, corrected_category: str,
+                              key: Optional[str] = None):
+        """
+        Apprend d'une correction utilisateur.
+        
+        Args:
+            email_data: {subject, body, sender}
+            original_category: Catégorie affichée avant la correction
+            corrected_category: Catégorie choisie par l'utilisateur
+            key: Identifiant de l'email, celui du verdict corrigé (empreinte du contenu par défaut)
+        """
         try:
-            text = f"{email_data.get('subject', '')} {email_data.get('body', '')}"
-            email_hash = hashlib.md5(text.encode()).hexdigest()
-            
-            conn = sqlite3.connect(self.model_path)
-            cursor = conn.cursor()
+            content_key = email_hash(email_data.get('subject', ''), email_data.get('body', ''))
+            self.store.add_correction(content_key, original_category, corrected_category)
             
-            cursor.execute('''
-                INSERT OR REPLACE INTO user_corrections 
-                (email_hash, original_category, corrected_category, timestamp, confidence)
-                VALUES (?, ?, ?, ?, ?)
-            ''', (email_hash, original_category, corrected_category, datetime.now(), 0.8))
-            
-            conn.commit()
-            conn.close()
+            features = self.online_model.features(
+                email_data.get('subject', ''), email_data.get('body', ''), email_data.get('sender', '')
+            )
+            self.online_model.learn(features, to_ai_category(corrected_category),
+                                    weight=self.correction_weight, key=key or content_key)
             
             logger.info(f"Correction apprise: {original_category} -> {corrected_category}")
         except Exception as e:
-            logger.error(f"Erreur apprentissage correction: {e}")
\ No newline at end of file
+            logger.error(f"Erreur apprentissage correction: {e}")
+    
+    def learn_from_verdict(self, email_data: Dict, category: str, key: Optional[str] = None) -> bool:
+        """
+        Apprend d'un verdict du modèle (catégorie AIProcessor).
+        
+        Args:
+            email_data: {subject, body, sender}
+            category: Catégorie retenue par le modèle
+            key: Identifiant de l'email (empreinte du contenu par défaut)
+            
+        Returns:
+            True si l'exemple a été appris (un même email n'est appris qu'une fois)
+        """
+        try:
+            subject = email_data.get('subject', '')
+            body = email_data.get('body', '')
+            features = self.online_model.features(subject, body, email_data.get('sender', ''))
+            return self.online_model.learn(features, category, key=key or email_hash(subject, body))
+        except Exception as e:
+            logger.error(f"Erreur apprentissage verdict: {e}")
+            return False
\ No newline at end of file
@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""
+Filtre anti-spam bayésien appris du label SPAM de Gmail.
+"""
+import logging
+import math
+import re
+import threading
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from app.ai.keyword_matcher import normalize_text
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_RE = re.compile(r"\w{2,20}")
+
+def _chi2q(x2: float, v: int) -> float:
+    """Probabilité qu'un khi-deux à v degrés de liberté (pair) dépasse x2."""
+    m = x2 / 2.0
+    term = total = math.exp(-m)
+    for i in range(1, v // 2):
+        term *= m / i
+        total += term
+    return min(total, 1.0)
+
+class SpamFilter:
+    """
+    Filtre de Robinson-Fisher (à la SpamBayes) sur des mots hachés.
+
+    Chaque message appris incrémente, pour chacun de ses mots, le nombre de
+    spams ou de messages légitimes qui le contiennent. Le score combine les
+    mots les plus marqués par un test du khi-deux : proche de 0 ou de 1 quand
+    les indices concordent, autour de 0,5 quand ils se contredisent. Les
+    scores sont recalibrés par tranches sur les labels observés.
+    """
+
+    def __init__(self, store_path: str = "app/data/spam_filter.npz", n_features: int = 2 ** 18,
+                 ham_cutoff: float = 0.2, spam_cutoff: float = 0.9, min_examples: int = 20,
+                 max_tokens: int = 150, text_chars: int = 500, autosave_every: int = 50,
+                 bins: int = 10, min_bin_samples: int = 20):
+        """
+        Initialise le filtre.
+
+        Args:
+            store_path: Fichier .npz du modèle
+            n_features: Nombre de cases de hachage (puissance de 2)
+            ham_cutoff: Probabilité en dessous de laquelle le message est légitime
+            spam_cutoff: Probabilité au-dessus de laquelle le message est un spam
+            min_examples: Exemples de chaque classe nécessaires avant de conclure
+            max_tokens: Mots les plus marqués retenus pour le score
+            text_chars: Caractères de l'aperçu (ou du corps) pris en compte
+            autosave_every: Sauvegarde automatique tous les N apprentissages
+            bins: Tranches de score du calibrage
+            min_bin_samples: Exemples d'une tranche nécessaires pour la calibrer
+        """
+        self.store_path = Path(store_path)
+        self.n_features = n_features
+        self.ham_cutoff = ham_cutoff
+        self.spam_cutoff = spam_cutoff
+        self.min_examples = min_examples
+        self.max_tokens = max_tokens
+        self.text_chars = text_chars
+        self.autosave_every = autosave_every
+        self.bins = bins
+        self.min_bin_samples = min_bin_samples
+
+        self.spam_counts = np.zeros(n_features, dtype=np.int32)
+        self.ham_counts = np.zeros(n_features, dtype=np.int32)
+        self.n_spam = 0
+        self.n_ham = 0
+        self.bin_spam = np.zeros(bins, dtype=np.int64)
+        self.bin_total = np.zeros(bins, dtype=np.int64)
+
+        # Label appris de chaque message, sans limite : oublier un message
+        # ferait compter deux fois un changement de label ultérieur
+        self._seen: Dict[str, bool] = {}
+        self._unsaved = 0
+        self._lock = threading.Lock()
+
+        self.load()
+
+    def __len__(self) -> int:
+        return self.n_spam + self.n_ham
+
+    def is_ready(self) -> bool:
+        """Assez d'exemples de chaque classe pour conclure."""
+        return self.n_spam >= self.min_examples and self.n_ham >= self.min_examples
+
+    def features(self, email) -> np.ndarray:
+        """
+        Mots hachés (distincts) d'un email : sujet, aperçu, adresse et domaine de l'expéditeur.
+
+        Returns:
+            Indices de hachage triés
+        """
+        text = (email.snippet or email.body or '')[:self.text_chars]
+        tokens = {f"s:{t}" for t in _TOKEN_RE.findall(normalize_text(email.subject or ''))}
+        tokens.update(_TOKEN_RE.findall(normalize_text(text)))
+
+        sender = (email.sender or '').lower()
+        address = sender[sender.find('<') + 1:].strip(' >') if '<' in sender else sender.strip()
+        if address:
+            tokens.add(f"a:{address}")
+            tokens.add(f"d:{address.rpartition('@')[2]}")
+        if (email.subject or '').count('!') > 1:
+            tokens.add("x:exclamations")
+
+        mask = self.n_features - 1
+        return np.unique(np.fromiter((zlib.crc32(t.encode()) & mask for t in tokens), dtype=np.int64,
+                                     count=len(tokens)))
+
+    def raw_score(self, indices: np.ndarray) -> float:
+        """Score de Robinson-Fisher (0 légitime, 1 spam) d'un ensemble de mots hachés."""
+        with self._lock:
+            spam = self.spam_counts[indices].astype(np.float64)
+            ham = self.ham_counts[indices].astype(np.float64)
+            n_spam, n_ham = max(self.n_spam, 1), max(self.n_ham, 1)
+
+        # Probabilité de spam de chaque mot, lissée vers 0,5 pour les mots rares
+        spam_ratio = spam / n_spam
+        ham_ratio = ham / n_ham
+        seen = spam + ham
+        with np.errstate(invalid='ignore', divide='ignore'):
+            p = np.where(seen > 0, spam_ratio / (spam_ratio + ham_ratio), 0.5)
+        f = (0.45 * 0.5 + seen * p) / (0.45 + seen)
+
+        # Mots les plus marqués uniquement
+        strength = np.abs(f - 0.5)
+        f = f[strength >= 0.1]
+        if len(f) > self.max_tokens:
+            f = f[np.argsort(np.abs(f - 0.5))[-self.max_tokens:]]
+        if not len(f):
+            return 0.5
+
+        f = np.clip(f, 0.01, 0.99)
+        n = 2 * len(f)
+        spamminess = 1.0 - _chi2q(-2.0 * float(np.log1p(-f).sum()), n)
+        hamminess = 1.0 - _chi2q(-2.0 * float(np.log(f).sum()), n)
+        return (spamminess - hamminess + 1.0) / 2.0
+
+    def spam_probability(self, email) -> Optional[float]:
+        """
+        Probabilité calibrée qu'un email soit un spam.
+
+        Returns:
+            Probabilité entre 0 et 1, None si le filtre n'a pas assez appris
+        """
+        if not self.is_ready():
+            return None
+        score = self.raw_score(self.features(email))
+
+        # Fréquence observée des spams dans la tranche du score, si elle est assez remplie
+        bin_index = min(int(score * self.bins), self.bins - 1)
+        with self._lock:
+            total = int(self.bin_total[bin_index])
+            spam = int(self.bin_spam[bin_index])
+        if total >= self.min_bin_samples:
+            return (spam + 1) / (total + 2)
+        return score
+
+    def classify(self, email) -> str:
+        """
+        Verdict du filtre.
+
+        Returns:
+            'spam', 'ham', ou 'unsure' (probabilité intermédiaire ou filtre pas prêt)
+        """
+        probability = self.spam_probability(email)
+        if probability is None:
+            return 'unsure'
+        if probability >= self.spam_cutoff:
+            return 'spam'
+        if probability <= self.ham_cutoff:
+            return 'ham'
+        return 'unsure'
+
+    def learn(self, email, is_spam: bool) -> bool:
+        """
+        Apprend le label d'un email (un changement de label annule l'apprentissage précédent).
+
+        Args:
+            email: Email étiqueté
+            is_spam: True pour un spam
+
+        Returns:
+            True si le modèle a changé
+        """
+        indices = self.features(email)
+        if not len(indices):
+            return False
+
+        # Score avant apprentissage : échantillon non biaisé pour le calibrage
+        score = self.raw_score(indices) if self.is_ready() else None
+
+        with self._lock:
+            previous = self._seen.get(email.id)
+            if previous == is_spam:
+                return False
+
+            if previous is not None:
+                counts = self.spam_counts if previous else self.ham_counts
+                counts[indices] = np.maximum(counts[indices] - 1, 0)
+                if previous:
+                    self.n_spam = max(self.n_spam - 1, 0)
+                else:
+                    self.n_ham = max(self.n_ham - 1, 0)
+            elif score is not None:
+                bin_index = min(int(score * self.bins), self.bins - 1)
+                self.bin_total[bin_index] += 1
+                self.bin_spam[bin_index] += int(is_spam)
+
+            if is_spam:
+                self.spam_counts[indices] += 1
+                self.n_spam += 1
+            else:
+                self.ham_counts[indices] += 1
+                self.n_ham += 1
+
+            self._seen[email.id] = is_spam
+
+            self._unsaved += 1
+            should_save = self._unsaved >= self.autosave_every
+
+        if should_save:
+            self.save()
+        return True
+
+    def observe(self, emails: List) -> int:
+        """
+        Apprend des labels Gmail (appelé à chaque synchronisation) : SPAM pour
+        les spams, INBOX pour les messages légitimes.
+
+        Args:
+            emails: Liste d'emails
+
+        Returns:
+            Nombre d'emails appris
+        """
+        learned = 0
+        for email in emails:
+            labels = email.labels or []
+            if 'SPAM' in labels:
+                learned += self.learn(email, True)
+            elif 'INBOX' in labels:
+                learned += self.learn(email, False)
+        if learned:
+            logger.debug(f"🛡️ {learned} emails appris par le filtre anti-spam ({self.n_spam} spams, {self.n_ham} légitimes)")
+        return learned
+
+    def save(self):
+        """Sauvegarde les compteurs non nuls sur disque."""
+        try:
+            with self._lock:
+                spam_indices = np.flatnonzero(self.spam_counts)
+                ham_indices = np.flatnonzero(self.ham_counts)
+                self.store_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.store_path, 'wb') as f:
+                    np.savez_compressed(
+                        f,
+                        n_features=np.array(self.n_features),
+                        spam_indices=spam_indices.astype(np.int32),
+                        spam_values=self.spam_counts[spam_indices],
+                        ham_indices=ham_indices.astype(np.int32),
+                        ham_values=self.ham_counts[ham_indices],
+                        totals=np.array([self.n_spam, self.n_ham]),
+                        bin_spam=self.bin_spam,
+                        bin_total=self.bin_total,
+                        seen_ids=np.array(list(self._seen), dtype=str),
+                        seen_spam=np.array(list(self._seen.values()), dtype=bool)
+                    )
+                self._unsaved = 0
+
+            logger.info(f"💾 Filtre anti-spam sauvegardé ({self.n_spam} spams, {self.n_ham} légitimes)")
+        except Exception as e:
+            logger.error(f"Erreur sauvegarde filtre anti-spam: {e}")
+
+    def load(self):
+        """Charge le modèle depuis le disque."""
+        if not self.store_path.exists():
+            return
+
+        try:
+            with np.load(self.store_path) as data:
+                if int(data['n_features']) != self.n_features or len(data['bin_total']) != self.bins:
+                    logger.warning("Paramètres modifiés, filtre anti-spam réinitialisé")
+                    return
+
+                spam_counts = np.zeros(self.n_features, dtype=np.int32)
+                ham_counts = np.zeros(self.n_features, dtype=np.int32)
+                spam_counts[data['spam_indices']] = data['spam_values']
+                ham_counts[data['ham_indices']] = data['ham_values']
+                n_spam, n_ham = (int(v) for v in data['totals'])
+                bin_spam = data['bin_spam'].astype(np.int64)
+                bin_total = data['bin_total'].astype(np.int64)
+                seen = dict(zip((str(i) for i in data['seen_ids']), (bool(s) for s in data['seen_spam'])))
+
+            with self._lock:
+                self.spam_counts, self.ham_counts = spam_counts, ham_counts
+                self.n_spam, self.n_ham = n_spam, n_ham
+                self.bin_spam, self.bin_total = bin_spam, bin_total
+                self._seen = seen
+
+            logger.info(f"✅ Filtre anti-spam chargé ({n_spam} spams, {n_ham} légitimes)")
+        except Exception as e:
+            logger.error(f"Erreur chargement filtre anti-spam: {e}")
+
+
+_filters: Dict[str, SpamFilter] = {}
+_filters_lock = threading.Lock()
+
+def get_spam_filter(store_path: str = "app/data/spam_filter.npz") -> SpamFilter:
+    """Filtre partagé d'un fichier (chargé au premier appel)."""
+    key = str(Path(store_path).resolve())
+    with _filters_lock:
+        if key not in _filters:
+            _filters[key] = SpamFilter(store_path)
+        return _filters[key]
+
+def save_spam_filters():
+    """Sauvegarde tous les filtres partagés (à appeler à la fermeture de l'application)."""
+    with _filters_lock:
+        filters = list(_filters.values())
+    for spam_filter in filters:
+        if spam_filter._unsaved:
+            spam_filter.save()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Précalcul spéculatif des résumés et suggestions de réponse.
+"""
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+class SpeculativePrecomputer:
+    """
+    Utilise la capacité inoccupée du modèle pour préparer les emails
+    susceptibles d'être ouverts ensuite.
+
+    Les emails sont classés par probabilité d'ouverture (non lus, prioritaires,
+    proches de l'email affiché ou du haut de la liste). Un travail n'est lancé
+    que lorsque AIProcessor est inactif depuis idle_delay secondes, et toute
+    requête non spéculative l'interrompt : il est alors remis en file.
+    """
+
+    def __init__(self, ai_processor, max_emails: int = 10, suggestion_count: int = 3,
+                 idle_delay: float = 2.0, poll_interval: float = 0.5,
+                 fetch_email: Optional[Callable] = None):
+        """
+        Initialise le précalcul.
+
+        Args:
+            ai_processor: AIProcessor (résumés, suggestions et cache)
+            max_emails: Nombre d'emails préparés par planification
+            suggestion_count: Nombre de suggestions de réponse précalculées
+            idle_delay: Durée d'inactivité requise avant de lancer un travail
+            poll_interval: Intervalle de vérification de l'inactivité
+            fetch_email: Récupère l'email complet par identifiant (les emails
+                des listes n'ont que l'aperçu ; précalcul sur l'aperçu si None)
+        """
+        self.ai_processor = ai_processor
+        self.fetch_email = fetch_email
+        self.max_emails = max_emails
+        self.suggestion_count = suggestion_count
+        self.idle_delay = idle_delay
+        self.poll_interval = poll_interval
+
+        self.completed = 0
+        self.preempted = 0
+
+        self._queue: List = []
+        self._condition = threading.Condition()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="speculative-precompute", daemon=True)
+        self._thread.start()
+
+    def schedule(self, emails: list, anchor: Optional[int] = None):
+        """
+        Remplace la file par les emails les plus susceptibles d'être ouverts.
+
+        Args:
+            emails: Emails dans l'ordre d'affichage
+            anchor: Position de l'email affiché (None = haut de la liste)
+        """
+        ranked = sorted(
+            ((self.score(e, position, anchor), position, e) for position, e in enumerate(emails)
+             if not self._is_ready(e)),
+            key=lambda item: (-item[0], item[1])
+        )
+
+        with self._condition:
+            self._queue = [e for _, _, e in ranked[:self.max_emails]]
+            self._condition.notify()
+
+    @staticmethod
+    def score(email, position: int, anchor: Optional[int] = None) -> float:
+        """
+        Probabilité relative d'ouverture.
+
+        Args:
+            email: Email candidat
+            position: Position dans la liste affichée
+            anchor: Position de l'email affiché
+
+        Returns:
+            Score (plus élevé = préparé en premier)
+        """
+        score = 0.0
+
+        if email.is_unread:
+            score += 2.0
+
+        analysis = email.ai_analysis or {}
+        if analysis.get('category') in ('urgent', 'important') or analysis.get('priority', 5) <= 2:
+            score += 1.5
+        if 'IMPORTANT' in (email.labels or []) or 'STARRED' in (email.labels or []):
+            score += 1.0
+
+        # L'utilisateur lit généralement vers le bas à partir de l'email affiché
+        if anchor is None:
+            distance = position
+        elif position > anchor:
+            distance = position - anchor - 1
+        else:
+            distance = (anchor - position) * 3
+        score += 3.0 / (1 + distance)
+
+        return score
+
+    def stop(self):
+        """Arrête le précalcul."""
+        with self._condition:
+            self._running = False
+            self._queue = []
+            self._condition.notify()
+
+    def _is_ready(self, email) -> bool:
+        """Le résumé et les suggestions sont déjà en cache."""
+        cache = self.ai_processor.response_cache
+        return (
+            cache.key('summary', email, 100) in cache
+            and cache.key('suggestions', email, self.suggestion_count) in cache
+        )
+
+    def _wait_for_idle(self) -> bool:
+        """Attend que le processeur soit inactif depuis idle_delay secondes."""
+        idle_since = None
+        while self._running:
+            if not self.ai_processor.is_idle():
+                idle_since = None
+            elif idle_since is None:
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since >= self.idle_delay:
+                return True
+            time.sleep(self.poll_interval)
+        return False
+
+    def _run(self):
+        """Boucle du précalcul."""
+        while True:
+            with self._condition:
+                while self._running and not self._queue:
+                    self._condition.wait()
+                if not self._running:
+                    return
+
+            if not self._wait_for_idle():
+                return
+
+            with self._condition:
+                if not self._queue:
+                    continue
+                email = self._queue.pop(0)
+
+            epoch = self.ai_processor.foreground_epoch
+            try:
+                done = self._precompute(email)
+            except Exception as e:
+                logger.error(f"Erreur précalcul {email.id}: {e}")
+                continue
+
+            if done:
+                self.completed += 1
+            elif self.ai_processor.foreground_epoch != epoch:
+                # Interrompu par une requête prioritaire : reprendre plus tard
+                self.preempted += 1
+                with self._condition:
+                    if email not in self._queue:
+                        self._queue.insert(0, email)
+
+    def _precompute(self, email) -> bool:
+        """
+        Prépare résumé et suggestions d'un email.
+
+        Returns:
+            True si tout est en cache, False si le travail a été interrompu ou a échoué
+        """
+        cache = self.ai_processor.response_cache
+
+        # Même clé de cache que l'email de la liste (identifiant, sujet et aperçu)
+        if not email.body and self.fetch_email:
+            email = self.fetch_email(email.id) or email
+
+        if cache.key('summary', email, 100) not in cache:
+            self.ai_processor.summarize_email(email, speculative=True)
+
+        if cache.key('suggestions', email, self.suggestion_count) not in cache:
+            self.ai_processor.generate_smart_reply_suggestions(email, self.suggestion_count, speculative=True)
+
+        ready = self._is_ready(email)
+        if ready:
+            logger.debug(f"Précalcul terminé pour {email.id}")
+        return ready
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Reconstruction locale des fils de conversation (Message-ID, In-Reply-To, References).
+"""
+import logging
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from app.ai.sender_index import address_of
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS thread_messages (
+        message_id TEXT PRIMARY KEY,
+        email_id TEXT,
+        parent_id TEXT,
+        root_id TEXT NOT NULL,
+        outgoing INTEGER NOT NULL DEFAULT 0,
+        date DATETIME
+    ) WITHOUT ROWID;
+    CREATE INDEX IF NOT EXISTS idx_thread_messages_email ON thread_messages (email_id);
+    CREATE INDEX IF NOT EXISTS idx_thread_messages_root ON thread_messages (root_id, date);
+'''
+
+_SELECT_CONTAINER = "SELECT parent_id, root_id, email_id FROM thread_messages WHERE message_id = ?"
+_INSERT_PLACEHOLDER = "INSERT INTO thread_messages (message_id, parent_id, root_id) VALUES (?, ?, ?)"
+_SET_PARENT = "UPDATE thread_messages SET parent_id = ? WHERE message_id = ?"
+_REROOT = "UPDATE thread_messages SET root_id = ? WHERE root_id = ?"
+_FILL = "UPDATE thread_messages SET email_id = ?, outgoing = ?, date = ? WHERE message_id = ?"
+
+# Requêtes : une recherche par email_id puis un parcours de l'index (root_id, date)
+_SELECT_THREAD = '''
+    SELECT m.email_id FROM thread_messages x JOIN thread_messages m ON m.root_id = x.root_id
+    WHERE x.email_id = ? AND m.email_id IS NOT NULL ORDER BY m.date
+'''
+_SELECT_LAST = '''
+    SELECT m.email_id FROM thread_messages x JOIN thread_messages m ON m.root_id = x.root_id
+    WHERE x.email_id = ? AND m.email_id IS NOT NULL ORDER BY m.date DESC LIMIT 1
+'''
+_SELECT_REPLIED = '''
+    SELECT EXISTS (
+        SELECT 1 FROM thread_messages x JOIN thread_messages m ON m.root_id = x.root_id
+        WHERE x.email_id = ? AND m.outgoing = 1 AND m.date > x.date
+    )
+'''
+_SELECT_PARENT = '''
+    SELECT p.email_id FROM thread_messages x JOIN thread_messages p ON p.message_id = x.parent_id
+    WHERE x.email_id = ?
+'''
+
+def _iso(date: Optional[datetime]) -> Optional[str]:
+    """Date en UTC sans fuseau (les dates naïves sont considérées locales)."""
+    return date.astimezone(timezone.utc).replace(tzinfo=None).isoformat(sep=' ') if date else None
+
+class ThreadIndex:
+    """
+    Fils de conversation reconstruits à la manière de JWZ.
+
+    Chaque Message-ID (vu ou seulement cité dans References) est un
+    conteneur relié à son parent ; le parent d'un message est le dernier
+    identifiant de References (ou In-Reply-To). Chaque conteneur porte la
+    racine de son fil : quand un message relie deux fils (message cité
+    arrivé plus tard, réponses synchronisées dans le désordre), un seul
+    UPDATE indexé rattache l'ancien fil à la nouvelle racine. Les requêtes
+    « fil de X », « réponse après X » et « dernier message » passent ainsi
+    par un seul parcours d'index.
+    """
+
+    def __init__(self, db_path: str = "app/data/threads.db", own_addresses: Iterable[str] = ()):
+        """
+        Ouvre l'index.
+
+        Args:
+            db_path: Fichier SQLite
+            own_addresses: Nos adresses (en plus du label SENT) pour reconnaître les envois
+        """
+        self.db_path = db_path
+        self.own_addresses = {address.lower() for address in own_addresses if address}
+
+        self._lock = threading.Lock()
+        Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(db_path, timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        self._seen = set()
+        self._load()
+
+        logger.info(f"🧵 Index des fils de conversation: {len(self._seen)} messages")
+
+    def _load(self):
+        """Charge les messages déjà intégrés."""
+        self._seen = {row[0] for row in self._conn.execute(
+            "SELECT email_id FROM thread_messages WHERE email_id IS NOT NULL")}
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+    def __contains__(self, email_id: str) -> bool:
+        return email_id in self._seen
+
+    def add_own_addresses(self, addresses: Iterable[str]):
+        """Ajoute nos adresses (celle du compte Gmail) pour reconnaître les envois."""
+        self.own_addresses.update(address.lower() for address in addresses if address)
+
+    def is_outgoing(self, email) -> bool:
+        """Message envoyé par nous."""
+        return 'SENT' in (email.labels or []) or address_of(email.sender) in self.own_addresses
+
+    @staticmethod
+    def message_id_of(email) -> str:
+        """Message-ID d'un email (identifiant Gmail à défaut)."""
+        return email.message_id or f"<{email.id}@gmail>"
+
+    def add_emails(self, emails: list) -> int:
+        """
+        Intègre les messages pas encore vus (appelé à chaque synchronisation).
+
+        Args:
+            emails: Liste d'emails (reçus ou envoyés)
+
+        Returns:
+            Nombre de messages intégrés
+        """
+        with self._lock:
+            added = []
+            try:
+                with self._conn:
+                    for email in emails:
+                        if not email.id or email.id in self._seen or email.id in added:
+                            continue
+                        self._add(email)
+                        added.append(email.id)
+            except Exception as e:
+                logger.error(f"Erreur index des fils: {e}")
+                return 0
+            self._seen.update(added)
+
+        if added:
+            logger.debug(f"🧵 {len(added)} messages rattachés à leur fil")
+        return len(added)
+
+    def _add(self, email):
+        message_id = self.message_id_of(email)
+        chain = [ref for ref in dict.fromkeys(email.references or []) if ref != message_id]
+        if email.in_reply_to and email.in_reply_to != message_id:
+            if email.in_reply_to in chain:
+                chain.remove(email.in_reply_to)
+            chain.append(email.in_reply_to)
+
+        # Chaîne des références : chacune est l'enfant de la précédente
+        parent = None
+        for ref in chain:
+            self._link(ref, parent)
+            parent = ref
+        self._link(message_id, parent)
+
+        self._conn.execute(_FILL, (email.id, int(self.is_outgoing(email)), _iso(email.received_date),
+                                   message_id))
+
+    def _link(self, message_id: str, parent: Optional[str]):
+        """Crée le conteneur si besoin et le rattache au parent s'il n'en a pas encore."""
+        row = self._conn.execute(_SELECT_CONTAINER, (message_id,)).fetchone()
+        parent_root = self._root(parent) if parent else None
+
+        if row is None:
+            self._conn.execute(_INSERT_PLACEHOLDER, (message_id, parent, parent_root or message_id))
+            return
+
+        current_parent, root, _ = row
+        # Lien déjà connu, ou lien qui créerait une boucle : on garde l'existant
+        if current_parent or not parent or parent_root == root:
+            return
+        self._conn.execute(_SET_PARENT, (parent, message_id))
+        self._conn.execute(_REROOT, (parent_root, root))
+
+    def _root(self, message_id: str) -> Optional[str]:
+        row = self._conn.execute(_SELECT_CONTAINER, (message_id,)).fetchone()
+        return row[1] if row else None
+
+    def _query(self, sql: str, email_id: str) -> list:
+        try:
+            with self._lock:
+                return self._conn.execute(sql, (email_id,)).fetchall()
+        except Exception as e:
+            logger.error(f"Erreur lecture index des fils: {e}")
+            return []
+
+    def thread(self, email_id: str) -> List[str]:
+        """
+        Fil d'un message.
+
+        Args:
+            email_id: Identifiant Gmail du message
+
+        Returns:
+            Identifiants des messages du fil, du plus ancien au plus récent (vide si inconnu)
+        """
+        return [row[0] for row in self._query(_SELECT_THREAD, email_id)]
+
+    def last_message(self, email_id: str) -> Optional[str]:
+        """Dernier message du fil d'un message."""
+        rows = self._query(_SELECT_LAST, email_id)
+        return rows[0][0] if rows else None
+
+    def replied_after(self, email_id: str) -> bool:
+        """Nous avons envoyé un message dans le fil après ce message."""
+        rows = self._query(_SELECT_REPLIED, email_id)
+        return bool(rows and rows[0][0])
+
+    def parent(self, email_id: str) -> Optional[str]:
+        """Message auquel celui-ci répond (s'il a été synchronisé)."""
+        rows = self._query(_SELECT_PARENT, email_id)
+        return rows[0][0] if rows else None
+
+    def close(self):
+        """Ferme la connexion."""
+        with self._lock:
+            self._conn.close()
+
+
+_indexes: Dict[str, ThreadIndex] = {}
+_indexes_lock = threading.Lock()
+
+def get_thread_index(db_path: str = "app/data/threads.db", own_addresses: Iterable[str] = ()) -> ThreadIndex:
+    """Index partagé d'un fichier (ouvert au premier appel, nos adresses ajoutées à chaque appel)."""
+    key = str(Path(db_path).resolve())
+    with _indexes_lock:
+        if key not in _indexes:
+            _indexes[key] = ThreadIndex(db_path)
+        _indexes[key].add_own_addresses(own_addresses)
+        return _indexes[key]
+
+def close_thread_indexes():
+    """Ferme tous les index partagés (à appeler à la fermeture de l'application)."""
+    with _indexes_lock:
+        indexes = list(_indexes.values())
+        _indexes.clear()
+    for index in indexes:
+        index.close()
@@ -5,27 +5,123 @@ Processeur IA - VERSION CORRIGÉE COMPLÈTE
 import logging
 import json
 import re
-from typing import Dict, Any, Optional
+import threading
+from typing import Dict, Any, Optional, Tuple
 from datetime import datetime
 
 from app.ollama_client import OllamaClient
 from app.models.email_model import Email
+from app.ai.prompt_builder import LANGUAGE_NAMES, PromptBuilder, PromptSection
+from app.ai.response_cache import ResponseCache
+from app.ai.smart_classifier import SmartClassifier, to_ai_category
+from app.ai.keyword_matcher import shared_matcher
 
 logger = logging.getLogger(__name__)
 
 class AIProcessor:
     """Processeur IA pour analyse d'emails."""
     
-    def __init__(self, ollama_client: OllamaClient):
+    # À incrémenter quand le prompt d'analyse ou les règles changent : les
+    # analyses enregistrées avec une autre version sont refaites
+    ANALYSIS_VERSION = 2
+    
+    # Sources d'analyse enregistrées (pas les analyses de repli ou par défaut)
+    PERSISTED_SOURCES = ('rules', 'embedding', 'llm')
+    
+    def __init__(self, ollama_client: OllamaClient, embedding_classifier=None, sender_index=None,
+                 spam_filter=None, near_duplicates=None, analysis_store=None):
         """
         Initialise le processeur IA.
         
         Args:
             ollama_client: Client Ollama pour les requêtes IA
+            embedding_classifier: Classificateur k-NN sur embeddings (optionnel)
+            sender_index: Statistiques par expéditeur (optionnel, app.ai.sender_index)
+            spam_filter: Filtre anti-spam bayésien (optionnel, app.ai.spam_filter)
+            near_duplicates: Groupes de messages similaires partageant une analyse
+                (optionnel, app.ai.near_duplicates)
+            analysis_store: Analyses enregistrées entre les sessions (optionnel, app.ai.analysis_store)
         """
         self.ollama_client = ollama_client
+        self.embedding_classifier = embedding_classifier
+        self.sender_index = sender_index
+        self.spam_filter = spam_filter
+        self.near_duplicates = near_duplicates
+        self.analysis_store = analysis_store
+        self.cascade = None
+        self.precomputer = None
+        self._smart_classifier = None
+        self.prompt_builder = PromptBuilder()
+        self.response_cache = ResponseCache()
+        
+        # Requêtes non spéculatives en cours, et compteur incrémenté à chacune
+        # d'elles pour interrompre les générations spéculatives
+        self.foreground_epoch = 0
+        self._foreground = 0
+        self._foreground_lock = threading.Lock()
+        
         logger.info("AIProcessor initialisé")
     
+    def is_idle(self) -> bool:
+        """Aucune requête non spéculative n'est en cours."""
+        return self._foreground == 0
+    
+    def _generate(self, instruction: str, sections: list, max_tokens: int, speculative: bool = False,
+                  language: str = 'fr', **kwargs) -> str:
+        """
+        Génère une réponse à partir d'un prompt construit sous budget de tokens.
+        
+        Args:
+            instruction: Consigne finale
+            sections: Sections de contenu (PromptSection)
+            max_tokens: Tokens maximum de la réponse
+            speculative: Requête de précalcul, abandonnée dès qu'une autre requête arrive
+            language: Langue de la réponse (code de langue)
+            **kwargs: Options transmises à OllamaClient.generate (dont feature)
+            
+        Returns:
+            Le texte généré (vide si une requête spéculative a été interrompue)
+        """
+        built = self.prompt_builder.build(instruction, sections, max_tokens, language=language)
+        
+        if speculative:
+            epoch = self.foreground_epoch
+            if not self.is_idle():
+                return ""
+            return self.ollama_client.generate(
+                built.prompt, max_tokens=max_tokens, num_ctx=built.num_ctx,
+                cancel=lambda: self.foreground_epoch != epoch, **kwargs
+            )
+        
+        with self._foreground_lock:
+            self._foreground += 1
+            self.foreground_epoch += 1
+        try:
+            return self.ollama_client.generate(built.prompt, max_tokens=max_tokens, num_ctx=built.num_ctx, **kwargs)
+        finally:
+            with self._foreground_lock:
+                self._foreground -= 1
+    
+    def set_cascade(self, cascade):
+        """
+        Route analyze_email vers une cascade de classification.
+        
+        Args:
+            cascade: ClassificationCascade (None pour désactiver)
+        """
+        self.cascade = cascade
+    
+    def set_precomputer(self, precomputer):
+        """
+        Active le précalcul spéculatif des résumés et suggestions.
+        
+        Args:
+            precomputer: SpeculativePrecomputer (None pour arrêter le précalcul actuel)
+        """
+        if self.precomputer and self.precomputer is not precomputer:
+            self.precomputer.stop()
+        self.precomputer = precomputer
+    
     def analyze_email(self, email: Email) -> Dict[str, Any]:
         """
         Analyse un email avec l'IA.
@@ -36,31 +132,160 @@ class AIProcessor:
         Returns:
             Dictionnaire avec l'analyse (category, sentiment, summary)
         """
+        # Analyse enregistrée, toujours valide pour ce contenu et cette version
+        if self.analysis_store:
+            stored = self.analysis_store.get(email, self.analysis_version())
+            if stored:
+                return stored
+        
+        # Message quasi identique à un message déjà analysé (newsletter, notification...)
+        analysis = self.near_duplicates.shared_analysis(email) if self.near_duplicates else None
+        
+        if analysis is None:
+            if self.cascade:
+                analysis = self.cascade.classify(email)
+            else:
+                analysis, vector = self.classify_by_embedding(email)
+                if not analysis:
+                    analysis = self.analyze_with_llm(email, vector=vector)
+            
+            if self.near_duplicates:
+                self.near_duplicates.record_analysis(email, analysis)
+        
+        if self.analysis_store and analysis.get('source') in self.PERSISTED_SOURCES:
+            self.analysis_store.put(email, analysis, self.analysis_version())
+        return analysis
+    
+    def analysis_version(self) -> str:
+        """Version des analyses (prompt et modèle)."""
+        return f"{self.ANALYSIS_VERSION}:{self.ollama_client.model}"
+    
+    def stored_analyses(self, emails: list) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyses enregistrées et encore valides d'une liste d'emails (lecture groupée).
+        
+        Args:
+            emails: Liste d'emails
+            
+        Returns:
+            Identifiant -> analyse (les emails absents sont à analyser)
+        """
+        if not self.analysis_store:
+            return {}
+        return self.analysis_store.load(emails, self.analysis_version())
+    
+    def correct_category(self, email: Email, category: str) -> Dict[str, Any]:
+        """
+        Applique la catégorie choisie par l'utilisateur.
+        
+        La correction est apprise par les règles (elle remplace le verdict du
+        modèle appris pour cet email) et enregistrée avec l'analyse.
+        
+        Args:
+            email: Email corrigé (avec son analyse actuelle)
+            category: Catégorie choisie
+            
+        Returns:
+            L'analyse corrigée
+        """
+        analysis = dict(email.ai_analysis or self._default_analysis(email))
+        original = analysis.get('category', 'general')
+        if original == category:
+            return analysis
+        
+        self._rules_classifier().learn_from_correction({
+            'subject': email.subject or '',
+            'body': email.body or email.snippet or '',
+            'sender': email.sender or ''
+        }, original, category, key=email.id)
+        
+        analysis.update(category=category, source='user', confidence=1.0)
+        analysis.pop('shared_from', None)
+        if self.analysis_store:
+            self.analysis_store.put(email, analysis, self.analysis_version())
+        return analysis
+    
+    def classify_by_embedding(self, email: Email) -> Tuple[Optional[Dict[str, Any]], Any]:
+        """
+        Classe un email par plus proches voisins sur les embeddings.
+        
+        Args:
+            email: Email à classer
+            
+        Returns:
+            (analyse ou None si la confiance est insuffisante, embedding calculé)
+        """
+        if not self.embedding_classifier:
+            return None, None
+        
         try:
-            # Construire le prompt
-            content = email.snippet or (email.body[:500] if email.body else '')
+            vector = self.embedding_classifier.embed_text(self.embedding_classifier.email_text(email))
+            category, confidence = self.embedding_classifier.predict(vector=vector)
             
-            prompt = f"""Analyse cet email et réponds UNIQUEMENT en JSON valide sans aucun texte avant ou après:
-
-Expéditeur: {email.sender}
-Sujet: {email.subject}
-Contenu: {content}
-
-Réponds au format JSON suivant (UNIQUEMENT le JSON, rien d'autre):
-{{
+            if category and confidence >= self.embedding_classifier.confidence_threshold:
+                logger.info(f"✅ Email classé par embeddings: {category} ({confidence:.2f})")
+                return {
+                    'category': category,
+                    'sentiment': 'neutral',
+                    'summary': email.subject or 'Email sans sujet',
+                    'confidence': confidence,
+                    'source': 'embedding'
+                }, vector
+            
+            return None, vector
+        
+        except Exception as e:
+            logger.error(f"Erreur classification embeddings {email.id}: {e}")
+            return None, None
+    
+    def analyze_with_llm(self, email: Email, vector=None) -> Dict[str, Any]:
+        """
+        Analyse un email par génération.
+        
+        Args:
+            email: Email à analyser
+            vector: Embedding déjà calculé, ajouté à la base d'exemples
+            
+        Returns:
+            Dictionnaire avec l'analyse (category, sentiment, summary)
+        """
+        # Backend indisponible : ne pas attendre les timeouts
+        if not self.ollama_client.can_send():
+            return self._fallback_analysis(email)
+        
+        try:
+            # Construire le prompt
+            instruction = """Analyse cet email et réponds UNIQUEMENT en JSON valide sans aucun texte avant ou après, au format suivant:
+{
     "category": "cv|meeting|invoice|newsletter|support|spam|important|personal|work",
     "sentiment": "positive|negative|neutral",
-    "summary": "résumé en 1 phrase courte"
-}}"""
+    "summary": "résumé en 1 phrase courte",
+    "confidence": "certitude sur la catégorie, nombre entre 0 et 1"
+}"""
             
             # Générer la réponse
-            response = self.ollama_client.generate(prompt, max_tokens=200)
+            response = self._generate(
+                instruction,
+                self.prompt_builder.email_sections(email, body_tokens=400, history_tokens=0),
+                max_tokens=200,
+                feature="analyze"
+            )
             
             # Parser le JSON
             analysis = self._parse_json_response(response)
             
             if analysis:
                 logger.info(f"✅ Email analysé: {analysis.get('category')}")
+                analysis.setdefault('source', 'llm')
+                
+                # Enrichir la base d'exemples avec le verdict du modèle
+                if vector is not None and self.embedding_classifier:
+                    self.embedding_classifier.add_example(
+                        analysis['category'],
+                        vector=vector,
+                        key=self.embedding_classifier.email_key(email)
+                    )
+                
                 return analysis
             else:
                 # Valeur par défaut
@@ -84,6 +309,11 @@ Réponds au format JSON suivant (UNIQUEMENT le JSON, rien d'autre):
                 
                 # Valider les champs
                 if 'category' in analysis and 'sentiment' in analysis:
+                    # Confiance déclarée par le modèle (retirée si absente ou invalide)
+                    try:
+                        analysis['confidence'] = min(max(float(analysis['confidence']), 0.0), 1.0)
+                    except (KeyError, TypeError, ValueError):
+                        analysis.pop('confidence', None)
                     return analysis
             
             return None
@@ -92,23 +322,57 @@ Réponds au format JSON suivant (UNIQUEMENT le JSON, rien d'autre):
             logger.error(f"Erreur parsing JSON: {e}")
             return None
     
+    def _rules_classifier(self) -> SmartClassifier:
+        """Classificateur par règles (celui de la cascade, sinon créé au premier usage)."""
+        if self.cascade:
+            return self.cascade.smart_classifier
+        if self._smart_classifier is None:
+            self._smart_classifier = SmartClassifier()
+        return self._smart_classifier
+    
+    def _fallback_analysis(self, email: Email) -> Dict[str, Any]:
+        """Analyse par règles (SmartClassifier) lorsque le modèle est indisponible."""
+        try:
+            result = self._rules_classifier().analyze_email({
+                'subject': email.subject or '',
+                'body': email.body or email.snippet or '',
+                'sender': email.sender or ''
+            })
+            
+            if result.category != 'general':
+                return {
+                    'category': to_ai_category(result.category),
+                    'sentiment': 'neutral',
+                    'summary': email.subject or 'Email sans sujet',
+                    'confidence': result.confidence,
+                    'priority': result.priority,
+                    'source': 'fallback'
+                }
+        
+        except Exception as e:
+            logger.error(f"Erreur analyse de repli {email.id}: {e}")
+        
+        analysis = self._default_analysis(email)
+        analysis['source'] = 'fallback'
+        return analysis
+    
     def _default_analysis(self, email: Email) -> Dict[str, Any]:
         """Retourne une analyse par défaut."""
         # Détection basique de catégorie
-        subject_lower = (email.subject or '').lower()
+        hits = shared_matcher().scan(email.subject or '')
         sender_lower = (email.sender or '').lower()
         
         category = 'work'
         
-        if any(word in subject_lower for word in ['cv', 'candidature', 'postul']):
+        if hits.has('default.cv'):
             category = 'cv'
-        elif any(word in subject_lower for word in ['réunion', 'meeting', 'rdv']):
+        elif hits.has('default.meeting'):
             category = 'meeting'
-        elif any(word in subject_lower for word in ['facture', 'invoice', 'paiement']):
+        elif hits.has('default.invoice'):
             category = 'invoice'
-        elif 'noreply' in sender_lower or 'newsletter' in subject_lower:
+        elif 'noreply' in sender_lower or hits.has('default.newsletter'):
             category = 'newsletter'
-        elif any(word in subject_lower for word in ['support', 'aide', 'help']):
+        elif hits.has('default.support'):
             category = 'support'
         
         return {
@@ -137,16 +401,15 @@ Réponds au format JSON suivant (UNIQUEMENT le JSON, rien d'autre):
             
             tone_text = tone_instructions.get(tone, 'professionnel')
             
-            prompt = f"""Rédige une réponse {tone_text} à cet email.
-
-Email reçu:
-De: {email.sender}
-Sujet: {email.subject}
-Message: {email.snippet or email.body[:500] if email.body else ''}
-
-Rédige une réponse appropriée en français (maximum 200 mots):"""
+            instruction = f"Rédige une réponse {tone_text} et appropriée à cet email, dans sa langue (maximum 200 mots):"
             
-            response = self.ollama_client.generate(prompt, max_tokens=300)
+            response = self._generate(
+                instruction,
+                self.prompt_builder.email_sections(email, history_tokens=600),
+                max_tokens=300,
+                language=self.detect_language(email.body or email.snippet or email.subject or ''),
+                feature="reply"
+            )
             
             logger.info("✅ Réponse générée")
             return response.strip()
@@ -155,33 +418,42 @@ Rédige une réponse appropriée en français (maximum 200 mots):"""
             logger.error(f"Erreur génération réponse: {e}")
             return "Merci pour votre email. Je reviendrai vers vous prochainement."
     
-    def summarize_email(self, email: Email, max_length: int = 100) -> str:
+    def summarize_email(self, email: Email, max_length: int = 100, speculative: bool = False) -> str:
         """
         Résume un email.
         
         Args:
             email: Email à résumer
             max_length: Longueur maximale du résumé
+            speculative: Précalcul interruptible (voir SpeculativePrecomputer)
             
         Returns:
             Résumé de l'email
         """
         try:
+            key = self.response_cache.key('summary', email, max_length)
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return cached
+            
             content = email.body or email.snippet or ''
             
             if len(content) <= max_length:
+                self.response_cache.put(key, content)
                 return content
             
-            prompt = f"""Résume cet email en 1-2 phrases maximum:
-
-Sujet: {email.subject}
-Contenu: {content[:1000]}
-
-Résumé concis:"""
+            summary = self._generate(
+                "Résume cet email en 1-2 phrases maximum.\n\nRésumé concis:",
+                self.prompt_builder.email_sections(email, include_sender=False, history_tokens=400),
+                max_tokens=100,
+                speculative=speculative,
+                feature="summarize"
+            ).strip()
             
-            summary = self.ollama_client.generate(prompt, max_tokens=100)
+            if summary:
+                self.response_cache.put(key, summary)
             
-            return summary.strip()
+            return summary
         
         except Exception as e:
             logger.error(f"Erreur résumé: {e}")
@@ -198,16 +470,12 @@ Résumé concis:"""
             Liste des actions détectées
         """
         try:
-            content = email.body or email.snippet or ''
-            
-            prompt = f"""Liste les actions à faire mentionnées dans cet email.
-
-Email:
-{content[:800]}
-
-Liste les actions (une par ligne, commençant par "-"):"""
-            
-            response = self.ollama_client.generate(prompt, max_tokens=200)
+            response = self._generate(
+                'Liste les actions à faire mentionnées dans cet email (une par ligne, commençant par "-"):',
+                self.prompt_builder.email_sections(email, include_sender=False, history_tokens=0),
+                max_tokens=200,
+                feature="actions"
+            )
             
             # Parser les actions
             actions = []
@@ -233,28 +501,28 @@ Liste les actions (une par ligne, commençant par "-"):"""
             'urgent', 'important', 'normal', ou 'low'
         """
         try:
-            subject_lower = (email.subject or '').lower()
-            content_lower = (email.snippet or email.body or '')[:500].lower()
-            
-            # Mots-clés d'urgence
-            urgent_keywords = ['urgent', 'asap', 'immédiat', 'critique', 'emergency']
-            important_keywords = ['important', 'prioritaire', 'rapidement', 'bientôt']
+            # Mots-clés d'urgence (sujet et début du contenu)
+            hits = shared_matcher().scan(f"{email.subject or ''}\n{(email.snippet or email.body or '')[:500]}")
             
             # Vérification simple
-            if any(keyword in subject_lower or keyword in content_lower for keyword in urgent_keywords):
+            if hits.has('urgency.urgent'):
                 return 'urgent'
-            elif any(keyword in subject_lower or keyword in content_lower for keyword in important_keywords):
+            elif hits.has('urgency.important'):
                 return 'important'
             
-            # Demander à l'IA
-            prompt = f"""Évalue l'urgence de cet email. Réponds uniquement par: URGENT, IMPORTANT, NORMAL ou LOW
-
-Sujet: {email.subject}
-Contenu: {email.snippet or ''}
-
-Urgence:"""
+            # Historique avec l'expéditeur (réponses rapides, ou jamais de réponse)
+            if self.sender_index:
+                hint = self.sender_index.urgency_hint(email.sender)
+                if hint:
+                    return hint
             
-            response = self.ollama_client.generate(prompt, max_tokens=10).strip().upper()
+            # Demander à l'IA
+            response = self._generate(
+                "Évalue l'urgence de cet email. Réponds uniquement par: URGENT, IMPORTANT, NORMAL ou LOW\n\nUrgence:",
+                self.prompt_builder.email_sections(email, include_sender=False, body_tokens=200, history_tokens=0),
+                max_tokens=10,
+                feature="urgency"
+            ).strip().upper()
             
             if 'URGENT' in response:
                 return 'urgent'
@@ -321,28 +589,31 @@ Urgence:"""
         try:
             # Indicateurs de spam simples
             sender_lower = (email.sender or '').lower()
-            subject_lower = (email.subject or '').lower()
+            subject = email.subject or ''
+            hits = shared_matcher().scan(subject)
             
             spam_indicators = [
-                'noreply' in sender_lower and 'promo' in subject_lower,
-                subject_lower.count('!') > 3,
-                'viagra' in subject_lower or 'casino' in subject_lower,
-                'lottery' in subject_lower or 'winner' in subject_lower,
+                'noreply' in sender_lower and hits.has('spam.promo'),
+                subject.count('!') > 3,
+                hits.has('spam.subject'),
             ]
             
             if any(spam_indicators):
                 return True
             
-            # Demander à l'IA
-            prompt = f"""Cet email est-il du spam? Réponds uniquement par OUI ou NON
-
-Expéditeur: {email.sender}
-Sujet: {email.subject}
-Contenu: {email.snippet or ''}
-
-Spam:"""
+            # Filtre bayésien appris des labels Gmail ; l'IA ne tranche que les cas incertains
+            if self.spam_filter:
+                verdict = self.spam_filter.classify(email)
+                if verdict != 'unsure':
+                    return verdict == 'spam'
             
-            response = self.ollama_client.generate(prompt, max_tokens=10).strip().upper()
+            # Demander à l'IA
+            response = self._generate(
+                "Cet email est-il du spam? Réponds uniquement par OUI ou NON\n\nSpam:",
+                self.prompt_builder.email_sections(email, body_tokens=200, history_tokens=0),
+                max_tokens=10,
+                feature="spam"
+            ).strip().upper()
             
             return 'OUI' in response or 'YES' in response
         
@@ -350,28 +621,32 @@ Spam:"""
             logger.error(f"Erreur détection spam: {e}")
             return False
     
-    def generate_smart_reply_suggestions(self, email: Email, count: int = 3) -> list:
+    def generate_smart_reply_suggestions(self, email: Email, count: int = 3, speculative: bool = False) -> list:
         """
         Génère des suggestions de réponses rapides.
         
         Args:
             email: Email source
             count: Nombre de suggestions
+            speculative: Précalcul interruptible (voir SpeculativePrecomputer)
             
         Returns:
             Liste de suggestions de réponses
         """
         try:
-            prompt = f"""Génère {count} suggestions de réponses courtes à cet email.
-
-Email:
-De: {email.sender}
-Sujet: {email.subject}
-Message: {email.snippet or ''}
-
-Génère {count} réponses courtes et pertinentes (une par ligne, maximum 15 mots chacune):"""
-            
-            response = self.ollama_client.generate(prompt, max_tokens=200)
+            key = self.response_cache.key('suggestions', email, count)
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return list(cached)
+            
+            response = self._generate(
+                f"Génère {count} réponses courtes et pertinentes à cet email (une par ligne, maximum 15 mots chacune):",
+                self.prompt_builder.email_sections(email, body_tokens=400, history_tokens=200),
+                max_tokens=200,
+                speculative=speculative,
+                language=self.detect_language(email.body or email.snippet or email.subject or ''),
+                feature="suggestions"
+            )
             
             # Parser les suggestions
             suggestions = []
@@ -385,6 +660,9 @@ Génère {count} réponses courtes et pertinentes (une par ligne, maximum 15 mot
                     if len(suggestions) >= count:
                         break
             
+            if suggestions:
+                self.response_cache.put(key, suggestions[:count])
+            
             return suggestions[:count]
         
         except Exception as e:
@@ -510,12 +788,7 @@ Génère {count} réponses courtes et pertinentes (une par ligne, maximum 15 mot
             
             tone_text = tone_instructions.get(tone, 'professionnel')
             
-            prompt = f"""Rédige un email {tone_text} en français.
-
-Destinataire: {recipient}
-Sujet: {topic}
-
-Rédige l'email complet avec:
+            instruction = f"""Rédige un email {tone_text} en français avec:
 - Une formule de politesse d'ouverture
 - Le corps du message (3-4 phrases)
 - Une formule de politesse de clôture
@@ -523,7 +796,15 @@ Rédige l'email complet avec:
 
 Email:"""
             
-            draft = self.ollama_client.generate(prompt, max_tokens=400)
+            draft = self._generate(
+                instruction,
+                [
+                    PromptSection("Destinataire", recipient, priority=0, max_tokens=40),
+                    PromptSection("Sujet", topic, priority=0)
+                ],
+                max_tokens=400,
+                feature="draft"
+            )
             
             logger.info("✅ Brouillon généré")
             return draft.strip()
@@ -532,36 +813,40 @@ Email:"""
             logger.error(f"Erreur génération brouillon: {e}")
             return f"Bonjour,\n\nConcernant {topic}...\n\nCordialement"
     
-    def detect_language(self, text: str) -> str:
+    def detect_language(self, text: str, min_confidence: float = 0.6) -> str:
         """
-        Détecte la langue d'un texte.
+        Détecte la langue d'un texte (profils de n-grammes, sans appel au modèle).
         
         Args:
             text: Texte à analyser
+            min_confidence: Confiance minimale, en dessous la langue par défaut est retournée
             
         Returns:
-            Code de langue ('fr', 'en', etc.)
+            Code de langue ('fr', 'en', 'es', 'de'), 'fr' par défaut
         """
-        try:
-            # Détection simple basée sur des mots communs
-            french_words = ['le', 'la', 'les', 'de', 'un', 'une', 'est', 'sont', 'pour']
-            english_words = ['the', 'is', 'are', 'for', 'and', 'to', 'in', 'of']
-            
-            text_lower = text.lower()
-            
-            french_count = sum(1 for word in french_words if f' {word} ' in text_lower)
-            english_count = sum(1 for word in english_words if f' {word} ' in text_lower)
+        return self.detect_languages([text], min_confidence)[0]
+    
+    def detect_languages(self, texts: list, min_confidence: float = 0.6) -> list:
+        """
+        Détecte la langue d'un lot de textes.
+        
+        Args:
+            texts: Textes à analyser
+            min_confidence: Voir detect_language
             
-            if french_count > english_count:
-                return 'fr'
-            elif english_count > french_count:
-                return 'en'
-            else:
-                return 'fr'  # Par défaut
+        Returns:
+            Codes de langue, dans l'ordre des textes
+        """
+        try:
+            from app.ai.language_identifier import shared_identifier
+            return [
+                lang if lang and confidence >= min_confidence else 'fr'  # Par défaut
+                for lang, confidence in shared_identifier().identify_batch(texts)
+            ]
         
         except Exception as e:
             logger.error(f"Erreur détection langue: {e}")
-            return 'fr'
+            return ['fr'] * len(texts)
     
     def translate_text(self, text: str, target_lang: str = 'fr') -> str:
         """
@@ -572,25 +857,27 @@ Email:"""
             target_lang: Langue cible
             
         Returns:
-            Texte traduit
+            Texte traduit (le texte d'origine s'il est déjà dans la langue cible)
         """
         try:
-            lang_names = {
-                'fr': 'français',
-                'en': 'anglais',
-                'es': 'espagnol',
-                'de': 'allemand'
-            }
+            from app.ai.language_identifier import shared_identifier
             
-            target_name = lang_names.get(target_lang, 'français')
+            # Seuil élevé : une traduction manquée coûte plus qu'un appel inutile
+            source_lang, confidence = shared_identifier().identify(text)
+            if source_lang == target_lang and confidence >= 0.99:
+                logger.debug(f"⏭️ Traduction ignorée: texte déjà en '{target_lang}'")
+                return text
             
-            prompt = f"""Traduis ce texte en {target_name}:
-
-{text}
-
-Traduction:"""
+            if target_lang not in LANGUAGE_NAMES:
+                target_lang = 'fr'
             
-            translation = self.ollama_client.generate(prompt, max_tokens=500)
+            translation = self._generate(
+                f"Traduis ce texte en {LANGUAGE_NAMES[target_lang]}.\n\nTraduction:",
+                [PromptSection("Texte", text)],
+                max_tokens=500,
+                language=target_lang,
+                feature="translate"
+            )
             
             return translation.strip()
         
@@ -609,14 +896,13 @@ Traduction:"""
             Corrections suggérées
         """
         try:
-            prompt = f"""Corrige les fautes d'orthographe et de grammaire dans ce texte.
-
-Texte original:
-{text}
-
-Texte corrigé:"""
-            
-            corrected = self.ollama_client.generate(prompt, max_tokens=600)
+            corrected = self._generate(
+                "Corrige les fautes d'orthographe et de grammaire dans ce texte, sans le traduire.\n\nTexte corrigé:",
+                [PromptSection("Texte original", text)],
+                max_tokens=600,
+                language=self.detect_language(text),
+                feature="grammar"
+            )
             
             has_errors = corrected.strip() != text.strip()
             
@@ -650,19 +936,22 @@ Texte corrigé:"""
             if not emails:
                 return "Aucun email dans la conversation"
             
-            # Construire l'historique
-            thread_text = "\n\n".join([
-                f"De: {email.sender}\nSujet: {email.subject}\nMessage: {email.snippet or ''}"
-                for email in emails[:5]  # Limiter à 5 emails
-            ])
-            
-            prompt = f"""Résume cette conversation email en 2-3 phrases:
-
-{thread_text}
-
-Résumé de la conversation:"""
+            # Construire l'historique (les messages récents sont prioritaires)
+            sections = [
+                PromptSection(
+                    f"Message {i}",
+                    f"De: {email.sender} | Sujet: {email.subject} | {email.snippet or ''}",
+                    priority=len(emails) - i
+                )
+                for i, email in enumerate(emails, 1)
+            ]
             
-            summary = self.ollama_client.generate(prompt, max_tokens=200)
+            summary = self._generate(
+                "Résume cette conversation email en 2-3 phrases.\n\nRésumé de la conversation:",
+                sections,
+                max_tokens=200,
+                feature="thread_summary"
+            )
             
             return summary.strip()
         
@@ -679,7 +968,7 @@ Résumé de la conversation:"""
         """
         try:
             test_prompt = "Réponds simplement par OK"
-            response = self.ollama_client.generate(test_prompt, max_tokens=10)
+            response = self.ollama_client.generate(test_prompt, max_tokens=10, feature="health")
             
             return bool(response and len(response.strip()) > 0)
         
@@ -15,16 +15,24 @@ logger = logging.getLogger(__name__)
 class AutoResponder:
     """Gestionnaire de réponses automatiques."""
     
-    def __init__(self, gmail_client: GmailClient, ai_processor: AIProcessor):
+    def __init__(self, gmail_client: GmailClient, ai_processor: AIProcessor, sender_index=None,
+                 min_sent_personal: int = 3, thread_index=None):
         """
         Initialise l'auto-responder.
         
         Args:
             gmail_client: Client Gmail
             ai_processor: Processeur IA
+            sender_index: Statistiques par expéditeur (celles d'AIProcessor par défaut)
+            min_sent_personal: Nombre d'emails envoyés à une adresse à partir duquel
+                elle attend une réponse personnelle plutôt qu'automatique
+            thread_index: Fils de conversation reconstruits (optionnel, app.ai.thread_index)
         """
         self.gmail_client = gmail_client
         self.ai_processor = ai_processor
+        self.sender_index = sender_index or getattr(ai_processor, 'sender_index', None)
+        self.min_sent_personal = min_sent_personal
+        self.thread_index = thread_index
         self.enabled = False
         self.responded_emails = set()
         self.last_check = datetime.now()
@@ -71,6 +79,19 @@ class AutoResponder:
         if 'SPAM' in email.labels:
             return False
         
+        # Ne pas répondre si nous avons déjà écrit dans le fil depuis ce message
+        if self.thread_index and self.thread_index.replied_after(email.id):
+            return False
+        
+        # Historique : correspondant habituel (réponse personnelle attendue) ou
+        # expéditeur que nous ignorons toujours, sans appel au modèle
+        stats = self.sender_index.get(email.sender) if self.sender_index else None
+        if stats:
+            if stats.sent >= self.min_sent_personal:
+                return False
+            if stats.urgency_hint(outgoing_seen=self.sender_index.outgoing_seen) == 'low':
+                return False
+        
         # Analyser avec l'IA
         try:
             analysis = self.ai_processor.analyze_email(email)
@@ -0,0 +1,7 @@
+#!/usr/bin/env python3
+"""
+Benchmarks sur serveur Ollama simulé.
+"""
+from .fake_ollama import FakeOllamaConfig, FakeOllamaServer
+
+__all__ = ['FakeOllamaConfig', 'FakeOllamaServer']
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Benchmarks de débit des traitements IA sur un serveur Ollama simulé.
+
+Mesure le débit de bout en bout d'AIProcessor, d'AutoResponder et du worker
+d'analyse de la boîte de réception, avec un ou plusieurs serveurs simulés.
+
+Usage :
+    python -m app.benchmarks.ai_throughput --emails 50 --hosts 1 2 --json resultats.json
+"""
+import argparse
+import json
+import logging
+import random
+import statistics
+import time
+from contextlib import ExitStack
+from typing import Callable, Dict, List
+
+from app.benchmarks.fake_ollama import FakeOllamaConfig, FakeOllamaServer
+from app.models.email_model import Email
+from app.ollama_client import OllamaClient
+
+logger = logging.getLogger(__name__)
+
+MODEL = "nchapman/ministral-8b-instruct-2410:8b"
+
+_SUBJECTS = [
+    "Candidature au poste de développeur",
+    "Réunion de lancement mardi",
+    "Facture n°{n} - échéance fin de mois",
+    "Newsletter hebdomadaire",
+    "Problème de connexion à l'application",
+    "Proposition de partenariat",
+    "Question sur votre offre",
+    "Suivi du projet {n}"
+]
+
+def make_emails(count: int, seed: int = 0) -> List[Email]:
+    """
+    Emails synthétiques reproductibles.
+
+    Args:
+        count: Nombre d'emails
+        seed: Graine du générateur
+
+    Returns:
+        Liste d'emails
+    """
+    rng = random.Random(seed)
+    emails = []
+    for n in range(count):
+        subject = rng.choice(_SUBJECTS).format(n=n)
+        paragraphs = rng.randint(1, 6)
+        body = "\n\n".join(
+            f"Bonjour, je vous contacte au sujet de « {subject} ». "
+            f"Pourriez-vous me faire un retour sur le point {i + 1} avant la fin de la semaine ?"
+            for i in range(paragraphs)
+        )
+        emails.append(Email(
+            id=f"bench-{n}",
+            sender=f"contact{n % 7}@exemple.fr",
+            to="moi@exemple.fr",
+            subject=subject,
+            snippet=body[:100],
+            body=body,
+            read=n % 3 == 0
+        ))
+    return emails
+
+def _measure(name: str, emails: List[Email], work: Callable[[Email], object]) -> Dict:
+    """Exécute work sur chaque email et mesure débit et latences."""
+    latencies = []
+    start = time.perf_counter()
+    for email in emails:
+        t = time.perf_counter()
+        work(email)
+        latencies.append(time.perf_counter() - t)
+    return _result(name, len(emails), time.perf_counter() - start, latencies)
+
+def _result(name: str, count: int, elapsed: float, latencies: List[float]) -> Dict:
+    latencies = sorted(latencies)
+    return {
+        'benchmark': name,
+        'emails': count,
+        'seconds': elapsed,
+        'emails_per_second': count / elapsed if elapsed else 0.0,
+        'latency_p50_ms': statistics.median(latencies) * 1000 if latencies else 0.0,
+        'latency_p95_ms': latencies[int(0.95 * (len(latencies) - 1))] * 1000 if latencies else 0.0
+    }
+
+def bench_ai_processor(client: OllamaClient, emails: List[Email]) -> Dict:
+    """Analyse séquentielle par génération (sans cascade ni embeddings)."""
+    from app.ai_processor import AIProcessor
+
+    processor = AIProcessor(client)
+    return _measure("ai_processor.analyze_email", emails, processor.analyze_email)
+
+def bench_auto_responder(client: OllamaClient, emails: List[Email]) -> Dict:
+    """Décision et génération de réponse automatique (sans envoi)."""
+    from app.ai_processor import AIProcessor
+    from app.auto_responder import AutoResponder
+
+    responder = AutoResponder(gmail_client=None, ai_processor=AIProcessor(client))
+    responder.enable()
+
+    def respond(email):
+        if responder.should_respond(email):
+            responder.generate_response(email)
+
+    return _measure("auto_responder", emails, respond)
+
+def bench_inbox_worker(client: OllamaClient, emails: List[Email]) -> Dict:
+    """Worker d'analyse de la boîte de réception (parallèle sur le pool)."""
+    from app.ai_processor import AIProcessor
+    from app.ui.views.smart_inbox_view import EmailAnalysisWorker
+
+    worker = EmailAnalysisWorker(AIProcessor(client), emails)
+    start = time.perf_counter()
+    worker.run()
+    elapsed = time.perf_counter() - start
+    return _result("inbox_worker", len(emails), elapsed, [elapsed / max(1, len(emails))] * len(emails))
+
+BENCHMARKS = {
+    'ai_processor': bench_ai_processor,
+    'auto_responder': bench_auto_responder,
+    'inbox_worker': bench_inbox_worker
+}
+
+def run(emails: int = 50, hosts: List[int] = (1,), config: FakeOllamaConfig = None,
+        benchmarks: List[str] = None) -> List[Dict]:
+    """
+    Lance les benchmarks.
+
+    Args:
+        emails: Nombre d'emails par benchmark
+        hosts: Nombres de serveurs simulés à tester
+        config: Paramètres de simulation (identiques pour chaque serveur)
+        benchmarks: Benchmarks à lancer (tous par défaut)
+
+    Returns:
+        Résultats (un dictionnaire par benchmark et nombre de serveurs)
+    """
+    config = config or FakeOllamaConfig(load_time=0.0)
+    dataset = make_emails(emails)
+    results = []
+
+    for host_count in hosts:
+        with ExitStack() as stack:
+            servers = [stack.enter_context(FakeOllamaServer(config)) for _ in range(host_count)]
+            client = OllamaClient([s.url for s in servers], model=MODEL, keep_alive="30m")
+            client.pool.stop_health_checks()
+
+            for name in benchmarks or BENCHMARKS:
+                try:
+                    result = BENCHMARKS[name](client, dataset)
+                except ImportError as e:
+                    logger.warning(f"⚠️ Benchmark {name} ignoré: {e}")
+                    continue
+
+                result['hosts'] = host_count
+                result['tokens_per_second'] = client.telemetry.summary(window=len(client.telemetry))['tokens_per_second']
+                client.telemetry.clear()
+                results.append(result)
+
+    return results
+
+def print_results(results: List[Dict]):
+    """Affiche les résultats sous forme de tableau."""
+    print(f"{'benchmark':<30} {'hôtes':>5} {'emails/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'tokens/s':>10}")
+    for r in results:
+        print(
+            f"{r['benchmark']:<30} {r['hosts']:>5} {r['emails_per_second']:>10.2f} "
+            f"{r['latency_p50_ms']:>10.0f} {r['latency_p95_ms']:>10.0f} {r['tokens_per_second']:>10.1f}"
+        )
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de débit IA sur Ollama simulé")
+    parser.add_argument("--emails", type=int, default=50)
+    parser.add_argument("--hosts", type=int, nargs="+", default=[1])
+    parser.add_argument("--benchmarks", nargs="+", choices=sorted(BENCHMARKS))
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--prompt-tokens-per-second", type=float, default=4000.0)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Fichier de sortie JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+
+    config = FakeOllamaConfig(
+        tokens_per_second=args.tokens_per_second,
+        prompt_tokens_per_second=args.prompt_tokens_per_second,
+        load_time=0.0,
+        concurrency=args.concurrency,
+        failure_rate=args.failure_rate,
+        seed=args.seed
+    )
+
+    results = run(args.emails, args.hosts, config, args.benchmarks)
+    print_results(results)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
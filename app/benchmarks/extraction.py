@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark du moteur d'extraction d'app.utils.ai_utils.
+
+Compare l'ancienne chaîne de fonctions (une recherche et une mise en
+minuscules par fonction et par motif), lue dans l'historique git, au
+passage unique d'ExtractionEngine.
+
+Usage :
+    python -m app.benchmarks.extraction --messages 5000 --reference <révision>
+"""
+import argparse
+import random
+import subprocess
+import time
+import types
+from typing import Optional
+
+from app.utils.ai_utils import ExtractionEngine, extract_batch
+
+_SNIPPETS = [
+    "Bonjour, je vous propose une réunion le {d}/10/2025 à {h}h30 en salle B{n}.",
+    "Pouvez-vous me rappeler au 06{n:08d} ou écrire à contact{n}@exemple-groupe.fr ?",
+    "Le contrat du projet client doit être signé avant la deadline de demain.",
+    "Rendez-vous au 12 rue de la République pour la livraison de la commande.",
+    "Merci pour votre retour, la facture n°{n} sera réglée dans 3 jours.",
+    "C'est urgent : le budget doit être validé vendredi prochain.",
+    "Voici les actualités de la semaine et nos dernières offres."
+]
+
+def make_messages(count: int, seed: int = 0):
+    """Messages synthétiques reproductibles (texte, expéditeur)."""
+    rng = random.Random(seed)
+    messages = []
+    for n in range(count):
+        text = " ".join(
+            rng.choice(_SNIPPETS).format(d=rng.randint(1, 28), h=rng.randint(8, 18), n=n)
+            for _ in range(rng.randint(3, 12))
+        )
+        messages.append((text, f"expediteur{n % 5}@{rng.choice(['gmail.com', 'acme-corp.fr', 'exemple.fr'])}"))
+    return messages
+
+def load_reference(revision: Optional[str] = None) -> types.ModuleType:
+    """
+    Ancienne version d'app.utils.ai_utils, lue avec git show.
+
+    Args:
+        revision: Révision git (premier commit du dépôt par défaut)
+
+    Returns:
+        Le module de référence
+    """
+    if revision is None:
+        roots = subprocess.run(["git", "rev-list", "--max-parents=0", "HEAD"],
+                               capture_output=True, text=True, check=True).stdout.split()
+        revision = roots[-1]
+    source = subprocess.run(["git", "show", f"{revision}:app/utils/ai_utils.py"],
+                            capture_output=True, text=True, check=True).stdout
+
+    module = types.ModuleType("reference_ai_utils")
+    exec(compile(source, f"{revision}:app/utils/ai_utils.py", "exec"), module.__dict__)
+    return module
+
+def legacy_extract(legacy: types.ModuleType, message):
+    """Ancienne chaîne : une fonction par information."""
+    text, sender = message
+    return (
+        legacy.extract_datetime(text),
+        legacy.extract_contact_info(text),
+        legacy.extract_keywords(text),
+        legacy.calculate_email_importance(text, sender)
+    )
+
+def _timed(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du moteur d'extraction")
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--reference", default=None, help="Révision git de l'ancienne version")
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages)
+    engine = ExtractionEngine()
+    legacy = load_reference(args.reference)
+
+    results = [
+        ("fonctions séparées (référence)", _timed(lambda: [legacy_extract(legacy, m) for m in messages])),
+        ("ExtractionEngine.extract", _timed(lambda: [engine.extract(*m) for m in messages])),
+        ("extract_batch", _timed(lambda: extract_batch(messages)))
+    ]
+
+    reference = results[0][1]
+    print(f"{'méthode':<32} {'messages/s':>12} {'gain':>6}")
+    for name, elapsed in results:
+        print(f"{name:<32} {len(messages) / elapsed:>12.0f} {reference / elapsed:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
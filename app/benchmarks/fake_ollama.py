@@ -0,0 +1,425 @@
+#!/usr/bin/env python3
+"""
+Serveur Ollama simulé, déterministe, pour les benchmarks.
+
+Implémente /api/generate, /api/chat, /api/embeddings, /api/embed, /api/tags
+et /api/ps, en streaming ou non. Les réponses sont des textes prédéfinis
+choisis à partir du prompt ; les durées (chargement, évaluation du prompt,
+génération) sont simulées à partir de la configuration.
+
+Usage autonome :
+    python -m app.benchmarks.fake_ollama --port 11435 --tokens-per-second 40
+"""
+import argparse
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_NS = 1_000_000_000
+
+CATEGORIES = ["cv", "meeting", "invoice", "newsletter", "support", "spam", "important", "personal", "work"]
+SENTIMENTS = ["positive", "negative", "neutral"]
+
+SUGGESTIONS = [
+    "Merci pour votre message, je reviens vers vous rapidement.",
+    "Bien reçu, je regarde cela dans la journée.",
+    "Merci, c'est noté de mon côté.",
+    "Pouvez-vous me préciser vos disponibilités cette semaine ?",
+    "Je vous transmets les éléments demandés au plus vite."
+]
+
+@dataclass
+class FakeOllamaConfig:
+    """Paramètres de simulation."""
+    models: List[str] = field(default_factory=lambda: [
+        "nchapman/ministral-8b-instruct-2410:8b", "nomic-embed-text:latest"
+    ])
+    tokens_per_second: float = 40.0
+    prompt_tokens_per_second: float = 800.0
+    load_time: float = 2.0
+    default_keep_alive: float = 300.0
+    concurrency: int = 1
+    failure_rate: float = 0.0
+    hang_rate: float = 0.0
+    hang_time: float = 120.0
+    embedding_dimension: int = 768
+    seed: int = 0
+
+
+class FakeOllamaServer:
+    """Serveur HTTP local imitant l'API Ollama."""
+
+    def __init__(self, config: Optional[FakeOllamaConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Initialise le serveur (démarré par start()).
+
+        Args:
+            config: Paramètres de simulation
+            host: Adresse d'écoute
+            port: Port d'écoute (0 = port libre choisi par le système)
+        """
+        self.config = config or FakeOllamaConfig()
+        self.requests = 0
+        self.failures = 0
+
+        self._slots = threading.Semaphore(self.config.concurrency)
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        # Modèle chargé -> instant d'expiration
+        self._loaded: Dict[str, float] = {}
+
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """URL de base du serveur."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeOllamaServer":
+        """Démarre le serveur dans un thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="fake-ollama", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Arrête le serveur."""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def unload_all(self):
+        """Décharge tous les modèles (prochaine requête = chargement à froid)."""
+        with self._lock:
+            self._loaded.clear()
+
+    # ------------------------------------------------------------------
+    # Simulation
+    # ------------------------------------------------------------------
+
+    def _known_model(self, model: str) -> bool:
+        return _tagged(model) in {_tagged(m) for m in self.config.models}
+
+    def _draw(self) -> Tuple[bool, bool]:
+        """Tirage (échec, blocage) reproductible pour la requête suivante."""
+        with self._lock:
+            self.requests += 1
+            fail = self._rng.random() < self.config.failure_rate
+            hang = self._rng.random() < self.config.hang_rate
+            if fail:
+                self.failures += 1
+            return fail, hang
+
+    def _load(self, model: str, keep_alive) -> float:
+        """Charge le modèle si nécessaire et renvoie la durée de chargement."""
+        now = time.monotonic()
+        duration = _parse_keep_alive(keep_alive, self.config.default_keep_alive)
+
+        with self._lock:
+            expires = self._loaded.get(_tagged(model))
+            cold = expires is None or expires < now
+            if duration <= 0:
+                self._loaded.pop(_tagged(model), None)
+            else:
+                self._loaded[_tagged(model)] = now + (self.config.load_time if cold else 0) + duration
+
+        if cold and duration > 0:
+            time.sleep(self.config.load_time)
+            return self.config.load_time
+        return 0.0
+
+    def _ps(self) -> List[Dict]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    'name': name,
+                    'model': name,
+                    'size': 5 * 1024 ** 3,
+                    'size_vram': 5 * 1024 ** 3,
+                    'expires_at': time.strftime(
+                        "%Y-%m-%dT%H:%M:%SZ", time.gmtime(time.time() + expires - now)
+                    )
+                }
+                for name, expires in self._loaded.items() if expires >= now
+            ]
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._json({'models': [{'name': _tagged(m), 'model': _tagged(m)} for m in server.config.models]})
+                elif self.path == "/api/ps":
+                    self._json({'models': server._ps()})
+                else:
+                    self._json({'error': 'not found'}, status=404)
+
+            def do_POST(self):
+                try:
+                    length = int(self.headers.get('Content-Length', 0))
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except Exception:
+                    self._json({'error': 'invalid json'}, status=400)
+                    return
+
+                routes = {
+                    "/api/generate": self._generate,
+                    "/api/chat": self._generate,
+                    "/api/embeddings": self._embeddings,
+                    "/api/embed": self._embeddings
+                }
+                route = routes.get(self.path)
+                if route is None:
+                    self._json({'error': 'not found'}, status=404)
+                    return
+
+                model = body.get('model', '')
+                if not server._known_model(model):
+                    self._json({'error': f"model '{model}' not found"}, status=404)
+                    return
+
+                fail, hang = server._draw()
+                with server._slots:
+                    if hang:
+                        time.sleep(server.config.hang_time)
+                    if fail:
+                        self._json({'error': 'simulated failure'}, status=500)
+                        return
+                    route(body)
+
+            def _generate(self, body: Dict):
+                chat = self.path == "/api/chat"
+                model = body['model']
+                prompt = _chat_prompt(body.get('messages', [])) if chat else body.get('prompt', '')
+                options = body.get('options') or {}
+                stream = body.get('stream', True)
+
+                start = time.perf_counter()
+                load = server._load(model, body.get('keep_alive'))
+
+                # Préchargement : prompt vide
+                if not prompt:
+                    self._json(_final(model, chat, "", load, start, 0, 0.0, 0, 0.0))
+                    return
+
+                prompt_tokens = _count_tokens(prompt)
+                prompt_time = prompt_tokens / server.config.prompt_tokens_per_second
+                time.sleep(prompt_time)
+
+                tokens = _tokenize(canned_response(prompt))[:int(options.get('num_predict', 500))]
+                per_token = 1.0 / server.config.tokens_per_second
+
+                if not stream:
+                    time.sleep(per_token * len(tokens))
+                    self._json(_final(model, chat, "".join(tokens), load, start,
+                                      prompt_tokens, prompt_time, len(tokens), per_token * len(tokens)))
+                    return
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/x-ndjson')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                try:
+                    for token in tokens:
+                        time.sleep(per_token)
+                        self._chunk(_partial(model, chat, token))
+                    self._chunk(_final(model, chat, "", load, start,
+                                       prompt_tokens, prompt_time, len(tokens), per_token * len(tokens)))
+                    self.wfile.write(b"0\r\n\r\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    # Le client a abandonné : Ollama arrête alors la génération
+                    pass
+
+            def _embeddings(self, body: Dict):
+                server._load(body['model'], body.get('keep_alive'))
+                dimension = server.config.embedding_dimension
+
+                if self.path == "/api/embeddings":
+                    text = body.get('prompt', '')
+                    self._json({'embedding': fake_embedding(text, dimension)})
+                    return
+
+                inputs = body.get('input', '')
+                if isinstance(inputs, str):
+                    inputs = [inputs]
+                self._json({'model': body['model'], 'embeddings': [fake_embedding(t, dimension) for t in inputs]})
+
+            def _json(self, payload: Dict, status: int = 200):
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _chunk(self, payload: Dict):
+                data = json.dumps(payload).encode('utf-8') + b"\n"
+                self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+                self.wfile.flush()
+
+        return Handler
+
+
+# ----------------------------------------------------------------------
+# Réponses prédéfinies
+# ----------------------------------------------------------------------
+
+def _digest(text: str) -> int:
+    return int(hashlib.md5(text.encode('utf-8')).hexdigest(), 16)
+
+def canned_response(prompt: str) -> str:
+    """
+    Réponse déterministe adaptée à la consigne du prompt.
+
+    Args:
+        prompt: Prompt reçu
+
+    Returns:
+        Texte au format attendu par AIProcessor
+    """
+    digest = _digest(prompt)
+    tail = prompt[-400:]
+
+    if '"category"' in prompt and 'JSON' in prompt:
+        return json.dumps({
+            'category': CATEGORIES[digest % len(CATEGORIES)],
+            'sentiment': SENTIMENTS[digest % len(SENTIMENTS)],
+            'summary': "Message concernant une demande à traiter.",
+            'confidence': 0.5 + (digest % 50) / 100
+        }, ensure_ascii=False)
+    if "URGENT, IMPORTANT, NORMAL ou LOW" in tail:
+        return ["URGENT", "IMPORTANT", "NORMAL", "NORMAL", "LOW"][digest % 5]
+    if "OUI ou NON" in tail:
+        return "OUI" if digest % 10 == 0 else "NON"
+    if "réponses courtes" in tail:
+        count = int(re.search(r"Génère (\d+)", tail).group(1)) if re.search(r"Génère (\d+)", tail) else 3
+        return "\n".join(f"{i + 1}. {SUGGESTIONS[(digest + i) % len(SUGGESTIONS)]}" for i in range(count))
+    if "actions à faire" in tail:
+        return "- Répondre à l'expéditeur\n- Vérifier les pièces jointes"
+    if "Résume" in tail:
+        return "L'expéditeur demande un retour rapide sur sa demande."
+    if "OK" in tail and len(prompt) < 100:
+        return "OK"
+
+    return (
+        "Bonjour,\n\nMerci pour votre message. Nous avons bien pris en compte votre demande "
+        "et reviendrons vers vous dans les meilleurs délais.\n\nCordialement"
+    )
+
+def fake_embedding(text: str, dimension: int = 768) -> List[float]:
+    """Embedding déterministe et normalisé d'un texte."""
+    rng = random.Random(_digest(text))
+    vector = [rng.gauss(0.0, 1.0) for _ in range(dimension)]
+    norm = sum(v * v for v in vector) ** 0.5 or 1.0
+    return [v / norm for v in vector]
+
+_TOKEN_RE = re.compile(r"\s*\S{1,4}|\s+")
+
+def _tokenize(text: str) -> List[str]:
+    """Découpage approximatif en tokens (environ 4 caractères)."""
+    return _TOKEN_RE.findall(text)
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+def _tagged(model: str) -> str:
+    return model if ':' in model else f"{model}:latest"
+
+def _parse_keep_alive(value, default: float) -> float:
+    """Durée de keep_alive en secondes ("30m", "1h", 300, -1...)."""
+    if value is None:
+        return default
+    if isinstance(value, (int, float)):
+        return float('inf') if value < 0 else float(value)
+
+    match = re.fullmatch(r"(-?\d+(?:\.\d+)?)\s*([smh]?)", str(value).strip())
+    if not match:
+        return default
+    amount = float(match.group(1))
+    if amount < 0:
+        return float('inf')
+    return amount * {'': 1, 's': 1, 'm': 60, 'h': 3600}[match.group(2)]
+
+def _chat_prompt(messages: List[Dict]) -> str:
+    return "\n".join(str(m.get('content', '')) for m in messages)
+
+def _partial(model: str, chat: bool, token: str) -> Dict:
+    message = {'message': {'role': 'assistant', 'content': token}} if chat else {'response': token}
+    return {'model': model, 'created_at': _now(), **message, 'done': False}
+
+def _final(model: str, chat: bool, text: str, load: float, start: float, prompt_tokens: int,
+           prompt_time: float, eval_tokens: int, eval_time: float) -> Dict:
+    message = {'message': {'role': 'assistant', 'content': text}} if chat else {'response': text}
+    return {
+        'model': model,
+        'created_at': _now(),
+        **message,
+        'done': True,
+        'done_reason': 'stop',
+        'total_duration': int((time.perf_counter() - start) * _NS),
+        'load_duration': int(load * _NS),
+        'prompt_eval_count': prompt_tokens,
+        'prompt_eval_duration': int(prompt_time * _NS),
+        'eval_count': eval_tokens,
+        'eval_duration': int(eval_time * _NS)
+    }
+
+def _now() -> str:
+    return time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+
+
+def main():
+    """Lance un serveur simulé au premier plan."""
+    parser = argparse.ArgumentParser(description="Serveur Ollama simulé")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--tokens-per-second", type=float, default=40.0)
+    parser.add_argument("--load-time", type=float, default=2.0)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = FakeOllamaConfig(
+        tokens_per_second=args.tokens_per_second,
+        load_time=args.load_time,
+        concurrency=args.concurrency,
+        failure_rate=args.failure_rate,
+        seed=args.seed
+    )
+
+    logging.basicConfig(level=logging.INFO)
+    server = FakeOllamaServer(config, host=args.host, port=args.port).start()
+    logger.info(f"🧪 Ollama simulé sur {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
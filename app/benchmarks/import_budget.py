@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Contrôle du coût d'import du chemin de démarrage.
+
+Importe les modules du démarrage dans un interpréteur neuf (python -X importtime),
+vérifie qu'ils s'importent tous, qu'aucune dépendance lourde n'est chargée et
+que la durée totale reste sous le budget. Code de sortie 1 sinon.
+
+Usage :
+    python -m app.benchmarks.import_budget --budget-ms 1500
+"""
+import argparse
+import json
+import subprocess
+import sys
+from typing import Dict, List
+
+# Modules importés au démarrage hors interface (PyQt6 est contrôlé à part)
+STARTUP_MODULES = [
+    "app.main",
+    "app.models",
+    "app.models.ai_model",
+    "app.ollama_client",
+    "app.ai_processor",
+    "app.ai",
+    "app.auto_responder",
+    "app.calendar_manager"
+]
+
+# Dépendances qui ne doivent être chargées qu'au premier usage
+FORBIDDEN_MODULES = ["transformers", "torch", "tensorflow", "sklearn", "numpy"]
+
+_PROBE = """
+import importlib, json, sys
+skipped = {}
+for name in %r:
+    try:
+        importlib.import_module(name)
+    except ImportError as e:
+        skipped[name] = str(e)
+print(json.dumps({"loaded": [m for m in %r if m in sys.modules], "skipped": skipped}))
+"""
+
+def measure(modules: List[str] = None, forbidden: List[str] = None) -> Dict:
+    """
+    Importe les modules dans un nouveau processus.
+
+    Args:
+        modules: Modules à importer (STARTUP_MODULES par défaut)
+        forbidden: Dépendances interdites (FORBIDDEN_MODULES par défaut)
+
+    Returns:
+        {total_ms, slowest: [(module, ms)], loaded_forbidden, skipped}
+    """
+    modules = modules or STARTUP_MODULES
+    forbidden = forbidden or FORBIDDEN_MODULES
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROBE % (modules, forbidden)],
+        capture_output=True, text=True, check=True
+    )
+
+    # Lignes "import time: self [us] | cumulative | package" ; les imports
+    # de premier niveau ne sont pas indentés
+    top_level = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not name.startswith("  "):
+            top_level.append((name.strip(), int(cumulative) / 1000))
+
+    probe = json.loads(result.stdout.strip().splitlines()[-1])
+    return {
+        'total_ms': sum(ms for _, ms in top_level),
+        'slowest': sorted(top_level, key=lambda item: item[1], reverse=True)[:10],
+        'loaded_forbidden': probe['loaded'],
+        'skipped': probe['skipped']
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Budget d'import du démarrage")
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--modules", nargs="+")
+    args = parser.parse_args()
+
+    report = measure(args.modules)
+
+    print(f"Import du démarrage : {report['total_ms']:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    for name, ms in report['slowest']:
+        print(f"  {name:<40} {ms:>8.1f} ms")
+    # Un module non importé n'est pas mesuré : le budget ne peut pas être vérifié
+    failed = False
+    for name, error in report['skipped'].items():
+        print(f"❌ {name} non importé: {error}")
+        failed = True
+    if report['loaded_forbidden']:
+        print(f"❌ Dépendances lourdes chargées au démarrage: {', '.join(report['loaded_forbidden'])}")
+        failed = True
+    if report['total_ms'] > args.budget_ms:
+        print("❌ Budget d'import dépassé")
+        failed = True
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
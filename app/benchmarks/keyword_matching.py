@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark de la recherche de mots-clés sur des corps d'emails longs.
+
+Compare l'ancienne approche (un re.findall par mot-clé) au parcours unique
+de l'automate partagé, et vérifie que les comptes par catégorie sont identiques.
+
+Usage :
+    python -m app.benchmarks.keyword_matching --size 150000 --repeat 5
+"""
+import argparse
+import random
+import re
+import time
+from typing import Dict
+
+from app.ai.keyword_matcher import CATEGORY_KEYWORDS, normalize_text, shared_matcher
+
+_WORDS = [
+    "bonjour", "merci", "projet", "réunion", "facture", "montant", "semaine",
+    "équipe", "document", "retour", "question", "support", "candidature",
+    "proposition", "rendez-vous", "calendrier", "total", "commande", "lien",
+    "newsletter", "problème", "collaboration", "cordialement", "disponible"
+]
+
+def make_body(size: int, seed: int = 0) -> str:
+    """Texte pseudo-aléatoire d'environ size caractères."""
+    rng = random.Random(seed)
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(_WORDS)
+        words.append(word.capitalize() if rng.random() < 0.1 else word)
+        length += len(word) + 1
+    return " ".join(words)
+
+def regex_scores(text: str) -> Dict[str, int]:
+    """Ancienne approche de SmartClassifier : un re.findall par mot-clé."""
+    return {
+        category: sum(len(re.findall(re.escape(keyword), text, re.IGNORECASE)) for keyword in keywords)
+        for category, keywords in CATEGORY_KEYWORDS.items()
+    }
+
+def matcher_scores(text: str) -> Dict[str, int]:
+    """Parcours unique de l'automate partagé."""
+    hits = shared_matcher().scan(normalize_text(text), normalized=True)
+    return {category: hits.count(f"category.{category}") for category in CATEGORY_KEYWORDS}
+
+def _best_of(func, text: str, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de la recherche de mots-clés")
+    parser.add_argument("--size", type=int, nargs="+", default=[2000, 20000, 150000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    shared_matcher()  # construction de l'automate hors mesure
+
+    print(f"{'taille':>10} {'regex ms':>10} {'automate ms':>12} {'gain':>6}")
+    for size in args.size:
+        text = make_body(size)
+        if regex_scores(text) != matcher_scores(text):
+            raise SystemExit(f"❌ Comptes différents pour {size} caractères")
+
+        regex_time = _best_of(regex_scores, text, args.repeat)
+        matcher_time = _best_of(matcher_scores, text, args.repeat)
+        print(f"{size:>10} {regex_time * 1000:>10.1f} {matcher_time * 1000:>12.1f} {regex_time / matcher_time:>5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
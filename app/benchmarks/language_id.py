@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'identification de langue d'app.ai.language_identifier.
+
+Compare l'ancien comptage de mots outils d'AIProcessor.detect_language aux
+profils de n-grammes (précision et débit) sur des phrases absentes des
+textes de référence.
+
+Usage :
+    python -m app.benchmarks.language_id --messages 5000
+"""
+import argparse
+import random
+import time
+
+from app.ai.language_identifier import LanguageIdentifier
+
+# Phrases de test (distinctes des textes de référence des profils)
+_SENTENCES = {
+    'fr': [
+        "Peux-tu relire le contrat avant demain ?", "Le serveur de production ne répond plus.",
+        "Merci, c'est noté.", "Voici le lien vers la présentation", "Je suis absent jusqu'à lundi",
+        "Rappel : paiement en attente", "Votre colis arrive aujourd'hui", "Bonne soirée à tous !"
+    ],
+    'en': [
+        "Can you review the contract before tomorrow?", "The production server is down again.",
+        "Thanks, noted.", "Here is the link to the slides", "I am out of office until Monday",
+        "Reminder: payment pending", "Your parcel arrives today", "Have a nice evening everyone!"
+    ],
+    'es': [
+        "¿Puedes revisar el contrato antes de mañana?", "El servidor de producción no responde.",
+        "Gracias, anotado.", "Aquí está el enlace a la presentación", "Estoy fuera hasta el lunes",
+        "Recordatorio: pago pendiente", "Su paquete llega hoy", "¡Buenas noches a todos!"
+    ],
+    'de': [
+        "Kannst du den Vertrag vor morgen prüfen?", "Der Produktionsserver antwortet nicht mehr.",
+        "Danke, notiert.", "Hier ist der Link zur Präsentation", "Ich bin bis Montag nicht im Büro",
+        "Erinnerung: Zahlung ausstehend", "Ihr Paket kommt heute an", "Schönen Abend zusammen!"
+    ]
+}
+
+def make_messages(count: int, seed: int = 0):
+    """Messages synthétiques reproductibles (texte, langue)."""
+    rng = random.Random(seed)
+    messages = []
+    for _ in range(count):
+        lang = rng.choice(list(_SENTENCES))
+        text = " ".join(rng.choice(_SENTENCES[lang]) for _ in range(rng.randint(1, 4)))
+        messages.append((text, lang))
+    return messages
+
+def legacy_detect(text: str) -> str:
+    """Ancien AIProcessor.detect_language (mots outils entourés d'espaces)."""
+    french_words = ['le', 'la', 'les', 'de', 'un', 'une', 'est', 'sont', 'pour']
+    english_words = ['the', 'is', 'are', 'for', 'and', 'to', 'in', 'of']
+    text_lower = text.lower()
+    french_count = sum(1 for word in french_words if f' {word} ' in text_lower)
+    english_count = sum(1 for word in english_words if f' {word} ' in text_lower)
+    if english_count > french_count:
+        return 'en'
+    return 'fr'
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'identification de langue")
+    parser.add_argument("--messages", type=int, default=5000)
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages)
+    texts = [text for text, _ in messages]
+
+    build_time, identifier = _timed(LanguageIdentifier)
+    runs = [
+        ("mots outils (référence)", _timed(lambda: [legacy_detect(t) for t in texts])),
+        ("LanguageIdentifier.identify", _timed(lambda: [identifier.identify(t)[0] for t in texts])),
+        ("LanguageIdentifier.identify_batch", _timed(lambda: [lang for lang, _ in identifier.identify_batch(texts)]))
+    ]
+
+    print(f"Construction des profils : {build_time * 1000:.1f} ms")
+    print(f"{'méthode':<36} {'textes/s':>10} {'précision':>10}")
+    for name, (elapsed, predicted) in runs:
+        accuracy = sum(p == lang for p, (_, lang) in zip(predicted, messages)) / len(messages)
+        print(f"{name:<36} {len(texts) / elapsed:>10.0f} {accuracy:>10.1%}")
+
+
+if __name__ == "__main__":
+    main()
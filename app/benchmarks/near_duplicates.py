@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark du regroupement des messages similaires d'app.ai.near_duplicates.
+
+Génère une boîte mêlant envois en masse (mêmes gabarits, numéros et liens
+différents) et messages uniques, puis compare l'index LSH à la comparaison
+exacte de chaque message avec tous les précédents : débit, groupes
+retrouvés et analyses évitées.
+
+Usage :
+    python -m app.benchmarks.near_duplicates --messages 3000
+"""
+import argparse
+import random
+import time
+
+from app.ai.near_duplicates import NearDuplicateIndex, normalize_body
+from app.models.email_model import Email
+
+_TEMPLATES = [
+    ("Votre commande n°{n} a été expédiée",
+     "Bonjour, votre commande n°{n} a été expédiée et sera livrée sous 3 jours ouvrés. Suivez votre colis "
+     "sur https://suivi.example.com/{n}. Merci pour votre confiance, l'équipe boutique."),
+    ("Newsletter hebdomadaire #{n}",
+     "Cette semaine : les nouveautés produit, les événements à venir et nos conseils pour bien démarrer. "
+     "Lire en ligne : https://news.example.com/{n}. Pour vous désabonner cliquez ici."),
+    ("[GitHub] Build #{n} failed",
+     "The build #{n} of repository dynovate/mail failed on branch main. View the logs at "
+     "https://ci.example.com/runs/{n}. You are receiving this because you are subscribed to this repository."),
+    ("Rappel : facture {n} en attente",
+     "Bonjour, sauf erreur de notre part la facture {n} reste impayée à ce jour. Merci de procéder au "
+     "règlement avant la fin du mois. Cordialement, le service comptabilité."),
+]
+
+_WORDS = ("projet réunion budget client contrat demain équipe rapport question lundi merci "
+          "proposition planning livraison retour avis document relecture version priorité").split()
+
+def make_messages(count: int, bulk_ratio: float = 0.7, seed: int = 0):
+    """Messages synthétiques reproductibles (email, indice du gabarit ou None)."""
+    rng = random.Random(seed)
+    messages = []
+    for i in range(count):
+        if rng.random() < bulk_ratio:
+            template = rng.randrange(len(_TEMPLATES))
+            subject, body = _TEMPLATES[template]
+            n = rng.randint(1000, 99999)
+            email = Email(id=str(i), sender="noreply@example.com", to="moi@example.com",
+                          subject=subject.format(n=n), body=body.format(n=n))
+        else:
+            template = None
+            email = Email(id=str(i), sender="collegue@example.com", to="moi@example.com",
+                          subject=" ".join(rng.choice(_WORDS) for _ in range(4)),
+                          body=" ".join(rng.choice(_WORDS) for _ in range(40)))
+        messages.append((email, template))
+    return messages
+
+def exact_clusters(emails, threshold: float = 0.6):
+    """Référence : Jaccard exacte avec chaque message déjà vu (quadratique)."""
+    seen, clusters = [], {}
+    for email in emails:
+        words = normalize_body(f"{email.subject} {email.body}")
+        shingles = {' '.join(words[i:i + 2]) for i in range(len(words) - 1)}
+        best, best_similarity = email.id, threshold
+        for other_id, other in seen:
+            similarity = len(shingles & other) / len(shingles | other)
+            if similarity >= best_similarity:
+                best, best_similarity = clusters[other_id], similarity
+        clusters[email.id] = best
+        seen.append((email.id, shingles))
+    return clusters
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark du regroupement des messages similaires")
+    parser.add_argument("--messages", type=int, default=3000)
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages)
+    emails = [email for email, _ in messages]
+
+    start = time.perf_counter()
+    exact = exact_clusters(emails)
+    exact_time = time.perf_counter() - start
+
+    index = NearDuplicateIndex()
+    start = time.perf_counter()
+    lsh = {email.id: index.add(email) for email in emails}
+    lsh_time = time.perf_counter() - start
+
+    bulk = [(email, template) for email, template in messages if template is not None]
+    print(f"{'méthode':<28} {'msg/s':>10} {'analyses':>10} {'groupés':>10}")
+    for name, clusters, elapsed in (("Jaccard exacte (référence)", exact, exact_time),
+                                    ("NearDuplicateIndex (LSH)", lsh, lsh_time)):
+        analyses = len(set(clusters.values()))
+        grouped = sum(clusters[email.id] != email.id for email, _ in bulk) / max(len(bulk), 1)
+        print(f"{name:<28} {len(emails) / elapsed:>10.0f} {analyses:>10} {grouped:>10.1%}")
+
+    mixed = sum(
+        len({template for email, template in messages if lsh[email.id] == cluster_id}) > 1
+        for cluster_id in set(lsh.values())
+    )
+    print(f"Groupes mélangeant plusieurs gabarits : {mixed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark de l'analyseur temporel d'app.utils.temporal_parser.
+
+Compare l'ancien motif de CalendarManager (date numérique suivie d'une heure)
+à TemporalParser sur des emails de réunion synthétiques : part des
+rendez-vous résolus et débit, en séquentiel et sur un pool de processus.
+
+Usage :
+    python -m app.benchmarks.temporal_parsing --messages 5000 --processes 4
+"""
+import argparse
+import random
+import re
+import time
+from datetime import datetime, timedelta
+
+from app.utils.temporal_parser import TemporalParser, format_match, parse_batch
+
+_LEGACY_PATTERN = r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})\s*(?:à|a)?\s*(\d{1,2})h?(\d{2})?'
+
+_EXPRESSIONS = [
+    "le {d}/11/2025 à {h}h30", "mardi prochain à {h}h", "demain matin", "dans 2 semaines",
+    "le {d} novembre à {h}h", "jeudi de {h}h à {h2}h", "après-demain vers {h}h15",
+    "next friday at {h12}pm", "tomorrow {h12}-{h12b}pm", "ce soir à 20h", "dans trois jours",
+    "on November {d} at {h}:00", "la semaine prochaine"
+]
+
+_SENTENCES = [
+    "Bonjour, je vous propose une réunion {expr} pour faire le point sur le projet.",
+    "Hi team, let's schedule the meeting {expr} in room B{n}.",
+    "Rendez-vous confirmé {expr}, merci de prévoir le budget.",
+    "Pouvons-nous décaler notre call {expr} ? Merci pour votre retour."
+]
+
+def make_messages(count: int, seed: int = 0):
+    """Messages synthétiques reproductibles (texte, date de réception)."""
+    rng = random.Random(seed)
+    start = datetime(2025, 10, 1, 9, 0)
+    messages = []
+    for n in range(count):
+        hour = rng.randint(8, 16)
+        expr = rng.choice(_EXPRESSIONS).format(
+            d=rng.randint(1, 28), h=hour, h2=hour + 2, h12=rng.randint(1, 4), h12b=5
+        )
+        text = " ".join([rng.choice(_SENTENCES).format(expr=expr, n=n)] * rng.randint(1, 4))
+        messages.append((text, start + timedelta(hours=rng.randint(0, 24 * 30))))
+    return messages
+
+def legacy_resolve(message):
+    """Ancien motif de CalendarManager.extract_meeting_from_email."""
+    text, _ = message
+    match = re.search(_LEGACY_PATTERN, text)
+    if not match:
+        return None
+    date_str, hour, minute = match.groups()
+    for date_format in ['%d/%m/%Y', '%d-%m-%Y', '%d/%m/%y']:
+        try:
+            return datetime.strptime(date_str, date_format).replace(hour=int(hour), minute=int(minute or '00'))
+        except ValueError:
+            continue
+    return None
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de l'analyseur temporel")
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    messages = make_messages(args.messages)
+    temporal = TemporalParser()
+
+    runs = [
+        ("motif CalendarManager (référence)", _timed(lambda: [legacy_resolve(m) for m in messages])),
+        ("TemporalParser.upcoming", _timed(lambda: [temporal.upcoming(*m) for m in messages])),
+        ("parse_batch (séquentiel)", _timed(lambda: parse_batch(messages, processes=1))),
+        ("parse_batch (processus)", _timed(lambda: parse_batch(messages, processes=args.processes, min_parallel=0)))
+    ]
+
+    print(f"{'méthode':<34} {'messages/s':>12} {'résolus':>8}")
+    for name, (elapsed, results) in runs:
+        resolved = sum(1 for result in results if result)
+        print(f"{name:<34} {len(messages) / elapsed:>12.0f} {resolved / len(messages):>7.0%}")
+
+    print()
+    reference = datetime(2025, 10, 15, 9, 0)
+    print(f"Exemples (reçu le mercredi {reference:%d/%m/%Y à %Hh%M}) :")
+    for template in _EXPRESSIONS:
+        expr = template.format(d=3, h=14, h2=16, h12=2, h12b=4)
+        match = temporal.upcoming(expr, reference)
+        print(f"  {expr:<28} -> {format_match(match) if match else '—'}")
+
+
+if __name__ == "__main__":
+    main()
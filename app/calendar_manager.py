@@ -8,6 +8,9 @@ from datetime import datetime, timedelta
 from typing import List, Optional
 from dataclasses import dataclass
 
+from app.ai.keyword_matcher import shared_matcher
+from app.utils.temporal_parser import shared_parser
+
 logger = logging.getLogger(__name__)
 
 @dataclass
@@ -106,68 +109,29 @@ class CalendarManager:
             CalendarEvent si détecté, None sinon
         """
         try:
-            import re
-            
-            # Mots-clés de réunion
-            meeting_keywords = [
-                'réunion', 'meeting', 'rdv', 'rendez-vous', 
-                'zoom', 'teams', 'entretien', 'call', 'visio'
-            ]
-            
-            subject_lower = (email.subject or '').lower()
-            body_lower = (email.body or email.snippet or '').lower()
-            
-            # Vérifier si c'est un email de réunion
-            is_meeting = any(keyword in subject_lower or keyword in body_lower 
-                           for keyword in meeting_keywords)
-            
-            if not is_meeting:
-                return None
-            
-            # Extraire la date/heure (patterns simples)
+            # Vérifier si c'est un email de réunion (un seul parcours du texte)
             text = f"{email.subject} {email.body or email.snippet or ''}"
+            if not shared_matcher().scan(text).has('meeting'):
+                return None
             
-            # Pattern pour dates françaises: "le 15/10/2025 à 14h30"
-            date_pattern = r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})\s*(?:à|a)?\s*(\d{1,2})h?(\d{2})?'
-            date_match = re.search(date_pattern, text)
-            
-            if date_match:
-                date_str, hour, minute = date_match.groups()
-                minute = minute or '00'
-                
-                # Parser la date
-                try:
-                    # Essayer différents formats
-                    for date_format in ['%d/%m/%Y', '%d-%m-%Y', '%d/%m/%y']:
-                        try:
-                            date_obj = datetime.strptime(date_str, date_format)
-                            break
-                        except:
-                            continue
-                    else:
-                        return None
-                    
-                    # Ajouter l'heure
-                    event_time = date_obj.replace(hour=int(hour), minute=int(minute))
-                    
-                    # Créer l'événement
-                    event = CalendarEvent(
-                        id=f"email_{email.id}",
-                        title=email.subject or "Réunion",
-                        start_time=event_time,
-                        end_time=event_time + timedelta(hours=1),  # 1h par défaut
-                        participants=[email.sender],
-                        email_id=email.id
-                    )
-                    
-                    logger.info(f"✅ Réunion extraite: {event.title} le {event_time}")
-                    return event
-                
-                except Exception as e:
-                    logger.error(f"Erreur parsing date: {e}")
-                    return None
+            # Résoudre la date/heure par rapport à la réception de l'email
+            # ("le 15/10/2025 à 14h30", "mardi prochain à 14h", "demain matin"...)
+            reference = email.received_date or datetime.now()
+            match = shared_parser().upcoming(text, reference)
+            if match is None or not match.has_time:
+                return None
             
-            return None
+            event = CalendarEvent(
+                id=f"email_{email.id}",
+                title=email.subject or "Réunion",
+                start_time=match.start,
+                end_time=match.end,
+                participants=[email.sender],
+                email_id=email.id
+            )
+            
+            logger.info(f"✅ Réunion extraite: {event.title} le {event.start_time} ({match.text})")
+            return event
         
         except Exception as e:
             logger.error(f"Erreur extraction réunion: {e}")
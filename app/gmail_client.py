@@ -4,8 +4,12 @@ Client Gmail - VERSION OPTIMISÉE ULTRA-RAPIDE
 """
 import logging
 import os
+import re
 import base64
-from typing import List, Optional
+import queue
+import threading
+import time
+from typing import Dict, List, Optional
 from datetime import datetime
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -22,6 +26,12 @@ from app.models.email_model import Email
 
 logger = logging.getLogger(__name__)
 
+_MESSAGE_ID_RE = re.compile(r"<[^<>\s]+>")
+
+def message_ids(header: str) -> List[str]:
+    """Identifiants « <...> » d'un en-tête References ou In-Reply-To, dans l'ordre."""
+    return _MESSAGE_ID_RE.findall(header or '')
+
 class GmailClient:
     """Client Gmail optimisé."""
     
@@ -36,6 +46,15 @@ class GmailClient:
         self.mock_mode = mock_mode
         self.service = None
         self.authenticated = False
+        self._sync_listeners = []
+        self._sync_queue: "queue.Queue" = queue.Queue()
+        self._sync_worker = None
+        self._sync_lock = threading.Lock()
+        self._creds = None
+        self._local = threading.local()
+        self._account_address = None
+        self._background_stop = threading.Event()
+        self._background_thread = None
         
         if not mock_mode:
             self._authenticate()
@@ -60,6 +79,7 @@ class GmailClient:
                 with open('token.json', 'w') as token:
                     token.write(creds.to_json())
             
+            self._creds = creds
             self.service = build('gmail', 'v1', credentials=creds)
             self.authenticated = True
             logger.info("✅ Gmail authentifié")
@@ -68,6 +88,66 @@ class GmailClient:
             logger.error(f"❌ Erreur auth: {e}")
             self.authenticated = False
     
+    def _api(self):
+        """Service Gmail du thread courant (les objets du client Google ne sont pas thread-safe)."""
+        if threading.current_thread() is threading.main_thread() or self._creds is None:
+            return self.service
+        service = getattr(self._local, 'service', None)
+        if service is None:
+            service = build('gmail', 'v1', credentials=self._creds, cache_discovery=False)
+            self._local.service = service
+        return service
+    
+    def get_account_address(self) -> Optional[str]:
+        """Adresse du compte connecté (profil Gmail), en minuscules."""
+        if self.mock_mode or not self.authenticated:
+            return None
+        if self._account_address is None:
+            try:
+                profile = self._api().users().getProfile(userId='me').execute()
+                self._account_address = profile.get('emailAddress', '').lower() or None
+            except Exception as e:
+                logger.error(f"❌ Erreur profil Gmail: {e}")
+        return self._account_address
+    
+    def start_background_sync(self, folders: Dict[str, int], interval: float = 900.0):
+        """
+        Synchronise périodiquement, en arrière-plan, des dossiers jamais affichés
+        automatiquement (SENT, SPAM...) pour que les listeners les indexent.
+        
+        Args:
+            folders: Dossier -> nombre de messages récupérés à chaque passage
+            interval: Secondes entre deux passages (le premier est immédiat)
+        """
+        if self.mock_mode or not self.authenticated or self._background_thread:
+            return
+        
+        def run():
+            while not self._background_stop.is_set():
+                for folder, max_results in folders.items():
+                    if self._background_stop.is_set():
+                        return
+                    self.list_emails(folder=folder, max_results=max_results)
+                self._background_stop.wait(interval)
+        
+        self._background_thread = threading.Thread(target=run, name="gmail-background-sync", daemon=True)
+        self._background_thread.start()
+        logger.info(f"🔄 Synchronisation en arrière-plan: {', '.join(folders)}")
+    
+    def stop_background_sync(self, timeout: float = 5.0):
+        """
+        Arrête la synchronisation en arrière-plan et laisse les listeners
+        finir les lots en attente (avant la fermeture des index).
+        
+        Args:
+            timeout: Attente maximale (secondes)
+        """
+        self._background_stop.set()
+        
+        deadline = time.monotonic() + timeout
+        while self._sync_queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.05)
+    
     def list_emails(self, folder: str = "INBOX", max_results: int = 50) -> List[Email]:
         """Liste emails - RAPIDE."""
         if self.mock_mode or not self.authenticated:
@@ -85,7 +165,7 @@ class GmailClient:
             
             label_id = label_map.get(folder, folder)
             
-            results = self.service.users().messages().list(
+            results = self._api().users().messages().list(
                 userId='me',
                 labelIds=[label_id],
                 maxResults=max_results
@@ -103,20 +183,59 @@ class GmailClient:
                     pass
             
             logger.info(f"📧 {len(emails)} emails de {folder}")
+            self._notify_sync(emails)
             return emails
         
         except Exception as e:
             logger.error(f"❌ Erreur: {e}")
             return []
     
+    def add_sync_listener(self, callback):
+        """
+        Enregistre un callback appelé avec chaque lot d'emails synchronisés.
+        
+        Args:
+            callback: Fonction prenant une liste d'emails
+        """
+        self._sync_listeners.append(callback)
+    
+    def _notify_sync(self, emails: List[Email]):
+        """
+        Notifie les listeners de synchronisation dans un thread dédié : les
+        index ne ralentissent ni l'interface ni la synchronisation, et
+        reçoivent les lots un par un, dans l'ordre.
+        """
+        if not self._sync_listeners or not emails:
+            return
+        
+        self._sync_queue.put(emails)
+        
+        # Appelé depuis l'interface et depuis la synchronisation en arrière-plan
+        with self._sync_lock:
+            if self._sync_worker is None or not self._sync_worker.is_alive():
+                self._sync_worker = threading.Thread(target=self._run_sync_listeners, name="gmail-sync-listeners",
+                                                     daemon=True)
+                self._sync_worker.start()
+    
+    def _run_sync_listeners(self):
+        """Consomme la file des lots synchronisés."""
+        while True:
+            emails = self._sync_queue.get()
+            for callback in self._sync_listeners:
+                try:
+                    callback(emails)
+                except Exception as e:
+                    logger.error(f"❌ Erreur listener synchronisation: {e}")
+            self._sync_queue.task_done()
+    
     def _parse_light(self, message_id: str) -> Optional[Email]:
         """Parse léger - RAPIDE."""
         try:
-            message = self.service.users().messages().get(
+            message = self._api().users().messages().get(
                 userId='me',
                 id=message_id,
                 format='metadata',
-                metadataHeaders=['From', 'To', 'Subject', 'Date']
+                metadataHeaders=['From', 'To', 'Subject', 'Date', 'Message-ID', 'In-Reply-To', 'References']
             ).execute()
             
             headers = message.get('payload', {}).get('headers', [])
@@ -129,7 +248,9 @@ class GmailClient:
                 subject=self._get_header(headers, 'Subject'),
                 snippet=message.get('snippet', ''),
                 received_date=self._parse_date(self._get_header(headers, 'Date')),
-                read='UNREAD' not in message.get('labelIds', [])
+                read='UNREAD' not in message.get('labelIds', []),
+                labels=message.get('labelIds', []),
+                **self._threading_headers(headers)
             )
             
             return email
@@ -143,7 +264,7 @@ class GmailClient:
             return None
         
         try:
-            message = self.service.users().messages().get(
+            message = self._api().users().messages().get(
                 userId='me',
                 id=message_id,
                 format='full'
@@ -161,7 +282,9 @@ class GmailClient:
                 snippet=message.get('snippet', ''),
                 body=self._extract_body(payload),
                 received_date=self._parse_date(self._get_header(headers, 'Date')),
-                read='UNREAD' not in message.get('labelIds', [])
+                read='UNREAD' not in message.get('labelIds', []),
+                labels=message.get('labelIds', []),
+                **self._threading_headers(headers)
             )
             
             return email
@@ -190,6 +313,15 @@ class GmailClient:
         except:
             return ""
     
+    def _threading_headers(self, headers: list) -> dict:
+        """En-têtes de fil de conversation (Message-ID, In-Reply-To, References)."""
+        in_reply_to = message_ids(self._get_header(headers, 'In-Reply-To'))
+        return {
+            'message_id': self._get_header(headers, 'Message-ID').strip(),
+            'in_reply_to': in_reply_to[0] if in_reply_to else '',
+            'references': message_ids(self._get_header(headers, 'References'))
+        }
+    
     def _get_header(self, headers: list, name: str) -> str:
         """Header."""
         for h in headers:
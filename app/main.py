@@ -29,6 +29,36 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
+# Configuration Ollama
+OLLAMA_URL = "http://localhost:11434"
+# Serveurs Ollama supplémentaires, séparés par des virgules (ex: "http://gpu1:11434,http://gpu2:11434")
+OLLAMA_HOSTS = [OLLAMA_URL] + [
+    url.strip() for url in os.environ.get("OLLAMA_HOSTS", "").split(",")
+    if url.strip() and url.strip().rstrip('/') != OLLAMA_URL
+]
+OLLAMA_MODEL = "nchapman/ministral-8b-instruct-2410:8b"
+OLLAMA_KEEP_ALIVE = os.environ.get("OLLAMA_KEEP_ALIVE", "30m")
+OLLAMA_EMBEDDING_MODEL = "nomic-embed-text"
+OLLAMA_SECONDARY_MODELS = {OLLAMA_EMBEDDING_MODEL: "embed"}
+
+def export_ollama_telemetry(ollama_client):
+    """Journalise et exporte les mesures de performance Ollama."""
+    try:
+        telemetry = ollama_client.telemetry
+        if not len(telemetry):
+            return
+        
+        for feature, stats in telemetry.summary_by_feature().items():
+            logger.info(
+                f"📊 {feature}: {stats['requests']} requêtes, {stats['tokens_per_second']:.1f} tokens/s, "
+                f"TTFT p50 {stats['ttft_p50_ms']:.0f} ms / p95 {stats['ttft_p95_ms']:.0f} ms, "
+                f"chargement p99 {stats['load_p99_ms']:.0f} ms"
+            )
+        
+        telemetry.export_jsonl(str(log_dir / f"ollama_telemetry_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"))
+    except Exception as e:
+        logger.error(f"Erreur export télémétrie Ollama: {e}")
+
 def cleanup_ollama():
     """Nettoyage Ollama à la sortie."""
     try:
@@ -47,7 +77,12 @@ def main():
         print("=" * 60)
         
         from ollama_manager import OllamaManager
-        ollama_manager = OllamaManager()
+        ollama_manager = OllamaManager(
+            base_url=OLLAMA_URL,
+            model_name=OLLAMA_MODEL,
+            keep_alive=OLLAMA_KEEP_ALIVE,
+            secondary_models=OLLAMA_SECONDARY_MODELS
+        )
         
         if not ollama_manager.ensure_running():
             logger.warning("⚠️ Ollama non disponible")
@@ -67,6 +102,10 @@ def main():
             print(f"   🤖 Modèle: {status['model_name']}")
             if status.get('available_models'):
                 print(f"   📚 Modèles: {', '.join(status['available_models'][:3])}")
+            
+            # Préchargement en arrière-plan pendant l'initialisation de l'interface
+            ollama_manager.preload_async()
+            print(f"   🔥 Préchargement du modèle (keep_alive={OLLAMA_KEEP_ALIVE})")
         
         # === ÉTAPE 2: INTERFACE QT ===
         print("\n" + "=" * 60)
@@ -164,18 +203,116 @@ def main():
         
         # Initialiser le client Ollama
         ollama_client = OllamaClient(
-            base_url="http://localhost:11434",
-            model="nchapman/ministral-8b-instruct-2410:8b"
+            base_url=OLLAMA_HOSTS,
+            model=OLLAMA_MODEL,
+            keep_alive=OLLAMA_KEEP_ALIVE,
+            embedding_model=OLLAMA_EMBEDDING_MODEL
         )
         
+        # Classificateur par embeddings (évite la génération pour les cas connus)
+        embedding_classifier = None
+        try:
+            from app.ai.embedding_classifier import EmbeddingClassifier
+            embedding_classifier = EmbeddingClassifier(ollama_client)
+            embedding_classifier.seed_from_corrections()
+        except Exception as e:
+            logger.warning(f"⚠️ Classificateur par embeddings indisponible: {e}")
+        
+        # Recherche sémantique, indexée à chaque synchronisation Gmail
+        semantic_search = None
+        try:
+            from app.ai.semantic_search import SemanticSearch
+            semantic_search = SemanticSearch(ollama_client)
+            gmail_client.add_sync_listener(semantic_search.index_async)
+        except Exception as e:
+            logger.warning(f"⚠️ Recherche sémantique indisponible: {e}")
+        
+        # Adresse du compte : nos messages sont reconnus même sans le label SENT
+        account_address = gmail_client.get_account_address()
+        
+        # Statistiques par expéditeur, mises à jour à chaque synchronisation Gmail
+        sender_index = None
+        try:
+            from app.ai.sender_index import get_sender_index
+            sender_index = get_sender_index(own_addresses=[account_address])
+            gmail_client.add_sync_listener(sender_index.add_emails)
+        except Exception as e:
+            logger.warning(f"⚠️ Index des expéditeurs indisponible: {e}")
+        
+        # Filtre anti-spam, appris des labels SPAM/INBOX à chaque synchronisation Gmail
+        spam_filter = None
+        try:
+            from app.ai.spam_filter import get_spam_filter
+            spam_filter = get_spam_filter()
+            gmail_client.add_sync_listener(spam_filter.observe)
+        except Exception as e:
+            logger.warning(f"⚠️ Filtre anti-spam indisponible: {e}")
+        
+        # Fils de conversation (Message-ID, In-Reply-To, References), mis à jour à chaque synchronisation Gmail
+        thread_index = None
+        try:
+            from app.ai.thread_index import get_thread_index
+            thread_index = get_thread_index(own_addresses=[account_address])
+            gmail_client.add_sync_listener(thread_index.add_emails)
+        except Exception as e:
+            logger.warning(f"⚠️ Index des fils de conversation indisponible: {e}")
+        
+        # Analyses enregistrées entre les sessions
+        analysis_store = None
+        try:
+            from app.ai.analysis_store import get_analysis_store
+            analysis_store = get_analysis_store()
+        except Exception as e:
+            logger.warning(f"⚠️ Stockage des analyses indisponible: {e}")
+        
+        # Groupes de messages similaires (newsletters, notifications), analysés une seule fois
+        near_duplicates = None
+        try:
+            from app.ai.near_duplicates import shared_near_duplicates
+            near_duplicates = shared_near_duplicates()
+            gmail_client.add_sync_listener(near_duplicates.add_emails)
+        except Exception as e:
+            logger.warning(f"⚠️ Regroupement des messages similaires indisponible: {e}")
+        
+        # Index TF-IDF des mots-clés, mis à jour à chaque synchronisation Gmail
+        try:
+            from app.ai.keyword_index import get_keyword_index
+            gmail_client.add_sync_listener(get_keyword_index().add_emails)
+        except Exception as e:
+            logger.warning(f"⚠️ Index de mots-clés indisponible: {e}")
+        
+        # Les messages envoyés et les spams ne sont jamais listés par l'interface : les
+        # synchroniser en arrière-plan pour que les index voient nos réponses et que
+        # le filtre anti-spam apprenne sans attendre l'ouverture du dossier Spam
+        gmail_client.start_background_sync({'SENT': 100, 'SPAM': 100})
+        
         # Initialiser AIProcessor avec le client
-        ai_processor = AIProcessor(ollama_client=ollama_client)
+        ai_processor = AIProcessor(
+            ollama_client=ollama_client,
+            embedding_classifier=embedding_classifier,
+            sender_index=sender_index,
+            spam_filter=spam_filter,
+            near_duplicates=near_duplicates,
+            analysis_store=analysis_store
+        )
+        
+        # Cascade: règles, puis embeddings, puis génération
+        try:
+            from app.ai.classification_cascade import ClassificationCascade
+            ai_processor.set_cascade(ClassificationCascade(ai_processor))
+        except Exception as e:
+            logger.warning(f"⚠️ Cascade de classification indisponible: {e}")
+        
+        # Précalcul des résumés et suggestions pendant l'inactivité du modèle
+        from app.ai.speculative_precompute import SpeculativePrecomputer
+        ai_processor.set_precomputer(SpeculativePrecomputer(ai_processor, fetch_email=gmail_client.get_email))
         
         # Initialiser les autres services
         calendar_manager = CalendarManager()
         auto_responder = AutoResponder(
             gmail_client=gmail_client,
-            ai_processor=ai_processor
+            ai_processor=ai_processor,
+            thread_index=thread_index
         )
         
         print("✅ Services IA chargés!")
@@ -194,7 +331,9 @@ def main():
             gmail_client=gmail_client,
             ai_processor=ai_processor,
             calendar_manager=calendar_manager,
-            auto_responder=auto_responder
+            auto_responder=auto_responder,
+            ollama_manager=ollama_manager,
+            semantic_search=semantic_search
         )
         
         main_window.show()
@@ -206,6 +345,28 @@ def main():
         
         # Nettoyage
         logger.info("👋 Fermeture de l'application...")
+        gmail_client.stop_background_sync()
+        if embedding_classifier:
+            embedding_classifier.save()
+        if ai_processor.cascade:
+            ai_processor.cascade.smart_classifier.online_model.save()
+            ai_processor.cascade.calibrator.save()
+        from app.ai.classifier_store import close_stores
+        from app.ai.keyword_index import close_keyword_indexes
+        from app.ai.sender_index import close_sender_indexes
+        from app.ai.spam_filter import save_spam_filters
+        from app.ai.thread_index import close_thread_indexes
+        from app.ai.analysis_store import close_analysis_stores
+        close_stores()
+        close_keyword_indexes()
+        close_sender_indexes()
+        save_spam_filters()
+        close_thread_indexes()
+        close_analysis_stores()
+        if semantic_search:
+            semantic_search.close()
+        ai_processor.set_precomputer(None)
+        export_ollama_telemetry(ollama_client)
         cleanup_ollama()
         
         sys.exit(exit_code)
@@ -1,31 +1,99 @@
 """
 Modèles d'IA pour l'analyse et le traitement des emails.
+
+numpy, scikit-learn et transformers ne sont importés qu'au premier usage :
+importer ce module ne charge aucune dépendance lourde.
 """
 import logging
-from typing import List, Dict, Any, Optional
-import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.cluster import KMeans
-from sklearn.ensemble import RandomForestClassifier
-from transformers import pipeline
+import threading
+from itertools import islice
+from typing import Iterable, List, Dict, Any, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Pipelines Hugging Face partagés par tout le processus
+_pipelines: Dict[Tuple[str, Optional[str]], Any] = {}
+_pipelines_lock = threading.Lock()
+
+def get_pipeline(task: str, model: Optional[str] = None):
+    """
+    Pipeline Hugging Face construit une seule fois par processus.
+    
+    Args:
+        task: Tâche (sentiment-analysis, text-generation...)
+        model: Modèle (celui par défaut de la tâche si None)
+        
+    Returns:
+        Le pipeline partagé
+    """
+    key = (task, model)
+    with _pipelines_lock:
+        if key not in _pipelines:
+            from transformers import pipeline
+            
+            _pipelines[key] = pipeline(task, model=model) if model else pipeline(task)
+            logger.info(f"Pipeline {task} chargé{f' ({model})' if model else ''}.")
+        return _pipelines[key]
+
+def loaded_pipelines() -> List[Tuple[str, Optional[str]]]:
+    """Pipelines actuellement chargés (tâche, modèle)."""
+    with _pipelines_lock:
+        return list(_pipelines)
+
+def release_pipelines():
+    """Libère tous les pipelines chargés."""
+    with _pipelines_lock:
+        _pipelines.clear()
+
+
+def _batches(items: Iterable, size: int):
+    """Découpe un itérable en listes de taille size."""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+class LazyPipeline:
+    """Pipeline chargé au premier usage via le registre partagé."""
+    
+    def __init__(self, task: str, model: Optional[str] = None):
+        self.task = task
+        self.model = model
+        self._pipeline = None
+        self._failed = False
+    
+    @property
+    def loaded(self) -> bool:
+        return self._pipeline is not None
+    
+    def get(self):
+        """
+        Charge le pipeline si nécessaire.
+        
+        Returns:
+            Le pipeline, ou None si son chargement a échoué (pas de nouvelle tentative)
+        """
+        if self._pipeline is None and not self._failed:
+            try:
+                self._pipeline = get_pipeline(self.task, self.model)
+            except Exception as e:
+                self._failed = True
+                logger.error(f"Erreur lors du chargement du pipeline {self.task}: {e}")
+        return self._pipeline
+
 class EmailClassifier:
     """Classe pour la classification des emails."""
     
     def __init__(self):
-        """Initialise le classificateur d'emails."""
-        self.vectorizer = TfidfVectorizer(stop_words='english')
+        """Initialise le classificateur d'emails (les modèles sont chargés au premier usage)."""
+        self.vectorizer = None
         self.model = None
-        self.sentiment_analyzer = None
+        self.is_clustering = False
+        self.sentiment_analyzer = LazyPipeline('sentiment-analysis')
         self.category_mapping = {}
-        
-        try:
-            self.sentiment_analyzer = pipeline('sentiment-analysis')
-            logger.info("Analyseur de sentiment initialisé avec succès.")
-        except Exception as e:
-            logger.error(f"Erreur lors de l'initialisation de l'analyseur de sentiment: {e}")
     
     def train(self, texts: List[str], labels: List[str] = None):
         """
@@ -36,16 +104,25 @@ class EmailClassifier:
             labels: Liste des étiquettes correspondantes (si disponibles).
         """
         try:
+            import numpy as np
+            from sklearn.feature_extraction.text import TfidfVectorizer
+            
             # Vectoriser les textes
+            self.vectorizer = TfidfVectorizer(stop_words='english')
             X = self.vectorizer.fit_transform(texts)
             
             if labels is None:
+                from sklearn.cluster import KMeans
+                
                 # Si pas d'étiquettes, utiliser un clustering non supervisé
                 n_clusters = min(10, len(texts))
                 self.model = KMeans(n_clusters=n_clusters, random_state=42)
                 self.model.fit(X)
+                self.is_clustering = True
                 logger.info(f"Modèle de clustering entraîné avec {n_clusters} clusters.")
             else:
+                from sklearn.ensemble import RandomForestClassifier
+                
                 # Si des étiquettes sont disponibles, utiliser un classificateur supervisé
                 unique_labels = list(set(labels))
                 self.category_mapping = {i: label for i, label in enumerate(unique_labels)}
@@ -56,11 +133,82 @@ class EmailClassifier:
                 # Entraîner un classificateur Random Forest
                 self.model = RandomForestClassifier(n_estimators=100, random_state=42)
                 self.model.fit(X, y)
+                self.is_clustering = False
                 logger.info(f"Classificateur supervisé entraîné avec {len(unique_labels)} catégories.")
         
         except Exception as e:
             logger.error(f"Erreur lors de l'entraînement du modèle: {e}")
     
+    def train_stream(self, samples: Iterable, classes: Optional[List[str]] = None,
+                     batch_size: int = 500, n_clusters: int = 10) -> int:
+        """
+        Entraîne le modèle par mini-lots, sans garder le corpus en mémoire.
+        
+        Le vectoriseur par hachage est sans état : chaque lot est vectorisé
+        indépendamment puis transmis au modèle incrémental (partial_fit).
+        
+        Args:
+            samples: Itérable de (texte, étiquette), ou de textes seuls pour un
+                clustering non supervisé (par ex. un générateur sur la boîte mail)
+            classes: Étiquettes possibles (celles du premier lot si None ; les
+                étiquettes inconnues des lots suivants sont ignorées)
+            batch_size: Taille des mini-lots
+            n_clusters: Nombre de clusters en mode non supervisé
+            
+        Returns:
+            Nombre de textes appris
+        """
+        try:
+            from sklearn.feature_extraction.text import HashingVectorizer
+            
+            self.vectorizer = HashingVectorizer(stop_words='english', alternate_sign=False, norm='l2')
+            self.model = None
+            self.category_mapping = {}
+            label_index = {}
+            learned = 0
+            skipped = 0
+            
+            for batch in _batches(samples, batch_size):
+                supervised = isinstance(batch[0], (tuple, list))
+                
+                if self.model is None:
+                    self.is_clustering = not supervised
+                    if supervised:
+                        from sklearn.linear_model import SGDClassifier
+                        
+                        labels = classes or sorted({label for _, label in batch})
+                        label_index = {label: i for i, label in enumerate(labels)}
+                        self.category_mapping = {i: label for label, i in label_index.items()}
+                        self.model = SGDClassifier(loss='log_loss', alpha=1e-5, random_state=42)
+                    else:
+                        from sklearn.cluster import MiniBatchKMeans
+                        
+                        self.model = MiniBatchKMeans(n_clusters=min(n_clusters, len(batch)), random_state=42)
+                
+                if self.is_clustering:
+                    self.model.partial_fit(self.vectorizer.transform(batch))
+                    learned += len(batch)
+                    continue
+                
+                known = [(text, label_index[label]) for text, label in batch if label in label_index]
+                skipped += len(batch) - len(known)
+                if not known:
+                    continue
+                
+                texts, y = zip(*known)
+                self.model.partial_fit(self.vectorizer.transform(texts), list(y),
+                                       classes=list(range(len(label_index))))
+                learned += len(known)
+            
+            if skipped:
+                logger.warning(f"{skipped} textes ignorés (étiquettes hors de la liste des classes).")
+            logger.info(f"Modèle entraîné par lots sur {learned} textes.")
+            return learned
+        
+        except Exception as e:
+            logger.error(f"Erreur lors de l'entraînement par lots: {e}")
+            return 0
+    
     def predict(self, text: str) -> Dict[str, Any]:
         """
         Prédit la catégorie d'un email.
@@ -71,32 +219,56 @@ class EmailClassifier:
         Returns:
             Dictionnaire contenant la catégorie prédite et d'autres informations.
         """
+        return self.predict_batch([text])[0]
+    
+    def predict_batch(self, texts: List[str]) -> List[Dict[str, Any]]:
+        """
+        Prédit la catégorie de plusieurs emails en une seule opération.
+        
+        Args:
+            texts: Les textes des emails à classifier.
+            
+        Returns:
+            Pour chaque texte, dictionnaire contenant la catégorie prédite et la confiance.
+        """
         if self.model is None:
             logger.warning("Le modèle n'a pas été entraîné. Impossible de faire une prédiction.")
-            return {"category": "unknown", "confidence": 0.0}
+            return [{"category": "unknown", "confidence": 0.0} for _ in texts]
+        
+        if not texts:
+            return []
         
         try:
-            # Vectoriser le texte
-            X = self.vectorizer.transform([text])
+            import numpy as np
+            
+            # Vectoriser les textes
+            X = self.vectorizer.transform(texts)
             
             # Faire la prédiction
-            if isinstance(self.model, KMeans):
+            if self.is_clustering:
                 # Pour le clustering non supervisé
-                cluster = self.model.predict(X)[0]
-                return {"category": f"cluster_{cluster}", "confidence": 1.0}
-            else:
-                # Pour la classification supervisée
-                proba = self.model.predict_proba(X)[0]
-                category_idx = np.argmax(proba)
-                confidence = proba[category_idx]
-                
-                category = self.category_mapping.get(category_idx, f"category_{category_idx}")
-                
-                return {"category": category, "confidence": float(confidence)}
+                return [
+                    {"category": f"cluster_{cluster}", "confidence": 1.0}
+                    for cluster in self.model.predict(X)
+                ]
+            
+            # Pour la classification supervisée
+            proba = self.model.predict_proba(X)
+            indices = proba.argmax(axis=1)
+            confidences = proba[np.arange(len(indices)), indices]
+            classes = self.model.classes_
+            
+            return [
+                {
+                    "category": self.category_mapping.get(int(classes[idx]), f"category_{classes[idx]}"),
+                    "confidence": float(confidence)
+                }
+                for idx, confidence in zip(indices, confidences)
+            ]
         
         except Exception as e:
             logger.error(f"Erreur lors de la prédiction: {e}")
-            return {"category": "error", "confidence": 0.0}
+            return [{"category": "error", "confidence": 0.0} for _ in texts]
     
     def analyze_sentiment(self, text: str) -> Dict[str, Any]:
         """
@@ -108,7 +280,8 @@ class EmailClassifier:
         Returns:
             Dictionnaire contenant le sentiment et le score.
         """
-        if self.sentiment_analyzer is None:
+        analyzer = self.sentiment_analyzer.get()
+        if analyzer is None:
             logger.warning("Analyseur de sentiment non initialisé.")
             return {"sentiment": "unknown", "score": 0.0}
         
@@ -117,7 +290,7 @@ class EmailClassifier:
             if len(text) > 512:
                 text = text[:512]
             
-            result = self.sentiment_analyzer(text)[0]
+            result = analyzer(text)[0]
             
             return {
                 "sentiment": result["label"],
@@ -139,13 +312,7 @@ class ResponseGenerator:
         Args:
             model_name: Nom du modèle Hugging Face à utiliser.
         """
-        self.generator = None
-        
-        try:
-            self.generator = pipeline('text-generation', model=model_name)
-            logger.info(f"Générateur de texte initialisé avec le modèle {model_name}.")
-        except Exception as e:
-            logger.error(f"Erreur lors de l'initialisation du générateur de texte: {e}")
+        self.generator = LazyPipeline('text-generation', model=model_name)
     
     def generate_response(self, prompt: str, max_length: int = 150) -> str:
         """
@@ -158,13 +325,14 @@ class ResponseGenerator:
         Returns:
             La réponse générée.
         """
-        if self.generator is None:
+        generator = self.generator.get()
+        if generator is None:
             logger.warning("Générateur de texte non initialisé.")
             return ""
         
         try:
             # Générer la réponse
-            result = self.generator(prompt, max_length=max_length, num_return_sequences=1)
+            result = generator(prompt, max_length=max_length, num_return_sequences=1)
             
             # Extraire le texte généré
             generated_text = result[0]["generated_text"]
@@ -24,6 +24,9 @@ class Email:
         attachments: Liste des pièces jointes
         labels: Labels Gmail associés
         ai_analysis: Résultat de l'analyse IA
+        message_id: En-tête Message-ID
+        in_reply_to: En-tête In-Reply-To (Message-ID du message auquel il répond)
+        references: Message-ID de l'en-tête References, du plus ancien au plus récent
     """
     
     id: str
@@ -38,6 +41,9 @@ class Email:
     attachments: List[Dict] = field(default_factory=list)
     labels: List[str] = field(default_factory=list)
     ai_analysis: Optional[Dict] = None
+    message_id: str = ""
+    in_reply_to: str = ""
+    references: List[str] = field(default_factory=list)
     
     def __str__(self) -> str:
         """Représentation textuelle de l'email."""
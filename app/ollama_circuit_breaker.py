@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Disjoncteur pour les requêtes Ollama.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+class CircuitBreaker:
+    """
+    Coupe les requêtes vers un modèle défaillant.
+
+    Fermé : les requêtes passent et leurs résultats sont suivis sur une
+    fenêtre glissante (une réponse plus lente que le délai admis pour sa
+    taille compte comme un échec, voir slow_threshold). Ouvert : les requêtes échouent immédiatement, ce qui
+    laisse les appelants passer directement à leurs solutions de repli.
+    Semi-ouvert : après reset_timeout, une seule requête de test passe ; son
+    succès referme le circuit, son échec le rouvre pour une durée doublée.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 3, failure_rate: float = 0.5,
+                 window: int = 10, min_calls: int = 5, slow_call_threshold: float = 20.0,
+                 slow_call_per_token: float = 0.25, slow_call_per_prompt_token: float = 0.05,
+                 slow_call_timeout_ratio: float = 0.8, reset_timeout: float = 30.0,
+                 max_reset_timeout: float = 300.0):
+        """
+        Initialise le disjoncteur.
+
+        Args:
+            name: Nom affiché dans les logs (modèle protégé)
+            failure_threshold: Échecs consécutifs ouvrant le circuit
+            failure_rate: Taux d'échec sur la fenêtre ouvrant le circuit
+            window: Nombre de requêtes de la fenêtre glissante
+            min_calls: Requêtes minimales avant d'appliquer le taux d'échec
+            slow_call_threshold: Durée fixe (secondes) admise pour une réponse, hors tokens
+            slow_call_per_token: Durée admise par token généré (0.25 s = 4 tokens/s, un CPU lent)
+            slow_call_per_prompt_token: Durée admise par token du prompt évalué
+            slow_call_timeout_ratio: Part du timeout de la requête au-delà de laquelle
+                une réponse est lente, quelle que soit sa taille
+            reset_timeout: Durée d'ouverture avant la première requête de test
+            max_reset_timeout: Durée d'ouverture maximale après des tests échoués
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.slow_call_threshold = slow_call_threshold
+        self.slow_call_per_token = slow_call_per_token
+        self.slow_call_per_prompt_token = slow_call_per_prompt_token
+        self.slow_call_timeout_ratio = slow_call_timeout_ratio
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+
+        self._state = self.CLOSED
+        self._outcomes = deque(maxlen=window)
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._open_duration = reset_timeout
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """État courant (passe à semi-ouvert une fois le délai écoulé)."""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self._open_duration:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        """
+        Autorise ou refuse une requête.
+
+        Returns:
+            True si la requête peut partir (elle doit ensuite être déclarée
+            par record_success, record_failure ou record_cancel)
+        """
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                logger.info(f"🔌 Disjoncteur {self.name}: requête de test")
+                return True
+            return False
+
+    def slow_threshold(self, tokens: int = 0, prompt_tokens: int = 0, timeout: Optional[float] = None) -> float:
+        """
+        Durée au-delà de laquelle une réponse compte comme un échec.
+
+        Le délai suit la taille de la requête : une longue génération sur un
+        serveur CPU sain ne doit pas ouvrir le circuit, une réponse courte
+        anormalement lente si. Il reste sous le timeout de la requête, sans
+        quoi une réponse lente échouerait par timeout avant d'être repérée.
+
+        Args:
+            tokens: Tokens générés (ou demandés)
+            prompt_tokens: Tokens du prompt évalués
+            timeout: Timeout de la requête (secondes)
+        """
+        threshold = (self.slow_call_threshold + tokens * self.slow_call_per_token
+                     + prompt_tokens * self.slow_call_per_prompt_token)
+        if timeout:
+            threshold = min(threshold, timeout * self.slow_call_timeout_ratio)
+        return threshold
+
+    def record_success(self, latency: float, tokens: int = 0, prompt_tokens: int = 0,
+                       timeout: Optional[float] = None):
+        """
+        Déclare une requête réussie.
+
+        Args:
+            latency: Durée de la requête (hors chargement du modèle)
+            tokens: Tokens générés (ou demandés)
+            prompt_tokens: Tokens du prompt évalués
+            timeout: Timeout de la requête (secondes)
+        """
+        threshold = self.slow_threshold(tokens, prompt_tokens, timeout)
+        if latency > threshold:
+            logger.warning(f"🐢 Réponse lente de {self.name}: {latency:.1f}s "
+                           f"(> {threshold:.0f}s pour {tokens} tokens)")
+            self.record_failure()
+            return
+
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"✅ Disjoncteur {self.name} refermé")
+            self._state = self.CLOSED
+            self._outcomes.append(True)
+            self._consecutive_failures = 0
+            self._open_duration = self.reset_timeout
+            self._probe_in_flight = False
+
+    def record_failure(self):
+        """Déclare une requête échouée (erreur, timeout ou réponse trop lente)."""
+        with self._lock:
+            self._outcomes.append(False)
+            self._consecutive_failures += 1
+
+            if self._state == self.HALF_OPEN:
+                self._open_duration = min(self._open_duration * 2, self.max_reset_timeout)
+                self._open()
+                return
+
+            failures = self._outcomes.count(False)
+            if self._state == self.CLOSED and (
+                self._consecutive_failures >= self.failure_threshold
+                or (len(self._outcomes) >= self.min_calls and failures / len(self._outcomes) >= self.failure_rate)
+            ):
+                self._open()
+
+    def record_cancel(self):
+        """Déclare une requête abandonnée par l'appelant (sans effet sur l'état)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def retry_in(self) -> float:
+        """Secondes avant la prochaine requête de test (0 si le circuit n'est pas ouvert)."""
+        with self._lock:
+            if self._current_state() != self.OPEN:
+                return 0.0
+            return max(0.0, self._open_duration - (time.monotonic() - self._opened_at))
+
+    def get_status(self) -> Dict:
+        """
+        État du disjoncteur.
+
+        Returns:
+            {state, retry_in, consecutive_failures, failure_rate}
+        """
+        retry_in = self.retry_in()
+        with self._lock:
+            outcomes = len(self._outcomes)
+            return {
+                'state': self._current_state(),
+                'retry_in': retry_in,
+                'consecutive_failures': self._consecutive_failures,
+                'failure_rate': self._outcomes.count(False) / outcomes if outcomes else 0.0
+            }
+
+    def _open(self):
+        """Ouvre le circuit (verrou déjà pris)."""
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probe_in_flight = False
+        logger.warning(
+            f"⚡ Disjoncteur {self.name} ouvert pour {self._open_duration:.0f}s "
+            f"({self._consecutive_failures} échecs consécutifs)"
+        )
@@ -2,38 +2,209 @@
 """
 Client Ollama pour génération de texte.
 """
+import json
 import logging
+import time
 import requests
-from typing import Optional
+import threading
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from app.ollama_circuit_breaker import CircuitBreaker
+from app.ollama_pool import OllamaPool
+from app.ollama_telemetry import OllamaTelemetry
 
 logger = logging.getLogger(__name__)
 
 class OllamaClient:
-    """Client pour interagir avec Ollama."""
+    """Client pour interagir avec Ollama (un ou plusieurs serveurs)."""
     
-    def __init__(self, base_url: str = "http://localhost:11434", model: str = "nchapman/ministral-8b-instruct-2410:8b"):
+    def __init__(self, base_url: Union[str, List[str]] = "http://localhost:11434",
+                 model: str = "nchapman/ministral-8b-instruct-2410:8b",
+                 keep_alive: Optional[str] = None, embedding_model: str = "nomic-embed-text",
+                 telemetry: Optional[OllamaTelemetry] = None):
         """
         Initialise le client Ollama.
         
         Args:
-            base_url: URL de base du serveur Ollama
+            base_url: URL du serveur Ollama, ou liste d'URLs pour répartir la charge
             model: Nom du modèle à utiliser
+            keep_alive: Durée de maintien du modèle en mémoire après chaque requête
+            embedding_model: Modèle utilisé pour les embeddings
+            telemetry: Collecte des mesures de performance (créée si None)
         """
-        self.base_url = base_url.rstrip('/')
+        urls = [base_url] if isinstance(base_url, str) else list(base_url)
+        self.pool = OllamaPool(urls)
+        self.base_url = self.pool.endpoints[0].url
         self.model = model
-        self.generate_url = f"{self.base_url}/api/generate"
+        self.keep_alive = keep_alive
+        self.embedding_model = embedding_model
+        self.telemetry = telemetry or OllamaTelemetry()
+        
+        # Un disjoncteur par modèle : un modèle d'embedding absent ne coupe pas la génération
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._breakers_lock = threading.Lock()
         
         # Tester la connexion
+        healthy = self.pool.check_health()
+        if healthy:
+            logger.info(f"✅ Ollama connecté ({healthy}/{len(self.pool)} serveurs)")
+        else:
+            logger.error("❌ Impossible de se connecter à Ollama")
+        
+        self.pool.start_health_checks()
+    
+    def concurrency(self) -> int:
+        """Nombre de requêtes pouvant être traitées en parallèle (serveurs sains)."""
+        return max(1, self.pool.healthy_count())
+    
+    def breaker(self, model: Optional[str] = None) -> CircuitBreaker:
+        """
+        Disjoncteur d'un modèle.
+        
+        Args:
+            model: Modèle (modèle de génération si None)
+            
+        Returns:
+            Le disjoncteur, créé au premier appel
+        """
+        model = model or self.model
+        with self._breakers_lock:
+            if model not in self.breakers:
+                self.breakers[model] = CircuitBreaker(model)
+            return self.breakers[model]
+    
+    def can_send(self, model: Optional[str] = None) -> bool:
+        """
+        Le modèle peut recevoir des requêtes (disjoncteur non ouvert).
+        
+        Args:
+            model: Modèle (modèle de génération si None)
+        """
+        return self.breaker(model).state != CircuitBreaker.OPEN
+    
+    def _post(self, path: str, payload: dict, timeout: float, feature: Optional[str] = None,
+              cancel: Optional[Callable[[], bool]] = None) -> Optional[dict]:
+        """
+        Envoie une requête via le disjoncteur du modèle.
+        
+        Args:
+            path: Chemin de l'API (/api/generate...)
+            payload: Corps JSON (doit contenir "model")
+            timeout: Timeout de la requête
+            feature: Fonctionnalité appelante (mesures enregistrées si fournie)
+            cancel: Si fourni, la réponse est lue en streaming et abandonnée dès
+                que cette fonction renvoie True
+            
+        Returns:
+            La réponse JSON, ou None en cas d'échec, d'interruption ou de circuit ouvert
+        """
+        breaker = self.breaker(payload["model"])
+        if not breaker.allow_request():
+            logger.debug(f"Circuit ouvert pour {payload['model']}, requête ignorée")
+            return None
+        
+        start = time.perf_counter()
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            if response.status_code == 200:
-                logger.info(f"✅ Ollama connecté sur {self.base_url}")
-            else:
-                logger.warning(f"⚠️ Ollama répond mais avec code {response.status_code}")
-        except Exception as e:
-            logger.error(f"❌ Impossible de se connecter à Ollama: {e}")
+            result, cancelled = self._send(path, payload, timeout, feature, cancel)
+        except Exception:
+            breaker.record_failure()
+            raise
+        
+        if cancelled:
+            breaker.record_cancel()
+        elif result is None:
+            breaker.record_failure()
+        else:
+            # Le chargement à froid du modèle n'est pas une lenteur du serveur
+            latency = time.perf_counter() - start - result.get('load_duration', 0) / 1e9
+            tokens = result.get('eval_count') or payload.get('options', {}).get('num_predict', 0)
+            breaker.record_success(latency, tokens, result.get('prompt_eval_count', 0), timeout)
+        
+        return result
     
-    def generate(self, prompt: str, max_tokens: int = 500, temperature: float = 0.7) -> str:
+    def _send(self, path: str, payload: dict, timeout: float, feature: Optional[str],
+              cancel: Optional[Callable[[], bool]]) -> Tuple[Optional[dict], bool]:
+        """
+        Envoie une requête au serveur le moins chargé, avec bascule en cas d'échec.
+        
+        Returns:
+            (réponse JSON ou None, requête interrompue par l'appelant)
+        """
+        model = payload["model"]
+        tried = []
+        
+        if cancel is not None:
+            payload = dict(payload, stream=True)
+        
+        while True:
+            if cancel is not None and cancel():
+                return None, True
+            
+            endpoint = self.pool.acquire(model, exclude=tried)
+            if endpoint is None:
+                logger.error(f"❌ Aucun serveur Ollama disponible pour {model}")
+                return None, False
+            tried.append(endpoint)
+            
+            start = time.perf_counter()
+            result = None
+            cancelled = False
+            try:
+                response = requests.post(f"{endpoint.url}{path}", json=payload, timeout=timeout,
+                                         stream=cancel is not None)
+                if response.status_code != 200:
+                    logger.error(f"❌ Erreur Ollama {endpoint.url}: {response.status_code}")
+                elif cancel is None:
+                    result = response.json()
+                else:
+                    result = self._read_stream(response, cancel)
+                    cancelled = result is None
+            
+            except requests.exceptions.Timeout:
+                logger.error(f"⏱️ Timeout Ollama {endpoint.url}")
+            
+            except requests.exceptions.ConnectionError as e:
+                self.pool.mark_down(endpoint, f"({e.__class__.__name__})")
+            
+            finally:
+                # Une interruption volontaire n'est pas une défaillance du serveur
+                self.pool.release(endpoint, model, result is not None or cancelled)
+                if feature and not cancelled:
+                    self.telemetry.record(feature, model, time.perf_counter() - start, result, host=endpoint.url)
+            
+            if result is not None or cancelled:
+                return result, cancelled
+    
+    def _read_stream(self, response, cancel: Callable[[], bool]) -> Optional[dict]:
+        """
+        Lit une réponse en streaming.
+        
+        Fermer la connexion suffit à faire abandonner la génération par Ollama.
+        
+        Returns:
+            Le dernier message (avec le texte complet dans "response"), ou None si interrompu
+        """
+        parts = []
+        try:
+            for line in response.iter_lines():
+                if cancel():
+                    return None
+                if not line:
+                    continue
+                
+                chunk = json.loads(line)
+                parts.append(chunk.get('response', ''))
+                if chunk.get('done'):
+                    chunk['response'] = ''.join(parts)
+                    return chunk
+        finally:
+            response.close()
+        
+        raise requests.exceptions.ConnectionError("Flux Ollama interrompu")
+    
+    def generate(self, prompt: str, max_tokens: int = 500, temperature: float = 0.7,
+                 num_ctx: Optional[int] = None, feature: str = "generic",
+                 cancel: Optional[Callable[[], bool]] = None) -> str:
         """
         Génère du texte avec Ollama.
         
@@ -41,9 +212,12 @@ class OllamaClient:
             prompt: Le prompt à envoyer
             max_tokens: Nombre maximum de tokens
             temperature: Température de génération (0-1)
+            num_ctx: Taille du contexte (défaut du serveur si None)
+            feature: Fonctionnalité appelante (pour la télémétrie)
+            cancel: Fonction renvoyant True pour abandonner la génération en cours
             
         Returns:
-            Le texte généré
+            Le texte généré (vide si abandonné)
         """
         try:
             payload = {
@@ -56,29 +230,53 @@ class OllamaClient:
                 }
             }
             
-            response = requests.post(
-                self.generate_url,
-                json=payload,
-                timeout=60
-            )
-            
-            if response.status_code == 200:
-                result = response.json()
-                generated_text = result.get('response', '').strip()
-                logger.info(f"✅ Réponse générée ({len(generated_text)} caractères)")
-                return generated_text
-            else:
-                logger.error(f"❌ Erreur Ollama: {response.status_code}")
+            if num_ctx:
+                payload["options"]["num_ctx"] = num_ctx
+            
+            if self.keep_alive is not None:
+                payload["keep_alive"] = self.keep_alive
+            
+            result = self._post("/api/generate", payload, timeout=60, feature=feature, cancel=cancel)
+            if result is None:
                 return ""
-        
-        except requests.exceptions.Timeout:
-            logger.error("⏱️ Timeout Ollama")
-            return ""
+            
+            generated_text = result.get('response', '').strip()
+            logger.info(f"✅ Réponse générée ({len(generated_text)} caractères)")
+            return generated_text
         
         except Exception as e:
             logger.error(f"❌ Erreur génération: {e}")
             return ""
     
+    def embed(self, text: str) -> List[float]:
+        """
+        Calcule l'embedding d'un texte.
+        
+        Args:
+            text: Texte à encoder
+            
+        Returns:
+            Le vecteur d'embedding (liste vide en cas d'erreur)
+        """
+        try:
+            payload = {
+                "model": self.embedding_model,
+                "prompt": text
+            }
+            
+            if self.keep_alive is not None:
+                payload["keep_alive"] = self.keep_alive
+            
+            result = self._post("/api/embeddings", payload, timeout=30)
+            if result is None:
+                return []
+            
+            return result.get('embedding', [])
+        
+        except Exception as e:
+            logger.error(f"❌ Erreur embedding: {e}")
+            return []
+    
     def chat(self, messages: list, max_tokens: int = 500) -> str:
         """
         Conversation avec Ollama.
@@ -113,9 +311,8 @@ class OllamaClient:
             return ""
     
     def is_available(self) -> bool:
-        """Vérifie si Ollama est disponible."""
+        """Vérifie si au moins un serveur Ollama est disponible."""
         try:
-            response = requests.get(f"{self.base_url}/api/tags", timeout=3)
-            return response.status_code == 200
+            return self.pool.check_health() > 0
         except:
             return False
\ No newline at end of file
@@ -4,6 +4,7 @@ Gestionnaire Ollama - VERSION FINALE
 """
 import logging
 import subprocess
+import threading
 import time
 import os
 import signal
@@ -11,16 +12,40 @@ from typing import Dict, List, Optional
 
 import requests
 
+from app.ollama_pool import normalize_model_name
+
 logger = logging.getLogger(__name__)
 
 class OllamaManager:
     """Gère le serveur Ollama."""
     
-    def __init__(self, base_url: str = "http://localhost:11434", model_name: str = "nchapman/ministral-8b-instruct-2410:8b"):
+    # États de chargement d'un modèle
+    STATE_COLD = "cold"
+    STATE_LOADING = "loading"
+    STATE_HOT = "hot"
+    STATE_ERROR = "error"
+    
+    def __init__(self, base_url: str = "http://localhost:11434", model_name: str = "nchapman/ministral-8b-instruct-2410:8b",
+                 keep_alive: str = "30m", secondary_models: Optional[Dict[str, str]] = None):
+        """
+        Initialise le gestionnaire.
+        
+        Args:
+            base_url: URL de base du serveur Ollama
+            model_name: Modèle principal (génération)
+            keep_alive: Durée de maintien en mémoire ("30m", "2h", -1 pour illimité)
+            secondary_models: Modèles secondaires {nom: "generate" | "embed"}
+        """
         self.base_url = base_url
         self.model_name = model_name
+        self.keep_alive = keep_alive
+        self.secondary_models = dict(secondary_models or {})
         self.process = None
         self.was_already_running = False
+        
+        self._load_states: Dict[str, str] = {}
+        self._state_lock = threading.Lock()
+        self._preload_thread: Optional[threading.Thread] = None
     
     def is_running(self) -> bool:
         """Vérifie si Ollama tourne."""
@@ -108,13 +133,144 @@ class OllamaManager:
             logger.error(f"❌ Erreur vérification modèle: {e}")
             return False
     
+    def preload_model(self, model_name: str = None, keep_alive=None, kind: str = "generate") -> bool:
+        """
+        Charge un modèle en mémoire et le maintient chargé.
+        
+        Une requête sans prompt suffit à Ollama pour charger le modèle
+        sans rien générer.
+        
+        Args:
+            model_name: Modèle à charger (modèle principal par défaut)
+            keep_alive: Durée de maintien (valeur du gestionnaire par défaut)
+            kind: "generate" ou "embed" selon le type de modèle
+            
+        Returns:
+            True si le modèle est chargé
+        """
+        if model_name is None:
+            model_name = self.model_name
+        if keep_alive is None:
+            keep_alive = self.keep_alive
+        
+        self._set_state(model_name, self.STATE_LOADING)
+        logger.info(f"🔥 Préchargement du modèle {model_name} (keep_alive={keep_alive})...")
+        
+        try:
+            if kind == "embed":
+                url = f"{self.base_url}/api/embed"
+                payload = {"model": model_name, "input": "", "keep_alive": keep_alive}
+            else:
+                url = f"{self.base_url}/api/generate"
+                payload = {"model": model_name, "keep_alive": keep_alive}
+            
+            start = time.time()
+            response = requests.post(url, json=payload, timeout=300)
+            
+            if response.status_code == 200:
+                self._set_state(model_name, self.STATE_HOT)
+                logger.info(f"✅ Modèle {model_name} chargé en {time.time() - start:.1f}s")
+                return True
+            
+            logger.error(f"❌ Préchargement {model_name}: code {response.status_code}")
+        
+        except Exception as e:
+            logger.error(f"❌ Erreur préchargement {model_name}: {e}")
+        
+        self._set_state(model_name, self.STATE_ERROR)
+        return False
+    
+    def preload_async(self) -> threading.Thread:
+        """
+        Précharge le modèle principal puis les modèles secondaires en arrière-plan.
+        
+        Returns:
+            Le thread de préchargement
+        """
+        if self._preload_thread and self._preload_thread.is_alive():
+            return self._preload_thread
+        
+        models = [(self.model_name, "generate")] + list(self.secondary_models.items())
+        for name, _ in models:
+            self._set_state(name, self.STATE_LOADING)
+        
+        def _run():
+            for name, kind in models:
+                self.preload_model(name, kind=kind)
+        
+        self._preload_thread = threading.Thread(target=_run, name="ollama-preload", daemon=True)
+        self._preload_thread.start()
+        return self._preload_thread
+    
+    def get_loaded_models(self) -> Dict[str, Dict]:
+        """
+        Liste les modèles résidents en mémoire (/api/ps).
+        
+        Returns:
+            {nom avec tag: {'size', 'size_vram', 'expires_at'}}
+        """
+        try:
+            response = requests.get(f"{self.base_url}/api/ps", timeout=2)
+            if response.status_code == 200:
+                return {
+                    normalize_model_name(m.get('name', '')): {
+                        'size': m.get('size', 0),
+                        'size_vram': m.get('size_vram', 0),
+                        'expires_at': m.get('expires_at')
+                    }
+                    for m in response.json().get('models', [])
+                }
+        except:
+            pass
+        
+        return {}
+    
+    def get_model_state(self, model_name: str = None, loaded: Optional[Dict[str, Dict]] = None) -> str:
+        """
+        Retourne l'état de chargement d'un modèle.
+        
+        Args:
+            model_name: Modèle à vérifier (modèle principal par défaut)
+            loaded: Résultat de get_loaded_models() déjà récupéré
+            
+        Returns:
+            'hot', 'loading', 'cold' ou 'error'
+        """
+        if model_name is None:
+            model_name = self.model_name
+        if loaded is None:
+            loaded = self.get_loaded_models()
+        
+        # /api/ps renvoie toujours le tag ("nomic-embed-text:latest")
+        if normalize_model_name(model_name) in {normalize_model_name(name) for name in loaded}:
+            self._set_state(model_name, self.STATE_HOT)
+            return self.STATE_HOT
+        
+        with self._state_lock:
+            state = self._load_states.get(model_name, self.STATE_COLD)
+        
+        # Modèle déchargé par le serveur depuis le préchargement
+        if state == self.STATE_HOT:
+            self._set_state(model_name, self.STATE_COLD)
+            return self.STATE_COLD
+        
+        return state
+    
+    def _set_state(self, model_name: str, state: str):
+        """Met à jour l'état de chargement d'un modèle."""
+        with self._state_lock:
+            self._load_states[model_name] = state
+    
     def get_status(self) -> Dict:
         """Retourne le statut d'Ollama."""
         status = {
             'running': self.is_running(),
             'base_url': self.base_url,
             'model_name': self.model_name,
-            'available_models': []
+            'keep_alive': self.keep_alive,
+            'available_models': [],
+            'loaded_models': {},
+            'model_states': {}
         }
         
         if status['running']:
@@ -125,6 +281,11 @@ class OllamaManager:
                     status['available_models'] = [m['name'] for m in data.get('models', [])]
             except:
                 pass
+            
+            status['loaded_models'] = self.get_loaded_models()
+        
+        for name in [self.model_name] + list(self.secondary_models):
+            status['model_states'][name] = self.get_model_state(name, loaded=status['loaded_models'])
         
         return status
     
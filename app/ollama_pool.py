@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Pool de serveurs Ollama : santé, routage et bascule.
+"""
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+def normalize_model_name(name: str) -> str:
+    """Nom de modèle avec son tag (Ollama ajoute ':latest' par défaut)."""
+    return name if ':' in name else f"{name}:latest"
+
+
+class OllamaEndpoint:
+    """Serveur Ollama du pool."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip('/')
+        self.healthy = True
+        self.outstanding = 0
+        self.failures = 0
+        # None tant que la liste des modèles n'a pas pu être lue
+        self.models: Optional[Set[str]] = None
+        self.loaded: Set[str] = set()
+
+    def has_model(self, model: str) -> bool:
+        """Le modèle est installé (ou la liste est encore inconnue)."""
+        return self.models is None or normalize_model_name(model) in self.models
+
+    def is_loaded(self, model: str) -> bool:
+        """Le modèle est chargé en mémoire."""
+        return normalize_model_name(model) in self.loaded
+
+    def __repr__(self) -> str:
+        return f"OllamaEndpoint({self.url}, healthy={self.healthy}, outstanding={self.outstanding})"
+
+
+class OllamaPool:
+    """
+    Répartit les requêtes entre plusieurs serveurs Ollama.
+
+    Une requête est envoyée au serveur sain ayant le moins de requêtes en
+    cours parmi ceux qui disposent du modèle ; à égalité, un serveur où le
+    modèle est déjà chargé est préféré. Un serveur qui ne répond plus est
+    écarté jusqu'au prochain contrôle de santé réussi.
+    """
+
+    def __init__(self, urls: Iterable[str], health_interval: float = 30.0, timeout: float = 3.0):
+        """
+        Initialise le pool.
+
+        Args:
+            urls: URLs des serveurs Ollama
+            health_interval: Intervalle entre deux contrôles de santé (secondes)
+            timeout: Timeout des contrôles de santé
+        """
+        self.endpoints: List[OllamaEndpoint] = [OllamaEndpoint(url) for url in urls]
+        if not self.endpoints:
+            raise ValueError("Aucun serveur Ollama configuré")
+
+        self.health_interval = health_interval
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self.endpoints)
+
+    def check_health(self) -> int:
+        """
+        Contrôle chaque serveur et met à jour ses modèles installés et chargés.
+
+        Returns:
+            Nombre de serveurs sains
+        """
+        for endpoint in self.endpoints:
+            try:
+                tags = requests.get(f"{endpoint.url}/api/tags", timeout=self.timeout)
+                tags.raise_for_status()
+                models = {normalize_model_name(m.get('name', '')) for m in tags.json().get('models', [])}
+
+                loaded = set()
+                ps = requests.get(f"{endpoint.url}/api/ps", timeout=self.timeout)
+                if ps.status_code == 200:
+                    loaded = {normalize_model_name(m.get('name', '')) for m in ps.json().get('models', [])}
+
+                with self._lock:
+                    if not endpoint.healthy:
+                        logger.info(f"✅ Serveur Ollama {endpoint.url} de nouveau disponible")
+                    endpoint.healthy = True
+                    endpoint.failures = 0
+                    endpoint.models = models
+                    endpoint.loaded = loaded
+
+            except Exception as e:
+                with self._lock:
+                    if endpoint.healthy:
+                        logger.warning(f"⚠️ Serveur Ollama {endpoint.url} indisponible: {e}")
+                    endpoint.healthy = False
+
+        return self.healthy_count()
+
+    def start_health_checks(self):
+        """Lance les contrôles de santé périodiques en arrière-plan."""
+        if self._health_thread and self._health_thread.is_alive():
+            return
+
+        self._stop.clear()
+        self._health_thread = threading.Thread(target=self._health_loop, name="ollama-health", daemon=True)
+        self._health_thread.start()
+
+    def stop_health_checks(self):
+        """Arrête les contrôles de santé périodiques."""
+        self._stop.set()
+
+    def _health_loop(self):
+        """Boucle des contrôles de santé."""
+        while not self._stop.wait(self.health_interval):
+            self.check_health()
+
+    def acquire(self, model: str, exclude: Iterable[OllamaEndpoint] = ()) -> Optional[OllamaEndpoint]:
+        """
+        Choisit un serveur pour une requête et le réserve.
+
+        Si aucun serveur n'est sain, les serveurs écartés sont tentés quand
+        même plutôt que d'échouer sans essayer.
+
+        Args:
+            model: Modèle demandé
+            exclude: Serveurs déjà tentés pour cette requête
+
+        Returns:
+            Le serveur réservé (à libérer avec release), ou None
+        """
+        excluded = {id(e) for e in exclude}
+
+        with self._lock:
+            candidates = [e for e in self.endpoints if id(e) not in excluded and e.has_model(model)]
+            healthy = [e for e in candidates if e.healthy]
+            if healthy:
+                candidates = healthy
+
+            if not candidates:
+                return None
+
+            endpoint = min(candidates, key=lambda e: (e.outstanding, not e.is_loaded(model)))
+            endpoint.outstanding += 1
+            return endpoint
+
+    def release(self, endpoint: OllamaEndpoint, model: str, success: bool):
+        """
+        Libère un serveur après une requête.
+
+        Args:
+            endpoint: Serveur réservé par acquire
+            model: Modèle utilisé
+            success: La requête a abouti
+        """
+        with self._lock:
+            endpoint.outstanding = max(0, endpoint.outstanding - 1)
+            if success:
+                endpoint.healthy = True
+                endpoint.failures = 0
+                endpoint.loaded.add(normalize_model_name(model))
+            else:
+                endpoint.failures += 1
+
+    def mark_down(self, endpoint: OllamaEndpoint, reason: str = ""):
+        """Écarte un serveur jusqu'au prochain contrôle de santé réussi."""
+        with self._lock:
+            if endpoint.healthy:
+                logger.warning(f"⚠️ Serveur Ollama {endpoint.url} écarté {reason}".rstrip())
+            endpoint.healthy = False
+            endpoint.loaded.clear()
+
+    def healthy_count(self) -> int:
+        """Nombre de serveurs sains."""
+        with self._lock:
+            return sum(1 for e in self.endpoints if e.healthy)
+
+    def get_status(self) -> List[Dict]:
+        """
+        État de chaque serveur.
+
+        Returns:
+            Liste de {url, healthy, outstanding, failures, models, loaded}
+        """
+        with self._lock:
+            return [
+                {
+                    'url': e.url,
+                    'healthy': e.healthy,
+                    'outstanding': e.outstanding,
+                    'failures': e.failures,
+                    'models': sorted(e.models) if e.models is not None else None,
+                    'loaded': sorted(e.loaded)
+                }
+                for e in self.endpoints
+            ]
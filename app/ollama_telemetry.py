@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""
+Télémétrie des requêtes Ollama à partir des mesures renvoyées par le serveur.
+"""
+import csv
+import json
+import logging
+import math
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, fields
+from pathlib import Path
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_NS_PER_MS = 1_000_000
+
+@dataclass
+class RequestTiming:
+    """Mesures d'une requête Ollama (durées en millisecondes)."""
+    timestamp: float
+    feature: str
+    model: str
+    success: bool
+    wall_ms: float
+    total_duration_ms: float = 0.0
+    load_duration_ms: float = 0.0
+    prompt_eval_count: int = 0
+    prompt_eval_duration_ms: float = 0.0
+    eval_count: int = 0
+    eval_duration_ms: float = 0.0
+    host: str = ""
+
+    @property
+    def tokens_per_second(self) -> float:
+        """Vitesse de génération."""
+        if self.eval_duration_ms <= 0:
+            return 0.0
+        return self.eval_count / (self.eval_duration_ms / 1000)
+
+    @property
+    def time_to_first_token_ms(self) -> float:
+        """Délai avant le premier token (chargement + évaluation du prompt)."""
+        return self.load_duration_ms + self.prompt_eval_duration_ms
+
+
+class OllamaTelemetry:
+    """Collecte en mémoire des mesures par fonctionnalité appelante."""
+
+    def __init__(self, max_records: int = 5000):
+        """
+        Initialise la télémétrie.
+
+        Args:
+            max_records: Nombre de requêtes conservées (les plus anciennes sont oubliées)
+        """
+        self._records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def record(self, feature: str, model: str, wall_time: float, data: Optional[Dict] = None,
+               host: str = "") -> RequestTiming:
+        """
+        Enregistre une requête.
+
+        Args:
+            feature: Fonctionnalité appelante (analyze, urgency, spam, draft...)
+            model: Modèle utilisé
+            wall_time: Durée mesurée côté client (secondes)
+            data: Réponse JSON d'Ollama (None si la requête a échoué)
+            host: Serveur ayant traité la requête
+
+        Returns:
+            La mesure enregistrée
+        """
+        data = data or {}
+        timing = RequestTiming(
+            timestamp=time.time(),
+            feature=feature,
+            model=model,
+            success=bool(data),
+            wall_ms=wall_time * 1000,
+            total_duration_ms=data.get('total_duration', 0) / _NS_PER_MS,
+            load_duration_ms=data.get('load_duration', 0) / _NS_PER_MS,
+            prompt_eval_count=data.get('prompt_eval_count', 0),
+            prompt_eval_duration_ms=data.get('prompt_eval_duration', 0) / _NS_PER_MS,
+            eval_count=data.get('eval_count', 0),
+            eval_duration_ms=data.get('eval_duration', 0) / _NS_PER_MS,
+            host=host
+        )
+
+        with self._lock:
+            self._records.append(timing)
+
+        return timing
+
+    def records(self, feature: Optional[str] = None, since: Optional[float] = None) -> List[RequestTiming]:
+        """
+        Mesures enregistrées.
+
+        Args:
+            feature: Filtrer sur une fonctionnalité
+            since: Filtrer sur un horodatage minimal (time.time())
+
+        Returns:
+            Liste des mesures, de la plus ancienne à la plus récente
+        """
+        with self._lock:
+            records = list(self._records)
+
+        return [
+            r for r in records
+            if (feature is None or r.feature == feature) and (since is None or r.timestamp >= since)
+        ]
+
+    def summary(self, feature: Optional[str] = None, window: int = 100) -> Dict:
+        """
+        Statistiques glissantes sur les dernières requêtes.
+
+        Args:
+            feature: Filtrer sur une fonctionnalité
+            window: Nombre de requêtes prises en compte
+
+        Returns:
+            Nombre de requêtes, échecs, tokens/s, percentiles TTFT et chargement
+        """
+        records = self.records(feature)[-window:]
+        ok = [r for r in records if r.success]
+
+        eval_tokens = sum(r.eval_count for r in ok)
+        eval_seconds = sum(r.eval_duration_ms for r in ok) / 1000
+        prompt_tokens = sum(r.prompt_eval_count for r in ok)
+        prompt_seconds = sum(r.prompt_eval_duration_ms for r in ok) / 1000
+
+        ttft = sorted(r.time_to_first_token_ms for r in ok)
+        load = sorted(r.load_duration_ms for r in ok)
+        wall = sorted(r.wall_ms for r in records)
+
+        return {
+            'requests': len(records),
+            'failures': len(records) - len(ok),
+            'tokens_per_second': eval_tokens / eval_seconds if eval_seconds else 0.0,
+            'prompt_tokens_per_second': prompt_tokens / prompt_seconds if prompt_seconds else 0.0,
+            'ttft_p50_ms': _percentile(ttft, 50),
+            'ttft_p95_ms': _percentile(ttft, 95),
+            'load_p50_ms': _percentile(load, 50),
+            'load_p95_ms': _percentile(load, 95),
+            'load_p99_ms': _percentile(load, 99),
+            'wall_p50_ms': _percentile(wall, 50),
+            'wall_p95_ms': _percentile(wall, 95)
+        }
+
+    def summary_by_feature(self, window: int = 100) -> Dict[str, Dict]:
+        """Statistiques glissantes pour chaque fonctionnalité."""
+        features = sorted({r.feature for r in self.records()})
+        return {feature: self.summary(feature, window) for feature in features}
+
+    def export_csv(self, path: str) -> int:
+        """
+        Exporte les mesures en CSV.
+
+        Args:
+            path: Fichier de destination
+
+        Returns:
+            Nombre de lignes écrites
+        """
+        records = self.records()
+        columns = [f.name for f in fields(RequestTiming)] + ['tokens_per_second', 'time_to_first_token_ms']
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for r in records:
+                writer.writerow([getattr(r, c) for c in columns])
+
+        logger.info(f"📊 {len(records)} mesures Ollama exportées vers {path}")
+        return len(records)
+
+    def export_jsonl(self, path: str) -> int:
+        """
+        Exporte les mesures en JSON Lines.
+
+        Args:
+            path: Fichier de destination
+
+        Returns:
+            Nombre de lignes écrites
+        """
+        records = self.records()
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            for r in records:
+                row = asdict(r)
+                row['tokens_per_second'] = r.tokens_per_second
+                row['time_to_first_token_ms'] = r.time_to_first_token_ms
+                f.write(json.dumps(row) + "\n")
+
+        logger.info(f"📊 {len(records)} mesures Ollama exportées vers {path}")
+        return len(records)
+
+    def clear(self):
+        """Efface les mesures."""
+        with self._lock:
+            self._records.clear()
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """Percentile (rang le plus proche) d'une liste triée."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, math.ceil(percent / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
@@ -17,16 +17,20 @@ class SmartEmailCard(QFrame):
     
     clicked = pyqtSignal(Email)
     
+    # Hauteur fixe : la position d'une carte dans la liste se déduit de son rang
+    HEIGHT = 105
+    
     def __init__(self, email: Email):
         super().__init__()
         self.email = email
+        self.category_badge = None
         self._setup_ui()
         self.setCursor(QCursor(Qt.CursorShape.PointingHandCursor))
     
     def _setup_ui(self):
         """Crée la carte."""
         self.setObjectName("email-card")
-        self.setFixedHeight(105)
+        self.setFixedHeight(self.HEIGHT)
         
         layout = QVBoxLayout(self)
         layout.setContentsMargins(18, 12, 18, 12)
@@ -56,19 +60,17 @@ class SmartEmailCard(QFrame):
         
         header_layout.addStretch()
         
-        # Badge catégorie (si disponible)
-        if hasattr(self.email, 'ai_analysis') and self.email.ai_analysis:
-            category = self.email.ai_analysis.get('category')
-            if category:
-                badge = self._create_category_badge(category)
-                header_layout.addWidget(badge)
-        
-        # Date
+        # Date (le badge catégorie est inséré juste avant)
         date_str = self._format_date(self.email.received_date)
-        date_label = QLabel(date_str)
-        date_label.setFont(QFont("Arial", 11))
-        date_label.setStyleSheet("color: #6b7280;")
-        header_layout.addWidget(date_label)
+        self.date_label = QLabel(date_str)
+        self.date_label.setFont(QFont("Arial", 11))
+        self.date_label.setStyleSheet("color: #6b7280;")
+        header_layout.addWidget(self.date_label)
+        self.header_layout = header_layout
+        
+        # Badge catégorie (si disponible)
+        if self.email.ai_analysis:
+            self.set_analysis(self.email.ai_analysis)
         
         layout.addLayout(header_layout)
         
@@ -103,6 +105,20 @@ class SmartEmailCard(QFrame):
         
         self._apply_styles()
     
+    def set_analysis(self, analysis: dict):
+        """Affiche (ou remplace) le badge de catégorie d'une analyse."""
+        self.email.ai_analysis = analysis
+        category = (analysis or {}).get('category')
+        
+        if self.category_badge:
+            self.header_layout.removeWidget(self.category_badge)
+            self.category_badge.deleteLater()
+            self.category_badge = None
+        
+        if category:
+            self.category_badge = self._create_category_badge(category)
+            self.header_layout.insertWidget(self.header_layout.indexOf(self.date_label), self.category_badge)
+    
     def _create_category_badge(self, category: str) -> QLabel:
         """Crée un badge de catégorie."""
         # Mapping catégories -> affichage
@@ -18,6 +18,7 @@ class TopToolbar(QWidget):
     compose_requested = pyqtSignal()
     refresh_requested = pyqtSignal()
     search_requested = pyqtSignal(str)
+    semantic_search_requested = pyqtSignal(str)
     
     def __init__(self):
         super().__init__()
@@ -60,8 +61,36 @@ class TopToolbar(QWidget):
         """)
         layout.addWidget(self.search_input)
         
+        # Bascule recherche sémantique
+        self.semantic_btn = QPushButton("🧠")
+        self.semantic_btn.setFont(QFont("Arial", 16))
+        self.semantic_btn.setFixedSize(42, 42)
+        self.semantic_btn.setCheckable(True)
+        self.semantic_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+        self.semantic_btn.setToolTip("Recherche sémantique (décrivez l'email recherché)")
+        self.semantic_btn.toggled.connect(self._on_semantic_toggled)
+        self.semantic_btn.setStyleSheet("""
+            QPushButton {
+                background-color: #f9fafb;
+                border: 1px solid #e5e7eb;
+                border-radius: 21px;
+            }
+            QPushButton:checked {
+                background-color: #ede9fe;
+                border-color: #5b21b6;
+            }
+        """)
+        layout.addWidget(self.semantic_btn)
+        
         layout.addStretch()
         
+        # Indicateur d'état de l'IA
+        self.ai_status_label = QLabel()
+        self.ai_status_label.setFont(QFont("Arial", 11))
+        self.ai_status_label.setFixedHeight(30)
+        layout.addWidget(self.ai_status_label)
+        self.set_ai_status("cold")
+        
         # Boutons de navigation
         nav_buttons = [
             ("📥 Inbox", "inbox"),
@@ -145,9 +174,48 @@ class TopToolbar(QWidget):
         """Recherche."""
         query = self.search_input.text().strip()
         if query:
-            self.search_requested.emit(query)
+            if self.semantic_btn.isChecked():
+                self.semantic_search_requested.emit(query)
+            else:
+                self.search_requested.emit(query)
             logger.info(f"Recherche: {query}")
     
+    def _on_semantic_toggled(self, checked: bool):
+        """Change le mode de recherche."""
+        if checked:
+            self.search_input.setPlaceholderText("🧠  Décrivez l'email recherché...")
+        else:
+            self.search_input.setPlaceholderText("🔍  Rechercher dans vos emails...")
+    
+    def set_ai_status(self, state: str, detail: str = ""):
+        """
+        Met à jour l'indicateur d'état de l'IA.
+        
+        Args:
+            state: 'hot', 'loading', 'cold', 'error', 'degraded' ou 'recovering'
+            detail: Information complémentaire (infobulle)
+        """
+        status_config = {
+            "hot": ("🟢 IA prête", "#059669"),
+            "loading": ("🟡 IA en chargement", "#d97706"),
+            "cold": ("⚪ IA en veille", "#6b7280"),
+            "error": ("🔴 IA indisponible", "#dc2626"),
+            "degraded": ("🟠 IA en mode dégradé", "#ea580c"),
+            "recovering": ("🟡 IA en reprise", "#d97706")
+        }
+        
+        text, color = status_config.get(state, status_config["cold"])
+        
+        self.ai_status_label.setText(text)
+        self.ai_status_label.setToolTip(detail)
+        self.ai_status_label.setStyleSheet(f"""
+            QLabel {{
+                color: {color};
+                border: none;
+                padding: 0 10px;
+            }}
+        """)
+    
     def _apply_nav_styles(self):
         """Styles navigation."""
         for btn in self.nav_buttons.values():
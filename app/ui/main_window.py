@@ -9,7 +9,7 @@ from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
     QMessageBox, QApplication
 )
-from PyQt6.QtCore import Qt, QTimer
+from PyQt6.QtCore import Qt, QTimer, QThread, pyqtSignal
 from PyQt6.QtGui import QFont
 
 from app.gmail_client import GmailClient
@@ -24,23 +24,96 @@ from app.ui.views.calendar_view import CalendarView
 from app.ui.views.settings_view import SettingsView
 from app.ui.views.ai_assistant_view import AIAssistantView
 from app.ui.compose_view import ComposeView
+from app.ollama_pool import normalize_model_name
 
 logger = logging.getLogger(__name__)
 
+class AIStatusWorker(QThread):
+    """État du modèle et du disjoncteur, récupéré en arrière-plan (/api/ps peut bloquer)."""
+    
+    status_ready = pyqtSignal(str, str)
+    
+    def __init__(self, ai_processor: AIProcessor, ollama_manager=None):
+        super().__init__()
+        self.ai_processor = ai_processor
+        self.ollama_manager = ollama_manager
+    
+    def run(self):
+        try:
+            # Disjoncteur ouvert : les analyses passent par les règles
+            breaker = self.ai_processor.ollama_client.breaker()
+            status = breaker.get_status()
+            if status['state'] == breaker.OPEN:
+                self.status_ready.emit(
+                    "degraded",
+                    f"Ollama ne répond pas, analyse par règles. Nouvel essai dans {status['retry_in']:.0f}s"
+                )
+                return
+            if status['state'] == breaker.HALF_OPEN:
+                self.status_ready.emit("recovering", "Test de reprise d'Ollama en cours")
+                return
+        except Exception as e:
+            logger.error(f"Erreur état disjoncteur: {e}")
+        
+        if not self.ollama_manager:
+            return
+        
+        try:
+            loaded = self.ollama_manager.get_loaded_models()
+            state = self.ollama_manager.get_model_state(loaded=loaded)
+            
+            detail = self.ollama_manager.model_name
+            model_info = loaded.get(normalize_model_name(self.ollama_manager.model_name))
+            if model_info:
+                detail += f" - {model_info.get('size_vram', 0) / (1024 ** 3):.1f} Go en VRAM"
+            
+            self.status_ready.emit(state, detail)
+        except Exception as e:
+            logger.error(f"Erreur état IA: {e}")
+
+
+class SemanticSearchWorker(QThread):
+    """Recherche sémantique en arrière-plan (encodage de la requête et chargement des messages)."""
+    
+    results_ready = pyqtSignal(str, list)
+    
+    def __init__(self, query: str, semantic_search, gmail_client: GmailClient, known: dict, parent=None):
+        super().__init__(parent)
+        self.query = query
+        self.semantic_search = semantic_search
+        self.gmail_client = gmail_client
+        self.known = known
+    
+    def run(self):
+        results = []
+        try:
+            for email_id, score in self.semantic_search.search(self.query):
+                email = self.known.get(email_id) or self.gmail_client.get_email(email_id)
+                if email:
+                    results.append(email)
+        except Exception as e:
+            logger.error(f"Erreur recherche sémantique: {e}")
+        self.results_ready.emit(self.query, results)
+
+
 class MainWindow(QMainWindow):
     """Interface principale Dynovate Mail - Optimisée."""
     
     def __init__(self, gmail_client: GmailClient, ai_processor: AIProcessor,
-                 calendar_manager: CalendarManager, auto_responder: AutoResponder):
+                 calendar_manager: CalendarManager, auto_responder: AutoResponder,
+                 ollama_manager=None, semantic_search=None):
         super().__init__()
         
         self.gmail_client = gmail_client
         self.ai_processor = ai_processor
         self.calendar_manager = calendar_manager
         self.auto_responder = auto_responder
+        self.ollama_manager = ollama_manager
+        self.semantic_search = semantic_search
         
         self.current_view = "inbox"
         self.compose_window = None
+        self.semantic_query = None
         
         self._setup_window()
         self._setup_ui()
@@ -52,6 +125,13 @@ class MainWindow(QMainWindow):
         self.refresh_timer.timeout.connect(self._auto_refresh)
         self.refresh_timer.start(600000)
         
+        # État du modèle IA et du disjoncteur (5 secondes)
+        self.ai_status_worker = None
+        self.ai_status_timer = QTimer(self)
+        self.ai_status_timer.timeout.connect(self._update_ai_status)
+        self.ai_status_timer.start(5000)
+        self._update_ai_status()
+        
         logger.info("✅ Interface principale initialisée")
     
     def _setup_window(self):
@@ -127,6 +207,7 @@ class MainWindow(QMainWindow):
         self.top_toolbar.compose_requested.connect(self._open_compose)
         self.top_toolbar.refresh_requested.connect(self._refresh_current_view)
         self.top_toolbar.search_requested.connect(self._perform_search)
+        self.top_toolbar.semantic_search_requested.connect(self._perform_semantic_search)
         
         # Sidebar
         self.sidebar.folder_changed.connect(self._on_folder_changed)
@@ -134,6 +215,7 @@ class MainWindow(QMainWindow):
         # Inbox view
         self.inbox_view.email_selected.connect(self._on_email_selected)
         self.inbox_view.email_detail_view.reply_requested.connect(self._open_reply)
+        self.inbox_view.email_detail_view.suggested_reply_requested.connect(self._open_reply)
         self.inbox_view.email_detail_view.forward_requested.connect(self._open_forward)
         
         # Settings
@@ -241,8 +323,8 @@ class MainWindow(QMainWindow):
         self.compose_window.email_sent.connect(self._on_email_sent)
         self.compose_window.exec()
     
-    def _open_reply(self, email: Email):
-        """Ouvre réponse."""
+    def _open_reply(self, email: Email, body: str = ""):
+        """Ouvre réponse (pré-remplie avec une réponse suggérée le cas échéant)."""
         logger.info(f"Réponse: {email.sender}")
         
         self.compose_window = ComposeView(
@@ -251,6 +333,8 @@ class MainWindow(QMainWindow):
             ai_processor=self.ai_processor,
             reply_to=email
         )
+        if body:
+            self.compose_window.body_input.setPlainText(body)
         self.compose_window.email_sent.connect(self._on_email_sent)
         self.compose_window.exec()
     
@@ -312,13 +396,50 @@ class MainWindow(QMainWindow):
                 self._switch_view("inbox")
             
             results = self.gmail_client.search_emails(query)
-            self.inbox_view.emails = results
-            self.inbox_view._display_emails_instant()
+            self._show_results(results)
             
             logger.info(f"{len(results)} résultats")
         except Exception as e:
             logger.error(f"Erreur recherche: {e}")
     
+    def _perform_semantic_search(self, query: str):
+        """Recherche sémantique."""
+        logger.info(f"Recherche sémantique: {query}")
+        
+        if not self.semantic_search:
+            self._perform_search(query)
+            return
+        
+        try:
+            if self.current_view != "inbox":
+                self._switch_view("inbox")
+            
+            known = {email.id: email for email in self.inbox_view.emails}
+            
+            # Encodage de la requête et chargement des messages hors du thread UI ;
+            # seule la dernière requête est affichée
+            self.semantic_query = query
+            worker = SemanticSearchWorker(query, self.semantic_search, self.gmail_client, known, parent=self)
+            worker.results_ready.connect(self._on_semantic_results)
+            worker.finished.connect(worker.deleteLater)
+            worker.start()
+        except Exception as e:
+            logger.error(f"Erreur recherche sémantique: {e}")
+    
+    def _on_semantic_results(self, query: str, results: list):
+        """Résultats de la recherche sémantique."""
+        if query != self.semantic_query:
+            return
+        
+        self._show_results(results)
+        logger.info(f"{len(results)} résultats sémantiques")
+    
+    def _show_results(self, results: list):
+        """Affiche des résultats de recherche dans la boîte de réception."""
+        self.inbox_view.emails = results
+        self.inbox_view.email_index = {email.id: email for email in results}
+        self.inbox_view._display_emails_instant()
+    
     def _update_sidebar_counts(self):
         """Met à jour les compteurs."""
         try:
@@ -327,6 +448,15 @@ class MainWindow(QMainWindow):
         except:
             pass
     
+    def _update_ai_status(self):
+        """Lance la mise à jour de l'indicateur d'état du modèle (requêtes hors du thread UI)."""
+        if self.ai_status_worker and self.ai_status_worker.isRunning():
+            return
+        
+        self.ai_status_worker = AIStatusWorker(self.ai_processor, self.ollama_manager)
+        self.ai_status_worker.status_ready.connect(self.top_toolbar.set_ai_status)
+        self.ai_status_worker.start()
+    
     def _on_settings_changed(self, settings: dict):
         """Paramètres modifiés."""
         logger.info("Paramètres modifiés")
@@ -341,6 +471,11 @@ class MainWindow(QMainWindow):
         
         if reply == QMessageBox.StandardButton.Yes:
             self.refresh_timer.stop()
+            self.ai_status_timer.stop()
+            if self.ai_status_worker and self.ai_status_worker.isRunning():
+                self.ai_status_worker.wait()
+            for worker in self.findChildren(SemanticSearchWorker):
+                worker.wait()
             if hasattr(self.inbox_view, 'analysis_worker') and self.inbox_view.analysis_worker:
                 if self.inbox_view.analysis_worker.isRunning():
                     self.inbox_view.analysis_worker.stop()
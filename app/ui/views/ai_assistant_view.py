@@ -12,8 +12,11 @@ from PyQt6.QtCore import Qt, pyqtSignal, QThread
 from PyQt6.QtGui import QFont
 
 from app.ai_processor import AIProcessor
+from app.ai.keyword_index import get_keyword_index
+from app.ai.keyword_matcher import normalize_text, shared_matcher
 from app.gmail_client import GmailClient
 from app.models.email_model import Email
+from app.utils.temporal_parser import format_match, parse_emails
 
 logger = logging.getLogger(__name__)
 
@@ -372,45 +375,34 @@ class AIAnalysisThread(QThread):
         
         emails = self.gmail_client.list_emails(folder="INBOX", max_results=50)
         
-        meetings = []
+        meeting_emails = []
+        matcher = shared_matcher()
         
         for i, email in enumerate(emails, 1):
             if not self._running:
                 break
             
-            progress = 20 + int((i / len(emails)) * 70)
+            progress = 20 + int((i / len(emails)) * 60)
             self.progress.emit(f"🔍 {i}/{len(emails)}", progress)
             
-            subject_lower = email.subject.lower()
-            snippet_lower = (email.snippet or '').lower()
+            subject_lower = normalize_text(email.subject)
+            snippet_lower = normalize_text(email.snippet or '')
             
-            meeting_keywords = ['réunion', 'meeting', 'rdv', 'rendez-vous', 'entretien', 'call', 'visio', 'zoom', 'teams', 'skype']
-            
-            has_meeting = any(kw in subject_lower or kw in snippet_lower for kw in meeting_keywords)
-            
-            if has_meeting:
-                import re
-                
-                date_found = "Date à confirmer"
-                
-                patterns = [
-                    r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',
-                    r'(\d{1,2}\s+(?:janvier|février|mars|avril|mai|juin|juillet|août|septembre|octobre|novembre|décembre))',
-                    r'(lundi|mardi|mercredi|jeudi|vendredi|samedi|dimanche)',
-                    r"(aujourd'hui|demain|ce soir)"
-                ]
-                
-                text_to_search = f"{subject_lower} {snippet_lower}"
-                for pattern in patterns:
-                    match = re.search(pattern, text_to_search)
-                    if match:
-                        date_found = match.group(1)
-                        break
-                
-                meetings.append({
-                    'email': email,
-                    'date_info': date_found
-                })
+            if matcher.scan(f"{subject_lower}\n{snippet_lower}", normalized=True).has('meeting'):
+                meeting_emails.append(email)
+        
+        # Dates résolues en un seul lot, par rapport à la réception de chaque email
+        self.progress.emit("📅 Résolution des dates...", 85)
+        resolved = parse_emails(meeting_emails)
+        
+        meetings = [
+            {
+                'email': email,
+                'date_info': format_match(match) if match else "Date à confirmer",
+                'start_time': match.start if match else None
+            }
+            for email, match in zip(meeting_emails, resolved)
+        ]
         
         self.progress.emit("✅ Terminé !", 100)
         
@@ -427,6 +419,7 @@ class AIAnalysisThread(QThread):
         emails = self.gmail_client.list_emails(folder="INBOX", max_results=50)
         
         urgent = []
+        matcher = shared_matcher()
         
         for i, email in enumerate(emails, 1):
             if not self._running:
@@ -435,12 +428,7 @@ class AIAnalysisThread(QThread):
             progress = 30 + int((i / len(emails)) * 60)
             self.progress.emit(f"🔍 {i}/{len(emails)}", progress)
             
-            subject = email.subject.lower()
-            snippet = (email.snippet or '').lower()
-            
-            urgent_keywords = ['urgent', 'asap', 'immédiat', 'critique', 'important', 'rapidement']
-            
-            is_urgent = any(kw in subject or kw in snippet for kw in urgent_keywords)
+            is_urgent = matcher.scan(f"{email.subject}\n{email.snippet or ''}").has('assistant.urgent')
             
             if is_urgent:
                 urgent.append(email)
@@ -461,6 +449,7 @@ class AIAnalysisThread(QThread):
         unread = [e for e in unread if not getattr(e, 'read', True)]
         
         needs_reply = []
+        matcher = shared_matcher()
         
         for i, email in enumerate(unread, 1):
             if not self._running:
@@ -469,12 +458,7 @@ class AIAnalysisThread(QThread):
             progress = 30 + int((i / len(unread)) * 60)
             self.progress.emit(f"🔍 {i}/{len(unread)}", progress)
             
-            subject = email.subject.lower()
-            snippet = (email.snippet or '').lower()
-            
-            question_keywords = ['?', 'pouvez-vous', 'pourriez-vous', 'merci de', 'svp', 's il vous plait']
-            
-            needs_response = any(kw in subject or kw in snippet for kw in question_keywords)
+            needs_response = matcher.scan(f"{email.subject}\n{email.snippet or ''}").has('assistant.question')
             
             if needs_response:
                 suggestion = "Bonjour,\n\nMerci pour votre message.\n\nJe prends note et reviens vers vous rapidement.\n\nCordialement"
@@ -522,6 +506,15 @@ class AIAnalysisThread(QThread):
         if len(recs) == 0:
             recs.append("🎉 Excellente gestion !")
         
+        # Sujets de la semaine (index TF-IDF, complété avec les emails listés)
+        topics = []
+        try:
+            keyword_index = get_keyword_index()
+            keyword_index.add_emails(emails)
+            topics = [term for term, _, _ in keyword_index.top_topics(days=7, k=8)]
+        except Exception as e:
+            logger.error(f"Erreur sujets de la semaine: {e}")
+        
         self.progress.emit("✅ Terminé !", 100)
         
         self.analysis_complete.emit({
@@ -530,7 +523,8 @@ class AIAnalysisThread(QThread):
             'unread': unread,
             'read_rate': read_rate,
             'score': score,
-            'recommendations': recs
+            'recommendations': recs,
+            'topics': topics
         })
 
 
@@ -1260,4 +1254,17 @@ class AIAssistantView(QWidget):
             rec_label.setFont(QFont("Arial", 13))
             rec_label.setStyleSheet("color: #4b5563;")
             rec_label.setWordWrap(True)
-            self.results_layout.addWidget(rec_label)
\ No newline at end of file
+            self.results_layout.addWidget(rec_label)
+        
+        # Sujets de la semaine
+        if results.get('topics'):
+            topics_label = QLabel("🔥 Sujets de la semaine :")
+            topics_label.setFont(QFont("Arial", 16, QFont.Weight.Bold))
+            topics_label.setStyleSheet("color: #000000;")
+            self.results_layout.addWidget(topics_label)
+            
+            topics_value = QLabel(" · ".join(results['topics']))
+            topics_value.setFont(QFont("Arial", 13))
+            topics_value.setStyleSheet("color: #5b21b6;")
+            topics_value.setWordWrap(True)
+            self.results_layout.addWidget(topics_value)
\ No newline at end of file
@@ -8,9 +8,9 @@ import re
 import base64
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton,
-    QScrollArea, QFrame, QTextBrowser
+    QScrollArea, QFrame, QTextBrowser, QComboBox
 )
-from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtCore import Qt, pyqtSignal, QThread
 from PyQt6.QtGui import QFont
 
 from app.gmail_client import GmailClient
@@ -19,12 +19,42 @@ from app.models.email_model import Email
 
 logger = logging.getLogger(__name__)
 
+# Catégories proposées pour corriger l'analyse (catégories AIProcessor)
+CATEGORY_CHOICES = [
+    ("work", "💼 Pro"), ("personal", "👤 Personnel"), ("important", "⭐ Important"),
+    ("meeting", "📅 RDV"), ("invoice", "💰 Facture"), ("cv", "📄 CV"),
+    ("newsletter", "📰 Newsletter"), ("support", "🛠️ Support"), ("spam", "🚫 Spam")
+]
+
+class EmailInsightsWorker(QThread):
+    """Résumé et suggestions de réponse d'un email, en arrière-plan (servis par le cache s'ils ont été précalculés)."""
+    
+    insights_ready = pyqtSignal(str, str, list)
+    
+    def __init__(self, ai_processor: AIProcessor, email: Email, suggestion_count: int):
+        super().__init__()
+        self.ai_processor = ai_processor
+        self.email = email
+        self.suggestion_count = suggestion_count
+    
+    def run(self):
+        try:
+            summary = self.ai_processor.summarize_email(self.email)
+            suggestions = self.ai_processor.generate_smart_reply_suggestions(self.email, self.suggestion_count)
+            self.insights_ready.emit(self.email.id, summary, suggestions)
+        except Exception as e:
+            logger.error(f"Erreur résumé/suggestions {self.email.id}: {e}")
+
+
 class EmailDetailView(QWidget):
     """Vue détail email avec affichage correct des images et du HTML."""
     
     reply_requested = pyqtSignal(Email)
     forward_requested = pyqtSignal(Email)
     archive_requested = pyqtSignal(Email)
+    cluster_action_requested = pyqtSignal(str, list)
+    suggested_reply_requested = pyqtSignal(Email, str)
+    category_corrected = pyqtSignal(Email, str)
     
     def __init__(self, gmail_client: GmailClient, ai_processor: AIProcessor):
         super().__init__()
@@ -33,6 +63,10 @@ class EmailDetailView(QWidget):
         self.ai_processor = ai_processor
         self.current_email = None
         
+        self.summary_label = None
+        self.suggestions_layout = None
+        self._insights_workers = set()
+        
         self._setup_ui()
     
     def _setup_ui(self):
@@ -140,9 +174,35 @@ class EmailDetailView(QWidget):
         forward_btn.setStyleSheet(btn_style)
         actions_layout.addWidget(forward_btn)
         
+        # Actions groupées sur les messages quasi identiques (newsletters, notifications)
+        similar = self._similar_email_ids(email)
+        if similar:
+            archive_all_btn = QPushButton(f"📚 Archiver les {len(similar)} similaires")
+            archive_all_btn.setFont(QFont("Arial", 13))
+            archive_all_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+            archive_all_btn.clicked.connect(lambda: self.cluster_action_requested.emit("archive", similar))
+            archive_all_btn.setStyleSheet(btn_style)
+            actions_layout.addWidget(archive_all_btn)
+            
+            read_all_btn = QPushButton("✓ Tout marquer lu")
+            read_all_btn.setFont(QFont("Arial", 13))
+            read_all_btn.setCursor(Qt.CursorShape.PointingHandCursor)
+            read_all_btn.clicked.connect(lambda: self.cluster_action_requested.emit("read", similar))
+            read_all_btn.setStyleSheet(btn_style)
+            actions_layout.addWidget(read_all_btn)
+        
         actions_layout.addStretch()
+        
+        # Catégorie de l'analyse, corrigeable (la correction est apprise)
+        if (email.ai_analysis or {}).get('category'):
+            actions_layout.addWidget(self._create_category_selector(email))
+        
         main_layout.addLayout(actions_layout)
         
+        # Résumé et réponses suggérées (prêts immédiatement s'ils ont été précalculés)
+        main_layout.addWidget(self._create_insights_section())
+        self._load_insights(email)
+        
         # Séparateur
         separator = QFrame()
         separator.setFrameShape(QFrame.Shape.HLine)
@@ -271,6 +331,117 @@ class EmailDetailView(QWidget):
         main_layout.addStretch()
         self.content_layout.addWidget(main_container)
     
+    def _create_category_selector(self, email: Email) -> QComboBox:
+        """Liste des catégories, sur celle de l'analyse."""
+        selector = QComboBox()
+        selector.setFont(QFont("Arial", 13))
+        selector.setCursor(Qt.CursorShape.PointingHandCursor)
+        selector.setToolTip("Corriger la catégorie")
+        
+        category = email.ai_analysis.get('category')
+        choices = list(CATEGORY_CHOICES)
+        if category not in dict(choices):
+            choices.append((category, category.title()))
+        for value, label in choices:
+            selector.addItem(label, value)
+        selector.setCurrentIndex(selector.findData(category))
+        
+        selector.currentIndexChanged.connect(
+            lambda index: self.category_corrected.emit(email, selector.itemData(index))
+        )
+        selector.setStyleSheet("""
+            QComboBox {
+                background-color: #f1f3f4;
+                border: none;
+                border-radius: 20px;
+                padding: 10px 20px;
+                color: #3c4043;
+            }
+        """)
+        return selector
+    
+    def _create_insights_section(self) -> QWidget:
+        """Crée la section résumé IA et réponses suggérées."""
+        section = QFrame()
+        section.setStyleSheet("""
+            QFrame {
+                background-color: #f8f9fa;
+                border: 1px solid #e0e0e0;
+                border-radius: 8px;
+            }
+        """)
+        
+        layout = QVBoxLayout(section)
+        layout.setContentsMargins(20, 16, 20, 16)
+        layout.setSpacing(12)
+        
+        self.summary_label = QLabel("🤖 Résumé en cours...")
+        self.summary_label.setFont(QFont("Arial", 13))
+        self.summary_label.setWordWrap(True)
+        self.summary_label.setStyleSheet("color: #3c4043; background-color: transparent; border: none;")
+        layout.addWidget(self.summary_label)
+        
+        self.suggestions_layout = QHBoxLayout()
+        self.suggestions_layout.setSpacing(8)
+        layout.addLayout(self.suggestions_layout)
+        
+        return section
+    
+    def _load_insights(self, email: Email):
+        """Lance le calcul du résumé et des suggestions de l'email affiché."""
+        precomputer = getattr(self.ai_processor, 'precomputer', None)
+        suggestion_count = precomputer.suggestion_count if precomputer else 3
+        
+        worker = EmailInsightsWorker(self.ai_processor, email, suggestion_count)
+        worker.insights_ready.connect(self._on_insights_ready)
+        worker.finished.connect(lambda: self._insights_workers.discard(worker))
+        self._insights_workers.add(worker)
+        worker.start()
+    
+    def _on_insights_ready(self, email_id: str, summary: str, suggestions: list):
+        """Affiche le résumé et les suggestions (ignorés si un autre email est affiché entre-temps)."""
+        if not self.current_email or self.current_email.id != email_id or not self.summary_label:
+            return
+        
+        self.summary_label.setText(f"🤖 {summary}" if summary else "🤖 Résumé non disponible")
+        
+        for suggestion in suggestions:
+            button = QPushButton(suggestion)
+            button.setFont(QFont("Arial", 12))
+            button.setCursor(Qt.CursorShape.PointingHandCursor)
+            button.setStyleSheet("""
+                QPushButton {
+                    background-color: #ffffff;
+                    border: 1px solid #dadce0;
+                    border-radius: 16px;
+                    padding: 8px 16px;
+                    color: #3c4043;
+                }
+                QPushButton:hover {
+                    background-color: #e8eaed;
+                }
+            """)
+            button.clicked.connect(
+                lambda _, text=suggestion: self.suggested_reply_requested.emit(self.current_email, text)
+            )
+            self.suggestions_layout.addWidget(button)
+        self.suggestions_layout.addStretch()
+    
+    def _similar_email_ids(self, email: Email) -> list:
+        """Identifiants des messages du groupe de l'email (lui compris), vide s'il est seul."""
+        near_duplicates = getattr(self.ai_processor, 'near_duplicates', None)
+        if not near_duplicates:
+            return []
+        
+        try:
+            near_duplicates.add(email)
+            members = near_duplicates.members(email.id)
+        except Exception as e:
+            logger.error(f"Erreur groupe de messages similaires: {e}")
+            return []
+        
+        return members if len(members) > 1 else []
+    
     def _format_date(self, date):
         """Formate la date."""
         from datetime import datetime
@@ -3,10 +3,13 @@
 Vue inbox intelligente - VERSION CORRIGÉE
 """
 import logging
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from PyQt6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QLabel, QScrollArea, QFrame
 )
-from PyQt6.QtCore import Qt, pyqtSignal, QThread
+from PyQt6.QtCore import Qt, pyqtSignal, QThread, QTimer
 from PyQt6.QtGui import QFont
 
 from app.gmail_client import GmailClient
@@ -18,32 +21,73 @@ from app.ui.components.smart_email_card import SmartEmailCard
 logger = logging.getLogger(__name__)
 
 class EmailAnalysisWorker(QThread):
-    """Worker pour analyse IA en arrière-plan."""
+    """Pool d'analyse IA en arrière-plan, emails visibles en premier."""
     
     analysis_complete = pyqtSignal(str, dict)
     
-    def __init__(self, ai_processor: AIProcessor, emails: list):
+    def __init__(self, ai_processor: AIProcessor, emails: list, max_workers: int = None):
+        """
+        Args:
+            ai_processor: Processeur IA
+            emails: Emails à analyser, par ordre de priorité
+            max_workers: Analyses simultanées (une par serveur Ollama disponible par défaut)
+        """
         super().__init__()
         self.ai_processor = ai_processor
-        self.emails = emails
+        self.max_workers = max_workers
         self.running = True
+        self._queue = deque(emails)
+        self._queue_lock = threading.Lock()
     
     def run(self):
-        """Lance l'analyse."""
-        for email in self.emails:
-            if not self.running:
-                break
-            
-            try:
-                analysis = self.ai_processor.analyze_email(email)
-                self.analysis_complete.emit(email.id, analysis)
-            except Exception as e:
-                logger.error(f"Erreur analyse {email.id}: {e}")
+        """Lance l'analyse : chaque thread du pool prend le prochain email de la file."""
+        workers = self.max_workers or self.ai_processor.ollama_client.concurrency()
+        workers = max(1, min(workers, len(self._queue)))
+        
+        if workers == 1:
+            self._drain()
+        else:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="analysis") as executor:
+                for _ in range(workers):
+                    executor.submit(self._drain)
         
         logger.info("✅ Analyse IA terminée")
+        
+        if self.ai_processor.cascade:
+            self.ai_processor.cascade.log_stats()
+    
+    def prioritize(self, email_ids: list):
+        """Place en tête de file les emails encore en attente (ceux devenus visibles)."""
+        wanted = set(email_ids)
+        with self._queue_lock:
+            first = [email for email in self._queue if email.id in wanted]
+            if first:
+                rest = [email for email in self._queue if email.id not in wanted]
+                self._queue = deque(first + rest)
+    
+    def _next(self):
+        with self._queue_lock:
+            return self._queue.popleft() if self._queue else None
+    
+    def _drain(self):
+        """Analyse les emails de la file jusqu'à épuisement ou arrêt."""
+        while self.running:
+            email = self._next()
+            if email is None:
+                return
+            self._analyze(email)
+    
+    def _analyze(self, email):
+        """Analyse un email et publie le résultat."""
+        try:
+            analysis = self.ai_processor.analyze_email(email)
+            if self.running:
+                self.analysis_complete.emit(email.id, analysis)
+        except Exception as e:
+            logger.error(f"Erreur analyse {email.id}: {e}")
     
     def stop(self):
-        """Arrête l'analyse."""
+        """Arrête l'analyse (les analyses en cours se terminent)."""
         self.running = False
 
 
@@ -52,16 +96,32 @@ class SmartInboxView(QWidget):
     
     email_selected = pyqtSignal(object)
     
-    def __init__(self, gmail_client: GmailClient, ai_processor: AIProcessor):
+    def __init__(self, gmail_client: GmailClient, ai_processor: AIProcessor, analysis_workers: int = None,
+                 ui_refresh_ms: int = 100):
+        """
+        Args:
+            gmail_client: Client Gmail
+            ai_processor: Processeur IA
+            analysis_workers: Analyses simultanées (une par serveur Ollama disponible par défaut)
+            ui_refresh_ms: Intervalle de regroupement des résultats d'analyse affichés
+        """
         super().__init__()
         
         self.gmail_client = gmail_client
         self.ai_processor = ai_processor
+        self.analysis_workers = analysis_workers
         self.emails = []
         self.email_cards = {}
+        self.email_index = {}
         self.current_folder = "INBOX"
         self.analysis_worker = None
         
+        # Résultats d'analyse en attente d'affichage, appliqués par lots
+        self._pending_results = {}
+        self.results_timer = QTimer(self)
+        self.results_timer.setInterval(ui_refresh_ms)
+        self.results_timer.timeout.connect(self._flush_results)
+        
         self._setup_ui()
     
     def _setup_ui(self):
@@ -119,12 +179,15 @@ class SmartInboxView(QWidget):
         self.emails_layout.addStretch()
         
         self.emails_scroll.setWidget(self.emails_container)
+        self.emails_scroll.verticalScrollBar().valueChanged.connect(self._prioritize_visible)
         list_layout.addWidget(self.emails_scroll)
         
         layout.addWidget(list_container)
         
         # Vue détail
         self.email_detail_view = EmailDetailView(self.gmail_client, self.ai_processor)
+        self.email_detail_view.cluster_action_requested.connect(self._on_cluster_action)
+        self.email_detail_view.category_corrected.connect(self._on_category_corrected)
         layout.addWidget(self.email_detail_view, 1)
     
     def load_folder(self, folder_id: str):
@@ -152,15 +215,23 @@ class SmartInboxView(QWidget):
             if self.analysis_worker and self.analysis_worker.isRunning():
                 self.analysis_worker.stop()
                 self.analysis_worker.wait()
+            self._pending_results.clear()
             
             # Charger emails
             self.emails = self.gmail_client.list_emails(
                 folder=self.current_folder,
                 max_results=50
             )
+            self.email_index = {email.id: email for email in self.emails}
+            
+            # Analyses déjà enregistrées (lecture groupée)
+            stored = self.ai_processor.stored_analyses(self.emails)
+            for email in self.emails:
+                if email.id in stored:
+                    email.ai_analysis = stored[email.id]
             
             # Compteur
-            self.email_count_label.setText(f"{len(self.emails)} emails")
+            self.email_count_label.setText(f"{len(self.emails)} emails{self._groups_summary()}")
             
             # Afficher IMMÉDIATEMENT
             self._display_emails_instant()
@@ -198,23 +269,71 @@ class SmartInboxView(QWidget):
         logger.info(f"✅ {len(self.emails)} emails affichés")
     
     def _start_background_analysis(self):
-        """Analyse IA en arrière-plan."""
-        if not self.emails:
+        """Analyse IA en arrière-plan (emails nouveaux ou modifiés uniquement)."""
+        pending = [email for email in self.emails if not email.ai_analysis]
+        if not pending:
+            self._schedule_precompute()
             return
         
-        logger.info("🤖 Analyse IA...")
+        logger.info(f"🤖 Analyse IA de {len(pending)}/{len(self.emails)} emails...")
+        
+        # Emails visibles d'abord
+        visible = set(self._visible_email_ids())
+        pending.sort(key=lambda email: email.id not in visible)
         
-        self.analysis_worker = EmailAnalysisWorker(self.ai_processor, self.emails)
+        self.analysis_worker = EmailAnalysisWorker(self.ai_processor, pending, self.analysis_workers)
         self.analysis_worker.analysis_complete.connect(self._on_analysis_complete)
+        self.analysis_worker.finished.connect(self._on_analysis_finished)
         self.analysis_worker.start()
     
+    def _visible_email_ids(self) -> list:
+        """Emails dont la carte est dans la zone visible de la liste (cartes de hauteur fixe)."""
+        top = self.emails_scroll.verticalScrollBar().value()
+        height = self.emails_scroll.viewport().height()
+        first = top // SmartEmailCard.HEIGHT
+        last = (top + height) // SmartEmailCard.HEIGHT + 1
+        return [email.id for email in self.emails[first:last]]
+    
+    def _prioritize_visible(self):
+        """Après un défilement, analyser en priorité les emails devenus visibles."""
+        if self.analysis_worker and self.analysis_worker.isRunning():
+            self.analysis_worker.prioritize(self._visible_email_ids())
+    
+    def _on_analysis_finished(self):
+        """Fin de l'analyse : afficher les derniers résultats puis lancer le précalcul."""
+        self._flush_results()
+        self._schedule_precompute()
+    
+    def _schedule_precompute(self, anchor=None):
+        """Prépare résumés et suggestions des emails susceptibles d'être ouverts."""
+        if self.ai_processor.precomputer and self.emails:
+            self.ai_processor.precomputer.schedule(self.emails, anchor)
+    
     def _on_analysis_complete(self, email_id: str, analysis: dict):
-        """Analyse terminée."""
-        # Mettre à jour l'email
-        for email in self.emails:
-            if email.id == email_id:
+        """Analyse terminée : mise en attente jusqu'au prochain rafraîchissement de la liste."""
+        self._pending_results[email_id] = analysis
+        if not self.results_timer.isActive():
+            self.results_timer.start()
+    
+    def _flush_results(self):
+        """Applique les résultats en attente aux emails et à leurs cartes, en un seul rafraîchissement."""
+        if not self._pending_results:
+            self.results_timer.stop()
+            return
+        
+        results, self._pending_results = self._pending_results, {}
+        self.emails_container.setUpdatesEnabled(False)
+        try:
+            for email_id, analysis in results.items():
+                email = self.email_index.get(email_id)
+                if email is None:
+                    continue
                 email.ai_analysis = analysis
-                break
+                card = self.email_cards.get(email_id)
+                if card:
+                    card.set_analysis(analysis)
+        finally:
+            self.emails_container.setUpdatesEnabled(True)
     
     def _on_email_clicked(self, email: Email):
         """Clic sur email."""
@@ -225,6 +344,7 @@ class SmartInboxView(QWidget):
             try:
                 full_email = self.gmail_client.get_email(email.id)
                 if full_email:
+                    full_email.ai_analysis = email.ai_analysis
                     email = full_email
             except:
                 pass
@@ -233,6 +353,10 @@ class SmartInboxView(QWidget):
         self.email_detail_view.show_email(email)
         self.email_selected.emit(email)
         
+        # Préparer les emails suivants
+        positions = [i for i, e in enumerate(self.emails) if e.id == email.id]
+        self._schedule_precompute(positions[0] if positions else None)
+        
         # Marquer lu
         try:
             if not getattr(email, 'read', True):
@@ -247,6 +371,61 @@ class SmartInboxView(QWidget):
         except:
             pass
     
+    def _groups_summary(self) -> str:
+        """Nombre de groupes de messages similaires parmi les emails affichés."""
+        near_duplicates = getattr(self.ai_processor, 'near_duplicates', None)
+        if not near_duplicates:
+            return ""
+        
+        cluster_ids = [near_duplicates.cluster_of(email.id) for email in self.emails]
+        sizes = {}
+        for cluster_id in cluster_ids:
+            if cluster_id:
+                sizes[cluster_id] = sizes.get(cluster_id, 0) + 1
+        groups = sum(1 for size in sizes.values() if size > 1)
+        return f" · {groups} groupes similaires" if groups else ""
+    
+    def _on_cluster_action(self, action: str, email_ids: list):
+        """Action groupée sur des messages similaires."""
+        done = 0
+        for email_id in email_ids:
+            try:
+                if action == "archive":
+                    self.gmail_client.archive_email(email_id)
+                elif action == "read":
+                    self.gmail_client.mark_as_read(email_id)
+                done += 1
+            except Exception as e:
+                logger.error(f"Erreur action groupée {action} {email_id}: {e}")
+        
+        logger.info(f"📚 Action groupée {action}: {done}/{len(email_ids)} emails")
+        
+        if action == "archive":
+            self.refresh_emails()
+        else:
+            for email_id in email_ids:
+                card = self.email_cards.get(email_id)
+                if card:
+                    card.email.read = True
+                    card._apply_styles()
+    
+    def _on_category_corrected(self, email: Email, category: str):
+        """Catégorie corrigée par l'utilisateur : apprise, puis appliquée à la carte."""
+        try:
+            analysis = self.ai_processor.correct_category(email, category)
+        except Exception as e:
+            logger.error(f"Erreur correction catégorie {email.id}: {e}")
+            return
+        
+        logger.info(f"✏️ Catégorie corrigée: {email.id} -> {category}")
+        email.ai_analysis = analysis
+        listed = self.email_index.get(email.id)
+        if listed is not None:
+            listed.ai_analysis = analysis
+        card = self.email_cards.get(email.id)
+        if card:
+            card.set_analysis(analysis)
+    
     def _show_error(self, message: str):
         """Erreur."""
         while self.emails_layout.count() > 1:
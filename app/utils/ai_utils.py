@@ -1,532 +1,328 @@
 """
 Utilitaires pour l'intelligence artificielle - VERSION LOCALE.
+
+Toutes les extractions passent par ExtractionEngine : les expressions
+régulières sont compilées une seule fois au chargement du module et chaque
+message n'est mis en minuscules et découpé en mots qu'une fois.
 """
 import re
 import logging
-from typing import Dict, List, Optional, Any
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Tuple, Union
 from datetime import datetime, timedelta
 
-# Import conditionnel pour éviter les erreurs
-try:
-    import dateutil.parser as date_parser
-    HAS_DATEUTIL = True
-except ImportError:
-    HAS_DATEUTIL = False
-    logging.warning("dateutil non disponible - parsing de dates simplifié")
-
 logger = logging.getLogger(__name__)
 
-def extract_datetime(text: str) -> Optional[Dict[str, datetime]]:
-    """
-    Extrait les informations de date et heure d'un texte (VERSION LOCALE).
-    
-    Args:
-        text: Le texte à analyser.
-        
-    Returns:
-        Dictionnaire avec start_time et end_time ou None.
-    """
-    try:
-        # Patterns pour les dates en français
-        date_patterns = [
-            r'(\d{1,2})/(\d{1,2})/(\d{4})',  # DD/MM/YYYY
-            r'(\d{1,2})-(\d{1,2})-(\d{4})',  # DD-MM-YYYY
-            r'(\d{1,2}) (janvier|février|mars|avril|mai|juin|juillet|août|septembre|octobre|novembre|décembre) (\d{4})',  # DD mois YYYY
-            r'(lundi|mardi|mercredi|jeudi|vendredi|samedi|dimanche) (\d{1,2}) (janvier|février|mars|avril|mai|juin|juillet|août|septembre|octobre|novembre|décembre)',  # jour DD mois
-        ]
-        
-        # Patterns pour les heures
-        time_patterns = [
-            r'(\d{1,2})[h:](\d{2})',        # HH:MM ou HHhMM
-            r'(\d{1,2})\s*(h|heures?)',     # HH h
-            r'(\d{1,2})[h:](\d{2})\s*(am|pm)?',  # avec AM/PM
-        ]
-        
-        # Rechercher les dates
-        dates_found = []
+MONTHS = {
+    'janvier': 1, 'février': 2, 'mars': 3, 'avril': 4, 'mai': 5, 'juin': 6,
+    'juillet': 7, 'août': 8, 'septembre': 9, 'octobre': 10, 'novembre': 11, 'décembre': 12
+}
+
+WEEKDAYS = ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi']
+
+# Dates (par ordre de priorité), avec un test rapide évitant les recherches inutiles
+_DATE_PATTERNS = [
+    (re.compile(r'(\d{1,2})/(\d{1,2})/(\d{4})'), lambda text: '/' in text),  # DD/MM/YYYY
+    (re.compile(r'(\d{1,2})-(\d{1,2})-(\d{4})'), lambda text: '-' in text),  # DD-MM-YYYY
+    (re.compile(rf"(\d{{1,2}}) ({'|'.join(MONTHS)}) (\d{{4}})"), lambda text: True),  # DD mois YYYY
+]
+
+# Heures : 14h30, 14:30, 14h, 14 heures, 2:30 pm
+_TIME_PATTERN = re.compile(r'(\d{1,2})\s*(?:[h:](\d{2})|h\b|heures?\b)\s*(am|pm)?')
+
+# Expressions relatives (après-demain avant demain)
+_RELATIVE_PATTERNS = [
+    (re.compile(r'après[- ]demain'), 2),
+    (re.compile(r'demain'), 1),
+    (re.compile(r'dans (\d+) jours?'), None),
+    (re.compile(r'la semaine prochaine'), 7),
+    (re.compile(rf"({'|'.join(WEEKDAYS)}) prochain"), None),
+]
+
+_PHONE_PATTERNS = [
+    re.compile(r'(?:\+33|0)[1-9](?:[0-9]{8})'),  # Format français
+    re.compile(r'(?:\+\d{1,3})?[- ]?\(?\d{3}\)?[- ]?\d{3}[- ]?\d{4}'),  # Format international
+]
+
+_EMAIL_PATTERN = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+
+# Les adresses ne contiennent que des caractères [\w\s] : elles sont cherchées dans
+# les segments de ce type contenant un nom de voie, ce qui limite les retours arrière
+_SEGMENT_PATTERN = re.compile(r'[\w\s]+')
+_STREET_PATTERN = re.compile(r'rue|avenue|boulevard|place|impasse|allée', re.IGNORECASE)
+
+_ADDRESS_PATTERNS = [
+    re.compile(r'\d+\s+[\w\s]+(?:rue|avenue|boulevard|place|impasse|allée)\s+[\w\s]+', re.IGNORECASE),
+    re.compile(r'(?:rue|avenue|boulevard|place|impasse|allée)\s+[\w\s]+\s+\d+', re.IGNORECASE),
+]
+
+_LOCATION_PATTERNS = [
+    re.compile(r'(?:salle|bureau|local|étage)\s+[\w\s\d]+', re.IGNORECASE),
+    re.compile(r'(?:au|à la|à l\'|dans le|dans la)\s+[\w\s]+', re.IGNORECASE),
+]
+
+_WORD_PATTERN = re.compile(r'\b[a-zA-Zàâäçéèêëïîôùûüÿ]+\b')
+_CLEAN_PATTERN = re.compile(r'[^\w\s\.\,\!\?\-\:\;\'\"àâäçéèêëïîôùûüÿ]')
+_SPACES_PATTERN = re.compile(r'\s+')
+
+# Mots vides en français
+STOP_WORDS = frozenset({
+    'le', 'la', 'les', 'un', 'une', 'des', 'de', 'du', 'et', 'à', 'il',
+    'elle', 'on', 'ils', 'elles', 'je', 'tu', 'nous', 'vous', 'me', 'te',
+    'se', 'ce', 'cet', 'cette', 'ces', 'mon', 'ton', 'son', 'ma', 'ta',
+    'sa', 'mes', 'tes', 'ses', 'notre', 'votre', 'leur', 'dans', 'pour',
+    'avec', 'sans', 'sur', 'sous', 'par', 'en', 'au', 'aux',
+    'que', 'qui', 'quoi', 'dont', 'où', 'si', 'mais', 'ou', 'donc', 'car',
+    'ni', 'or', 'est', 'être', 'avoir', 'faire', 'aller', 'venir', 'voir',
+    'savoir', 'pouvoir', 'vouloir', 'devoir', 'falloir', 'prendre', 'dire',
+    'mettre', 'donner', 'passer', 'partir', 'sortir', 'arriver',
+    'entrer', 'monter', 'descendre', 'rester', 'tenir', 'porter', 'suivre'
+})
+
+# Domaines personnels courants
+PERSONAL_DOMAINS = frozenset({
+    'gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com',
+    'free.fr', 'orange.fr', 'wanadoo.fr', 'sfr.fr',
+    'laposte.net', 'numericable.fr', 'bbox.fr'
+})
+
+PROFESSIONAL_KEYWORDS = [
+    'company', 'corp', 'inc', 'ltd', 'sa', 'sarl', 'sas',
+    'groupe', 'consulting', 'services', 'solutions'
+]
+
+# Une seule alternative compilée par liste : une recherche au lieu d'un `in` par mot-clé
+_URGENT_PATTERN = re.compile('|'.join(map(re.escape, [
+    'urgent', 'asap', 'immédiat', 'priorité', 'deadline',
+    'échéance', 'time-sensitive', 'critique', 'important'
+])))
+_BUSINESS_PATTERN = re.compile('|'.join(map(re.escape, [
+    'contrat', 'projet', 'client', 'réunion', 'meeting',
+    'deadline', 'budget', 'facture', 'commande'
+])))
+
+@dataclass
+class ExtractionResult:
+    """Informations extraites d'un message."""
+    dates: List[datetime] = field(default_factory=list)
+    times: List[Tuple[int, int]] = field(default_factory=list)
+    datetime: Optional[Dict[str, datetime]] = None
+    phones: List[str] = field(default_factory=list)
+    emails: List[str] = field(default_factory=list)
+    address: Optional[str] = None
+    location: Optional[str] = None
+    keywords: List[str] = field(default_factory=list)
+    importance: int = 1
+    is_professional: bool = False
+
+    def contact_info(self) -> Dict[str, str]:
+        """Informations de contact au format de extract_contact_info."""
+        info = {}
+        if self.phones:
+            info['phone'] = self.phones[0]
+        if self.emails:
+            info['email'] = self.emails[0]
+        if self.address:
+            info['address'] = self.address
+        if self.location:
+            info['location'] = self.location
+        return info
+
+
+class ExtractionEngine:
+    """Extraction de dates, contacts, mots-clés et importance en un passage."""
+
+    def __init__(self, max_keywords: int = 10):
+        """
+        Args:
+            max_keywords: Nombre maximum de mots-clés retournés
+        """
+        self.max_keywords = max_keywords
+
+    def extract(self, text: str, sender_email: str = "") -> ExtractionResult:
+        """
+        Analyse un message.
+
+        Args:
+            text: Le texte du message
+            sender_email: L'adresse de l'expéditeur (pour l'importance)
+
+        Returns:
+            Les informations extraites
+        """
+        text = text or ""
         text_lower = text.lower()
-        
-        for pattern in date_patterns:
-            matches = re.findall(pattern, text_lower)
-            for match in matches:
-                try:
-                    if len(match) == 3:
-                        if match[1].isdigit():  # DD/MM/YYYY format
-                            day, month, year = int(match[0]), int(match[1]), int(match[2])
-                            date_obj = datetime(year, month, day)
-                        else:  # DD mois YYYY format
-                            months = {
-                                'janvier': 1, 'février': 2, 'mars': 3, 'avril': 4, 'mai': 5, 'juin': 6,
-                                'juillet': 7, 'août': 8, 'septembre': 9, 'octobre': 10, 'novembre': 11, 'décembre': 12
-                            }
-                            day, month_name, year = int(match[0]), match[1], int(match[2])
-                            month = months.get(month_name, 1)
-                            date_obj = datetime(year, month, day)
-                        dates_found.append(date_obj)
-                except (ValueError, TypeError):
-                    continue
-        
-        # Rechercher les heures
-        times_found = []
-        for pattern in time_patterns:
-            matches = re.findall(pattern, text_lower)
-            for match in matches:
+        result = ExtractionResult()
+
+        try:
+            result.dates = self._dates(text_lower)
+            result.times = self._times(text_lower)
+            result.datetime = self._combine(result.dates, result.times, text_lower)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'extraction de date/heure: {e}")
+
+        try:
+            self._contacts(text, result)
+        except Exception as e:
+            logger.error(f"Erreur lors de l'extraction d'informations de contact: {e}")
+
+        result.keywords = self.keywords(text_lower)
+        result.is_professional = is_professional_email(sender_email) if sender_email else False
+        result.importance = self._importance(text_lower, result.is_professional)
+        return result
+
+    def keywords(self, text_lower: str, max_keywords: Optional[int] = None) -> List[str]:
+        """Mots les plus fréquents (hors mots vides et mots courts) d'un texte en minuscules."""
+        counts = Counter(keyword_tokens(text_lower))
+        return [word for word, _ in counts.most_common(max_keywords or self.max_keywords)]
+
+    @staticmethod
+    def _dates(text_lower: str) -> List[datetime]:
+        dates = []
+        for pattern, may_match in _DATE_PATTERNS:
+            if not may_match(text_lower):
+                continue
+            for day, month, year in pattern.findall(text_lower):
                 try:
-                    if isinstance(match, tuple) and len(match) >= 2:
-                        hour = int(match[0])
-                        minute = int(match[1]) if len(match) > 1 and match[1].isdigit() else 0
-                        
-                        # Gérer AM/PM
-                        if len(match) > 2 and match[2]:
-                            if match[2] == 'pm' and hour != 12:
-                                hour += 12
-                            elif match[2] == 'am' and hour == 12:
-                                hour = 0
-                        
-                        times_found.append((hour, minute))
-                except (ValueError, TypeError):
+                    month = int(month) if month.isdigit() else MONTHS[month]
+                    dates.append(datetime(int(year), month, int(day)))
+                except (ValueError, KeyError):
                     continue
-        
-        # Combiner dates et heures
-        if dates_found:
-            base_date = dates_found[0]
-            
-            if times_found:
-                hour, minute = times_found[0]
-                start_time = base_date.replace(hour=hour, minute=minute)
-                
-                # Essayer de trouver une heure de fin
-                end_time = None
-                if len(times_found) > 1:
-                    end_hour, end_minute = times_found[1]
-                    end_time = base_date.replace(hour=end_hour, minute=end_minute)
-                else:
-                    # Durée par défaut de 1 heure
-                    end_time = start_time + timedelta(hours=1)
-                
-                return {
-                    'start_time': start_time,
-                    'end_time': end_time
-                }
-            else:
-                # Pas d'heure spécifiée, créer un événement toute la journée
-                return {
-                    'start_time': base_date.replace(hour=9, minute=0),
-                    'end_time': base_date.replace(hour=17, minute=0)
-                }
-        
-        # Rechercher des expressions relatives
-        relative_patterns = [
-            (r'demain', 1),
-            (r'après[- ]demain', 2),
-            (r'dans (\d+) jours?', None),
-            (r'la semaine prochaine', 7),
-            (r'(lundi|mardi|mercredi|jeudi|vendredi) prochain', None),
-        ]
-        
-        for pattern, days_offset in relative_patterns:
-            match = re.search(pattern, text_lower)
-            if match:
-                if days_offset is None and pattern.startswith(r'dans'):
-                    try:
-                        days_offset = int(match.group(1))
-                    except:
-                        continue
-                elif days_offset is None:  # jour de la semaine
-                    weekdays = ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi']
-                    day_name = match.group(1)
-                    if day_name in weekdays:
-                        current_weekday = datetime.now().weekday()
-                        target_weekday = weekdays.index(day_name)
-                        days_offset = (target_weekday - current_weekday) % 7
-                        if days_offset == 0:
-                            days_offset = 7  # Semaine prochaine
-                
-                if days_offset is not None:
-                    target_date = datetime.now() + timedelta(days=days_offset)
-                    
-                    # Essayer de trouver une heure
-                    if times_found:
-                        hour, minute = times_found[0]
-                        start_time = target_date.replace(hour=hour, minute=minute)
-                        end_time = start_time + timedelta(hours=1)
-                    else:
-                        start_time = target_date.replace(hour=9, minute=0)
-                        end_time = target_date.replace(hour=17, minute=0)
-                    
-                    return {
-                        'start_time': start_time,
-                        'end_time': end_time
-                    }
-        
-        return None
-        
-    except Exception as e:
-        logger.error(f"Erreur lors de l'extraction de date/heure: {e}")
+        return dates
+
+    @staticmethod
+    def _times(text_lower: str) -> List[Tuple[int, int]]:
+        times = []
+        for hour, minute, meridiem in _TIME_PATTERN.findall(text_lower):
+            hour, minute = int(hour), int(minute or 0)
+            if meridiem == 'pm' and hour != 12:
+                hour += 12
+            elif meridiem == 'am' and hour == 12:
+                hour = 0
+            if hour < 24 and minute < 60:
+                times.append((hour, minute))
+        return times
+
+    @staticmethod
+    def _combine(dates: List[datetime], times: List[Tuple[int, int]],
+                 text_lower: str) -> Optional[Dict[str, datetime]]:
+        """Début et fin de l'événement mentionné."""
+        if dates:
+            base_date = dates[0]
+        else:
+            base_date = ExtractionEngine._relative_date(text_lower)
+            if base_date is None:
+                return None
+
+        if not times:
+            # Pas d'heure spécifiée, créer un événement toute la journée
+            return {
+                'start_time': base_date.replace(hour=9, minute=0),
+                'end_time': base_date.replace(hour=17, minute=0)
+            }
+
+        hour, minute = times[0]
+        start_time = base_date.replace(hour=hour, minute=minute)
+
+        if dates and len(times) > 1:
+            end_hour, end_minute = times[1]
+            end_time = base_date.replace(hour=end_hour, minute=end_minute)
+        else:
+            # Durée par défaut de 1 heure
+            end_time = start_time + timedelta(hours=1)
+
+        return {'start_time': start_time, 'end_time': end_time}
+
+    @staticmethod
+    def _relative_date(text_lower: str) -> Optional[datetime]:
+        """Date désignée par une expression relative (demain, dans 3 jours...)."""
+        for pattern, days_offset in _RELATIVE_PATTERNS:
+            match = pattern.search(text_lower)
+            if not match:
+                continue
+
+            if days_offset is None and match.group(1).isdigit():
+                days_offset = int(match.group(1))
+            elif days_offset is None:
+                days_offset = (WEEKDAYS.index(match.group(1)) - datetime.now().weekday()) % 7 or 7
+
+            return datetime.now() + timedelta(days=days_offset)
+
         return None
 
-def extract_contact_info(text: str) -> Dict[str, str]:
-    """
-    Extrait les informations de contact d'un texte.
-    
-    Args:
-        text: Le texte à analyser.
-        
-    Returns:
-        Dictionnaire avec les informations de contact.
-    """
-    contact_info = {}
-    
-    try:
-        # Numéros de téléphone français
-        phone_patterns = [
-            r'(?:\+33|0)[1-9](?:[0-9]{8})',  # Format français
-            r'(?:\+\d{1,3})?[- ]?\(?\d{3}\)?[- ]?\d{3}[- ]?\d{4}',  # Format international
-        ]
-        
-        for pattern in phone_patterns:
-            matches = re.findall(pattern, text)
-            if matches:
-                contact_info['phone'] = matches[0]
-                break
-        
-        # Adresses email
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
-        if emails:
-            contact_info['email'] = emails[0]
-        
-        # Adresses physiques
-        address_patterns = [
-            r'\d+\s+[\w\s]+(?:rue|avenue|boulevard|place|impasse|allée)\s+[\w\s]+',
-            r'(?:rue|avenue|boulevard|place|impasse|allée)\s+[\w\s]+\s+\d+',
-        ]
-        
-        for pattern in address_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                contact_info['address'] = matches[0]
+    @staticmethod
+    def _contacts(text: str, result: ExtractionResult):
+        for pattern in _PHONE_PATTERNS:
+            result.phones = pattern.findall(text)
+            if result.phones:
                 break
-        
-        # Lieux/salles
-        location_patterns = [
-            r'(?:salle|bureau|local|étage)\s+[\w\s\d]+',
-            r'(?:au|à la|à l\'|dans le|dans la)\s+[\w\s]+',
-        ]
-        
-        for pattern in location_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                contact_info['location'] = matches[0]
-                break
-        
-        return contact_info
-        
-    except Exception as e:
-        logger.error(f"Erreur lors de l'extraction d'informations de contact: {e}")
-        return {}
 
-def clean_text(text: str) -> str:
-    """
-    Nettoie un texte en supprimant les caractères indésirables.
-    
-    Args:
-        text: Le texte à nettoyer.
-        
-    Returns:
-        Le texte nettoyé.
-    """
-    try:
-        # Supprimer les caractères spéciaux
-        text = re.sub(r'[^\w\s\.\,\!\?\-\:\;\'\"àâäçéèêëïîôùûüÿ]', '', text)
-        
-        # Supprimer les espaces multiples
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Supprimer les espaces en début/fin
-        text = text.strip()
-        
-        return text
-        
-    except Exception as e:
-        logger.error(f"Erreur lors du nettoyage du texte: {e}")
-        return text
+        result.emails = _EMAIL_PATTERN.findall(text)
 
-def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
-    """
-    Extrait les mots-clés d'un texte.
-    
-    Args:
-        text: Le texte à analyser.
-        max_keywords: Nombre maximum de mots-clés à retourner.
-        
-    Returns:
-        Liste des mots-clés.
-    """
-    try:
-        # Mots vides en français
-        stop_words = {
-            'le', 'la', 'les', 'un', 'une', 'des', 'de', 'du', 'et', 'à', 'il',
-            'elle', 'on', 'ils', 'elles', 'je', 'tu', 'nous', 'vous', 'me', 'te',
-            'se', 'ce', 'cet', 'cette', 'ces', 'mon', 'ton', 'son', 'ma', 'ta',
-            'sa', 'mes', 'tes', 'ses', 'notre', 'votre', 'leur', 'dans', 'pour',
-            'avec', 'sans', 'sur', 'sous', 'par', 'en', 'au', 'aux', 'du', 'des',
-            'que', 'qui', 'quoi', 'dont', 'où', 'si', 'mais', 'ou', 'donc', 'car',
-            'ni', 'or', 'est', 'être', 'avoir', 'faire', 'aller', 'venir', 'voir',
-            'savoir', 'pouvoir', 'vouloir', 'devoir', 'falloir', 'prendre', 'dire',
-            'mettre', 'donner', 'passer', 'partir', 'sortir', 'venir', 'arriver',
-            'entrer', 'monter', 'descendre', 'rester', 'tenir', 'porter', 'suivre'
-        }
-        
-        # Nettoyer le texte et extraire les mots
-        words = re.findall(r'\b[a-zA-Zàâäçéèêëïîôùûüÿ]+\b', text.lower())
-        
-        # Filtrer les mots vides et courts
-        filtered_words = [
-            word for word in words
-            if word not in stop_words and len(word) > 2
-        ]
-        
-        # Compter les occurrences
-        word_count = {}
-        for word in filtered_words:
-            word_count[word] = word_count.get(word, 0) + 1
-        
-        # Trier par fréquence et retourner les top mots-clés
-        sorted_words = sorted(word_count.items(), key=lambda x: x[1], reverse=True)
-        keywords = [word for word, count in sorted_words[:max_keywords]]
-        
-        return keywords
-        
-    except Exception as e:
-        logger.error(f"Erreur lors de l'extraction des mots-clés: {e}")
-        return []
+        segments = []
+        if _STREET_PATTERN.search(text):
+            segments = [
+                segment.group() for segment in _SEGMENT_PATTERN.finditer(text)
+                if _STREET_PATTERN.search(segment.group())
+            ]
+        for pattern in _ADDRESS_PATTERNS:
+            match = next(filter(None, map(pattern.search, segments)), None)
+            if match:
+                result.address = match.group()
+                break
 
-def is_professional_email(email_address: str) -> bool:
-    """
-    Détermine si une adresse email est professionnelle.
-    
-    Args:
-        email_address: L'adresse email à analyser.
-        
-    Returns:
-        True si l'email semble professionnel, False sinon.
-    """
-    try:
-        # Domaines personnels courants
-        personal_domains = [
-            'gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com',
-            'free.fr', 'orange.fr', 'wanadoo.fr', 'sfr.fr',
-            'laposte.net', 'numericable.fr', 'bbox.fr'
-        ]
-        
-        domain = email_address.split('@')[1].lower()
-        
-        # Si le domaine est dans la liste des domaines personnels
-        if domain in personal_domains:
-            return False
-        
-        # Vérifier si le domaine contient des mots-clés professionnels
-        professional_keywords = [
-            'company', 'corp', 'inc', 'ltd', 'sa', 'sarl', 'sas',
-            'groupe', 'consulting', 'services', 'solutions'
-        ]
-        
-        if any(keyword in domain for keyword in professional_keywords):
-            return True
-        
-        # Si le domaine n'est pas personnel et semble être un domaine d'entreprise
-        return '.' in domain and len(domain.split('.')) >= 2
-        
-    except Exception as e:
-        logger.error(f"Erreur lors de l'analyse de l'email professionnel: {e}")
-        return False
+        for pattern in _LOCATION_PATTERNS:
+            match = pattern.search(text)
+            if match:
+                result.location = match.group()
+                break
 
-def calculate_email_importance(email_content: str, sender_email: str) -> int:
-    """
-    Calcule l'importance d'un email sur une échelle de 1 à 5.
-    
-    Args:
-        email_content: Le contenu de l'email.
-        sender_email: L'adresse de l'expéditeur.
-        
-    Returns:
-        Score d'importance (1-5).
-    """
-    try:
+    @staticmethod
+    def _importance(text_lower: str, professional: bool) -> int:
         importance = 1
-        content_lower = email_content.lower()
-        
-        # Mots-clés d'urgence
-        urgent_keywords = [
-            'urgent', 'asap', 'immédiat', 'priorité', 'deadline',
-            'échéance', 'time-sensitive', 'critique', 'important'
-        ]
-        
-        if any(keyword in content_lower for keyword in urgent_keywords):
+        if _URGENT_PATTERN.search(text_lower):
             importance += 2
-        
-        # Vérifier si c'est un email professionnel
-        if is_professional_email(sender_email):
+        if professional:
             importance += 1
-        
-        # Mots-clés de business
-        business_keywords = [
-            'contrat', 'projet', 'client', 'réunion', 'meeting',
-            'deadline', 'budget', 'facture', 'commande'
-        ]
-        
-        if any(keyword in content_lower for keyword in business_keywords):
+        if _BUSINESS_PATTERN.search(text_lower):
             importance += 1
-        
-        # Limiter à 5
         return min(importance, 5)
-        
-    except Exception as e:
-        logger.error(f"Erreur lors du calcul d'importance: {e}")
-        return 1
 
-logger = logging.getLogger(__name__)
+
+_engine = ExtractionEngine()
+
+def _extract_one(message: Union[str, Tuple[str, str]]) -> ExtractionResult:
+    """Analyse d'un message (texte, ou (texte, expéditeur))."""
+    if isinstance(message, str):
+        return _engine.extract(message)
+    return _engine.extract(*message)
+
+def extract_batch(messages: Iterable[Union[str, Tuple[str, str]]]) -> List[ExtractionResult]:
+    """
+    Analyse un lot de messages.
+
+    Args:
+        messages: Textes, ou couples (texte, adresse de l'expéditeur)
+
+    Returns:
+        Les résultats, dans l'ordre des messages
+    """
+    return [_extract_one(message) for message in messages]
 
 def extract_datetime(text: str) -> Optional[Dict[str, datetime]]:
     """
-    Extrait les informations de date et heure d'un texte.
-    
+    Extrait les informations de date et heure d'un texte (VERSION LOCALE).
+
     Args:
         text: Le texte à analyser.
-        
+
     Returns:
         Dictionnaire avec start_time et end_time ou None.
     """
     try:
-        # Patterns pour les dates en français
-        date_patterns = [
-            r'(\d{1,2})/(\d{1,2})/(\d{4})',  # DD/MM/YYYY
-            r'(\d{1,2})-(\d{1,2})-(\d{4})',  # DD-MM-YYYY
-            r'(\d{1,2}) (\w+) (\d{4})',      # DD mois YYYY
-            r'(\w+) (\d{1,2}), (\d{4})',     # mois DD, YYYY
-        ]
-        
-        # Patterns pour les heures
-        time_patterns = [
-            r'(\d{1,2})[h:](\d{2})',        # HH:MM ou HHhMM
-            r'(\d{1,2})[h:](\d{2})\s*(am|pm)?',  # avec AM/PM
-            r'(\d{1,2})\s*(h|heures?)',     # HH h
-        ]
-        
-        # Rechercher les dates
-        dates_found = []
-        for pattern in date_patterns:
-            matches = re.findall(pattern, text.lower())
-            for match in matches:
-                try:
-                    if len(match) == 3:
-                        if match[1].isdigit():  # DD/MM/YYYY format
-                            date_str = f"{match[0]}/{match[1]}/{match[2]}"
-                            date_obj = datetime.strptime(date_str, "%d/%m/%Y")
-                        else:  # DD mois YYYY format
-                            date_str = f"{match[0]} {match[1]} {match[2]}"
-                            date_obj = date_parser.parse(date_str, dayfirst=True)
-                        dates_found.append(date_obj)
-                except (ValueError, TypeError):
-                    continue
-        
-        # Rechercher les heures
-        times_found = []
-        for pattern in time_patterns:
-            matches = re.findall(pattern, text.lower())
-            for match in matches:
-                try:
-                    if isinstance(match, tuple) and len(match) >= 2:
-                        hour = int(match[0])
-                        minute = int(match[1]) if match[1].isdigit() else 0
-                        
-                        # Gérer AM/PM
-                        if len(match) > 2 and match[2]:
-                            if match[2] == 'pm' and hour != 12:
-                                hour += 12
-                            elif match[2] == 'am' and hour == 12:
-                                hour = 0
-                        
-                        times_found.append((hour, minute))
-                except (ValueError, TypeError):
-                    continue
-        
-        # Combiner dates et heures
-        if dates_found:
-            base_date = dates_found[0]
-            
-            if times_found:
-                hour, minute = times_found[0]
-                start_time = base_date.replace(hour=hour, minute=minute)
-                
-                # Essayer de trouver une heure de fin
-                end_time = None
-                if len(times_found) > 1:
-                    end_hour, end_minute = times_found[1]
-                    end_time = base_date.replace(hour=end_hour, minute=end_minute)
-                else:
-                    # Durée par défaut de 1 heure
-                    end_time = start_time + timedelta(hours=1)
-                
-                return {
-                    'start_time': start_time,
-                    'end_time': end_time
-                }
-            else:
-                # Pas d'heure spécifiée, créer un événement toute la journée
-                return {
-                    'start_time': base_date.replace(hour=9, minute=0),
-                    'end_time': base_date.replace(hour=17, minute=0)
-                }
-        
-        # Rechercher des expressions relatives
-        relative_patterns = [
-            (r'demain', 1),
-            (r'après[- ]demain', 2),
-            (r'dans (\d+) jours?', None),
-            (r'la semaine prochaine', 7),
-            (r'lundi prochain', None),
-            (r'mardi prochain', None),
-            (r'mercredi prochain', None),
-            (r'jeudi prochain', None),
-            (r'vendredi prochain', None),
-        ]
-        
-        for pattern, days_offset in relative_patterns:
-            match = re.search(pattern, text.lower())
-            if match:
-                if days_offset is None and pattern.startswith(r'dans'):
-                    days_offset = int(match.group(1))
-                elif days_offset is None:  # jour de la semaine
-                    weekdays = ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi']
-                    day_name = pattern.split()[0]
-                    if day_name in weekdays:
-                        current_weekday = datetime.now().weekday()
-                        target_weekday = weekdays.index(day_name)
-                        days_offset = (target_weekday - current_weekday) % 7
-                        if days_offset == 0:
-                            days_offset = 7  # Semaine prochaine
-                
-                if days_offset is not None:
-                    target_date = datetime.now() + timedelta(days=days_offset)
-                    
-                    # Essayer de trouver une heure
-                    if times_found:
-                        hour, minute = times_found[0]
-                        start_time = target_date.replace(hour=hour, minute=minute)
-                        end_time = start_time + timedelta(hours=1)
-                    else:
-                        start_time = target_date.replace(hour=9, minute=0)
-                        end_time = target_date.replace(hour=17, minute=0)
-                    
-                    return {
-                        'start_time': start_time,
-                        'end_time': end_time
-                    }
-        
-        return None
-        
+        text_lower = text.lower()
+        return _engine._combine(_engine._dates(text_lower), _engine._times(text_lower), text_lower)
     except Exception as e:
         logger.error(f"Erreur lors de l'extraction de date/heure: {e}")
         return None
@@ -534,60 +330,17 @@ def extract_datetime(text: str) -> Optional[Dict[str, datetime]]:
 def extract_contact_info(text: str) -> Dict[str, str]:
     """
     Extrait les informations de contact d'un texte.
-    
+
     Args:
         text: Le texte à analyser.
-        
+
     Returns:
         Dictionnaire avec les informations de contact.
     """
-    contact_info = {}
-    
     try:
-        # Numéros de téléphone
-        phone_patterns = [
-            r'(?:\+33|0)[1-9](?:[0-9]{8})',  # Français
-            r'(?:\+\d{1,3})?[- ]?\(?\d{3}\)?[- ]?\d{3}[- ]?\d{4}',  # Général
-        ]
-        
-        for pattern in phone_patterns:
-            matches = re.findall(pattern, text)
-            if matches:
-                contact_info['phone'] = matches[0]
-                break
-        
-        # Adresses email
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, text)
-        if emails:
-            contact_info['email'] = emails[0]
-        
-        # Adresses
-        address_patterns = [
-            r'\d+\s+[\w\s]+(?:rue|avenue|boulevard|place|impasse|allée)\s+[\w\s]+',
-            r'(?:rue|avenue|boulevard|place|impasse|allée)\s+[\w\s]+\s+\d+',
-        ]
-        
-        for pattern in address_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                contact_info['address'] = matches[0]
-                break
-        
-        # Lieux/salles
-        location_patterns = [
-            r'(?:salle|bureau|local|étage)\s+[\w\s\d]+',
-            r'(?:au|à la|à l\'|dans le|dans la)\s+[\w\s]+',
-        ]
-        
-        for pattern in location_patterns:
-            matches = re.findall(pattern, text, re.IGNORECASE)
-            if matches:
-                contact_info['location'] = matches[0]
-                break
-        
-        return contact_info
-        
+        result = ExtractionResult()
+        _engine._contacts(text, result)
+        return result.contact_info()
     except Exception as e:
         logger.error(f"Erreur lors de l'extraction d'informations de contact: {e}")
         return {}
@@ -595,75 +348,41 @@ def extract_contact_info(text: str) -> Dict[str, str]:
 def clean_text(text: str) -> str:
     """
     Nettoie un texte en supprimant les caractères indésirables.
-    
+
     Args:
         text: Le texte à nettoyer.
-        
+
     Returns:
         Le texte nettoyé.
     """
     try:
-        # Supprimer les caractères spéciaux
-        text = re.sub(r'[^\w\s\.\,\!\?\-\:\;\'\"àâäçéèêëïîôùûüÿ]', '', text)
-        
-        # Supprimer les espaces multiples
-        text = re.sub(r'\s+', ' ', text)
-        
-        # Supprimer les espaces en début/fin
-        text = text.strip()
-        
-        return text
-        
+        # Supprimer les caractères spéciaux puis les espaces multiples
+        return _SPACES_PATTERN.sub(' ', _CLEAN_PATTERN.sub('', text)).strip()
     except Exception as e:
         logger.error(f"Erreur lors du nettoyage du texte: {e}")
         return text
 
-def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
+def keyword_tokens(text_lower: str) -> List[str]:
+    """Mots candidats (hors mots vides et mots courts) d'un texte en minuscules."""
+    return [word for word in _WORD_PATTERN.findall(text_lower) if len(word) > 2 and word not in STOP_WORDS]
+
+def extract_keywords(text: str, max_keywords: int = 10, index=None) -> List[str]:
     """
     Extrait les mots-clés d'un texte.
-    
+
     Args:
         text: Le texte à analyser.
         max_keywords: Nombre maximum de mots-clés à retourner.
-        
+        index: Index de mots-clés du corpus (app.ai.keyword_index) ; s'il est fourni,
+            les mots sont classés par TF-IDF plutôt que par fréquence brute.
+
     Returns:
         Liste des mots-clés.
     """
     try:
-        # Mots vides en français
-        stop_words = {
-            'le', 'la', 'les', 'un', 'une', 'des', 'de', 'du', 'et', 'à', 'il',
-            'elle', 'on', 'ils', 'elles', 'je', 'tu', 'nous', 'vous', 'me', 'te',
-            'se', 'ce', 'cet', 'cette', 'ces', 'mon', 'ton', 'son', 'ma', 'ta',
-            'sa', 'mes', 'tes', 'ses', 'notre', 'votre', 'leur', 'dans', 'pour',
-            'avec', 'sans', 'sur', 'sous', 'par', 'en', 'au', 'aux', 'du', 'des',
-            'que', 'qui', 'quoi', 'dont', 'où', 'si', 'mais', 'ou', 'donc', 'car',
-            'ni', 'or', 'est', 'être', 'avoir', 'faire', 'aller', 'venir', 'voir',
-            'savoir', 'pouvoir', 'vouloir', 'devoir', 'falloir', 'prendre', 'dire',
-            'mettre', 'donner', 'passer', 'partir', 'sortir', 'venir', 'arriver',
-            'entrer', 'monter', 'descendre', 'rester', 'tenir', 'porter', 'suivre'
-        }
-        
-        # Nettoyer le texte et extraire les mots
-        words = re.findall(r'\b[a-zA-Zàâäçéèêëïîôùûüÿ]+\b', text.lower())
-        
-        # Filtrer les mots vides et courts
-        filtered_words = [
-            word for word in words
-            if word not in stop_words and len(word) > 2
-        ]
-        
-        # Compter les occurrences
-        word_count = {}
-        for word in filtered_words:
-            word_count[word] = word_count.get(word, 0) + 1
-        
-        # Trier par fréquence et retourner les top mots-clés
-        sorted_words = sorted(word_count.items(), key=lambda x: x[1], reverse=True)
-        keywords = [word for word, count in sorted_words[:max_keywords]]
-        
-        return keywords
-        
+        if index is not None:
+            return [word for word, _ in index.keywords(text, max_keywords)]
+        return _engine.keywords(text.lower(), max_keywords)
     except Exception as e:
         logger.error(f"Erreur lors de l'extraction des mots-clés: {e}")
         return []
@@ -671,83 +390,51 @@ def extract_keywords(text: str, max_keywords: int = 10) -> List[str]:
 def is_professional_email(email_address: str) -> bool:
     """
     Détermine si une adresse email est professionnelle.
-    
+
     Args:
         email_address: L'adresse email à analyser.
-        
+
     Returns:
         True si l'email semble professionnel, False sinon.
     """
     try:
-        # Domaines personnels courants
-        personal_domains = [
-            'gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com',
-            'free.fr', 'orange.fr', 'wanadoo.fr', 'sfr.fr',
-            'laposte.net', 'numericable.fr', 'bbox.fr'
-        ]
-        
         domain = email_address.split('@')[1].lower()
-        
+
         # Si le domaine est dans la liste des domaines personnels
-        if domain in personal_domains:
+        if domain in PERSONAL_DOMAINS:
             return False
-        
+
         # Vérifier si le domaine contient des mots-clés professionnels
-        professional_keywords = [
-            'company', 'corp', 'inc', 'ltd', 'sa', 'sarl', 'sas',
-            'groupe', 'consulting', 'services', 'solutions'
-        ]
-        
-        if any(keyword in domain for keyword in professional_keywords):
+        if any(keyword in domain for keyword in PROFESSIONAL_KEYWORDS):
             return True
-        
+
         # Si le domaine n'est pas personnel et semble être un domaine d'entreprise
         return '.' in domain and len(domain.split('.')) >= 2
-        
+
     except Exception as e:
         logger.error(f"Erreur lors de l'analyse de l'email professionnel: {e}")
         return False
 
-def calculate_email_importance(email_content: str, sender_email: str) -> int:
+def calculate_email_importance(email_content: str, sender_email: str, sender_stats=None) -> int:
     """
     Calcule l'importance d'un email sur une échelle de 1 à 5.
-    
+
     Args:
         email_content: Le contenu de l'email.
         sender_email: L'adresse de l'expéditeur.
-        
+        sender_stats: Historique des échanges avec l'expéditeur (app.ai.sender_index.SenderStats).
+
     Returns:
         Score d'importance (1-5).
     """
     try:
-        importance = 1
-        content_lower = email_content.lower()
-        
-        # Mots-clés d'urgence
-        urgent_keywords = [
-            'urgent', 'asap', 'immédiat', 'priorité', 'deadline',
-            'échéance', 'time-sensitive', 'critique', 'important'
-        ]
-        
-        if any(keyword in content_lower for keyword in urgent_keywords):
-            importance += 2
-        
-        # Vérifier si c'est un email professionnel
-        if is_professional_email(sender_email):
-            importance += 1
-        
-        # Mots-clés de business
-        business_keywords = [
-            'contrat', 'projet', 'client', 'réunion', 'meeting',
-            'deadline', 'budget', 'facture', 'commande'
-        ]
-        
-        if any(keyword in content_lower for keyword in business_keywords):
-            importance += 1
-        
-        # Limiter à 5
-        return min(importance, 5)
-        
+        importance = _engine._importance(email_content.lower(), is_professional_email(sender_email))
+        hint = sender_stats.urgency_hint() if sender_stats else None
+        if hint == 'important':
+            importance = min(importance + 1, 5)
+        elif hint == 'low':
+            importance = max(importance - 1, 1)
+        return importance
     except Exception as e:
         logger.error(f"Erreur lors du calcul d'importance: {e}")
-        return 1
\ No newline at end of file
+        return 1
@@ -0,0 +1,490 @@
+"""
+Résolution des expressions temporelles (français et anglais).
+
+Transforme « mardi prochain à 14h », « demain matin », « dans 2 semaines »,
+« le 3 novembre » ou « next friday 2-4pm » en dates concrètes, relativement
+à la date de réception de l'email, sans appel au modèle.
+"""
+import calendar
+import logging
+import re
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta
+from typing import Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MONTH_NAMES = {
+    'janvier': 1, 'janv': 1, 'january': 1, 'jan': 1,
+    'février': 2, 'fevrier': 2, 'févr': 2, 'fév': 2, 'fev': 2, 'february': 2, 'feb': 2,
+    'mars': 3, 'march': 3,
+    'avril': 4, 'avr': 4, 'april': 4, 'apr': 4,
+    'mai': 5, 'may': 5,
+    'juin': 6, 'june': 6, 'jun': 6,
+    'juillet': 7, 'juil': 7, 'july': 7, 'jul': 7,
+    'août': 8, 'aout': 8, 'august': 8, 'aug': 8,
+    'septembre': 9, 'september': 9, 'sept': 9, 'sep': 9,
+    'octobre': 10, 'october': 10, 'oct': 10,
+    'novembre': 11, 'november': 11, 'nov': 11,
+    'décembre': 12, 'decembre': 12, 'december': 12, 'déc': 12, 'dec': 12
+}
+
+WEEKDAY_NAMES = {
+    'lundi': 0, 'monday': 0, 'mardi': 1, 'tuesday': 1, 'mercredi': 2, 'wednesday': 2,
+    'jeudi': 3, 'thursday': 3, 'vendredi': 4, 'friday': 4, 'samedi': 5, 'saturday': 5,
+    'dimanche': 6, 'sunday': 6
+}
+
+NUMBER_WORDS = {
+    'un': 1, 'une': 1, 'a': 1, 'an': 1, 'one': 1, 'deux': 2, 'two': 2, 'trois': 3, 'three': 3,
+    'quatre': 4, 'four': 4, 'cinq': 5, 'five': 5, 'six': 6, 'sept': 7, 'seven': 7,
+    'huit': 8, 'eight': 8, 'neuf': 9, 'nine': 9, 'dix': 10, 'ten': 10, 'quinze': 15
+}
+
+# Moments de la journée : (début, fin)
+PARTS_OF_DAY = {
+    'matin': (time(9), time(12)), 'matinée': (time(9), time(12)), 'morning': (time(9), time(12)),
+    'midi': (time(12), time(13)), 'noon': (time(12), time(13)),
+    'après-midi': (time(14), time(18)), 'apres-midi': (time(14), time(18)), 'afternoon': (time(14), time(18)),
+    'soir': (time(19), time(21)), 'soirée': (time(19), time(21)), 'evening': (time(19), time(21)),
+    'tonight': (time(19), time(21)), 'minuit': (time(0), time(1)), 'midnight': (time(0), time(1))
+}
+
+# Jours relatifs : (décalage en jours, moment de la journée implicite)
+RELATIVE_DAYS = {
+    "aujourd'hui": (0, None), 'today': (0, None),
+    'après-demain': (2, None), 'apres-demain': (2, None), 'après demain': (2, None),
+    'day after tomorrow': (2, None),
+    'demain': (1, None), 'tomorrow': (1, None),
+    'hier': (-1, None), 'yesterday': (-1, None),
+    'ce matin': (0, 'matin'), 'this morning': (0, 'morning'),
+    'cet après-midi': (0, 'après-midi'), 'cet apres-midi': (0, 'après-midi'), 'this afternoon': (0, 'afternoon'),
+    'ce soir': (0, 'soir'), 'this evening': (0, 'evening'), 'tonight': (0, 'tonight')
+}
+
+# Périodes : (unité, décalage)
+PERIODS = {
+    'cette semaine': ('week', 0), 'this week': ('week', 0),
+    'la semaine prochaine': ('week', 1), 'semaine prochaine': ('week', 1), 'next week': ('week', 1),
+    'ce mois-ci': ('month', 0), 'this month': ('month', 0),
+    'le mois prochain': ('month', 1), 'mois prochain': ('month', 1), 'next month': ('month', 1),
+    'ce week-end': ('weekend', 0), 'ce weekend': ('weekend', 0), 'this weekend': ('weekend', 0),
+    'le week-end prochain': ('weekend', 1), 'next weekend': ('weekend', 1)
+}
+
+def _alternation(words) -> str:
+    """Alternative regex, mots les plus longs d'abord."""
+    return '|'.join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+_MONTH = _alternation(MONTH_NAMES)
+_WEEKDAY = _alternation(WEEKDAY_NAMES)
+_NUMBER = rf"\d{{1,3}}|{_alternation(NUMBER_WORDS)}"
+_ORDINAL = r"(?:er|re|st|nd|rd|th)?"
+
+def _first_letters(*tables) -> str:
+    """Classe regex des caractères pouvant commencer une expression (filtre rapide)."""
+    return '[\\d' + ''.join(sorted({word[0] for table in tables for word in table})) + ']'
+
+# Toutes les expressions commencent en début de mot : le préfixe \b(?=...) écarte
+# la plupart des positions avant d'essayer chaque alternative
+_DATE_RE = re.compile(
+    rf"\b(?={_first_letters(MONTH_NAMES, WEEKDAY_NAMES, RELATIVE_DAYS, PERIODS, ['dans', 'in', 'within', 'ce', 'this', 'next', 'on'])})(?:"
+    rf"(?P<iso>(?<!\d)(?P<iy>\d{{4}})-(?P<im>\d{{1,2}})-(?P<id>\d{{1,2}})(?!\d))"
+    rf"|(?P<num>(?<![\d/.])(?!24/7(?!\d))(?P<nd>\d{{1,2}})(?:/(?P<nm>\d{{1,2}})(?:/(?P<ny>\d{{4}}|\d{{2}}))?"
+    rf"|[.-](?P<nm2>\d{{1,2}})[.-](?P<ny2>\d{{4}}))(?![\d/])(?!\.\d))"
+    rf"|(?P<dm>\b(?:(?:{_WEEKDAY})\s+)?(?P<dmd>\d{{1,2}}){_ORDINAL}\s+(?:of\s+)?(?P<dmm>{_MONTH})\b\.?"
+    rf"(?:\s+(?P<dmy>\d{{4}})\b)?)"
+    rf"|(?P<md>\b(?P<mdm>{_MONTH})\b\.?\s+(?P<mdd>\d{{1,2}}){_ORDINAL}\b(?:,?\s+(?P<mdy>\d{{4}})\b)?)"
+    rf"|(?P<rel>\b(?:{_alternation(RELATIVE_DAYS)})\b)"
+    rf"|(?P<per>\b(?:{_alternation(PERIODS)})\b)"
+    rf"|(?P<off>\b(?:dans|d'ici|in|within)\s+(?P<offn>{_NUMBER})\s+"
+    rf"(?P<offu>jours?|days?|semaines?|weeks?|mois|months?)\b)"
+    rf"|(?P<wd>\b(?:(?P<wdmod>ce|this|next|on)\s+)?(?P<wdn>{_WEEKDAY})\b"
+    rf"(?:\s+(?P<wdnext>prochain|suivant|qui vient))?))"
+)
+
+# Contexte exigé avant une date numérique sans année (« le 3/4 », « du 3/4 au 5/4 »,
+# « mardi 3/4 ») : seule, « version 3/4 » ou « ratio 1/2 » n'est pas une date
+_NUMERIC_DATE_CONTEXT_RE = re.compile(
+    rf"\b(?:le|du|au|on|by|until|from|{_WEEKDAY})\s*,?\s*$"
+)
+
+_TIME_RE = re.compile(
+    rf"\b(?={_first_letters(PARTS_OF_DAY)})(?:"
+    r"(?P<span>(?<![\d/.:])(?P<sh>\d{1,2})\s*(?:-|–|to)\s*(?P<eh>\d{1,2})\s*(?P<sap>am|pm|a\.m\.|p\.m\.))"
+    r"|(?P<atom>(?<![\d/.:])(?P<h>\d{1,2})\s*(?:(?:h|:)(?P<m>\d{2})|h(?:eures?)?\b)"
+    r"(?:\s*(?P<ap>am|pm|a\.m\.|p\.m\.))?|(?<![\d/.:])(?P<h2>\d{1,2})\s*(?P<ap2>am|pm|a\.m\.|p\.m\.))"
+    rf"|(?P<pod>\b(?:{_alternation(PARTS_OF_DAY)})\b))"
+)
+
+# Liaisons autorisées entre une date et une heure (« demain à 14h », « 14h le 3 mars »)
+_LINK_RE = re.compile(
+    r"^[\s,]*(?:(?:à|a|at|vers|dès|des|de|du|from|entre|between|around|aux alentours de|le|la|on|en|dans la|in the)"
+    r"[\s,]+)*$"
+)
+
+# Liaisons d'une plage horaire (« 14h-16h », « de 14h à 16h », « 2 to 4pm »)
+_RANGE_RE = re.compile(r"^\s*(?:-|–|à|a|to|et|and|until|till|jusqu'à|jusqu'a)\s*$")
+
+_TimeExpr = namedtuple('_TimeExpr', 'start_pos end_pos start end granularity')
+
+@dataclass
+class TemporalMatch:
+    """Expression temporelle résolue."""
+    text: str
+    span: Tuple[int, int]
+    start: datetime
+    end: datetime
+    has_time: bool
+    granularity: str  # time, part_of_day, day, week, weekend, month
+
+
+def _is_plausible_date(match, text: str, lowered: str) -> bool:
+    """
+    Écarte les faux positifs des formes ambiguës : d/m sans année ni contexte
+    de date, et « may » anglais (verbe) sans majuscule ni année.
+    """
+    group = match.group
+    if group('num') and not (group('ny') or group('ny2')):
+        return bool(_NUMERIC_DATE_CONTEXT_RE.search(lowered, max(0, match.start() - 20), match.start()))
+
+    month_group = 'dmm' if group('dm') else 'mdm' if group('md') else None
+    if month_group and group(month_group) == 'may' and not (group('dmy') or group('mdy')):
+        return text[match.start(month_group)] == 'M'
+    return True
+
+
+class TemporalParser:
+    """Analyseur déterministe d'expressions temporelles."""
+
+    def __init__(self, default_duration: timedelta = timedelta(hours=1),
+                 past_tolerance: timedelta = timedelta(days=7), max_gap: int = 24):
+        """
+        Args:
+            default_duration: Durée d'un événement dont seule l'heure de début est connue
+            past_tolerance: Une date sans année plus ancienne que cela est placée l'année suivante
+            max_gap: Distance maximale (caractères) entre une date et son heure
+        """
+        self.default_duration = default_duration
+        self.past_tolerance = past_tolerance
+        self.max_gap = max_gap
+
+    def parse(self, text: str, reference: Optional[datetime] = None) -> List[TemporalMatch]:
+        """
+        Trouve et résout les expressions temporelles d'un texte.
+
+        Args:
+            text: Texte à analyser
+            reference: Date de référence (date de réception de l'email, maintenant si None ;
+                une date avec fuseau est ramenée à l'heure locale)
+
+        Returns:
+            Les expressions résolues, dans l'ordre du texte
+        """
+        if not text:
+            return []
+
+        reference = _local_reference(reference)
+        lowered = text.lower().replace('’', "'")
+        times = self._times(lowered)
+        used = set()
+        matches = []
+
+        for match in _DATE_RE.finditer(lowered):
+            if not _is_plausible_date(match, text, lowered):
+                continue
+            try:
+                resolved = self._resolve_date(match, reference.date())
+            except (ValueError, OverflowError):
+                continue
+            if resolved is None:
+                continue
+
+            day, granularity, span_end, implied_part = resolved
+            start_pos, end_pos = match.span()
+
+            # Heure associée (juste après la date, ou juste avant)
+            time_expr = None
+            if granularity == 'day':
+                index = self._linked_time(lowered, times, used, start_pos, end_pos)
+                if index is not None:
+                    used.add(index)
+                    time_expr = times[index]
+                    start_pos, end_pos = min(start_pos, time_expr.start_pos), max(end_pos, time_expr.end_pos)
+                elif implied_part:
+                    part_start, part_end = PARTS_OF_DAY[implied_part]
+                    time_expr = _TimeExpr(start_pos, end_pos, part_start, part_end, 'part_of_day')
+
+            if time_expr:
+                start = datetime.combine(day, time_expr.start)
+                end = datetime.combine(day, time_expr.end) if time_expr.end else start + self.default_duration
+                if end <= start:
+                    end += timedelta(days=1)
+                matches.append(TemporalMatch(text[start_pos:end_pos], (start_pos, end_pos), start, end,
+                                             True, time_expr.granularity))
+            else:
+                matches.append(TemporalMatch(text[start_pos:end_pos], (start_pos, end_pos),
+                                             datetime.combine(day, time()), datetime.combine(span_end, time()),
+                                             False, granularity))
+
+        return matches
+
+    def upcoming(self, text: str, reference: Optional[datetime] = None) -> Optional[TemporalMatch]:
+        """
+        Expression la plus probable pour un rendez-vous : la première à venir
+        avec une heure, sinon la première à venir.
+
+        Args:
+            text: Texte à analyser
+            reference: Date de référence (maintenant si None)
+
+        Returns:
+            L'expression retenue, ou None
+        """
+        reference = _local_reference(reference)
+        return _select_upcoming(self.parse(text, reference), reference)
+
+    def _times(self, lowered: str) -> List[_TimeExpr]:
+        """Heures, plages horaires et moments de la journée."""
+        exprs = []
+        for match in _TIME_RE.finditer(lowered):
+            if match.group('pod'):
+                start, end = PARTS_OF_DAY[match.group('pod')]
+                expr = _TimeExpr(match.start(), match.end(), start, end, 'part_of_day')
+            elif match.group('span'):
+                # « 2-4pm » : le suffixe s'applique aux deux heures
+                offset = 12 if match.group('sap').startswith('p') else 0
+                start_hour, end_hour = int(match.group('sh')), int(match.group('eh'))
+                if start_hour > 12 or end_hour > 12:
+                    continue
+                end_hour = end_hour % 12 + offset
+                start_hour = start_hour % 12 + (offset if start_hour % 12 + offset <= end_hour else 0)
+                expr = _TimeExpr(match.start(), match.end(), time(start_hour), time(end_hour), 'time')
+            else:
+                hour = int(match.group('h') or match.group('h2'))
+                minute = int(match.group('m') or 0)
+                meridiem = (match.group('ap') or match.group('ap2') or '').replace('.', '')
+                if meridiem == 'pm' and hour < 12:
+                    hour += 12
+                elif meridiem == 'am' and hour == 12:
+                    hour = 0
+                if hour > 23 or minute > 59:
+                    continue
+                expr = _TimeExpr(match.start(), match.end(), time(hour, minute), None, 'time')
+
+            if exprs:
+                previous = exprs[-1]
+                gap = lowered[previous.end_pos:expr.start_pos]
+
+                # Plage horaire : « 14h-16h », « 2 to 4pm »
+                if previous.granularity == 'time' and expr.granularity == 'time' and _RANGE_RE.match(gap):
+                    start = previous.start
+                    if expr.start.hour >= 12 and start.hour + 12 <= expr.start.hour and 'm' not in lowered[previous.start_pos:previous.end_pos]:
+                        start = time(start.hour + 12, start.minute)
+                    exprs[-1] = _TimeExpr(previous.start_pos, expr.end_pos, start, expr.start, 'time')
+                    continue
+
+                # « matin à 10h » : l'heure précise le moment de la journée
+                if previous.granularity == 'part_of_day' and expr.granularity == 'time' and _LINK_RE.match(gap):
+                    exprs[-1] = _TimeExpr(previous.start_pos, expr.end_pos, expr.start, None, 'time')
+                    continue
+
+            exprs.append(expr)
+        return exprs
+
+    def _linked_time(self, lowered: str, times: List[_TimeExpr], used: set,
+                     start_pos: int, end_pos: int) -> Optional[int]:
+        """Indice de l'heure liée à une date (après en priorité, puis avant)."""
+        after = before = None
+        for index, expr in enumerate(times):
+            if index in used:
+                continue
+            # Moment de la journée inclus dans la date (« ce soir à 20h »)
+            if expr.start_pos < end_pos and expr.end_pos > start_pos:
+                return index
+            if expr.start_pos >= end_pos and after is None:
+                if expr.start_pos - end_pos <= self.max_gap and _LINK_RE.match(lowered[end_pos:expr.start_pos]):
+                    after = index
+                break
+            if expr.end_pos <= start_pos and start_pos - expr.end_pos <= self.max_gap:
+                if _LINK_RE.match(lowered[expr.end_pos:start_pos]):
+                    before = index
+        return after if after is not None else before
+
+    def _resolve_date(self, match, today: date) -> Optional[Tuple[date, str, date, Optional[str]]]:
+        """
+        Résout une expression de date.
+
+        Returns:
+            (jour, granularité, fin de la période, moment de la journée implicite) ou None
+        """
+        group = match.group
+        one_day = timedelta(days=1)
+
+        if group('iso'):
+            day = date(int(group('iy')), int(group('im')), int(group('id')))
+            return day, 'day', day + one_day, None
+
+        if group('num'):
+            month = group('nm') or group('nm2')
+            year = group('ny') or group('ny2')
+            if year and len(year) == 2:
+                year = 2000 + int(year)
+            day = self._dated(today, int(group('nd')), int(month), int(year) if year else None)
+            return day, 'day', day + one_day, None
+
+        if group('dm') or group('md'):
+            day_number = group('dmd') or group('mdd')
+            month = MONTH_NAMES[group('dmm') or group('mdm')]
+            year = group('dmy') or group('mdy')
+            day = self._dated(today, int(day_number), month, int(year) if year else None)
+            return day, 'day', day + one_day, None
+
+        if group('rel'):
+            offset, implied_part = RELATIVE_DAYS[group('rel').replace('  ', ' ')]
+            day = today + timedelta(days=offset)
+            return day, 'day', day + one_day, implied_part
+
+        if group('per'):
+            unit, offset = PERIODS[group('per')]
+            if unit == 'month':
+                first = _add_months(today.replace(day=1), offset)
+                return first, 'month', _add_months(first, 1), None
+            monday = today - timedelta(days=today.weekday()) + timedelta(weeks=offset)
+            if unit == 'weekend':
+                saturday = monday + timedelta(days=5)
+                return saturday, 'weekend', saturday + timedelta(days=2), None
+            return monday, 'week', monday + timedelta(days=7), None
+
+        if group('off'):
+            amount = group('offn')
+            amount = int(amount) if amount.isdigit() else NUMBER_WORDS[amount]
+            unit = group('offu')
+            if unit.startswith(('sem', 'week')):
+                day = today + timedelta(weeks=amount)
+            elif unit.startswith(('mois', 'month')):
+                day = _add_months(today, amount)
+            else:
+                day = today + timedelta(days=amount)
+            return day, 'day', day + one_day, None
+
+        if group('wd'):
+            weekday = WEEKDAY_NAMES[group('wdn')]
+            delta = (weekday - today.weekday()) % 7
+            if delta == 0 and (group('wdnext') or group('wdmod') not in ('ce', 'this')):
+                delta = 7
+            day = today + timedelta(days=delta)
+            return day, 'day', day + one_day, None
+
+        return None
+
+    def _dated(self, today: date, day: int, month: int, year: Optional[int]) -> date:
+        """Date explicite ; sans année, la prochaine occurrence (à la tolérance près)."""
+        if year:
+            return date(year, month, day)
+        candidate = date(today.year, month, day)
+        if candidate < today - self.past_tolerance:
+            candidate = date(today.year + 1, month, day)
+        return candidate
+
+
+_WEEKDAY_LABELS = ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche']
+
+def format_match(match: TemporalMatch) -> str:
+    """Libellé français d'une expression résolue (« mardi 21/10/2025 à 14h00 »)."""
+    day = f"{_WEEKDAY_LABELS[match.start.weekday()]} {match.start:%d/%m/%Y}"
+    if match.granularity == 'week':
+        return f"semaine du {match.start:%d/%m/%Y}"
+    if match.granularity == 'month':
+        return f"{match.start:%m/%Y}"
+    if match.granularity == 'weekend':
+        return f"week-end du {match.start:%d/%m/%Y}"
+    if not match.has_time:
+        return day
+    if match.granularity == 'part_of_day' or match.end - match.start != _parser.default_duration:
+        return f"{day} de {match.start:%Hh%M} à {match.end:%Hh%M}"
+    return f"{day} à {match.start:%Hh%M}"
+
+def _select_upcoming(matches: List[TemporalMatch], reference: datetime) -> Optional[TemporalMatch]:
+    """Première expression à venir avec une heure, sinon première expression à venir."""
+    reference = _local_reference(reference)
+    future = [m for m in matches if m.end > reference]
+    timed = [m for m in future if m.has_time]
+    return (timed or future or [None])[0]
+
+def _local_reference(reference: Optional[datetime]) -> datetime:
+    """
+    Date de référence naïve en heure locale.
+
+    Les dates résolues sont naïves (heure locale) ; les dates de réception
+    Gmail portent un fuseau (parsedate_to_datetime) et ne leur seraient pas
+    comparables.
+    """
+    if reference is None:
+        return datetime.now()
+    if reference.tzinfo is not None:
+        return reference.astimezone().replace(tzinfo=None)
+    return reference
+
+def _add_months(day: date, months: int) -> date:
+    """Ajoute des mois (jour ramené à la fin du mois si nécessaire)."""
+    month_index = day.month - 1 + months
+    year, month = day.year + month_index // 12, month_index % 12 + 1
+    return date(year, month, min(day.day, calendar.monthrange(year, month)[1]))
+
+
+_parser = TemporalParser()
+
+def shared_parser() -> TemporalParser:
+    """Analyseur commun (réglages par défaut)."""
+    return _parser
+
+def _parse_one(item: Tuple[str, Optional[datetime]]) -> List[TemporalMatch]:
+    """Analyse d'un couple (texte, référence) ; exécutée dans les processus du pool."""
+    text, reference = item
+    return _parser.parse(text, reference)
+
+def parse_batch(items: Iterable[Tuple[str, Optional[datetime]]], processes: Optional[int] = None,
+                chunksize: int = 200, min_parallel: int = 2000) -> List[List[TemporalMatch]]:
+    """
+    Analyse un lot de textes, en parallèle sur plusieurs processus s'il est grand.
+
+    Args:
+        items: Couples (texte, date de référence)
+        processes: Nombre de processus (nombre de cœurs si None, 1 pour rester séquentiel)
+        chunksize: Textes envoyés à la fois à chaque processus
+        min_parallel: Taille de lot en dessous de laquelle l'analyse reste séquentielle
+
+    Returns:
+        Les expressions de chaque texte, dans l'ordre des textes
+    """
+    items = list(items)
+    if processes == 1 or len(items) < min_parallel:
+        return [_parse_one(item) for item in items]
+
+    try:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            return list(executor.map(_parse_one, items, chunksize=chunksize))
+    except Exception as e:
+        logger.error(f"Erreur analyse parallèle, repli séquentiel: {e}")
+        return [_parse_one(item) for item in items]
+
+def parse_emails(emails, processes: Optional[int] = None) -> List[Optional[TemporalMatch]]:
+    """
+    Date de rendez-vous la plus probable de chaque email.
+
+    Args:
+        emails: Emails (sujet et corps, référence = date de réception)
+        processes: Voir parse_batch
+
+    Returns:
+        Pour chaque email, l'expression retenue ou None
+    """
+    emails = list(emails)
+    references = [_local_reference(email.received_date) for email in emails]
+    texts = [f"{email.subject or ''}\n{email.body or email.snippet or ''}" for email in emails]
+    results = parse_batch(zip(texts, references), processes=processes)
+
+    return [_select_upcoming(matches, reference) for matches, reference in zip(results, references)]
@@ -0,0 +1,60 @@
+"""
+Tests de l'invalidation et du chargement par tranches des analyses enregistrées.
+"""
+import pytest
+
+from app.ai.analysis_store import AnalysisStore
+from app.models.email_model import Email
+
+VERSION = "llama3:prompt-v1"
+
+@pytest.fixture
+def store(tmp_path):
+    store = AnalysisStore(str(tmp_path / "analyses.db"))
+    yield store
+    store.close()
+
+def _email(index: int = 1, subject: str = "Facture de septembre", snippet: str = "Veuillez trouver la facture") -> Email:
+    return Email(id=f"m{index}", sender="billing@example.com", to="moi@example.com",
+                 subject=subject, body="Veuillez trouver la facture ci-jointe.", snippet=snippet)
+
+def _analysis(index: int = 1) -> dict:
+    return {'category': 'invoice', 'confidence': 0.9, 'summary': f"Facture {index}"}
+
+def test_stored_analysis_is_returned(store):
+    store.put(_email(), _analysis(), VERSION)
+
+    assert store.get(_email(), VERSION) == _analysis()
+
+def test_content_change_invalidates_analysis(store):
+    store.put(_email(), _analysis(), VERSION)
+
+    assert store.get(_email(subject="Facture d'octobre"), VERSION) is None
+    assert store.get(_email(snippet="Rappel : facture impayée"), VERSION) is None
+
+def test_version_bump_invalidates_analysis(store):
+    store.put(_email(), _analysis(), VERSION)
+
+    assert store.get(_email(), "llama3:prompt-v2") is None
+
+    store.put(_email(), _analysis(2), "llama3:prompt-v2")
+    assert store.get(_email(), "llama3:prompt-v2") == _analysis(2)
+    assert store.get(_email(), VERSION) is None
+
+def test_load_queries_by_chunks_of_500(store):
+    emails = [_email(index) for index in range(1200)]
+    for email in emails:
+        store.put(email, _analysis(int(email.id[1:])), VERSION)
+    emails[10] = _email(10, subject="Facture modifiée")
+    emails[1100] = _email(1100, subject="Facture modifiée")
+
+    statements = []
+    store._connection().set_trace_callback(statements.append)
+    found = store.load(emails, VERSION)
+    store._connection().set_trace_callback(None)
+
+    assert len([sql for sql in statements if sql.startswith("SELECT")]) == 3
+    assert len(found) == 1198
+    assert "m10" not in found and "m1100" not in found
+    assert found["m0"] == _analysis(0)
+    assert found["m1199"] == _analysis(1199)
@@ -0,0 +1,86 @@
+"""
+Tests des transitions du disjoncteur Ollama.
+"""
+import pytest
+
+from app import ollama_circuit_breaker
+from app.ollama_circuit_breaker import CircuitBreaker
+
+class Clock:
+    """Horloge monotone avancée à la main."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ollama_circuit_breaker.time, "monotonic", clock)
+    return clock
+
+def _opened(**params) -> CircuitBreaker:
+    breaker = CircuitBreaker("test", failure_threshold=3, reset_timeout=30.0, **params)
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    return breaker
+
+def test_consecutive_failures_open_the_circuit(clock):
+    breaker = _opened()
+
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    assert breaker.retry_in() == 30.0
+
+def test_half_open_lets_a_single_probe_through(clock):
+    breaker = _opened()
+    clock.now += 30.0
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+
+    breaker.record_success(1.0)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request()
+
+def test_failed_probes_double_backoff_until_success_resets_it(clock):
+    breaker = _opened(max_reset_timeout=100.0)
+
+    for expected in (60.0, 100.0):
+        clock.now += breaker.retry_in()
+        assert breaker.allow_request()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.retry_in() == expected
+
+    clock.now += breaker.retry_in()
+    assert breaker.allow_request()
+    breaker.record_success(1.0)
+    for _ in range(3):
+        breaker.record_failure()
+    assert breaker.retry_in() == 30.0
+
+def test_cancelled_probe_frees_the_slot(clock):
+    breaker = _opened()
+    clock.now += 30.0
+
+    assert breaker.allow_request()
+    breaker.record_cancel()
+    assert breaker.allow_request()
+
+def test_slow_threshold_stays_below_request_timeout():
+    breaker = CircuitBreaker("test")
+
+    assert breaker.slow_threshold(tokens=300) > 60.0
+    assert breaker.slow_threshold(tokens=300, timeout=60.0) == pytest.approx(48.0)
+    assert breaker.slow_threshold(tokens=10, timeout=60.0) == pytest.approx(22.5)
+
+def test_slow_success_counts_as_failure():
+    breaker = CircuitBreaker("test", failure_threshold=1)
+
+    breaker.record_success(50.0, tokens=300, timeout=60.0)
+    assert breaker.state == CircuitBreaker.OPEN
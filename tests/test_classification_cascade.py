@@ -0,0 +1,72 @@
+"""
+Tests de l'apprentissage des verdicts de la génération et du calibrage des règles.
+"""
+from app.ai.classification_cascade import ClassificationCascade, ConfidenceCalibrator
+from app.ai.classifier_store import ClassifierStore
+from app.ai.smart_classifier import EmailAnalysis
+from app.models.email_model import Email
+
+class FakeProcessor:
+    """Niveaux embeddings (sans verdict) et génération (verdict fixé)."""
+
+    def __init__(self, llm_analysis):
+        self.llm_analysis = llm_analysis
+
+    def classify_by_embedding(self, email):
+        return None, None
+
+    def analyze_with_llm(self, email, vector=None):
+        return dict(self.llm_analysis)
+
+class FakeRules:
+    """Règles sans verdict ; enregistre les verdicts appris."""
+
+    def __init__(self):
+        self.learned = []
+        self.online_model = []
+
+    def analyze_email(self, email_data):
+        return EmailAnalysis(category='general', confidence=0.0, priority=3, should_auto_respond=False,
+                             suggested_response=None, extracted_info={}, reasoning='')
+
+    def learn_from_verdict(self, email_data, category, key=None):
+        self.learned.append(category)
+        return True
+
+def _classify(llm_analysis):
+    rules = FakeRules()
+    cascade = ClassificationCascade(FakeProcessor(llm_analysis), smart_classifier=rules)
+    email = Email(id="1", sender="billing@example.com", to="moi@example.com",
+                  subject="Facture de septembre", body="Veuillez trouver la facture ci-jointe.")
+    return cascade.classify(email), rules.learned
+
+def test_llm_verdict_without_confidence_is_not_learned():
+    analysis, learned = _classify({'category': 'invoice', 'sentiment': 'neutral', 'summary': '', 'source': 'llm'})
+
+    assert analysis['tier'] == ClassificationCascade.TIER_LLM
+    assert learned == []
+
+def test_confident_llm_verdict_is_learned():
+    _, learned = _classify({'category': 'invoice', 'sentiment': 'neutral', 'summary': '', 'source': 'llm',
+                            'confidence': 0.9})
+
+    assert learned == ['invoice']
+
+def test_calibrated_threshold_never_drops_below_floor():
+    calibrator = ConfidenceCalibrator(min_samples=10)
+    for _ in range(20):
+        calibrator.record(0.05, True)
+
+    assert calibrator.threshold() == calibrator.default_threshold
+
+def test_calibration_survives_restart(tmp_path):
+    store = ClassifierStore(str(tmp_path / "classifier.db"))
+    calibrator = ConfidenceCalibrator(min_samples=10, min_threshold=0.3, store=store)
+    for _ in range(20):
+        calibrator.record(0.45, True)
+    calibrator.save()
+
+    restored = ConfidenceCalibrator(min_samples=10, min_threshold=0.3, store=store)
+    assert restored.total == calibrator.total
+    assert restored.threshold() == 0.4
+    store.close()
@@ -0,0 +1,57 @@
+"""
+Tests du regroupement des messages quasi identiques.
+"""
+from app.ai.near_duplicates import NearDuplicateIndex
+from app.models.email_model import Email
+
+NEWSLETTER = ("Cette semaine dans la lettre d'information : les nouveautés du produit, "
+              "le calendrier des webinaires, les conseils de nos experts et les offres du mois. "
+              "Numéro {n}, envoyé à {n} abonnés. Se désabonner : https://example.com/u/{n}")
+MEETING = ("Bonjour, peux-tu relire le compte rendu de la réunion de mardi avant vendredi "
+           "et me dire si les chiffres du budget te conviennent ? Merci, Alice")
+
+def _email(email_id: str, body: str, subject: str = "Lettre d'information") -> Email:
+    return Email(id=email_id, sender="news@example.com", to="moi@example.com", subject=subject, body=body)
+
+def test_near_identical_messages_share_a_cluster():
+    index = NearDuplicateIndex()
+    index.add_emails([_email("n1", NEWSLETTER.format(n=1)), _email("n2", NEWSLETTER.format(n=2)),
+                      _email("m1", MEETING, subject="Compte rendu")])
+
+    assert index.cluster_of("n2") == "n1"
+    assert index.cluster_of("m1") == "m1"
+    assert index.members("n1") == ["n1", "n2"]
+    assert [cluster['id'] for cluster in index.clusters()] == ["n1"]
+
+def test_short_messages_are_not_indexed():
+    index = NearDuplicateIndex()
+
+    assert index.add(_email("s1", "Merci !", subject="Re")) is None
+    assert "s1" not in index
+
+def test_fallback_analysis_is_not_shared():
+    index = NearDuplicateIndex()
+    first, second, third = (_email(f"n{n}", NEWSLETTER.format(n=n)) for n in range(1, 4))
+    index.add(first)
+    index.record_analysis(first, {'category': 'general', 'source': 'fallback'})
+
+    assert index.shared_analysis(second) is None
+    index.record_analysis(second, {'category': 'newsletter', 'source': 'llm'})
+
+    shared = index.shared_analysis(third)
+    assert shared['category'] == 'newsletter'
+    assert shared['shared_from'] == "n1"
+    assert shared['cluster_size'] == 3
+
+def test_oldest_messages_are_evicted():
+    index = NearDuplicateIndex(max_emails=2)
+    index.add(_email("m1", MEETING, subject="Compte rendu"))
+    index.record_analysis(_email("m1", MEETING), {'category': 'work', 'source': 'rules'})
+    index.add_emails([_email("n1", NEWSLETTER.format(n=1)), _email("n2", NEWSLETTER.format(n=2))])
+
+    assert "m1" not in index
+    assert index.cluster_of("m1") is None
+    assert index.members("n2") == ["n1", "n2"]
+    # Le groupe vidé n'attire plus les messages qui lui ressemblent, et son analyse est oubliée
+    assert index.add(_email("m2", MEETING, subject="Compte rendu")) == "m2"
+    assert index.shared_analysis(_email("m2", MEETING, subject="Compte rendu")) is None
@@ -0,0 +1,28 @@
+"""
+Tests de l'apprentissage incrémental et des corrections du modèle appris.
+"""
+import numpy as np
+
+from app.ai.online_classifier import OnlineClassifier
+
+def _features(model: OnlineClassifier):
+    return model.features("Facture de septembre", "Veuillez trouver la facture ci-jointe.", "billing@example.com")
+
+def test_same_verdict_is_learned_once(tmp_path):
+    model = OnlineClassifier(str(tmp_path / "online.npz"))
+
+    assert model.learn(_features(model), 'invoice', key="m1")
+    assert not model.learn(_features(model), 'invoice', key="m1")
+    assert len(model) == 1
+
+def test_correction_replaces_previous_verdict(tmp_path):
+    model = OnlineClassifier(str(tmp_path / "online.npz"))
+    model.learn(_features(model), 'newsletter', key="m1")
+
+    assert model.learn(_features(model), 'invoice', weight=5.0, key="m1")
+
+    newsletter, invoice = model.categories.index('newsletter'), model.categories.index('invoice')
+    assert model.documents[newsletter] == 0.0
+    assert model.totals[newsletter] == 0.0
+    assert not np.any(model.counts[newsletter])
+    assert model.documents[invoice] == 5.0
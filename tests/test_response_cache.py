@@ -0,0 +1,25 @@
+"""
+Tests des clés du cache des réponses générées.
+"""
+from app.ai.response_cache import ResponseCache
+from app.models.email_model import Email
+
+def _email(**fields) -> Email:
+    return Email(id="m1", sender="alice@example.com", to="moi@example.com", subject="Point projet",
+                 snippet="On se voit demain pour faire le point ?", **fields)
+
+def test_list_and_full_email_share_keys():
+    light = _email()
+    full = _email(body="Bonjour,\n\nOn se voit demain pour faire le point ?\n\nAlice")
+
+    assert ResponseCache.key('summary', light, 100) == ResponseCache.key('summary', full, 100)
+
+def test_changed_content_or_other_email_misses():
+    key = ResponseCache.key('summary', _email(), 100)
+    edited = _email()
+    edited.snippet = "Finalement, on décale à lundi."
+    other = _email()
+    other.id = "m2"
+
+    assert ResponseCache.key('summary', edited, 100) != key
+    assert ResponseCache.key('summary', other, 100) != key
@@ -0,0 +1,32 @@
+"""
+Tests de l'indication d'urgence de l'index des expéditeurs.
+"""
+from datetime import datetime, timedelta
+
+from app.ai.sender_index import SenderIndex
+from app.models.email_model import Email
+
+START = datetime(2025, 10, 1, 9)
+
+def _received(i: int, sender: str = "news@example.com") -> Email:
+    return Email(id=f"in{i}", thread_id=f"t{i}", sender=sender, to="moi@example.com",
+                 subject=f"Message {i}", received_date=START + timedelta(hours=i), labels=["INBOX"])
+
+def test_no_low_hint_before_any_outgoing_mail(tmp_path):
+    index = SenderIndex(str(tmp_path / "senders.db"))
+    index.add_emails([_received(i) for i in range(3)])
+
+    assert index.urgency_hint("news@example.com") is None
+    index.close()
+
+def test_low_hint_once_outgoing_mail_is_synced(tmp_path):
+    index = SenderIndex(str(tmp_path / "senders.db"), own_addresses=["moi@example.com"])
+    index.add_emails([_received(i) for i in range(3)])
+    # Envoi reconnu par notre adresse, sans label SENT
+    index.add_emails([Email(id="out1", thread_id="t9", sender="Moi <moi@example.com>", to="ami@example.com",
+                            subject="Salut", received_date=START, labels=["INBOX"])])
+
+    assert index.outgoing_seen
+    assert index.urgency_hint("news@example.com") == "low"
+    assert index.get("ami@example.com").sent == 1
+    index.close()
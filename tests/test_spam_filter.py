@@ -0,0 +1,63 @@
+"""
+Tests de l'apprentissage et du calibrage du filtre anti-spam.
+"""
+from app.ai.spam_filter import SpamFilter
+from app.models.email_model import Email
+
+def _spam(i: int) -> Email:
+    return Email(id=f"spam{i}", sender="Promo <promo@deals.biz>", to="moi@example.com",
+                 subject="Gagnez un iPhone gratuit !!", snippet=f"Offre exclusive {i}, cliquez vite pour gagner",
+                 labels=["SPAM"])
+
+def _ham(i: int) -> Email:
+    return Email(id=f"ham{i}", sender="Alice <alice@example.com>", to="moi@example.com",
+                 subject="Réunion projet", snippet=f"Compte rendu de la réunion {i} sur le planning",
+                 labels=["INBOX"])
+
+def _trained(tmp_path, **params) -> SpamFilter:
+    spam_filter = SpamFilter(str(tmp_path / "spam.npz"), **params)
+    spam_filter.observe([_spam(i) for i in range(20)] + [_ham(i) for i in range(20)])
+    return spam_filter
+
+def test_unsure_until_enough_examples(tmp_path):
+    spam_filter = SpamFilter(str(tmp_path / "spam.npz"))
+    spam_filter.observe([_spam(i) for i in range(5)] + [_ham(i) for i in range(5)])
+
+    assert not spam_filter.is_ready()
+    assert spam_filter.classify(_spam(99)) == 'unsure'
+
+def test_learns_from_labels(tmp_path):
+    spam_filter = _trained(tmp_path)
+
+    assert spam_filter.classify(_spam(99)) == 'spam'
+    assert spam_filter.classify(_ham(99)) == 'ham'
+
+def test_relabel_moves_counts_once(tmp_path):
+    spam_filter = _trained(tmp_path)
+    message = _spam(0)
+    message.labels = ["INBOX"]
+
+    assert spam_filter.observe([message]) == 1
+    assert spam_filter.observe([message]) == 0
+    assert (spam_filter.n_spam, spam_filter.n_ham) == (19, 21)
+
+def test_relabel_survives_reload(tmp_path):
+    spam_filter = _trained(tmp_path)
+    spam_filter.save()
+    reloaded = SpamFilter(str(tmp_path / "spam.npz"))
+    message = _ham(0)
+    message.labels = ["SPAM"]
+
+    reloaded.observe([message])
+    assert (reloaded.n_spam, reloaded.n_ham) == (21, 19)
+
+def test_calibrated_probability_from_filled_bin(tmp_path):
+    spam_filter = _trained(tmp_path, min_bin_samples=3)
+    # Appris une fois le filtre prêt : chaque score alimente le calibrage
+    spam_filter.observe([_spam(i) for i in range(20, 24)])
+
+    bin_index = spam_filter.bins - 1
+    assert spam_filter.bin_total[bin_index] == 4
+    assert spam_filter.bin_spam[bin_index] == 4
+    assert spam_filter.spam_probability(_spam(99)) == (4 + 1) / (4 + 2)
+    assert spam_filter.classify(_spam(99)) == 'unsure'
@@ -0,0 +1,52 @@
+"""
+Tests de l'analyseur temporel avec des dates de réception Gmail (avec fuseau).
+"""
+from datetime import datetime, time, timedelta
+from email.utils import parsedate_to_datetime
+
+from app.models.email_model import Email
+from app.utils.temporal_parser import parse_emails, shared_parser
+
+RECEIVED = parsedate_to_datetime('Wed, 15 Oct 2025 09:00:00 +0200')
+
+# « demain à 14h » : lendemain de la réception dans le fuseau local, heure naïve
+TOMORROW_2PM = datetime.combine(RECEIVED.astimezone().date() + timedelta(days=1), time(14))
+
+def test_upcoming_with_aware_reference():
+    match = shared_parser().upcoming("Réunion demain à 14h", RECEIVED)
+
+    assert match is not None and match.has_time
+    assert match.start.tzinfo is None
+    assert match.start == TOMORROW_2PM
+
+def test_parse_emails_with_aware_received_date():
+    email = Email(id="1", sender="alice@example.com", to="moi@example.com",
+                  subject="Point projet", body="On se voit demain à 14h ?", received_date=RECEIVED)
+
+    [match] = parse_emails([email], processes=1)
+
+    assert match is not None and match.has_time
+    assert match.start == TOMORROW_2PM
+
+def test_bare_fractions_are_not_dates():
+    parser = shared_parser()
+
+    assert parser.parse("Version 3/4 du document", RECEIVED) == []
+    assert parser.parse("ratio 1/2 validé", RECEIVED) == []
+
+def test_numeric_date_with_context_or_year():
+    parser = shared_parser()
+
+    [match] = parser.parse("Livraison le 3/11", RECEIVED)
+    assert match.start == datetime(2025, 11, 3)
+    [match] = parser.parse("Échéance 3/11/2025", RECEIVED)
+    assert match.start == datetime(2025, 11, 3)
+
+def test_english_may_as_verb_is_not_a_month():
+    parser = shared_parser()
+
+    assert parser.parse("I may 5 people bring", RECEIVED) == []
+    [match] = parser.parse("Meeting on May 5", RECEIVED)
+    assert (match.start.month, match.start.day) == (5, 5)
+    [match] = parser.parse("see you may 5 2026", RECEIVED)
+    assert match.start == datetime(2026, 5, 5)
@@ -0,0 +1,57 @@
+"""
+Tests de la reconstruction des fils de conversation.
+"""
+from datetime import datetime, timedelta
+
+from app.ai.thread_index import ThreadIndex
+from app.models.email_model import Email
+
+START = datetime(2025, 10, 1, 9)
+
+def _email(name: str, hour: int, references=(), sender: str = "alice@example.com", labels=("INBOX",)) -> Email:
+    return Email(id=name, sender=sender, to="moi@example.com", subject="Projet",
+                 received_date=START + timedelta(hours=hour), labels=list(labels),
+                 message_id=f"<{name}@mail>", in_reply_to=references[-1] if references else "",
+                 references=list(references))
+
+def test_replies_join_the_thread(tmp_path):
+    index = ThreadIndex(str(tmp_path / "threads.db"))
+    index.add_emails([
+        _email("a", 0),
+        _email("b", 1, ["<a@mail>"]),
+        _email("c", 2, ["<a@mail>", "<b@mail>"]),
+        _email("x", 3),
+    ])
+
+    assert index.thread("c") == ["a", "b", "c"]
+    assert index.parent("c") == "b"
+    assert index.last_message("a") == "c"
+    assert index.thread("x") == ["x"]
+    index.close()
+
+def test_late_parent_reroots_existing_thread(tmp_path):
+    index = ThreadIndex(str(tmp_path / "threads.db"))
+    # Réponses synchronisées avant le message d'origine, puis un fil séparé relié plus tard
+    index.add_emails([_email("c", 2, ["<a@mail>", "<b@mail>"])])
+    index.add_emails([_email("d", 3, ["<z@mail>"])])
+    index.add_emails([_email("a", 0)])
+    index.add_emails([_email("z", 1, ["<a@mail>"])])
+
+    assert index.thread("a") == ["a", "z", "c", "d"]
+    assert index.thread("d") == index.thread("a")
+    index.close()
+
+def test_replied_after_sent_label_or_own_address(tmp_path):
+    index = ThreadIndex(str(tmp_path / "threads.db"), own_addresses=["Moi@example.com"])
+    index.add_emails([
+        _email("a", 0),
+        _email("b", 1, ["<a@mail>"], sender="Moi <moi@example.com>"),
+        _email("c", 2, ["<a@mail>", "<b@mail>"]),
+        _email("d", 3),
+        _email("e", 4, ["<d@mail>"], sender="moi@example.com", labels=["SENT"]),
+    ])
+
+    assert index.replied_after("a")
+    assert not index.replied_after("c")
+    assert index.replied_after("d")
+    index.close()